@@ -5,43 +5,356 @@ backup_manager.py - Backup tracking, restoration, and checkpoint system
 import difflib
 import json
 import os
-import shutil
+import sqlite3
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from atomic_io import atomic_write_bytes
+from blob_store import BlobStore
+from file_locks import get_lock_manager
+
+# Unreferenced blobs younger than this may belong to a backup that is being
+# registered right now, so garbage collection leaves them for a later run
+BLOB_GRACE_SECONDS = 600
+
+# A file's backups are stored as deltas against the previous backup, with a
+# full copy every this many versions so a restore applies at most
+# SNAPSHOT_INTERVAL - 1 deltas
+DEFAULT_SNAPSHOT_INTERVAL = 10
+
+# Latest backed-up content kept in memory per file, so the next backup's
+# delta does not have to rebuild its base from the store
+_RECENT_CONTENTS = 4
+
+# Seconds a registry write waits for another process's write to finish
+_BUSY_TIMEOUT = 30.0
+
+# Short ids drawn before falling back to a full uuid
+_ID_ATTEMPTS = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backups (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    backup_path TEXT,
+    operation TEXT,
+    server_name TEXT,
+    tool_name TEXT,
+    blob TEXT,
+    metadata TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS backups_file_path ON backups (file_path);
+CREATE INDEX IF NOT EXISTS backups_server_name ON backups (server_name);
+CREATE INDEX IF NOT EXISTS backups_timestamp ON backups (timestamp);
+
+CREATE TABLE IF NOT EXISTS checkpoints (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    server_name TEXT,
+    description TEXT,
+    files TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS checkpoints_server_name ON checkpoints (server_name);
+CREATE INDEX IF NOT EXISTS checkpoints_timestamp ON checkpoints (timestamp);
+
+CREATE TABLE IF NOT EXISTS blobs (
+    digest TEXT PRIMARY KEY,
+    refs INTEGER NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    dependents INTEGER NOT NULL DEFAULT 0,
+    base TEXT,
+    depth INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+_BACKUP_COLUMNS = ("id", "timestamp", "file_path", "backup_path", "operation", "server_name", "tool_name", "blob", "metadata")
 
 
 class BackupManager:
     """
     Track backups with metadata, support restoration and checkpoints.
+
+    Backup and checkpoint contents live in a content-addressed BlobStore
+    next to the registry; entries point at blob digests and the registry
+    keeps a reference count per blob, so identical content is stored once
+    and a blob is deleted when the last entry using it is cleaned up.
+    Successive backups of one file form delta chains (see store_backup);
+    a delta blob holds a reference on its base.
+    Entries from before the blob store keep their ``backup_path`` copies.
+
+    The registry is a SQLite database in WAL mode, indexed on id, file
+    path, server name and timestamp, so registering a backup is one small
+    transaction and lookups do not scan the history. Each thread gets its
+    own connection; writes run in ``BEGIN IMMEDIATE`` transactions, so
+    concurrent admin processes serialise on SQLite's lock while readers
+    proceed. A ``backups.json`` registry from earlier versions is imported
+    once and renamed to ``backups.json.migrated``.
     """
 
-    def __init__(self, registry_file: Optional[Path] = None):
+    def __init__(
+        self,
+        registry_file: Optional[Path] = None,
+        compression: Optional[str] = None,
+        snapshot_interval: Optional[int] = None,
+    ):
         if registry_file is None:
             cache_dir = Path.home() / ".cache" / "universal-mcp-admin"
             cache_dir.mkdir(parents=True, exist_ok=True)
-            registry_file = cache_dir / "backups.json"
+            registry_file = cache_dir / "backups.db"
         self.registry_file = Path(registry_file)
-        self._registry: Dict[str, Any] = self._load_registry()
-
-    def _load_registry(self) -> Dict[str, Any]:
-        if self.registry_file.exists():
+        self.registry_file.parent.mkdir(parents=True, exist_ok=True)
+        if compression is None:
+            compression = os.getenv("BACKUP_COMPRESSION", "none").strip().lower() or "none"
+        self.blobs = BlobStore(self.registry_file.parent / "blobs", compression)
+        if snapshot_interval is None:
             try:
-                with open(self.registry_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, Exception):
-                return {"backups": [], "checkpoints": []}
-        return {"backups": [], "checkpoints": []}
+                snapshot_interval = int(os.getenv("BACKUP_SNAPSHOT_INTERVAL", str(DEFAULT_SNAPSHOT_INTERVAL)))
+            except ValueError:
+                snapshot_interval = DEFAULT_SNAPSHOT_INTERVAL
+        self.snapshot_interval = max(1, snapshot_interval)
+        self._recent: "OrderedDict[str, Tuple[str, bytes]]" = OrderedDict()
+        self._recent_lock = threading.Lock()
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+        self._migrate_json(self.registry_file.with_name("backups.json"))
+
+    # ------------------------------------------------------------------
+    # Registry storage
+    # ------------------------------------------------------------------
 
-    def _save_registry(self) -> None:
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's registry connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.registry_file), timeout=_BUSY_TIMEOUT, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """One write transaction, holding SQLite's write lock from the start."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            self.registry_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.registry_file, 'w', encoding='utf-8') as f:
-                json.dump(self._registry, f, indent=2)
-        except Exception:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _migrate_json(self, json_file: Path) -> None:
+        """Import a backups.json registry once; other processes skip it."""
+        if not json_file.exists():
+            return
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_json'").fetchone():
+                return
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    legacy = json.load(f)
+            except (OSError, ValueError):
+                legacy = {}
+            for b in legacy.get("backups", []):
+                if b.get("id") and b.get("file_path"):
+                    self._insert_backup(conn, b, ignore_existing=True)
+            for c in legacy.get("checkpoints", []):
+                if c.get("id"):
+                    conn.execute(
+                        "INSERT OR IGNORE INTO checkpoints (id, timestamp, server_name, description, files) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (c["id"], c.get("timestamp", ""), c.get("server_name"), c.get("description"),
+                         json.dumps(c.get("files", []))),
+                    )
+            for digest, ref in legacy.get("blobs", {}).items():
+                conn.execute(
+                    "INSERT OR IGNORE INTO blobs (digest, refs, size, dependents, base, depth) VALUES (?, ?, ?, ?, ?, ?)",
+                    (digest, ref.get("refs", 0), ref.get("size", 0), ref.get("dependents", 0),
+                     ref.get("base"), ref.get("depth", 0)),
+                )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_json', ?)",
+                (datetime.now(timezone.utc).isoformat(),),
+            )
+        try:
+            os.replace(json_file, json_file.with_name(json_file.name + ".migrated"))
+        except OSError:
             pass
 
+    @staticmethod
+    def _insert_backup(conn: sqlite3.Connection, entry: Dict[str, Any], ignore_existing: bool = False) -> None:
+        """
+        Insert a backup row. Raises sqlite3.IntegrityError if the id is taken,
+        unless ignore_existing (the JSON import, which may meet rows twice).
+        """
+        values = [entry.get(column) for column in _BACKUP_COLUMNS]
+        values[-1] = json.dumps(entry.get("metadata") or {})
+        conn.execute(
+            f"INSERT {'OR IGNORE ' if ignore_existing else ''}INTO backups ({', '.join(_BACKUP_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(_BACKUP_COLUMNS))})",
+            values,
+        )
+
+    @staticmethod
+    def _insert_with_fresh_id(conn: sqlite3.Connection, insert: Callable[[str], None]) -> str:
+        """
+        Run insert(id) with a new short id, drawing another on the rare
+        collision with an existing one; returns the id that was stored.
+        """
+        for _ in range(_ID_ATTEMPTS - 1):
+            new_id = str(uuid.uuid4())[:8]
+            try:
+                insert(new_id)
+                return new_id
+            except sqlite3.IntegrityError:
+                continue
+        # Fall back to a full uuid, which cannot realistically collide
+        new_id = str(uuid.uuid4())
+        insert(new_id)
+        return new_id
+
+    @staticmethod
+    def _backup_entry(row: sqlite3.Row) -> Dict[str, Any]:
+        entry = {column: row[column] for column in _BACKUP_COLUMNS}
+        entry["metadata"] = json.loads(entry["metadata"] or "{}")
+        if entry["blob"] is None:
+            del entry["blob"]
+        return entry
+
+    @staticmethod
+    def _checkpoint_entry(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "timestamp": row["timestamp"],
+            "server_name": row["server_name"],
+            "description": row["description"],
+            "files": json.loads(row["files"] or "[]"),
+        }
+
+    # ------------------------------------------------------------------
+    # Blob references
+    # ------------------------------------------------------------------
+
+    def store_backup(self, file_path: Path) -> Path:
+        """
+        Store a file's current content as a blob and return the blob's path.
+
+        The content is stored as a delta against the file's latest backup
+        unless that backup's chain already holds snapshot_interval - 1
+        deltas. The blob is only kept once an entry referencing it is
+        registered.
+        """
+        key = str(file_path)
+        data = Path(file_path).read_bytes()
+        base, base_data = self._chain_base(key), None
+        if base is not None:
+            with self._recent_lock:
+                recent = self._recent.get(key)
+            if recent is not None and recent[0] == base:
+                base_data = recent[1]
+            else:
+                try:
+                    base_data = self.blobs.get(base)
+                except FileNotFoundError:
+                    base = None
+        digest = self.blobs.put(data, base, base_data)
+        with self._recent_lock:
+            self._recent[key] = (digest, data)
+            self._recent.move_to_end(key)
+            while len(self._recent) > _RECENT_CONTENTS:
+                self._recent.popitem(last=False)
+        return self.blobs.path_for(digest)
+
+    def _content_size(self, digest: str) -> int:
+        """Size of a blob's original content (the file has usually moved on)."""
+        with self._recent_lock:
+            for recent_digest, data in self._recent.values():
+                if recent_digest == digest:
+                    return len(data)
+        return len(self.blobs.get(digest))
+
+    def _chain_base(self, file_path: str) -> Optional[str]:
+        """Blob of the file's latest backup if the next one may be a delta on it."""
+        row = self._connect().execute(
+            "SELECT b.blob, r.depth FROM backups b LEFT JOIN blobs r ON r.digest = b.blob "
+            "WHERE b.file_path = ? AND b.blob IS NOT NULL ORDER BY b.seq DESC LIMIT 1",
+            (file_path,),
+        ).fetchone()
+        if row is None or row["depth"] is None or row["depth"] + 1 >= self.snapshot_interval:
+            return None
+        return row["blob"]
+
+    def _add_ref(self, conn: sqlite3.Connection, digest: str, size: int) -> None:
+        row = conn.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE blobs SET refs = refs + 1, size = CASE WHEN size = 0 THEN ? ELSE size END WHERE digest = ?",
+                (size, digest),
+            )
+            return
+        base, depth = self.blobs.base_of(digest), 0
+        if base:
+            # A delta keeps its base, and everything down its chain, alive
+            self._add_ref(conn, base, 0)
+            conn.execute("UPDATE blobs SET dependents = dependents + 1 WHERE digest = ?", (base,))
+            depth = conn.execute("SELECT depth FROM blobs WHERE digest = ?", (base,)).fetchone()[0] + 1
+        conn.execute(
+            "INSERT INTO blobs (digest, refs, size, dependents, base, depth) VALUES (?, 1, ?, 0, ?, ?)",
+            (digest, size, base, depth),
+        )
+
+    @staticmethod
+    def _drop_ref(conn: sqlite3.Connection, digest: Optional[str]) -> None:
+        """Drop one reference, and the base's reference if the blob is now unused."""
+        dependent = 0
+        while digest:
+            row = conn.execute("SELECT refs, base FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            if row is None:
+                return
+            if row["refs"] > 1:
+                conn.execute(
+                    "UPDATE blobs SET refs = refs - 1, dependents = dependents - ? WHERE digest = ?",
+                    (dependent, digest),
+                )
+                return
+            conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            digest, dependent = row["base"], 1
+
+    def _read_entry(self, entry: Dict[str, Any]) -> Tuple[bytes, int]:
+        """
+        Content of a backup entry, from its blob or a legacy backup file, and
+        the number of deltas applied to rebuild it.
+        """
+        if entry.get("blob"):
+            return self.blobs.read(entry["blob"])
+        backup_path = Path(entry["backup_path"])
+        if not backup_path.exists():
+            raise FileNotFoundError(f"Backup file not found: {backup_path}")
+        return backup_path.read_bytes(), 0
+
+    def _safety_backup(self, path: Path, restored_from: str) -> None:
+        """Back up a file that is about to be overwritten by a restore."""
+        self.register_backup(
+            str(path), str(self.store_backup(path)), "pre_restore",
+            metadata={"restored_from": restored_from},
+        )
+
     # ------------------------------------------------------------------
     # Backup tracking
     # ------------------------------------------------------------------
@@ -55,10 +368,13 @@ class BackupManager:
         tool_name: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
     ) -> str:
-        """Register a backup in the registry and return its id."""
-        backup_id = str(uuid.uuid4())[:8]
+        """
+        Register a backup in the registry and return its id.
+
+        A backup_path from ``store_backup`` is recorded as a reference to its
+        blob; any other path is recorded as a standalone backup file.
+        """
         entry = {
-            "id": backup_id,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "file_path": str(file_path),
             "backup_path": str(backup_path),
@@ -67,8 +383,20 @@ class BackupManager:
             "tool_name": tool_name,
             "metadata": metadata or {},
         }
-        self._registry.setdefault("backups", []).append(entry)
-        self._save_registry()
+        digest = self.blobs.digest_of(Path(backup_path))
+        size = 0
+        if digest:
+            try:
+                size = self._content_size(digest)
+            except (OSError, ValueError):
+                pass
+            entry["blob"] = digest
+        with self._transaction() as conn:
+            backup_id = self._insert_with_fresh_id(
+                conn, lambda new_id: self._insert_backup(conn, {**entry, "id": new_id})
+            )
+            if digest:
+                self._add_ref(conn, digest, size)
         return backup_id
 
     def list_backups(
@@ -77,19 +405,23 @@ class BackupManager:
         server_name: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Return backups filtered by file_path or server_name, newest first."""
-        backups = self._registry.get("backups", [])
+        clauses, params = [], []
         if file_path:
-            backups = [b for b in backups if b.get("file_path") == str(file_path)]
+            clauses.append("file_path = ?")
+            params.append(str(file_path))
         if server_name:
-            backups = [b for b in backups if b.get("server_name") == server_name]
-        return sorted(backups, key=lambda b: b.get("timestamp", ""), reverse=True)
+            clauses.append("server_name = ?")
+            params.append(server_name)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._connect().execute(
+            f"SELECT * FROM backups{where} ORDER BY timestamp DESC, seq DESC", params
+        ).fetchall()
+        return [self._backup_entry(row) for row in rows]
 
     def get_backup_metadata(self, backup_id: str) -> Optional[Dict[str, Any]]:
         """Get metadata for a specific backup."""
-        for b in self._registry.get("backups", []):
-            if b.get("id") == backup_id:
-                return b
-        return None
+        row = self._connect().execute("SELECT * FROM backups WHERE id = ?", (backup_id,)).fetchone()
+        return self._backup_entry(row) if row is not None else None
 
     # ------------------------------------------------------------------
     # Restoration
@@ -103,19 +435,22 @@ class BackupManager:
         if entry is None:
             return False, f"Backup '{backup_id}' not found in registry"
 
-        backup_path = Path(entry["backup_path"])
-        if not backup_path.exists():
-            return False, f"Backup file not found: {backup_path}"
+        started = time.perf_counter()
+        try:
+            data, deltas = self._read_entry(entry)
+        except FileNotFoundError as e:
+            return False, str(e)
+        read_ms = (time.perf_counter() - started) * 1000
 
         dest = Path(target_path) if target_path else Path(entry["file_path"])
 
-        # Safety backup of current file
-        if dest.exists():
-            safety_bak = dest.with_suffix(dest.suffix + ".pre-restore.bak")
-            shutil.copy2(dest, safety_bak)
-
-        shutil.copy2(backup_path, dest)
-        return True, f"Restored from backup '{backup_id}' to {dest}"
+        with get_lock_manager().lock(dest):
+            # Safety backup of current file
+            if dest.exists():
+                self._safety_backup(dest, backup_id)
+            atomic_write_bytes(dest, data)
+        rebuilt = f", {deltas} deltas applied" if deltas else ""
+        return True, f"Restored from backup '{backup_id}' to {dest} (read in {read_ms:.1f} ms{rebuilt})"
 
     # ------------------------------------------------------------------
     # Cleanup
@@ -124,46 +459,99 @@ class BackupManager:
     def cleanup_backups(
         self, older_than_days: int = 30, keep_recent: int = 10
     ) -> Tuple[int, int]:
-        """Remove old backup files and registry entries. Returns (removed, kept)."""
+        """
+        Remove old registry entries and the backup data no entry uses any
+        more. Returns (removed, kept).
+        """
         cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
-        backups = self._registry.get("backups", [])
-        # group by file_path
-        by_file: Dict[str, List[Dict[str, Any]]] = {}
-        for b in backups:
-            by_file.setdefault(b.get("file_path", ""), []).append(b)
-
-        keep_ids = set()
-        for fp, entries in by_file.items():
-            entries.sort(key=lambda b: b.get("timestamp", ""), reverse=True)
-            for i, entry in enumerate(entries):
-                if i < keep_recent:
-                    keep_ids.add(entry["id"])
-                    continue
-                ts_str = entry.get("timestamp", "")
+        with self._transaction() as conn:
+            removed, kept = self._cleanup_entries(conn, cutoff, keep_recent)
+        self._collect_blobs()
+        return removed, kept
+
+    def _cleanup_entries(
+        self, conn: sqlite3.Connection, cutoff: datetime, keep_recent: int
+    ) -> Tuple[int, int]:
+        # Only entries beyond each file's keep_recent newest are candidates
+        candidates = conn.execute(
+            "SELECT id, timestamp, backup_path, blob FROM ("
+            "SELECT id, timestamp, backup_path, blob, ROW_NUMBER() OVER "
+            "(PARTITION BY file_path ORDER BY timestamp DESC, seq DESC) AS rank FROM backups"
+            ") WHERE rank > ?",
+            (keep_recent,),
+        ).fetchall()
+
+        expired = []
+        for row in candidates:
+            try:
+                ts = datetime.fromisoformat((row["timestamp"] or "").rstrip("Z"))
+                if ts < cutoff:
+                    expired.append(row)
+            except Exception:
+                continue
+
+        conn.executemany("DELETE FROM backups WHERE id = ?", [(row["id"],) for row in expired])
+        for row in expired:
+            if row["blob"]:
+                self._drop_ref(conn, row["blob"])
+                continue
+            # Older entries may share one <file>.bak with entries being kept
+            bp = Path(row["backup_path"] or "")
+            shared = conn.execute("SELECT 1 FROM backups WHERE backup_path = ? LIMIT 1", (row["backup_path"],)).fetchone()
+            if not shared and bp.exists():
                 try:
-                    ts = datetime.fromisoformat(ts_str.rstrip("Z"))
-                    if ts >= cutoff:
-                        keep_ids.add(entry["id"])
+                    bp.unlink()
                 except Exception:
-                    keep_ids.add(entry["id"])
-
-        removed = 0
-        new_backups = []
-        for b in backups:
-            if b["id"] in keep_ids:
-                new_backups.append(b)
-            else:
-                bp = Path(b.get("backup_path", ""))
-                if bp.exists():
-                    try:
-                        bp.unlink()
-                    except Exception:
-                        pass
-                removed += 1
-
-        self._registry["backups"] = new_backups
-        self._save_registry()
-        return removed, len(new_backups)
+                    pass
+
+        kept = conn.execute("SELECT COUNT(*) FROM backups").fetchone()[0]
+        return len(expired), kept
+
+    def _collect_blobs(self) -> int:
+        """Delete stored blobs with no references. Returns bytes freed."""
+        referenced = {row[0] for row in self._connect().execute("SELECT digest FROM blobs")}
+        freed = 0
+        for digest, _ in list(self.blobs.iter_blobs()):
+            if digest not in referenced:
+                freed += self.blobs.delete(digest, min_age=BLOB_GRACE_SECONDS)
+        return freed
+
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """
+        Bytes referenced by backups and checkpoints versus bytes stored, delta
+        chain shape, and restore latency so far.
+        """
+        conn = self._connect()
+        # References held by deltas on their bases are not backups
+        totals = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size * (refs - dependents)), 0), COALESCE(SUM(refs - dependents), 0), "
+            "COALESCE(SUM(base IS NOT NULL), 0), COALESCE(MAX(depth), 0) FROM blobs"
+        ).fetchone()
+        blobs, referenced, references, deltas, max_depth = totals
+        stored = 0
+        for (digest,) in conn.execute("SELECT digest FROM blobs").fetchall():
+            path = self.blobs.path_for(digest)
+            if path is not None:
+                stored += path.stat().st_size
+        blob_stats = self.blobs.get_stats()
+        return {
+            "backups": conn.execute("SELECT COUNT(*) FROM backups").fetchone()[0],
+            "checkpoints": conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0],
+            "blobs": blobs,
+            "full_blobs": blobs - deltas,
+            "delta_blobs": deltas,
+            "max_chain_depth": max_depth,
+            "snapshot_interval": self.snapshot_interval,
+            "references": references,
+            "referenced_bytes": referenced,
+            "stored_bytes": stored,
+            "saved_bytes": referenced - stored,
+            "savings_ratio": round(1 - stored / referenced, 4) if referenced else 0.0,
+            "compression": self.blobs.compression,
+            "restore_reads": blob_stats["reads"],
+            "restore_ms_avg": blob_stats["read_ms_avg"],
+            "restore_ms_max": blob_stats["read_ms_max"],
+        }
 
     # ------------------------------------------------------------------
     # Diff
@@ -175,17 +563,16 @@ class BackupManager:
         if entry is None:
             return False, f"Backup '{backup_id}' not found"
 
-        backup_path = Path(entry["backup_path"])
         current_path = Path(entry["file_path"])
 
-        if not backup_path.exists():
-            return False, f"Backup file missing: {backup_path}"
+        try:
+            old_lines = self._read_entry(entry)[0].decode('utf-8').splitlines(keepends=True)
+        except FileNotFoundError as e:
+            return False, str(e)
         if not current_path.exists():
             return False, f"Current file missing: {current_path}"
 
-        with open(backup_path, 'r', encoding='utf-8') as f:
-            old_lines = f.readlines()
-        with open(current_path, 'r', encoding='utf-8') as f:
+        with open(current_path, 'r', encoding='utf-8', newline='') as f:
             new_lines = f.readlines()
 
         diff = difflib.unified_diff(
@@ -206,52 +593,83 @@ class BackupManager:
         file_paths: List[str],
     ) -> str:
         """Create a named checkpoint (snapshot of multiple files)."""
-        checkpoint_id = str(uuid.uuid4())[:8]
-        checkpoint_dir = self.registry_file.parent / "checkpoints" / checkpoint_id
-        checkpoint_dir.mkdir(parents=True, exist_ok=True)
-
         saved_files = []
         for fp in file_paths:
             p = Path(fp)
             if p.exists():
-                dest = checkpoint_dir / p.name
-                shutil.copy2(p, dest)
-                saved_files.append({"original": str(p), "saved": str(dest)})
-
-        entry = {
-            "id": checkpoint_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "server_name": server_name,
-            "description": description,
-            "files": saved_files,
-        }
-        self._registry.setdefault("checkpoints", []).append(entry)
-        self._save_registry()
+                data = p.read_bytes()
+                digest = self.blobs.put(data)
+                saved_files.append({
+                    "original": str(p), "blob": digest,
+                    "saved": str(self.blobs.path_for(digest)), "size": len(data),
+                })
+
+        timestamp = datetime.now(timezone.utc).isoformat()
+
+        def insert(new_id: str) -> None:
+            conn.execute(
+                "INSERT INTO checkpoints (id, timestamp, server_name, description, files) VALUES (?, ?, ?, ?, ?)",
+                (new_id, timestamp, server_name, description, json.dumps(saved_files)),
+            )
+
+        with self._transaction() as conn:
+            checkpoint_id = self._insert_with_fresh_id(conn, insert)
+            for f in saved_files:
+                self._add_ref(conn, f["blob"], f["size"])
         return checkpoint_id
 
     def list_checkpoints(self, server_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """List checkpoints, optionally filtered by server."""
-        cps = self._registry.get("checkpoints", [])
         if server_name:
-            cps = [c for c in cps if c.get("server_name") == server_name]
-        return sorted(cps, key=lambda c: c.get("timestamp", ""), reverse=True)
+            rows = self._connect().execute(
+                "SELECT * FROM checkpoints WHERE server_name = ? ORDER BY timestamp DESC, seq DESC", (server_name,)
+            ).fetchall()
+        else:
+            rows = self._connect().execute("SELECT * FROM checkpoints ORDER BY timestamp DESC, seq DESC").fetchall()
+        return [self._checkpoint_entry(row) for row in rows]
 
     def restore_checkpoint(self, checkpoint_id: str) -> Tuple[bool, str]:
         """Restore all files from a checkpoint."""
-        for cp in self._registry.get("checkpoints", []):
-            if cp.get("id") == checkpoint_id:
-                restored = []
-                for f in cp.get("files", []):
-                    src = Path(f["saved"])
-                    dest = Path(f["original"])
-                    if src.exists():
-                        if dest.exists():
-                            safety = dest.with_suffix(dest.suffix + ".pre-restore.bak")
-                            shutil.copy2(dest, safety)
-                        shutil.copy2(src, dest)
-                        restored.append(str(dest))
-                return True, f"Restored {len(restored)} files from checkpoint '{checkpoint_id}'"
-        return False, f"Checkpoint '{checkpoint_id}' not found"
+        row = self._connect().execute("SELECT * FROM checkpoints WHERE id = ?", (checkpoint_id,)).fetchone()
+        if row is None:
+            return False, f"Checkpoint '{checkpoint_id}' not found"
+        restored = []
+        files = self._checkpoint_entry(row)["files"]
+        with get_lock_manager().lock_many(f["original"] for f in files):
+            for f in files:
+                try:
+                    data, _ = self._read_entry({"blob": f.get("blob"), "backup_path": f["saved"]})
+                except FileNotFoundError:
+                    continue
+                dest = Path(f["original"])
+                if dest.exists():
+                    self._safety_backup(dest, checkpoint_id)
+                atomic_write_bytes(dest, data)
+                restored.append(str(dest))
+        return True, f"Restored {len(restored)} files from checkpoint '{checkpoint_id}'"
+
+
+    # ------------------------------------------------------------------
+    # Config history
+    # ------------------------------------------------------------------
+
+    def list_config_changes(
+        self,
+        server_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """List journaled claude_desktop_config.json changes, newest first."""
+        import config_manager
+        return config_manager.list_config_history(server_name, since, until, limit)
+
+    def get_config_version(
+        self, seq: Optional[int] = None, timestamp: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Reconstruct a previous config version by sequence number or timestamp."""
+        import config_manager
+        return config_manager.get_config_version(seq, timestamp)
 
 
 # Global instance
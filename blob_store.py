@@ -0,0 +1,225 @@
+"""
+blob_store.py - Content-addressed, deduplicated storage for backup copies
+"""
+
+import hashlib
+import lzma
+import os
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from atomic_io import atomic_write_bytes
+from line_delta import apply_delta, encode_delta
+
+# name -> (file suffix, compress, decompress)
+COMPRESSIONS: Dict[str, Tuple[str, Optional[Callable[[bytes], bytes]], Optional[Callable[[bytes], bytes]]]] = {
+    "none": ("", None, None),
+    "zlib": (".zz", zlib.compress, zlib.decompress),
+    "lzma": (".xz", lzma.compress, lzma.decompress),
+}
+
+# Marks a blob stored as a delta against another blob
+DELTA_SUFFIX = ".d"
+
+# A delta is only kept if it is smaller than this fraction of the content
+DELTA_MAX_RATIO = 0.5
+
+_BLOB_NAME = re.compile(r"^([0-9a-f]{64})(\.d)?(\.zz|\.xz)?$")
+
+
+class BlobStore:
+    """
+    File contents stored once per distinct content, named by their sha256.
+
+    A blob lives at ``<root>/<first two hex digits>/<sha256><suffix>``, where
+    the suffix names its compression, so blobs written under an earlier
+    compression setting stay readable. Blobs are immutable: storing content
+    that is already present only refreshes the blob's mtime. Which blobs are
+    still needed is tracked by the caller (the backup registry keeps the
+    reference counts); the store only writes, reads and deletes them.
+
+    Content stored with a base is kept as a line delta against the base
+    blob (``<sha256>.d<suffix>``, starting with the base's digest) when that
+    is less than half the size. Reading such a blob rebuilds it from the
+    nearest full blob down the chain; the caller bounds chain length by
+    storing a full blob every few versions.
+    """
+
+    def __init__(self, root: Path, compression: str = "none"):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}' (use one of: {', '.join(COMPRESSIONS)})")
+        self.root = Path(root)
+        self.compression = compression
+        self._lock = threading.Lock()
+        self._stats = {
+            "puts": 0, "deduplicated": 0, "deltas": 0, "bytes_in": 0, "bytes_written": 0,
+            "reads": 0, "deltas_applied": 0, "read_ms_total": 0.0, "read_ms_max": 0.0, "deleted": 0,
+        }
+
+    def _candidates(self, digest: str) -> Iterator[Path]:
+        folder = self.root / digest[:2]
+        for kind in ("", DELTA_SUFFIX):
+            for suffix, _, _ in COMPRESSIONS.values():
+                yield folder / (digest + kind + suffix)
+
+    def path_for(self, digest: str) -> Optional[Path]:
+        """Path of the stored blob for digest, or None if it is not stored."""
+        for path in self._candidates(digest):
+            if path.exists():
+                return path
+        return None
+
+    def digest_of(self, path: Path) -> Optional[str]:
+        """The digest a blob path belongs to, or None for paths outside the store."""
+        path = Path(path)
+        match = _BLOB_NAME.match(path.name)
+        if not match or path.parent.parent != self.root or path.parent.name != match.group(1)[:2]:
+            return None
+        return match.group(1)
+
+    def put(self, data: bytes, base: Optional[str] = None, base_data: Optional[bytes] = None) -> str:
+        """
+        Store data (if not already stored) and return its sha256 digest.
+
+        With base (a stored digest) and base_data (its content), data is
+        stored as a delta against it when that saves enough space.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        existing = self.path_for(digest)
+        if existing is not None:
+            try:
+                # A fresh mtime keeps the blob out of the unreferenced sweep
+                # until the caller has registered its reference
+                os.utime(existing)
+                with self._lock:
+                    self._stats["puts"] += 1
+                    self._stats["deduplicated"] += 1
+                    self._stats["bytes_in"] += len(data)
+                return digest
+            except FileNotFoundError:
+                pass
+
+        kind, payload = "", data
+        base_path = self.path_for(base) if base and base_data is not None else None
+        if base_path is not None:
+            delta = base.encode() + b"\n" + encode_delta(base_data, data)
+            if len(delta) < len(data) * DELTA_MAX_RATIO:
+                kind, payload = DELTA_SUFFIX, delta
+                try:
+                    os.utime(base_path)
+                except OSError:
+                    kind, payload = "", data
+
+        suffix, compress, _ = COMPRESSIONS[self.compression]
+        stored = compress(payload) if compress else payload
+        atomic_write_bytes(self.root / digest[:2] / (digest + kind + suffix), stored)
+        with self._lock:
+            self._stats["puts"] += 1
+            self._stats["deltas"] += 1 if kind else 0
+            self._stats["bytes_in"] += len(data)
+            self._stats["bytes_written"] += len(stored)
+        return digest
+
+    def _load(self, digest: str) -> Tuple[Optional[str], bytes]:
+        """(base digest, delta) for a delta blob, (None, content) otherwise."""
+        path = self.path_for(digest)
+        if path is None:
+            raise FileNotFoundError(f"Backup blob {digest} is missing from {self.root}")
+        data = path.read_bytes()
+        name = path.name
+        for suffix, _, decompress in COMPRESSIONS.values():
+            if suffix and name.endswith(suffix):
+                data = decompress(data)
+                name = name[:-len(suffix)]
+                break
+        if not name.endswith(DELTA_SUFFIX):
+            return None, data
+        eol = data.index(b"\n")
+        return data[:eol].decode("ascii"), data[eol + 1:]
+
+    def base_of(self, digest: str) -> Optional[str]:
+        """Digest of the blob a delta blob is stored against, or None."""
+        path = self.path_for(digest)
+        if path is None or DELTA_SUFFIX not in path.name[64:]:
+            return None
+        return self._load(digest)[0]
+
+    def read(self, digest: str) -> Tuple[bytes, int]:
+        """
+        Read a blob's original content and the number of deltas applied to
+        rebuild it.
+
+        Raises:
+            FileNotFoundError: If the blob or a blob down its chain is not stored
+        """
+        start = time.perf_counter()
+        deltas: List[bytes] = []
+        base, data = self._load(digest)
+        while base is not None:
+            deltas.append(data)
+            base, data = self._load(base)
+        for delta in reversed(deltas):
+            data = apply_delta(data, delta)
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats["reads"] += 1
+            self._stats["deltas_applied"] += len(deltas)
+            self._stats["read_ms_total"] += elapsed
+            self._stats["read_ms_max"] = max(self._stats["read_ms_max"], elapsed)
+        return data, len(deltas)
+
+    def get(self, digest: str) -> bytes:
+        """
+        Read a blob's original content.
+
+        Raises:
+            FileNotFoundError: If the blob or a blob down its chain is not stored
+        """
+        return self.read(digest)[0]
+
+    def delete(self, digest: str, min_age: float = 0.0) -> int:
+        """
+        Delete a blob unless it was stored or re-stored in the last min_age
+        seconds. Returns the number of bytes freed.
+        """
+        freed = 0
+        cutoff = time.time() - min_age
+        for path in self._candidates(digest):
+            try:
+                st = path.stat()
+                if st.st_mtime > cutoff:
+                    continue
+                path.unlink()
+                freed += st.st_size
+            except OSError:
+                continue
+        if freed:
+            with self._lock:
+                self._stats["deleted"] += 1
+        return freed
+
+    def iter_blobs(self) -> Iterator[Tuple[str, Path]]:
+        """Yield (digest, path) for every stored blob."""
+        if not self.root.is_dir():
+            return
+        for folder in self.root.iterdir():
+            if not folder.is_dir():
+                continue
+            for path in folder.iterdir():
+                digest = self.digest_of(path)
+                if digest:
+                    yield digest, path
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["compression"] = self.compression
+        stats["dedup_rate"] = round(stats["deduplicated"] / stats["puts"], 3) if stats["puts"] else 0.0
+        stats["read_ms_avg"] = round(stats["read_ms_total"] / stats["reads"], 3) if stats["reads"] else 0.0
+        stats["read_ms_total"] = round(stats["read_ms_total"], 3)
+        stats["read_ms_max"] = round(stats["read_ms_max"], 3)
+        return stats
@@ -0,0 +1,714 @@
+"""
+block_boundaries.py - One tokenising engine for block boundaries in every supported language
+"""
+
+import bisect
+import re
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from delimiter_lexer import LEXER_PROFILES, LexError, iter_delimiters
+
+# Three block styles share one interface:
+#   brace   - '{' ... '}' via the delimiter_lexer profiles (strings, chars,
+#             raw strings, comments, regex literals)
+#   keyword - opener keywords ... 'end' (Ruby, Crystal, Lua, Elixir, Julia)
+#   indent  - a logical line and the more-indented lines under it (Python, Nim)
+#
+# Keyword profiles:
+#   openers: keywords that always open a block
+#   statement_openers: keywords that open only at the start of a statement
+#     (Ruby's "x if y" / "x while y" modifiers do not)
+#   loop_openers: statement openers whose optional "do" on the same line
+#     belongs to them
+#   closers: keywords that close the innermost block
+#   line_comment: comment-to-end-of-line prefix
+#   line_block_comment: (opener, closer) that must start a line (=begin/=end)
+#   nested_comment: (opener, closer) of nesting block comments (#= =#)
+#   strings: (opener, closer, escapes, interpolation opener)
+#   bracket_scoped: keywords inside () and [] are not block keywords (Julia
+#     a[end], generators)
+#   extras: literal forms with dedicated scanners
+_RUBY_STRINGS = [
+    ('"', '"', True, '#{'),
+    ("'", "'", True, None),
+    ('`', '`', True, '#{'),
+]
+KEYWORD_PROFILES: Dict[str, Dict[str, Any]] = {
+    '.rb': {
+        'openers': {'def', 'class', 'module', 'do', 'begin', 'case'},
+        'statement_openers': {'if', 'unless', 'while', 'until', 'for'},
+        'loop_openers': {'while', 'until', 'for'},
+        'closers': {'end'},
+        'line_comment': '#',
+        'line_block_comment': ('=begin', '=end'),
+        'strings': _RUBY_STRINGS,
+        'extras': {'heredoc', 'percent', 'regex', 'char', 'endless_def'},
+    },
+    '.cr': {
+        'openers': {'def', 'class', 'module', 'struct', 'do', 'begin', 'case', 'macro', 'lib', 'enum'},
+        'statement_openers': {'if', 'unless', 'while', 'until'},
+        'loop_openers': {'while', 'until'},
+        'closers': {'end'},
+        'line_comment': '#',
+        'strings': _RUBY_STRINGS,
+        'extras': {'heredoc', 'percent', 'char', 'abstract_def'},
+    },
+    '.lua': {
+        # for/while open through their "do"; elseif/then do not nest
+        'openers': {'function', 'if', 'do', 'repeat'},
+        'closers': {'end', 'until'},
+        'line_comment': '--',
+        'strings': [('"', '"', True, None), ("'", "'", True, None)],
+        'extras': {'long_brackets'},
+    },
+    '.ex': {
+        'openers': {'do', 'fn'},
+        'closers': {'end'},
+        'line_comment': '#',
+        'strings': [
+            ('"""', '"""', True, '#{'),
+            ("'''", "'''", True, '#{'),
+            ('"', '"', True, '#{'),
+            ("'", "'", True, '#{'),
+        ],
+        'extras': {'sigil', 'char'},
+    },
+    '.jl': {
+        'openers': {
+            'function', 'macro', 'module', 'baremodule', 'struct', 'quote', 'begin',
+            'let', 'for', 'while', 'if', 'try', 'do', 'abstract', 'primitive',
+        },
+        'closers': {'end'},
+        'line_comment': '#',
+        'nested_comment': ('#=', '=#'),
+        'strings': [('"""', '"""', True, '$('), ('"', '"', True, '$(')],
+        'bracket_scoped': True,
+        'extras': {'julia_char'},
+    },
+}
+KEYWORD_PROFILES['.exs'] = KEYWORD_PROFILES['.ex']
+
+# Indent profiles:
+#   comment: comment prefix
+#   quotes: string quotes, longest first; prefixes: letters that may precede
+#     them (letters in raw_prefixes make the string raw)
+#   raw_triple: triple-quoted strings take no escapes
+#   doubled_raw_quote: "" inside a raw string is a literal quote (Nim)
+#   char_literal: "'" starts a character literal rather than a string
+#   block_comment: (opener, closer) comments spanning lines
+INDENT_PROFILES: Dict[str, Dict[str, Any]] = {
+    '.py': {
+        'comment': '#',
+        'quotes': ('"""', "'''", '"', "'"),
+        'prefixes': 'rRbBuUfF',
+        'raw_prefixes': '',   # r'\'' still ends at the second quote
+        'raw_triple': False,
+    },
+    '.nim': {
+        'comment': '#',
+        'quotes': ('"""', '"'),
+        'prefixes': 'rR',
+        'raw_prefixes': 'rR',
+        'raw_triple': True,
+        'doubled_raw_quote': True,
+        'char_literal': re.compile(r"'(?:\\.[^'\n]*|[^'\\\n])'"),
+        'block_comment': ('#[', ']#'),
+    },
+}
+
+BLOCK_STYLES: Dict[str, str] = {}
+for _ext in LEXER_PROFILES:
+    BLOCK_STYLES[_ext] = 'brace'
+for _ext in KEYWORD_PROFILES:
+    BLOCK_STYLES[_ext] = 'keyword'
+for _ext in INDENT_PROFILES:
+    BLOCK_STYLES[_ext] = 'indent'
+
+
+class Block(NamedTuple):
+    """A block's opening offset and the offset just past its end."""
+    start: int
+    end: int
+
+
+# ---------------------------------------------------------------------------
+# Keyword blocks
+# ---------------------------------------------------------------------------
+
+def _compile_keyword_scanner(profile: Dict[str, Any]) -> "re.Pattern[str]":
+    words = profile['openers'] | profile.get('statement_openers', set()) | profile['closers']
+    extras = profile.get('extras', set())
+    parts = []
+    if 'line_block_comment' in profile:
+        parts.append(rf"(?P<line_block_comment>^{re.escape(profile['line_block_comment'][0])}\b)")
+    if 'nested_comment' in profile:
+        parts.append(f"(?P<nested_comment>{re.escape(profile['nested_comment'][0])})")
+    if 'long_brackets' in extras:
+        parts.append(r"(?P<long_comment>--\[(?P<lc_level>=*)\[)")
+        parts.append(r"(?P<long_string>\[(?P<ls_level>=*)\[)")
+    parts.append(f"(?P<line_comment>{re.escape(profile['line_comment'])})")
+    if 'heredoc' in extras:
+        parts.append(r"""(?P<heredoc><<[~-]?(?P<hd_quote>['"`]?)(?P<hd_id>[A-Z_][A-Za-z0-9_]*)(?P=hd_quote))""")
+    if 'sigil' in extras:
+        parts.append(r"""(?P<sigil>~[a-zA-Z]+(?:"{3}|'{3}|[/|"'(\[{<]))""")
+    if 'percent' in extras:
+        parts.append(r"(?P<percent>(?<![\w)\]])%[qQwWiIrsx]?[(\[{<|!/^])")
+    if 'char' in extras:
+        parts.append(r"(?P<char>(?<![\w)\]}])\?(?:\\.|[^\s\\])(?!\w))")
+    if 'julia_char' in extras:
+        parts.append(r"(?P<char>(?<![\w)\]}'.])'(?:\\[^'\n]+|[^'\\\n])')")
+    for i, (opener, _, _, _) in enumerate(sorted(profile['strings'], key=lambda rule: -len(rule[0]))):
+        parts.append(f"(?P<string{i}>{re.escape(opener)})")
+    if 'regex' in extras:
+        parts.append(r"(?P<regex>/)")
+    if profile.get('bracket_scoped'):
+        parts.append(r"(?P<open_bracket>[(\[])|(?P<close_bracket>[)\]])")
+    # Keywords, but not a method call (.end), symbol (:end), variable
+    # (@end, $end) or keyword-list key (do:)
+    keyword_alt = "|".join(sorted(words, key=len, reverse=True))
+    parts.append(rf"(?P<keyword>(?<![\w.:@$])(?:{keyword_alt})(?![\w?!]|:(?!:)))")
+    return re.compile("|".join(parts), re.MULTILINE)
+
+
+for _profile in KEYWORD_PROFILES.values():
+    if '_scanner' not in _profile:
+        _profile['_scanner'] = _compile_keyword_scanner(_profile)
+        _profile['_strings'] = {rule[0]: rule for rule in _profile['strings']}
+
+_CLOSING = {'(': ')', '[': ']', '{': '}', '<': '>'}
+_ENDLESS_DEF = re.compile(r'def\s+\S+?(?:\([^)\n]*\)\s*|\s+)=(?![=~>])')
+_ABSTRACT_DEF = re.compile(r'\babstract\s+$')
+_OPERAND_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^\n')
+_STATEMENT_PRECEDERS = set('=(;,|&!{[\n')
+_STATEMENT_WORDS = {'then', 'do', 'else', 'begin'}
+_OPERAND_WORDS = {'if', 'unless', 'when', 'while', 'until', 'and', 'or', 'not', 'return', 'then'}
+
+
+def _word_before(code: str, j: int) -> str:
+    k = j
+    while k > 0 and (code[k - 1].isalnum() or code[k - 1] == '_'):
+        k -= 1
+    return code[k:j + 1]
+
+
+def _previous_significant(code: str, i: int) -> int:
+    j = i - 1
+    while j >= 0 and code[j] in ' \t':
+        j -= 1
+    return j
+
+
+def _statement_start(code: str, i: int) -> bool:
+    """True if the token at i begins a statement (not a trailing modifier)."""
+    j = _previous_significant(code, i)
+    if j < 0 or code[j] in _STATEMENT_PRECEDERS:
+        return True
+    return (code[j].isalnum() or code[j] == '_') and _word_before(code, j) in _STATEMENT_WORDS
+
+
+def _operand_expected(code: str, i: int) -> bool:
+    """True if a '/' at i starts a regex literal rather than dividing."""
+    j = _previous_significant(code, i)
+    if j < 0 or code[j] in _OPERAND_PRECEDERS:
+        return True
+    return (code[j].isalnum() or code[j] == '_') and _word_before(code, j) in _OPERAND_WORDS
+
+
+def _skip_quoted(code: str, i: int, closer: str, escapes: bool, interp: Optional[str]) -> int:
+    """Offset after a string body starting at i; unterminated strings run to the end."""
+    n = len(code)
+    while i < n:
+        if escapes and code[i] == '\\':
+            i += 2
+            continue
+        if code.startswith(closer, i):
+            return i + len(closer)
+        if interp and code.startswith(interp, i):
+            i = _skip_interpolation(code, i + len(interp), interp[-1])
+            continue
+        i += 1
+    return n
+
+
+def _skip_interpolation(code: str, i: int, opener: str) -> int:
+    """Offset after the code of #{...} / $(...), skipping nested strings."""
+    closer = _CLOSING[opener]
+    depth = 1
+    n = len(code)
+    while i < n:
+        ch = code[i]
+        if ch in '"\'':
+            i = _skip_quoted(code, i + 1, ch, True, '#{' if ch == '"' else None)
+            continue
+        if ch == opener:
+            depth += 1
+        elif ch == closer:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def _skip_delimited(code: str, i: int, opener: str) -> int:
+    """Offset after a %-literal, sigil or regex body whose delimiter was ``opener``."""
+    closer = _CLOSING.get(opener, opener)
+    depth = 1
+    n = len(code)
+    while i < n:
+        ch = code[i]
+        if ch == '\\':
+            i += 2
+            continue
+        if closer != opener and ch == opener:
+            depth += 1
+        elif ch == closer:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def _skip_nested_comment(code: str, i: int, opener: str, closer: str) -> int:
+    depth = 1
+    n = len(code)
+    while i < n:
+        next_close = code.find(closer, i)
+        if next_close == -1:
+            return n
+        next_open = code.find(opener, i, next_close)
+        if next_open != -1:
+            depth += 1
+            i = next_open + len(opener)
+            continue
+        depth -= 1
+        i = next_close + len(closer)
+        if depth == 0:
+            return i
+    return n
+
+
+def _iter_keyword_events(code: str, profile: Dict[str, Any], start: int = 0) -> Iterator[Tuple[bool, int, int]]:
+    """Yield (is_opener, token start, token end) for block keywords outside strings and comments."""
+    scanner = profile['_scanner']
+    strings = profile['_strings']
+    openers = profile['openers']
+    closers = profile['closers']
+    statement_openers = profile.get('statement_openers', set())
+    loop_openers = profile.get('loop_openers', set())
+    extras = profile.get('extras', set())
+    bracket_scoped = profile.get('bracket_scoped', False)
+    n = len(code)
+    i = start
+    brackets = 0
+    absorb_do_until = -1   # "while x do": the do belongs to the while
+    heredoc: Optional[Tuple[int, "re.Pattern[str]"]] = None
+
+    while i < n:
+        m = scanner.search(code, i)
+        if heredoc is not None and (m is None or m.start() > heredoc[0]):
+            # Past the line that announced a heredoc: skip its body
+            end = heredoc[1].search(code, heredoc[0])
+            i = end.end() if end else n
+            heredoc = None
+            continue
+        if m is None:
+            return
+        kind = m.lastgroup
+        i = m.end()
+
+        if kind == 'keyword':
+            if bracket_scoped and brackets:
+                continue
+            word = m.group()
+            if word in closers:
+                yield False, m.start(), m.end()
+            elif word == 'do' and m.start() < absorb_do_until:
+                absorb_do_until = -1
+            elif word in statement_openers:
+                if _statement_start(code, m.start()):
+                    if word in loop_openers:
+                        newline = code.find('\n', m.end())
+                        absorb_do_until = n if newline == -1 else newline
+                    yield True, m.start(), m.end()
+            elif word in openers:
+                if word == 'def':
+                    if 'endless_def' in extras and _ENDLESS_DEF.match(code, m.start()):
+                        continue
+                    line_start = code.rfind('\n', 0, m.start()) + 1
+                    if 'abstract_def' in extras and _ABSTRACT_DEF.search(code, line_start, m.start()):
+                        continue
+                yield True, m.start(), m.end()
+        elif kind == 'line_comment':
+            newline = code.find('\n', i)
+            i = n if newline == -1 else newline
+        elif kind == 'line_block_comment':
+            closer = re.compile(rf"^{re.escape(profile['line_block_comment'][1])}\b[^\n]*", re.MULTILINE)
+            end = closer.search(code, i)
+            i = end.end() if end else n
+        elif kind == 'nested_comment':
+            i = _skip_nested_comment(code, i, *profile['nested_comment'])
+        elif kind in ('long_comment', 'long_string'):
+            level = m.group('lc_level' if kind == 'long_comment' else 'ls_level')
+            end = code.find(']' + level + ']', i)
+            i = n if end == -1 else end + len(level) + 2
+        elif kind == 'heredoc':
+            newline = code.find('\n', i)
+            if newline != -1:
+                terminator = re.compile(rf'^[ \t]*{re.escape(m.group("hd_id"))}[ \t]*$', re.MULTILINE)
+                heredoc = (newline, terminator)
+        elif kind == 'sigil':
+            token = m.group()
+            if token.endswith(('"""', "'''")):
+                end = code.find(token[-3:], i)
+                i = n if end == -1 else end + 3
+            else:
+                i = _skip_delimited(code, i, token[-1])
+        elif kind == 'percent':
+            i = _skip_delimited(code, i, m.group()[-1])
+        elif kind == 'regex':
+            if _operand_expected(code, m.start()):
+                i = _skip_delimited(code, i, '/')
+        elif kind == 'open_bracket':
+            brackets += 1
+        elif kind == 'close_bracket':
+            brackets = max(0, brackets - 1)
+        elif kind != 'char':
+            _, closer, escapes, interp = strings[m.group()]
+            i = _skip_quoted(code, i, closer, escapes, interp)
+
+
+def _keyword_blocks(
+    code: str, language: str, start: int = 0, first_only: bool = False, open_before: Optional[int] = None
+) -> List[Block]:
+    """Match opener and closer keywords; unclosed blocks run to the end of the code."""
+    stack: List[int] = []
+    blocks: List[Block] = []
+    for is_opener, token_start, token_end in _iter_keyword_events(code, KEYWORD_PROFILES[language], start):
+        if is_opener:
+            if first_only and not stack and open_before is not None and token_start >= open_before:
+                return []
+            stack.append(token_start)
+        elif stack:
+            blocks.append(Block(stack.pop(), token_end))
+            if first_only and not stack:
+                return blocks
+    blocks.extend(Block(opened, len(code)) for opened in stack)
+    return blocks
+
+
+# ---------------------------------------------------------------------------
+# Indentation blocks
+# ---------------------------------------------------------------------------
+
+# Open multi-line construct: (closer, escapes, doubled closer is literal)
+_Pending = Tuple[str, bool, bool]
+
+
+def _find_closer(line: str, j: int, pending: _Pending) -> int:
+    """Offset after the pending closer in line from j; -1 if it is not on this line."""
+    closer, escapes, doubled = pending
+    length = len(line)
+    while j < length:
+        if escapes and line[j] == '\\':
+            j += 2
+            continue
+        if line.startswith(closer, j):
+            if doubled and line.startswith(closer * 2, j):
+                j += 2
+                continue
+            return j + len(closer)
+        j += 1
+    return -1
+
+
+def _iter_logical_lines(code: str, language: str, start: int = 0) -> Iterator[Tuple[str, int, int, int]]:
+    """
+    Yield (kind, line start, line end, indent) for each line from ``start``.
+
+    kind is "code" for a line that starts a logical line, "blank", "comment"
+    for comment-only lines, or "cont" for lines that continue a bracket, a
+    backslash continuation, a multi-line string or a block comment.
+    """
+    profile = INDENT_PROFILES[language]
+    comment = profile['comment']
+    quotes = profile['quotes']
+    prefixes = profile['prefixes']
+    raw_prefixes = profile['raw_prefixes']
+    char_literal = profile.get('char_literal')
+    block_comment = profile.get('block_comment')
+    n = len(code)
+    pos = start
+    pending: Optional[_Pending] = None
+    depth = 0
+    continued = False
+
+    while pos < n:
+        newline = code.find('\n', pos)
+        line_end = n if newline == -1 else newline
+        line = code[pos:line_end]
+        stripped = line.lstrip()
+        indent = len(line) - len(stripped)
+
+        if pending is not None or depth > 0 or continued:
+            kind = 'cont'
+        elif not stripped.strip():
+            kind = 'blank'
+        elif stripped.startswith(comment) and not (block_comment and stripped.startswith(block_comment[0])):
+            kind = 'comment'
+        else:
+            kind = 'code'
+
+        j = 0
+        length = len(line)
+        continued = False
+        while j < length:
+            if pending is not None:
+                end = _find_closer(line, j, pending)
+                if end == -1:
+                    break
+                j = end
+                pending = None
+                continue
+            ch = line[j]
+            if ch == comment[0] and line.startswith(comment, j):
+                if block_comment and line.startswith(block_comment[0], j):
+                    pending = (block_comment[1], False, False)
+                    j += len(block_comment[0])
+                    continue
+                break
+            if ch in '([{':
+                depth += 1
+            elif ch in ')]}':
+                depth = max(0, depth - 1)
+            elif ch == "'" and char_literal is not None:
+                # A char literal, unless it is a type suffix such as 1'u8
+                if not (j and (line[j - 1].isalnum() or line[j - 1] == '_')):
+                    m = char_literal.match(line, j)
+                    if m:
+                        j = m.end()
+                        continue
+            elif ch in '"\'':
+                quote = next((q for q in quotes if line.startswith(q, j)), ch)
+                k = j
+                while k > 0 and j - k < 2 and line[k - 1] in prefixes:
+                    k -= 1
+                raw = any(c in raw_prefixes for c in line[k:j])
+                if len(quote) == 3:
+                    pending = (quote, not profile['raw_triple'], False)
+                else:
+                    pending = (quote, not raw, raw and profile.get('doubled_raw_quote', False))
+                j += len(quote)
+                continue
+            elif ch == '\\' and j == length - 1:
+                continued = True
+            j += 1
+        if pending is not None and len(pending[0]) == 1:
+            pending = None   # Single-quoted strings end with the line
+        yield kind, pos, line_end, indent
+        pos = line_end + 1
+
+
+def _indent_blocks(code: str, language: str, start: int = 0, first_only: bool = False) -> Tuple[List[Block], int]:
+    """
+    Blocks of every logical line (or only the first one from ``start``).
+    Trailing blank lines and comments no deeper than the header are left out.
+
+    Returns:
+        Tuple of (blocks, offset where scanning stopped)
+    """
+    blocks: List[Block] = []
+    # Open headers: [indent, line start, end of the last line belonging to it]
+    stack: List[List[int]] = []
+
+    for kind, line_start, line_end, indent in _iter_logical_lines(code, language, start):
+        if kind == 'blank':
+            continue
+        if kind == 'code':
+            while stack and stack[-1][0] >= indent:
+                _, opened, last = stack.pop()
+                blocks.append(Block(opened, last))
+            if first_only and blocks and not stack:
+                return blocks, line_end
+            for entry in stack:
+                entry[2] = line_end
+            stack.append([indent, line_start, line_end])
+            continue
+        for entry in stack:
+            # Continuation lines always belong; comments only when indented
+            if kind == 'cont' or indent > entry[0]:
+                entry[2] = line_end
+    while stack:
+        _, opened, last = stack.pop()
+        blocks.append(Block(opened, last))
+    return blocks, len(code)
+
+
+# ---------------------------------------------------------------------------
+# Public interface
+# ---------------------------------------------------------------------------
+
+class BlockBoundaries:
+    """
+    Every block in one source text, computed in a single pass.
+
+    ``end_after(offset)`` answers "where does the first block opening at or
+    after this offset end" with a binary search.
+    """
+
+    def __init__(self, code: str, blocks: Sequence[Block]):
+        self.code = code
+        self.blocks = sorted(blocks)
+        self._starts = [block.start for block in self.blocks]
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def end_after(self, offset: int) -> Optional[int]:
+        """Offset just past the end of the first block opening at or after offset."""
+        k = bisect.bisect_left(self._starts, offset)
+        if k == len(self.blocks):
+            return None
+        return self.blocks[k].end
+
+    def line_ranges(self) -> List[Tuple[int, int]]:
+        """(first line, one past last line) of every block, 0-based."""
+        newlines = [m.start() for m in re.finditer('\n', self.code)]
+        return [
+            (bisect.bisect_left(newlines, block.start), bisect.bisect_left(newlines, block.end - 1) + 1)
+            for block in self.blocks
+        ]
+
+
+def block_boundaries(code: str, language: str) -> Optional[BlockBoundaries]:
+    """
+    All block boundaries of a source file in one linear pass.
+
+    Returns None if the language has no block profile or brace code cannot
+    be lexed (unbalanced brackets, unterminated strings or comments).
+    """
+    style = BLOCK_STYLES.get(language)
+    if style == 'brace':
+        stack: List[int] = []
+        blocks: List[Block] = []
+        try:
+            for ch, offset in iter_delimiters(code, language):
+                if ch == '{':
+                    stack.append(offset)
+                elif ch == '}':
+                    blocks.append(Block(stack.pop(), offset + 1))
+        except LexError:
+            return None
+        return BlockBoundaries(code, blocks)
+    if style == 'keyword':
+        return BlockBoundaries(code, _keyword_blocks(code, language))
+    if style == 'indent':
+        return BlockBoundaries(code, _indent_blocks(code, language)[0])
+    return None
+
+
+def block_end(code: str, language: str, start: int = 0, open_before: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """
+    End of the first block opening at or after ``start`` (a line start).
+
+    Scans only as far as that block, so locating one definition costs its
+    length rather than the file's.
+
+    Args:
+        code: Source text
+        language: File extension
+        start: Offset of the line to start from
+        open_before: Keyword styles only: the block must open before this
+            offset (e.g. on the header line), otherwise None
+
+    Returns:
+        (offset just past the block, offset scanning stopped at), or None if
+        no block opens there or brace code cannot be lexed
+    """
+    style = BLOCK_STYLES.get(language)
+    if style == 'brace':
+        depth = 0
+        try:
+            for ch, offset in iter_delimiters(code, language, start):
+                if ch == '{':
+                    depth += 1
+                elif ch == '}':
+                    depth -= 1
+                    if depth == 0:
+                        return offset + 1, offset + 1
+        except LexError:
+            return None
+        return None
+    if style == 'keyword':
+        blocks = _keyword_blocks(code, language, start, first_only=True, open_before=open_before)
+        if not blocks:
+            return None
+        end = max(block.end for block in blocks)
+        return end, end
+    if style == 'indent':
+        blocks, scanned = _indent_blocks(code, language, start, first_only=True)
+        if not blocks:
+            return None
+        first = min(blocks, key=lambda block: block.start)
+        return first.end, scanned
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+_BENCH_TEMPLATES = {
+    '.rs': 'pub fn f{i}(x: i32) -> i32 {{\n    let s = "{{ not a block }}"; // }}\n    let c = \'}}\';\n    if x > 0 {{ x }} else {{ -x }}\n}}\n\n',
+    '.js': 'function f{i}(a) {{\n  const s = `${{a}} }}`;\n  const r = /[{{]+/g;\n  return s.replace(r, "}}");\n}}\n\n',
+    '.py': 'def f{i}(x):\n    """Docstring with\n    def fake():\n"""\n    if x:\n        return [\n    1, 2]\n    return x\n\n\n',
+    '.rb': 'def f{i}(x)\n  s = "#{{x}} end"\n  return 1 if x\n  [1].each do |y|\n    y\n  end\nend\n\n',
+    '.lua': 'function M.f{i}(x)\n  local s = [[ end ]]\n  for i = 1, x do\n    if i then print(i) end\n  end\nend\n\n',
+    '.ex': '  def f{i}(x) do\n    s = "end #{{x}}"\n    Enum.map([x], fn y -> y end)\n  end\n\n',
+    '.jl': 'function f{i}(x)\n    y = x[end]\n    for i in 1:x\n        s = "end"\n    end\n    return y\nend\n\n',
+}
+
+
+def benchmark_boundaries(
+    sizes: Sequence[int] = (1 << 20, 4 << 20),
+    languages: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Time a full one-pass boundary scan on generated sources of each size.
+
+    Returns:
+        Dictionary mapping language -> size in bytes -> blocks, seconds, MB/s
+    """
+    results: Dict[str, Any] = {}
+    for language in languages or list(_BENCH_TEMPLATES):
+        template = _BENCH_TEMPLATES[language]
+        row: Dict[str, Any] = {}
+        for size in sizes:
+            parts = []
+            total = 0
+            i = 0
+            while total < size:
+                part = template.format(i=i)
+                parts.append(part)
+                total += len(part)
+                i += 1
+            code = "".join(parts)
+            start = time.perf_counter()
+            boundaries = block_boundaries(code, language)
+            seconds = time.perf_counter() - start
+            row[str(size)] = {
+                "definitions": i,
+                "blocks": len(boundaries) if boundaries is not None else None,
+                "seconds": round(seconds, 3),
+                "mb_per_s": round(len(code) / (1 << 20) / seconds, 2) if seconds else None,
+            }
+        results[language] = row
+    return results
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(benchmark_boundaries(), indent=2))
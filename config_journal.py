@@ -0,0 +1,444 @@
+"""
+config_journal.py - Append-only journal of claude_desktop_config.json changes
+
+Every config write is recorded as one JSON-Patch-like delta against the
+previous version. A full snapshot is appended every few deltas, so any prior
+version can be rebuilt by replaying at most one snapshot interval of deltas.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from file_locks import get_lock_manager
+
+# Top-level config sections whose children are individual servers
+SERVER_SECTIONS = ("mcpServers", "_disabledServers")
+
+
+# ============================================================================
+# Delta computation
+# ============================================================================
+
+
+def _escape_pointer(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape_pointer(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """Return a stable content hash of a config dictionary."""
+    canonical = json.dumps(config, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def diff_configs(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compute JSON-Patch-like operations turning old into new.
+
+    Dictionary sections are diffed one level deep, so a change to one server
+    yields one operation on /mcpServers/<name> rather than a whole-file copy.
+    """
+    ops: List[Dict[str, Any]] = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": "/" + _escape_pointer(key)})
+    for key, value in new.items():
+        path = "/" + _escape_pointer(key)
+        if key not in old:
+            ops.append({"op": "add", "path": path, "value": value})
+            continue
+        old_value = old[key]
+        if old_value == value:
+            continue
+        if isinstance(old_value, dict) and isinstance(value, dict):
+            for sub in old_value:
+                if sub not in value:
+                    ops.append({"op": "remove", "path": f"{path}/{_escape_pointer(sub)}"})
+            for sub, sub_value in value.items():
+                if sub not in old_value:
+                    ops.append({"op": "add", "path": f"{path}/{_escape_pointer(sub)}", "value": sub_value})
+                elif old_value[sub] != sub_value:
+                    ops.append({"op": "replace", "path": f"{path}/{_escape_pointer(sub)}", "value": sub_value})
+        else:
+            ops.append({"op": "replace", "path": path, "value": value})
+    return ops
+
+
+def apply_patch(config: Dict[str, Any], ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply operations produced by diff_configs() to config in place and return it."""
+    for op in ops:
+        tokens = [_unescape_pointer(t) for t in op["path"].lstrip("/").split("/")]
+        parent = config
+        for token in tokens[:-1]:
+            parent = parent.setdefault(token, {})
+        if op["op"] == "remove":
+            parent.pop(tokens[-1], None)
+        else:
+            parent[tokens[-1]] = op["value"]
+    return config
+
+
+def servers_in_patch(ops: List[Dict[str, Any]]) -> List[str]:
+    """Return the server names touched by a patch."""
+    names = []
+    for op in ops:
+        tokens = [_unescape_pointer(t) for t in op["path"].lstrip("/").split("/")]
+        if tokens[0] in SERVER_SECTIONS:
+            if len(tokens) > 1:
+                names.append(tokens[1])
+            elif isinstance(op.get("value"), dict):
+                names.extend(op["value"].keys())
+    return sorted(set(names))
+
+
+# ============================================================================
+# Journal
+# ============================================================================
+
+
+class ConfigJournal:
+    """
+    Append-only JSONL journal of config versions.
+
+    Records are either {"type": "snapshot", "config": ...} or
+    {"type": "delta", "patch": [...]}; both carry seq, timestamp, the touched
+    server names and the hash of the resulting config. An in-memory index of
+    record offsets is built once and extended on append.
+
+    Appends and compaction hold the journal's file lock (shared with other
+    admin processes) from the index refresh through the write, so sequence
+    numbers stay unique. A final line without a newline is an append in
+    progress or a torn write; it is only truncated under that lock. Corrupt
+    lines elsewhere are skipped and counted, never truncated.
+    """
+
+    def __init__(
+        self,
+        journal_file: Path,
+        snapshot_interval: int = 50,
+        max_records: int = 5000,
+        keep_versions: int = 1000,
+    ):
+        self.journal_file = Path(journal_file)
+        self.snapshot_interval = snapshot_interval
+        self.max_records = max_records
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+        self._index: List[Dict[str, Any]] = []
+        # (inode, size) of the file the index was built from
+        self._indexed: Optional[Tuple[int, int]] = None
+        self.stats = {"corrupt_lines": 0, "torn_tails_dropped": 0}
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _refresh_index(self, repair: bool = False) -> None:
+        """
+        (Re)build the record index if the file changed outside this instance.
+
+        Args:
+            repair: Truncate a partial final line (only with the file lock held)
+        """
+        try:
+            st = self.journal_file.stat()
+        except FileNotFoundError:
+            self._index = []
+            self._indexed = None
+            return
+        if (st.st_ino, st.st_size) == self._indexed:
+            return
+
+        index: List[Dict[str, Any]] = []
+        offset = 0
+        corrupt = 0
+        with open(self.journal_file, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break   # Partial final line
+                try:
+                    index.append(self._index_entry(json.loads(raw), offset))
+                except (ValueError, KeyError, TypeError):
+                    corrupt += 1
+                offset += len(raw)
+        if repair and offset < st.st_size:
+            # Drop a torn tail left by an interrupted append
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(offset)
+            self.stats["torn_tails_dropped"] += 1
+        if corrupt > self.stats["corrupt_lines"]:
+            print(f"universal-mcp-admin: skipped {corrupt} corrupt lines in {self.journal_file}", file=sys.stderr)
+        self.stats["corrupt_lines"] = corrupt
+        self._index = index
+        self._indexed = (st.st_ino, offset) if offset == st.st_size or repair else None
+
+    @staticmethod
+    def _index_entry(record: Dict[str, Any], offset: int) -> Dict[str, Any]:
+        return {
+            "seq": record["seq"],
+            "type": record["type"],
+            "timestamp": record["timestamp"],
+            "servers": record.get("servers", []),
+            "operation": record.get("operation"),
+            "hash": record["hash"],
+            "offset": offset,
+        }
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_file, "ab") as f:
+            offset = f.tell()
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        self._index.append(self._index_entry(record, offset))
+        # Only trust the index if nothing else was appended in between
+        self._indexed = (st.st_ino, st.st_size) if st.st_size == offset + len(line) else None
+
+    def _new_record(self, record_type: str, servers: List[str], digest: str, operation: Optional[str]) -> Dict[str, Any]:
+        return {
+            "seq": (self._index[-1]["seq"] + 1) if self._index else 1,
+            "type": record_type,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "servers": servers,
+            "operation": operation,
+            "hash": digest,
+        }
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record_change(
+        self,
+        old_config: Dict[str, Any],
+        new_config: Dict[str, Any],
+        operation: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Record the transition old_config -> new_config.
+
+        If old_config does not match the journal head (the file was edited
+        outside the admin server, or the journal is new), a snapshot of
+        old_config is written first so the chain stays replayable.
+
+        Returns:
+            Sequence number of the new record, or None if nothing changed
+        """
+        with self._lock, get_lock_manager().lock(self.journal_file):
+            self._refresh_index(repair=True)
+            old_hash = config_hash(old_config)
+            if not self._index or self._index[-1]["hash"] != old_hash:
+                record = self._new_record("snapshot", [], old_hash, "external")
+                record["config"] = old_config
+                self._append(record)
+
+            patch = diff_configs(old_config, new_config)
+            if not patch:
+                return None
+            record = self._new_record("delta", servers_in_patch(patch), config_hash(new_config), operation)
+            record["patch"] = patch
+            self._append(record)
+            seq = record["seq"]
+
+            deltas_since_snapshot = 0
+            for entry in reversed(self._index):
+                if entry["type"] == "snapshot":
+                    break
+                deltas_since_snapshot += 1
+            if deltas_since_snapshot >= self.snapshot_interval:
+                snapshot = self._new_record("snapshot", [], record["hash"], "compaction")
+                snapshot["config"] = new_config
+                self._append(snapshot)
+                if len(self._index) > self.max_records:
+                    self._compact_locked(self.keep_versions)
+            return seq
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def list_changes(
+        self,
+        server_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        List recorded deltas, newest first.
+
+        Args:
+            server_name: Only changes touching this server
+            since: ISO timestamp lower bound (inclusive)
+            until: ISO timestamp upper bound (inclusive)
+            limit: Maximum number of entries to return
+        """
+        with self._lock:
+            self._refresh_index()
+            entries = list(self._index)
+        since_dt = _parse_ts(since) if since else None
+        until_dt = _parse_ts(until) if until else None
+
+        results = []
+        for entry in reversed(entries):
+            if entry["type"] != "delta":
+                continue
+            if server_name and server_name not in entry["servers"]:
+                continue
+            ts = _parse_ts(entry["timestamp"])
+            if since_dt and ts < since_dt:
+                continue
+            if until_dt and ts > until_dt:
+                continue
+            results.append({k: v for k, v in entry.items() if k != "offset"})
+            if len(results) >= limit:
+                break
+        return results
+
+    def seq_at(self, timestamp: str) -> Optional[int]:
+        """Return the sequence number of the last version recorded at or before timestamp."""
+        target = _parse_ts(timestamp)
+        with self._lock:
+            self._refresh_index()
+            seq = None
+            for entry in self._index:
+                if _parse_ts(entry["timestamp"]) > target:
+                    break
+                seq = entry["seq"]
+        return seq
+
+    def get_version(self, seq: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Reconstruct the config as of record seq.
+
+        Replays deltas forward from the nearest snapshot at or before seq.
+
+        Returns:
+            Tuple of (config, info) where info reports the snapshot used and
+            the number of deltas replayed
+
+        Raises:
+            ValueError: If seq is not in the journal
+        """
+        with self._lock, get_lock_manager().lock(self.journal_file):
+            self._refresh_index()
+            position = next((i for i, e in enumerate(self._index) if e["seq"] == seq), None)
+            if position is None:
+                raise ValueError(f"Config version {seq} not found in journal")
+            start = position
+            while start >= 0 and self._index[start]["type"] != "snapshot":
+                start -= 1
+            if start < 0:
+                raise ValueError(f"No snapshot precedes config version {seq}")
+            entries = self._index[start:position + 1]
+
+            config: Dict[str, Any] = {}
+            with open(self.journal_file, "rb") as f:
+                for entry in entries:
+                    # Seek per record: skipped corrupt lines may sit in between
+                    f.seek(entry["offset"])
+                    record = json.loads(f.readline())
+                    if record["type"] == "snapshot":
+                        config = record["config"]
+                    else:
+                        apply_patch(config, record["patch"])
+
+        info = {
+            "seq": seq,
+            "snapshot_seq": entries[0]["seq"],
+            "deltas_replayed": len(entries) - 1,
+            "timestamp": entries[-1]["timestamp"],
+            "hash": entries[-1]["hash"],
+            "verified": config_hash(config) == entries[-1]["hash"],
+        }
+        return config, info
+
+    def head_seq(self) -> Optional[int]:
+        """Return the sequence number of the newest record."""
+        with self._lock:
+            self._refresh_index()
+            return self._index[-1]["seq"] if self._index else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh_index()
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["records"] = len(self._index)
+        return stats
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self, keep_versions: Optional[int] = None) -> int:
+        """
+        Drop history older than the snapshot preceding the last keep_versions records.
+
+        Returns:
+            Number of records removed
+        """
+        with self._lock, get_lock_manager().lock(self.journal_file):
+            self._refresh_index(repair=True)
+            return self._compact_locked(keep_versions if keep_versions is not None else self.keep_versions)
+
+    def _compact_locked(self, keep_versions: int) -> int:
+        cut = min(max(len(self._index) - keep_versions, 0), len(self._index) - 1)
+        while cut > 0 and self._index[cut]["type"] != "snapshot":
+            cut -= 1
+        if cut <= 0:
+            return 0
+
+        fd, tmp_name = tempfile.mkstemp(dir=str(self.journal_file.parent), suffix=".tmp")
+        try:
+            with open(self.journal_file, "rb") as src, os.fdopen(fd, "wb") as dst:
+                src.seek(self._index[cut]["offset"])
+                for chunk in iter(lambda: src.read(1 << 20), b""):
+                    dst.write(chunk)
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp_name, self.journal_file)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        self._indexed = None
+        self._refresh_index()
+        return cut
+
+
+def _parse_ts(value: str) -> datetime:
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+# Global instances, one per config file
+_journals: Dict[str, ConfigJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_config_journal(config_path: Path) -> ConfigJournal:
+    """Get or create the journal for a given config file."""
+    key = str(Path(config_path).resolve())
+    with _journals_lock:
+        journal = _journals.get(key)
+        if journal is None:
+            cache_dir = Path.home() / ".cache" / "universal-mcp-admin" / "config_journal"
+            digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+            journal = ConfigJournal(cache_dir / f"{digest}.jsonl")
+            _journals[key] = journal
+        return journal
@@ -2,11 +2,25 @@
 config_manager.py - Logic for editing claude_desktop_config.json
 """
 
+import copy
 import json
 import os
 import platform
+import sys
+import threading
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from types import TracebackType
+from typing import Dict, List, Optional, Any, Tuple, Type
+
+from atomic_io import atomic_write_text
+from config_journal import get_config_journal
+
+
+# Process-wide parsed config cache: path -> ((st_mtime_ns, st_size), parsed_config)
+_config_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+_config_cache_lock = threading.Lock()
+_config_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0, "journal_failures": 0}
 
 
 def get_default_config_path() -> Path:
@@ -48,6 +62,11 @@ def read_config() -> Dict[str, Any]:
     """
     Read and parse the claude_desktop_config.json file.
     
+    The parsed config is cached process-wide, keyed on the file's path,
+    modification time and size, so repeated reads of an unchanged file skip
+    JSON parsing. The returned dictionary is shared with the cache and must
+    be treated as read-only; use _read_config_for_update() before mutating.
+    
     Returns:
         Dictionary containing the config data
         
@@ -57,11 +76,62 @@ def read_config() -> Dict[str, Any]:
     """
     config_path = get_config_path()
     
-    if not config_path.exists():
+    try:
+        st = os.stat(config_path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"Claude Desktop config not found at: {config_path}")
     
+    key = str(config_path)
+    version = (st.st_mtime_ns, st.st_size)
+    
+    with _config_cache_lock:
+        cached = _config_cache.get(key)
+        if cached is not None and cached[0] == version:
+            _config_cache_stats["hits"] += 1
+            return cached[1]
+        _config_cache_stats["misses"] += 1
+    
     with open(config_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+        config = json.load(f)
+    
+    with _config_cache_lock:
+        _config_cache[key] = (version, config)
+    return config
+
+
+def _read_config_for_update() -> Dict[str, Any]:
+    """Return a private, mutable copy of the config for read-modify-write callers."""
+    return copy.deepcopy(read_config())
+
+
+def invalidate_config_cache(config_path: Optional[Path] = None) -> None:
+    """
+    Drop cached parsed config data.
+    
+    Args:
+        config_path: Config file to invalidate, or None to clear every entry
+    """
+    with _config_cache_lock:
+        if config_path is None:
+            _config_cache.clear()
+        else:
+            _config_cache.pop(str(config_path), None)
+        _config_cache_stats["invalidations"] += 1
+
+
+def get_config_cache_stats() -> Dict[str, Any]:
+    """
+    Get hit/miss counters for the parsed config cache.
+    
+    Returns:
+        Dictionary with hits, misses, invalidations, hit_rate and entries
+    """
+    with _config_cache_lock:
+        stats: Dict[str, Any] = dict(_config_cache_stats)
+        stats["entries"] = len(_config_cache)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
 
 
 def list_mcp_servers() -> List[Dict[str, Any]]:
@@ -124,46 +194,62 @@ def get_server_config(server_name: str) -> Dict[str, Any]:
     return mcp_servers[server_name]
 
 
-def write_config(config_data: Dict[str, Any]) -> None:
+def write_config(config_data: Dict[str, Any], operation: Optional[str] = None) -> Optional[str]:
     """
     Write configuration data to claude_desktop_config.json.
-    Creates a backup before writing.
+    The new file is written to a temporary file in the same directory,
+    fsynced and renamed over the original, so readers never observe a
+    partially written config. The change is recorded as a delta in the
+    config journal, from which any earlier version can be rebuilt.
+    
+    If journaling fails the write still happens, but the previous config is
+    saved as ``<config>.<UTC stamp>.bak`` so the history is not lost.
     
     Args:
         config_data: Configuration dictionary to write
+        operation: Optional description of the change, stored in the journal
+        
+    Returns:
+        A warning if the change could not be journaled, else None
     """
     config_path = get_config_path()
     
-    # Create backup if file exists
-    if config_path.exists():
-        backup_path = config_path.with_suffix(".json.bak")
-        with open(config_path, "r", encoding="utf-8") as src:
-            with open(backup_path, "w", encoding="utf-8") as dst:
-                dst.write(src.read())
+    try:
+        old_config = read_config()
+    except (FileNotFoundError, json.JSONDecodeError):
+        old_config = {}
     
     # Write new config
-    with open(config_path, "w", encoding="utf-8") as f:
-        json.dump(config_data, f, indent=2, ensure_ascii=False)
-
-
-def update_server_config(server_name: str, updates: Dict[str, Any]) -> None:
-    """
-    Update configuration for a specific MCP server.
+    _atomic_write_json(config_path, config_data)
     
-    Args:
-        server_name: Name of the server to update
-        updates: Dictionary of fields to update
-    """
-    config = read_config()
-    
-    if "mcpServers" not in config:
-        config["mcpServers"] = {}
-    
-    if server_name not in config["mcpServers"]:
-        config["mcpServers"][server_name] = {}
+    invalidate_config_cache(config_path)
     
-    config["mcpServers"][server_name].update(updates)
-    write_config(config)
+    try:
+        get_config_journal(config_path).record_change(old_config, config_data, operation)
+    except Exception as e:
+        # Journaling must never block a config write, but it must not lose history either
+        return _journal_fallback(config_path, old_config, e)
+    return None
+
+
+def _journal_fallback(config_path: Path, old_config: Dict[str, Any], error: Exception) -> str:
+    """Snapshot the previous config after a journal failure and describe what happened."""
+    with _config_cache_lock:
+        _config_cache_stats["journal_failures"] += 1
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    snapshot = config_path.with_name(f"{config_path.name}.{stamp}.bak")
+    try:
+        _atomic_write_json(snapshot, old_config)
+        warning = f"Config change was not journaled ({error}); previous config saved to {snapshot}"
+    except Exception as snapshot_error:
+        warning = f"Config change was not journaled ({error}) and no snapshot could be saved ({snapshot_error})"
+    print(f"universal-mcp-admin: {warning}", file=sys.stderr)
+    return warning
+
+
+def _atomic_write_json(path: Path, data: Dict[str, Any]) -> None:
+    """Write JSON via temp file + fsync + rename, preserving the original file mode."""
+    atomic_write_text(path, json.dumps(data, indent=2, ensure_ascii=False))
 
 
 def validate_server_config(config: Dict[str, Any]) -> tuple:
@@ -191,13 +277,247 @@ def validate_server_config(config: Dict[str, Any]) -> tuple:
     return True, ""
 
 
+# ============================================================================
+# Transactions
+# ============================================================================
+
+
+class ConfigTransaction:
+    """
+    Batch of config edits applied to an in-memory copy of the config.
+    
+    All operations are checked as they are queued, every touched server is
+    validated together on commit, and the result is published with a single
+    atomic write. Use as a context manager to commit on success and discard
+    on error:
+    
+        with ConfigTransaction() as txn:
+            txn.add_server("a", "python", ["a.py"])
+            txn.disable_server("b")
+    """
+    
+    def __init__(self) -> None:
+        self.config: Dict[str, Any] = _read_config_for_update()
+        self.operations: List[str] = []
+        self._touched: set = set()
+        self._committed = False
+        self.warning: Optional[str] = None
+    
+    def _servers(self) -> Dict[str, Any]:
+        return self.config.setdefault("mcpServers", {})
+    
+    def _record(self, operation: str, server_name: str) -> None:
+        self.operations.append(f"{operation}:{server_name}")
+        self._touched.add(server_name)
+    
+    def add_server(
+        self,
+        server_name: str,
+        command: str,
+        args: Optional[List[str]] = None,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Queue a new server. Raises ValueError if it exists or is invalid."""
+        if server_name in self._servers():
+            raise ValueError(f"Server '{server_name}' already exists in config")
+        
+        server_config: Dict[str, Any] = {"command": command}
+        if args is not None:
+            server_config["args"] = args
+        if cwd is not None:
+            server_config["cwd"] = cwd
+        if env is not None:
+            server_config["env"] = env
+        
+        is_valid, error = validate_server_config(server_config)
+        if not is_valid:
+            raise ValueError(f"Invalid server config: {error}")
+        
+        self._servers()[server_name] = server_config
+        self._record("add", server_name)
+        return server_config
+    
+    def remove_server(self, server_name: str) -> Dict[str, Any]:
+        """Queue removal of a server. Returns the removed config."""
+        mcp_servers = self.config.get("mcpServers", {})
+        if server_name not in mcp_servers:
+            raise ValueError(f"Server '{server_name}' not found in config")
+        removed = mcp_servers.pop(server_name)
+        self._record("remove", server_name)
+        return removed
+    
+    def update_server(self, server_name: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a field update for a server (created if missing)."""
+        server_config = self._servers().setdefault(server_name, {})
+        server_config.update(updates)
+        self._record("update", server_name)
+        return server_config
+    
+    def enable_server(self, server_name: str, server_config: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Queue enabling a server. Returns False if it was already enabled.
+        """
+        mcp_servers = self._servers()
+        if server_name in mcp_servers:
+            return False
+        
+        disabled = self.config.get("_disabledServers", {})
+        if server_config:
+            mcp_servers[server_name] = server_config
+        elif server_name in disabled:
+            mcp_servers[server_name] = disabled.pop(server_name)
+        else:
+            raise ValueError(f"No config found for server '{server_name}'")
+        
+        self._record("enable", server_name)
+        return True
+    
+    def disable_server(self, server_name: str) -> Dict[str, Any]:
+        """Queue moving a server from the active to the disabled list."""
+        mcp_servers = self.config.get("mcpServers", {})
+        if server_name not in mcp_servers:
+            raise ValueError(f"Server '{server_name}' not found in config")
+        
+        disabled = self.config.setdefault("_disabledServers", {})
+        disabled[server_name] = mcp_servers.pop(server_name)
+        self._record("disable", server_name)
+        return disabled[server_name]
+    
+    def validate(self) -> List[str]:
+        """Validate every active server touched by this transaction."""
+        errors = []
+        mcp_servers = self.config.get("mcpServers", {})
+        for server_name in sorted(self._touched):
+            if server_name not in mcp_servers:
+                continue
+            is_valid, error = validate_server_config(mcp_servers[server_name])
+            if not is_valid:
+                errors.append(f"{server_name}: {error}")
+        return errors
+    
+    def commit(self) -> bool:
+        """
+        Validate and publish all queued operations with one atomic write.
+        
+        Returns:
+            True if the config was written, False if there was nothing to write
+            
+        Raises:
+            ValueError: If any touched server fails validation
+        """
+        if self._committed:
+            raise RuntimeError("Transaction already committed")
+        errors = self.validate()
+        if errors:
+            raise ValueError(f"Invalid server config: {'; '.join(errors)}")
+        self._committed = True
+        if not self.operations:
+            return False
+        self.warning = write_config(self.config, operation=", ".join(self.operations))
+        return True
+    
+    def __enter__(self) -> "ConfigTransaction":
+        return self
+    
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None and not self._committed:
+            self.commit()
+
+
+def apply_config_operations(operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply a list of add/remove/enable/disable/update operations in one transaction.
+    
+    Each operation is a dictionary with an "op" key and a "server_name" key:
+        - {"op": "add", "server_name", "command", "args"?, "cwd"?, "env"?}
+        - {"op": "remove", "server_name"}
+        - {"op": "update", "server_name", "updates"}
+        - {"op": "enable", "server_name", "config"?}
+        - {"op": "disable", "server_name"}
+    
+    Args:
+        operations: Operations to apply, in order
+        
+    Returns:
+        Dictionary with per-operation results and whether the config was written
+        
+    Raises:
+        ValueError: If any operation fails or the final config is invalid;
+            nothing is written in that case
+    """
+    txn = ConfigTransaction()
+    results: List[Dict[str, Any]] = []
+    
+    for index, operation in enumerate(operations):
+        op = operation.get("op", "")
+        server_name = operation.get("server_name", "")
+        if not server_name:
+            raise ValueError(f"Operation {index}: missing 'server_name'")
+        try:
+            if op == "add":
+                txn.add_server(
+                    server_name,
+                    operation.get("command", ""),
+                    operation.get("args"),
+                    operation.get("cwd"),
+                    operation.get("env"),
+                )
+                result: Dict[str, Any] = {"changed": True}
+            elif op == "remove":
+                result = {"changed": True, "config": txn.remove_server(server_name)}
+            elif op == "update":
+                updates = operation.get("updates", {})
+                if not isinstance(updates, dict):
+                    raise ValueError("'updates' must be a dictionary")
+                txn.update_server(server_name, updates)
+                result = {"changed": True}
+            elif op == "enable":
+                result = {"changed": txn.enable_server(server_name, operation.get("config"))}
+            elif op == "disable":
+                result = {"changed": True, "config": txn.disable_server(server_name)}
+            else:
+                raise ValueError(f"Unknown op '{op}'")
+        except ValueError as e:
+            raise ValueError(f"Operation {index} ({op} '{server_name}'): {e}")
+        result.update({"op": op, "server_name": server_name})
+        results.append(result)
+    
+    written = txn.commit()
+    result_data: Dict[str, Any] = {"results": results, "applied": len(results), "written": written}
+    if txn.warning:
+        result_data["warning"] = txn.warning
+    return result_data
+
+
+def update_server_config(server_name: str, updates: Dict[str, Any]) -> Optional[str]:
+    """
+    Update configuration for a specific MCP server.
+    
+    Args:
+        server_name: Name of the server to update
+        updates: Dictionary of fields to update
+        
+    Returns:
+        A warning if the change could not be journaled, else None
+    """
+    with ConfigTransaction() as txn:
+        txn.update_server(server_name, updates)
+    return txn.warning
+
+
 def add_server_config(
     server_name: str,
     command: str,
     args: Optional[List[str]] = None,
     cwd: Optional[str] = None,
     env: Optional[Dict[str, str]] = None
-) -> None:
+) -> Optional[str]:
     """
     Add a new MCP server to the configuration.
     
@@ -208,35 +528,18 @@ def add_server_config(
         cwd: Working directory
         env: Environment variables
         
+    Returns:
+        A warning if the change could not be journaled, else None
+        
     Raises:
         ValueError: If server already exists or config is invalid
     """
-    config = read_config()
-    
-    if "mcpServers" not in config:
-        config["mcpServers"] = {}
-    
-    if server_name in config["mcpServers"]:
-        raise ValueError(f"Server '{server_name}' already exists in config")
-    
-    server_config: Dict[str, Any] = {"command": command}
-    
-    if args is not None:
-        server_config["args"] = args
-    if cwd is not None:
-        server_config["cwd"] = cwd
-    if env is not None:
-        server_config["env"] = env
-    
-    is_valid, error = validate_server_config(server_config)
-    if not is_valid:
-        raise ValueError(f"Invalid server config: {error}")
-    
-    config["mcpServers"][server_name] = server_config
-    write_config(config)
+    with ConfigTransaction() as txn:
+        txn.add_server(server_name, command, args, cwd, env)
+    return txn.warning
 
 
-def remove_server_config(server_name: str) -> Dict[str, Any]:
+def remove_server_config(server_name: str) -> Tuple[Dict[str, Any], Optional[str]]:
     """
     Remove an MCP server from the configuration.
     
@@ -244,23 +547,17 @@ def remove_server_config(server_name: str) -> Dict[str, Any]:
         server_name: Name of the server to remove
         
     Returns:
-        The removed server configuration
+        Tuple of (removed server configuration, journaling warning or None)
         
     Raises:
         ValueError: If server not found in config
     """
-    config = read_config()
-    mcp_servers = config.get("mcpServers", {})
-    
-    if server_name not in mcp_servers:
-        raise ValueError(f"Server '{server_name}' not found in config")
-    
-    removed_config = mcp_servers.pop(server_name)
-    write_config(config)
-    return removed_config
+    with ConfigTransaction() as txn:
+        removed = txn.remove_server(server_name)
+    return removed, txn.warning
 
 
-def enable_server(server_name: str, server_config: Optional[Dict[str, Any]] = None) -> None:
+def enable_server(server_name: str, server_config: Optional[Dict[str, Any]] = None) -> Optional[str]:
     """
     Enable a server by adding it to the active config.
     If server_config is provided, use it; otherwise look in disabled servers.
@@ -268,28 +565,16 @@ def enable_server(server_name: str, server_config: Optional[Dict[str, Any]] = No
     Args:
         server_name: Name of the server to enable
         server_config: Optional config to use for the server
+        
+    Returns:
+        A warning if the change could not be journaled, else None
     """
-    config = read_config()
-    
-    if "mcpServers" not in config:
-        config["mcpServers"] = {}
-    
-    disabled = config.get("_disabledServers", {})
-    
-    if server_name in config["mcpServers"]:
-        return  # Already enabled
-    
-    if server_config:
-        config["mcpServers"][server_name] = server_config
-    elif server_name in disabled:
-        config["mcpServers"][server_name] = disabled.pop(server_name)
-    else:
-        raise ValueError(f"No config found for server '{server_name}'")
-    
-    write_config(config)
+    with ConfigTransaction() as txn:
+        txn.enable_server(server_name, server_config)
+    return txn.warning
 
 
-def disable_server(server_name: str) -> Dict[str, Any]:
+def disable_server(server_name: str) -> Tuple[Dict[str, Any], Optional[str]]:
     """
     Disable a server by moving it from active to disabled list.
     
@@ -297,17 +582,81 @@ def disable_server(server_name: str) -> Dict[str, Any]:
         server_name: Name of the server to disable
         
     Returns:
-        The disabled server configuration
+        Tuple of (disabled server configuration, journaling warning or None)
     """
-    config = read_config()
-    mcp_servers = config.get("mcpServers", {})
+    with ConfigTransaction() as txn:
+        disabled = txn.disable_server(server_name)
+    return disabled, txn.warning
+
+
+# ============================================================================
+# History
+# ============================================================================
+
+
+def list_config_history(
+    server_name: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 50,
+) -> List[Dict[str, Any]]:
+    """
+    List recorded config changes, newest first.
     
-    if server_name not in mcp_servers:
-        raise ValueError(f"Server '{server_name}' not found in config")
+    Args:
+        server_name: Only changes touching this server
+        since: ISO timestamp lower bound
+        until: ISO timestamp upper bound
+        limit: Maximum number of entries
+        
+    Returns:
+        List of change entries (seq, timestamp, servers, operation, hash)
+    """
+    return get_config_journal(get_config_path()).list_changes(server_name, since, until, limit)
+
+
+def get_config_version(
+    seq: Optional[int] = None,
+    timestamp: Optional[str] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Reconstruct a previous config version from the journal.
     
-    if "_disabledServers" not in config:
-        config["_disabledServers"] = {}
+    Args:
+        seq: Journal sequence number of the version
+        timestamp: Alternatively, return the version current at this ISO timestamp
+        
+    Returns:
+        Tuple of (config, info)
+        
+    Raises:
+        ValueError: If the version cannot be found
+    """
+    journal = get_config_journal(get_config_path())
+    if seq is None:
+        if timestamp is None:
+            raise ValueError("Either seq or timestamp is required")
+        seq = journal.seq_at(timestamp)
+        if seq is None:
+            raise ValueError(f"No config version recorded at or before {timestamp}")
+    return journal.get_version(seq)
+
+
+def restore_config_version(seq: int) -> Dict[str, Any]:
+    """
+    Restore the config to a previous journal version.
+    The restore itself is journaled, so it can be undone the same way.
     
-    config["_disabledServers"][server_name] = mcp_servers.pop(server_name)
-    write_config(config)
-    return config["_disabledServers"][server_name]
+    Args:
+        seq: Journal sequence number to restore
+        
+    Returns:
+        Reconstruction info for the restored version
+    """
+    config, info = get_config_version(seq)
+    if not info["verified"]:
+        raise ValueError(f"Config version {seq} failed hash verification; refusing to restore")
+    warning = write_config(config, operation=f"restore:{seq}")
+    if warning:
+        info["warning"] = warning
+    return info
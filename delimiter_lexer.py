@@ -0,0 +1,503 @@
+"""
+delimiter_lexer.py - String/comment-aware delimiter scanner for brace languages
+"""
+
+import functools
+import re
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# A string rule: (opener, closer, escape, multiline, interpolation opener)
+#   escape: "backslash", "double" (closer doubled, C# verbatim) or None (raw)
+#   interpolation opener: "${", "\\(" or "{" -- code inside is lexed as code
+StringRule = Tuple[str, str, Optional[str], bool, Optional[str]]
+
+_INTERP_CLOSERS = {"${": "}", "\\(": ")", "{": "}"}
+_OPENERS = {"(": ")", "[": "]", "{": "}"}
+_CLOSERS = {")", "]", "}"}
+
+_C_STRINGS: List[StringRule] = [
+    ('"', '"', "backslash", False, None),
+    ("'", "'", "backslash", False, None),
+]
+
+# Per-language lexical profiles, keyed by file extension like LANGUAGE_HANDLERS.
+#   line_comments: prefixes that comment out the rest of the line
+#   not_comments: longer prefixes that start with a line comment prefix but
+#     are code (PHP 8 attributes: "#[Attr]" vs a "#" comment)
+#   block_comments: (open, close, nests)
+#   strings: StringRule list (longest openers are tried first)
+#   raw_string: regex whose match opens a raw string; group "hashes" is
+#     repeated after the closing quote (Rust r#"..."#, Swift #"..."#,
+#     C++ R"delim(...)delim")
+#   char: "rust" (char literal vs lifetime), "cpp" (char literal vs digit
+#     separator) or None
+#   preprocessor: skip "#" directive lines (macros may hold unbalanced braces)
+#   regex_literals: "/" where an operand is expected starts a regex literal
+#   skip_if: substrings that make the snippet too ambiguous to pre-check
+LEXER_PROFILES: Dict[str, Dict[str, Any]] = {
+    '.c': {
+        'line_comments': ('//',), 'block_comments': (('/*', '*/', False),),
+        'strings': _C_STRINGS, 'preprocessor': True,
+    },
+    '.cpp': {
+        'line_comments': ('//',), 'block_comments': (('/*', '*/', False),),
+        'strings': [('"', '"', "backslash", False, None)], 'char': 'cpp', 'preprocessor': True,
+        'raw_string': re.compile(r'(?:u8|u|U|L)?R"(?P<hashes>[^()\\\s]{0,16})\('),
+        'raw_close': ')',
+    },
+    '.rs': {
+        'line_comments': ('//',), 'block_comments': (('/*', '*/', True),),
+        'strings': [('"', '"', "backslash", True, None)], 'char': 'rust',
+        'raw_string': re.compile(r'b?r(?P<hashes>#*)"'),
+    },
+    '.go': {
+        'line_comments': ('//',), 'block_comments': (('/*', '*/', False),),
+        'strings': _C_STRINGS + [('`', '`', None, True, None)],
+    },
+    '.java': {
+        'line_comments': ('//',), 'block_comments': (('/*', '*/', False),),
+        'strings': [('"""', '"""', "backslash", True, None)] + _C_STRINGS,
+    },
+    '.kt': {
+        'line_comments': ('//',), 'block_comments': (('/*', '*/', True),),
+        'strings': [
+            ('"""', '"""', None, True, "${"),
+            ('"', '"', "backslash", False, "${"),
+            ("'", "'", "backslash", False, None),
+        ],
+    },
+    '.swift': {
+        'line_comments': ('//',), 'block_comments': (('/*', '*/', True),),
+        'strings': [
+            ('"""', '"""', "backslash", True, "\\("),
+            ('"', '"', "backslash", False, "\\("),
+        ],
+        'raw_string': re.compile(r'(?P<hashes>#+)"'),
+    },
+    '.cs': {
+        'line_comments': ('//',), 'block_comments': (('/*', '*/', False),),
+        'strings': [
+            ('"""', '"""', None, True, None),
+            ('$@"', '"', "double", True, "{"),
+            ('@$"', '"', "double", True, "{"),
+            ('@"', '"', "double", True, None),
+            ('$"', '"', "backslash", False, "{"),
+        ] + _C_STRINGS,
+    },
+    '.dart': {
+        'line_comments': ('//',), 'block_comments': (('/*', '*/', True),),
+        'strings': [
+            ("r'''", "'''", None, True, None),
+            ('r"""', '"""', None, True, None),
+            ("r'", "'", None, False, None),
+            ('r"', '"', None, False, None),
+            ("'''", "'''", "backslash", True, "${"),
+            ('"""', '"""', "backslash", True, "${"),
+            ("'", "'", "backslash", False, "${"),
+            ('"', '"', "backslash", False, "${"),
+        ],
+    },
+    '.zig': {
+        # \\ starts a multiline string line, which runs to end of line
+        'line_comments': ('//', '\\\\'), 'block_comments': (),
+        'strings': _C_STRINGS,
+    },
+    '.d': {
+        'line_comments': ('//',),
+        'block_comments': (('/*', '*/', False), ('/+', '+/', True)),
+        'strings': [
+            ('r"', '"', None, True, None),
+            ('"', '"', "backslash", True, None),
+            ('`', '`', None, True, None),
+            ("'", "'", "backslash", False, None),
+        ],
+        'skip_if': ('q"',),
+    },
+    '.php': {
+        'line_comments': ('//', '#'), 'not_comments': ('#[',), 'block_comments': (('/*', '*/', False),),
+        'strings': [
+            ("'", "'", "backslash", True, None),
+            ('"', '"', "backslash", True, None),
+        ],
+        'skip_if': ('<<<', '?>'),
+    },
+    '.js': {
+        'line_comments': ('//',), 'block_comments': (('/*', '*/', False),),
+        'strings': _C_STRINGS + [('`', '`', "backslash", True, "${")],
+        'regex_literals': True,
+    },
+    '.scala': {
+        'line_comments': ('//',), 'block_comments': (('/*', '*/', True),),
+        'strings': [('"""', '"""', None, True, None), ('"', '"', "backslash", False, None)],
+        'char': 'rust',  # 'c' vs the old 'symbol literals
+    },
+    '.raku': {
+        'line_comments': ('#',),
+        'strings': [
+            ("'", "'", "backslash", True, None),
+            ('"', '"', "backslash", True, "{"),
+        ],
+        # Quoting constructs and regexes with arbitrary delimiters
+        'skip_if': ('Q[', 'Q{', 'q[', 'q{', 'qq', 'rx', '\u00ab', '=begin'),
+    },
+}
+for _alias, _base in (
+    ('.cc', '.cpp'), ('.cxx', '.cpp'), ('.kts', '.kt'), ('.ts', '.js'),
+    ('.rakumod', '.raku'), ('.pm6', '.raku'),
+):
+    LEXER_PROFILES[_alias] = LEXER_PROFILES[_base]
+
+
+
+def _skip_pattern(profile: Dict[str, Any]) -> "re.Pattern[str]":
+    """Regex matching a run of characters that cannot start any token of interest."""
+    starts = set('()[]{}\n')
+    starts.update(prefix[0] for prefix in profile.get('line_comments', ()))
+    starts.update(opener[0] for opener, _, _ in profile.get('block_comments', ()))
+    starts.update(rule[0][0] for rule in profile['strings'])
+    if profile.get('char'):
+        starts.add("'")
+    if profile.get('preprocessor'):
+        starts.add('#')
+    if profile.get('raw_string') is not None:
+        starts.update('rbRuUL#')
+    return re.compile('[^' + ''.join(re.escape(ch) for ch in sorted(starts)) + ']+')
+
+
+# Longest opener first so '"""' wins over '"' and '$@"' over '$"'
+for _profile in LEXER_PROFILES.values():
+    if '_skip' not in _profile:
+        _profile['strings'] = sorted(_profile['strings'], key=lambda rule: -len(rule[0]))
+        _profile['_skip'] = _skip_pattern(_profile)
+
+
+class LexError(Exception):
+    """Structural error found by the lexer, with a 0-based source offset."""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.message = message
+        self.offset = offset
+
+
+def _is_ident(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _line_col(code: str, offset: int) -> Tuple[int, int]:
+    """1-based line and column of an offset."""
+    line = code.count('\n', 0, offset) + 1
+    col = offset - (code.rfind('\n', 0, offset) + 1) + 1
+    return line, col
+
+
+# Tokens after which "/" starts a regex literal rather than dividing
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = {
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+    'void', 'throw', 'instanceof', 'yield', 'await',
+}
+
+
+def _regex_allowed(code: str, i: int) -> bool:
+    j = i - 1
+    while j >= 0 and code[j] in ' \t\r\n':
+        j -= 1
+    if j < 0 or code[j] in _REGEX_PRECEDERS:
+        return True
+    if _is_ident(code[j]):
+        k = j
+        while k > 0 and _is_ident(code[k - 1]):
+            k -= 1
+        return code[k:j + 1] in _REGEX_KEYWORDS
+    return False
+
+
+def _skip_regex(code: str, i: int) -> int:
+    """Offset after the regex literal starting at i (flags included)."""
+    j = i + 1
+    n = len(code)
+    in_class = False
+    while j < n:
+        ch = code[j]
+        if ch == '\\':
+            j += 2
+            continue
+        if ch == '\n':
+            break
+        if in_class:
+            if ch == ']':
+                in_class = False
+        elif ch == '[':
+            in_class = True
+        elif ch == '/':
+            j += 1
+            while j < n and _is_ident(code[j]):
+                j += 1
+            return j
+        j += 1
+    raise LexError("unterminated regular expression literal", i)
+
+
+def _skip_block_comment(code: str, i: int, opener: str, closer: str, nests: bool) -> int:
+    depth = 1
+    j = i + len(opener)
+    n = len(code)
+    while j < n:
+        if code.startswith(closer, j):
+            depth -= 1
+            j += len(closer)
+            if depth == 0:
+                return j
+        elif nests and code.startswith(opener, j):
+            depth += 1
+            j += len(opener)
+        else:
+            j += 1
+    raise LexError(f"unterminated block comment '{opener}'", i)
+
+
+def _scan_string(code: str, j: int, rule: StringRule, start: int) -> Tuple[int, bool]:
+    """
+    Scan a string body from j (just past the opener, or just past a closed
+    interpolation). Returns (offset, entered_interpolation): the offset after
+    the closer, or after the interpolation opener.
+    """
+    _, closer, escape, multiline, interp = rule
+    n = len(code)
+    while j < n:
+        ch = code[j]
+        if escape == "backslash" and ch == '\\':
+            if interp == "\\(" and code.startswith("\\(", j):
+                return j + 2, True
+            j += 2
+            continue
+        if escape == "double" and code.startswith(closer * 2, j):
+            j += 2 * len(closer)
+            continue
+        if code.startswith(closer, j):
+            return j + len(closer), False
+        if interp and interp != "\\(" and code.startswith(interp, j):
+            if interp == "{" and code.startswith("{{", j):
+                j += 2  # C# literal brace
+                continue
+            return j + len(interp), True
+        if ch == '\n' and not multiline:
+            raise LexError("unterminated string literal", start)
+        j += 1
+    raise LexError("unterminated string literal", start)
+
+
+def iter_delimiters(code: str, language: str, start: int = 0) -> Iterator[Tuple[str, int]]:
+    """
+    Yield (delimiter, offset) for every bracket outside strings and comments.
+
+    Lexing begins at ``start``, which should be the start of a line; offsets
+    are relative to the whole of ``code``.
+
+    Brackets are checked as they are seen, so a mismatch raises as soon as
+    it occurs; unclosed brackets raise once the end of the code is reached.
+
+    Raises:
+        KeyError: If the language has no lexer profile
+        LexError: On the first structural error
+    """
+    profile = LEXER_PROFILES[language]
+    line_comments = profile.get('line_comments', ())
+    not_comments = profile.get('not_comments', ())
+    block_comments = profile.get('block_comments', ())
+    strings = profile['strings']
+    raw_string = profile.get('raw_string')
+    char_mode = profile.get('char')
+    preprocessor = profile.get('preprocessor', False)
+    regex_literals = profile.get('regex_literals', False)
+
+    # (closer, offset of opener, string rule to resume after an interpolation)
+    stack: List[Tuple[str, int, Optional[StringRule]]] = []
+    n = len(code)
+    i = start
+    at_line_start = True
+
+    def enter_string(rule: StringRule, body_start: int, start: int) -> int:
+        end, interpolating = _scan_string(code, body_start, rule, start)
+        if interpolating:
+            stack.append((_INTERP_CLOSERS[rule[4]], end - len(rule[4]), rule))
+        return end
+
+    skip = profile['_skip'].match
+
+    while i < n:
+        run = skip(code, i)
+        if run:
+            # Plain code: identifiers, operators, whitespace
+            if at_line_start and not run.group().isspace():
+                at_line_start = False
+            i = run.end()
+            continue
+        ch = code[i]
+
+        if ch == '\n':
+            at_line_start = True
+            i += 1
+            continue
+
+        if preprocessor and at_line_start and ch == '#':
+            # Directive runs to an unescaped end of line
+            while i < n and code[i] != '\n':
+                i += 2 if code[i] == '\\' else 1
+            continue
+        at_line_start = False
+
+        matched = False
+        for prefix in line_comments:
+            if code.startswith(prefix, i) and not any(code.startswith(p, i) for p in not_comments):
+                newline = code.find('\n', i)
+                i = n if newline == -1 else newline
+                matched = True
+                break
+        if matched:
+            continue
+
+        for opener, closer, nests in block_comments:
+            if code.startswith(opener, i):
+                i = _skip_block_comment(code, i, opener, closer, nests)
+                matched = True
+                break
+        if matched:
+            continue
+
+        if raw_string is not None and (i == 0 or not _is_ident(code[i - 1])):
+            m = raw_string.match(code, i)
+            if m:
+                if 'raw_close' in profile:
+                    closer = profile['raw_close'] + m.group('hashes') + '"'
+                else:
+                    closer = '"' + m.group('hashes')
+                end = code.find(closer, m.end())
+                if end == -1:
+                    raise LexError("unterminated raw string literal", i)
+                i = end + len(closer)
+                continue
+
+        for rule in strings:
+            opener = rule[0]
+            if code.startswith(opener, i):
+                # Prefixed openers (r", @", $") only start a token
+                if len(opener) > 1 and _is_ident(opener[0]) and i > 0 and _is_ident(code[i - 1]):
+                    continue
+                i = enter_string(rule, i + len(opener), i)
+                matched = True
+                break
+        if matched:
+            continue
+
+        if ch == '/' and regex_literals and _regex_allowed(code, i):
+            i = _skip_regex(code, i)
+            continue
+
+        if ch == "'" and char_mode == 'rust':
+            if code.startswith("\\", i + 1):
+                i = enter_string(("'", "'", "backslash", False, None), i + 1, i)
+            elif i + 2 < n and code[i + 2] == "'":
+                i += 3
+            else:
+                i += 1  # Lifetime or label
+            continue
+        if ch == "'" and char_mode == 'cpp':
+            if i > 0 and _is_ident(code[i - 1]):
+                i += 1  # Digit separator (1'000'000)
+            else:
+                i = enter_string(("'", "'", "backslash", False, None), i + 1, i)
+            continue
+
+        if ch in _OPENERS:
+            stack.append((_OPENERS[ch], i, None))
+            yield ch, i
+        elif ch in _CLOSERS:
+            if not stack:
+                raise LexError(f"unexpected '{ch}'", i)
+            closer, opened_at, resume = stack[-1]
+            if ch != closer:
+                line, col = _line_col(code, opened_at)
+                raise LexError(f"'{ch}' does not match '{code[opened_at]}' opened at line {line}, column {col}", i)
+            stack.pop()
+            if resume is not None:
+                # End of an interpolation: continue the enclosing string
+                i = enter_string(resume, i + 1, opened_at)
+                continue
+            yield ch, i
+        i += 1
+
+    if stack:
+        closer, opened_at, resume = stack[-1]
+        if resume is not None:
+            raise LexError("unterminated string interpolation", opened_at)
+        raise LexError(f"unclosed '{code[opened_at]}'", opened_at)
+
+
+# Pre-check counters
+_gate_stats = {"checked": 0, "rejected": 0, "skipped": 0}
+_gate_stats_lock = threading.Lock()
+
+
+def check_delimiters(code: str, language: str) -> Tuple[bool, str]:
+    """
+    Check that brackets balance and strings/comments terminate.
+
+    Languages without a profile, and snippets using constructs the profile
+    cannot lex reliably, pass unchecked.
+
+    Args:
+        code: Source code to check
+        language: File extension (e.g. '.rs')
+
+    Returns:
+        Tuple of (is_valid, error_message with 1-based line and column)
+    """
+    profile = LEXER_PROFILES.get(language)
+    if profile is None or any(marker in code for marker in profile.get('skip_if', ())):
+        with _gate_stats_lock:
+            _gate_stats["skipped"] += 1
+        return True, ""
+
+    try:
+        for _ in iter_delimiters(code, language):
+            pass
+    except LexError as e:
+        line, col = _line_col(code, e.offset)
+        with _gate_stats_lock:
+            _gate_stats["checked"] += 1
+            _gate_stats["rejected"] += 1
+        return False, f"line {line}, column {col}: {e.message}"
+
+    with _gate_stats_lock:
+        _gate_stats["checked"] += 1
+    return True, ""
+
+
+def delimiter_gate(language: str, label: str) -> Callable:
+    """
+    Decorator that runs check_delimiters before a ``validate_*_code``
+    function, so structurally broken snippets are rejected without spawning
+    a compiler.
+
+    Args:
+        language: File extension whose lexer profile to use
+        label: Language name for error messages (e.g. "Rust")
+    """
+    def decorator(validate: Callable[..., Tuple[bool, str]]) -> Callable[..., Tuple[bool, str]]:
+        @functools.wraps(validate)
+        def wrapper(code: str, *args: Any, **kwargs: Any) -> Tuple[bool, str]:
+            is_valid, error_msg = check_delimiters(code, language)
+            if not is_valid:
+                return False, f"{label} syntax error: {error_msg}"
+            return validate(code, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_gate_stats() -> Dict[str, int]:
+    """Return pre-check counters."""
+    with _gate_stats_lock:
+        return dict(_gate_stats)
@@ -13,9 +13,10 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import config_manager
-import mcp_manager
-import resource_discovery
-import tool_analyzer
+import source_index
+
+# Source text beyond this many characters is truncated in exports
+MAX_SOURCE_CHARS = 500000
 
 
 # ============================================================================
@@ -60,23 +61,20 @@ def gather_server_data(server_name: Optional[str] = None) -> Dict[str, Any]:
             }
 
             try:
-                source_code, source_path = mcp_manager.read_source_file(
-                    name, max_chars=500000
-                )
-                extension = source_path.suffix
+                # One read serves both the source text and the index entry
+                entry, source_code, source_path = source_index.get_source_index().read_source(name)
+                if len(source_code) > MAX_SOURCE_CHARS:
+                    source_code = (
+                        source_code[:MAX_SOURCE_CHARS]
+                        + f"\n\n... (truncated, total size: {len(source_code)} chars)"
+                    )
                 server_data["source_file"] = str(source_path)
                 server_data["source_code"] = source_code
-                server_data["language"] = extension
+                server_data["language"] = entry["language"]
 
-                server_data["tools"] = tool_analyzer.list_tools_in_source(
-                    source_code, extension
-                )
-                server_data["resources"] = resource_discovery.list_mcp_resources(
-                    source_code, extension
-                )
-                server_data["prompts"] = resource_discovery.list_mcp_prompts(
-                    source_code, extension
-                )
+                server_data["tools"] = entry["tools"]
+                server_data["resources"] = entry["resources"]
+                server_data["prompts"] = entry["prompts"]
             except Exception as e:
                 server_data["source_error"] = f"Failed to read source: {e}"
                 server_data.setdefault("tools", [])
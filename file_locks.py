@@ -0,0 +1,225 @@
+"""
+file_locks.py - Per-file locks and compare-and-swap checks for concurrent edits
+"""
+
+import hashlib
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+PathLike = Union[str, Path]
+
+
+class LockTimeout(TimeoutError):
+    """Raised when a file lock cannot be acquired within the timeout."""
+    pass
+
+
+class ConcurrentModificationError(RuntimeError):
+    """Raised when a file changed between being read and being written."""
+    pass
+
+
+class FileVersion(NamedTuple):
+    """Identity of a file's content at the time it was read."""
+    mtime_ns: int
+    size: int
+    sha256: str
+
+
+def read_versioned(path: PathLike) -> Tuple[bytes, FileVersion]:
+    """
+    Read a file and capture its (mtime, size, sha256).
+
+    The stat is taken before the read: if the file changes in between, the
+    recorded mtime is stale and check_unchanged falls back to the hash of
+    the bytes actually read.
+    """
+    st = os.stat(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    return data, FileVersion(st.st_mtime_ns, st.st_size, hashlib.sha256(data).hexdigest())
+
+
+def file_version(path: PathLike) -> FileVersion:
+    """Capture a file's (mtime, size, sha256) without keeping its content."""
+    return read_versioned(path)[1]
+
+
+def check_unchanged(path: PathLike, expected: FileVersion) -> None:
+    """
+    Fail fast if the file no longer matches ``expected``.
+
+    Matching mtime and size are taken as unchanged without hashing; a file
+    that was only touched (same size, same hash) also passes.
+
+    Raises:
+        ConcurrentModificationError: If the content changed or the file is gone
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        _note_conflict()
+        raise ConcurrentModificationError(f"{path} was removed since it was read")
+    if st.st_mtime_ns == expected.mtime_ns and st.st_size == expected.size:
+        return
+    if st.st_size == expected.size:
+        with open(path, 'rb') as f:
+            if hashlib.sha256(f.read()).hexdigest() == expected.sha256:
+                return
+    _note_conflict()
+    raise ConcurrentModificationError(
+        f"{path} changed since it was read (another operation modified it); re-run the operation"
+    )
+
+
+class _PathLock:
+    def __init__(self) -> None:
+        self.rlock = threading.RLock()
+        self.depth = 0
+        self.fd: Optional[int] = None
+
+
+class FileLockManager:
+    """
+    Exclusive per-file locks for read-check-write sequences.
+
+    Each path gets a re-entrant in-process lock plus, where ``fcntl`` is
+    available, an advisory ``flock`` on a lock file under the cache
+    directory, so admin processes sharing a machine serialise too. Locks are
+    keyed on the resolved path; operations on different files never wait on
+    each other.
+    """
+
+    def __init__(self, lock_dir: Optional[Path] = None, timeout: float = 30.0):
+        if lock_dir is None:
+            lock_dir = Path.home() / ".cache" / "universal-mcp-admin" / "locks"
+        self.lock_dir = Path(lock_dir)
+        self.timeout = timeout
+        self._guard = threading.Lock()
+        self._locks: Dict[str, _PathLock] = {}
+        self.stats = {"acquired": 0, "contended": 0, "timeouts": 0}
+
+    def _entry(self, key: str) -> _PathLock:
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = _PathLock()
+            return entry
+
+    def _lock_file(self, key: str) -> Path:
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        return self.lock_dir / (hashlib.sha1(key.encode('utf-8')).hexdigest() + ".lock")
+
+    @contextmanager
+    def lock(self, path: PathLike, timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold the exclusive lock for ``path`` for the duration of the block.
+
+        Re-entrant within a thread. Raises LockTimeout if the lock is not
+        acquired within ``timeout`` seconds (the manager default if None).
+        """
+        key = os.path.realpath(path)
+        entry = self._entry(key)
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+
+        if not entry.rlock.acquire(blocking=False):
+            with self._guard:
+                self.stats["contended"] += 1
+            if not entry.rlock.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                with self._guard:
+                    self.stats["timeouts"] += 1
+                raise LockTimeout(f"Timed out waiting for lock on {key}")
+        try:
+            if entry.depth == 0 and fcntl is not None:
+                entry.fd = self._flock(key, deadline)
+            entry.depth += 1
+            with self._guard:
+                self.stats["acquired"] += 1
+        except BaseException:
+            entry.rlock.release()
+            raise
+
+        try:
+            yield
+        finally:
+            entry.depth -= 1
+            if entry.depth == 0 and entry.fd is not None:
+                try:
+                    fcntl.flock(entry.fd, fcntl.LOCK_UN)
+                finally:
+                    os.close(entry.fd)
+                    entry.fd = None
+            entry.rlock.release()
+
+    def _flock(self, key: str, deadline: float) -> int:
+        fd = os.open(str(self._lock_file(key)), os.O_RDWR | os.O_CREAT, 0o644)
+        contended = False
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                if not contended:
+                    contended = True
+                    with self._guard:
+                        self.stats["contended"] += 1
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    with self._guard:
+                        self.stats["timeouts"] += 1
+                    raise LockTimeout(f"Timed out waiting for another process's lock on {key}")
+                time.sleep(0.01)
+            except BaseException:
+                os.close(fd)
+                raise
+
+    @contextmanager
+    def lock_many(self, paths: Iterable[PathLike], timeout: Optional[float] = None) -> Iterator[None]:
+        """Lock several files, always in sorted order so callers cannot deadlock."""
+        keys = sorted({os.path.realpath(p) for p in paths})
+        with ExitStack() as stack:
+            for key in keys:
+                stack.enter_context(self.lock(key, timeout))
+            yield
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._guard:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["files"] = len(self._locks)
+            stats["held"] = sum(1 for entry in self._locks.values() if entry.depth)
+        with _conflict_lock:
+            stats["cas_conflicts"] = _conflicts["count"]
+        stats["process_locks"] = fcntl is not None
+        return stats
+
+
+_conflict_lock = threading.Lock()
+_conflicts = {"count": 0}
+
+
+def _note_conflict() -> None:
+    with _conflict_lock:
+        _conflicts["count"] += 1
+
+
+# Global lock manager
+_lock_manager: Optional[FileLockManager] = None
+_lock_manager_lock = threading.Lock()
+
+
+def get_lock_manager() -> FileLockManager:
+    """Get or create the global FileLockManager instance."""
+    global _lock_manager
+    with _lock_manager_lock:
+        if _lock_manager is None:
+            _lock_manager = FileLockManager()
+    return _lock_manager
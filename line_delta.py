@@ -0,0 +1,199 @@
+"""
+line_delta.py - Line-based deltas between successive versions of a file
+
+A delta lists the target's lines as copies of line ranges from the base plus
+inserted bytes. The unchanged prefix and suffix are found by comparing bytes
+in chunks and become one copy each; only the lines in between are diffed.
+There, base lines are indexed by content and each target line is matched
+first where the previous copy left off, so an edit that adds a few hundred
+bytes to a large file encodes as a few copy ops and the new bytes.
+"""
+
+import bisect
+import time
+from typing import Dict, List, Tuple, Union
+
+DELTA_MAGIC = b"LD1\n"
+
+# Candidate base positions tried per unmatched line (around the previous
+# copy's end first), bounding the work for very common lines such as "}"
+MAX_CANDIDATES = 8
+
+# Bytes compared per step when looking for the common prefix and suffix
+_CHUNK = 1 << 16
+
+Op = Union[Tuple[str, int, int], Tuple[str, bytes]]
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    """Length of the longest common prefix of a and b."""
+    n = min(len(a), len(b))
+    i = 0
+    while i + _CHUNK <= n and a[i:i + _CHUNK] == b[i:i + _CHUNK]:
+        i += _CHUNK
+    lo, hi = i, min(i + _CHUNK, n)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[i:mid] == b[i:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _match_length(base: List[bytes], start: int, target: List[bytes], j: int) -> int:
+    k = 0
+    limit = min(len(base) - start, len(target) - j)
+    while k < limit and base[start + k] == target[j + k]:
+        k += 1
+    return k
+
+
+def diff_lines(base: List[bytes], target: List[bytes]) -> List[Op]:
+    """
+    Ops turning base into target: ("copy", start, count) takes base lines
+    [start, start + count); ("insert", data) adds the given bytes.
+    """
+    index: Dict[bytes, List[int]] = {}
+    for i, line in enumerate(base):
+        index.setdefault(line, []).append(i)
+
+    ops: List[Op] = []
+    inserted: List[bytes] = []
+    expect = 0
+    j = 0
+    while j < len(target):
+        positions = index.get(target[j])
+        best_start, best_len = -1, 0
+        if positions:
+            k = bisect.bisect_left(positions, expect)
+            candidates = positions[k:k + MAX_CANDIDATES] or positions[-MAX_CANDIDATES:]
+            for start in candidates:
+                length = _match_length(base, start, target, j)
+                if length > best_len:
+                    best_start, best_len = start, length
+                    if start == expect:
+                        break
+        if not best_len:
+            inserted.append(target[j])
+            j += 1
+            continue
+        if inserted:
+            ops.append(("insert", b"".join(inserted)))
+            inserted = []
+        last = ops[-1] if ops else None
+        if last is not None and last[0] == "copy" and last[1] + last[2] == best_start:
+            ops[-1] = ("copy", last[1], last[2] + best_len)
+        else:
+            ops.append(("copy", best_start, best_len))
+        expect = best_start + best_len
+        j += best_len
+    if inserted:
+        ops.append(("insert", b"".join(inserted)))
+    return ops
+
+
+def _line_ops(base: bytes, target: bytes) -> List[Op]:
+    """diff_lines() over whole lines, with the common prefix and suffix as single copies."""
+    prefix = _common_prefix(base, target)
+    prefix = base.rfind(b"\n", 0, prefix) + 1
+    suffix = min(_common_prefix(base[::-1], target[::-1]), len(base) - prefix, len(target) - prefix)
+    # The suffix must start a line in both texts
+    while suffix:
+        start, t_start = len(base) - suffix, len(target) - suffix
+        if (start == prefix or base[start - 1] == 10) and (t_start == prefix or target[t_start - 1] == 10):
+            break
+        eol = base.find(b"\n", start)
+        suffix = len(base) - eol - 1 if eol >= 0 else 0
+
+    # Counted as splitlines() counts them, which also splits on a lone "\r"
+    prefix_lines = len(base[:prefix].splitlines())
+    middle = base[prefix:len(base) - suffix].splitlines(keepends=True)
+    ops: List[Op] = [("copy", 0, prefix_lines)] if prefix_lines else []
+    for op in diff_lines(middle, target[prefix:len(target) - suffix].splitlines(keepends=True)):
+        ops.append(("copy", op[1] + prefix_lines, op[2]) if op[0] == "copy" else op)
+    if suffix:
+        ops.append(("copy", prefix_lines + len(middle), len(base[len(base) - suffix:].splitlines())))
+
+    merged: List[Op] = []
+    for op in ops:
+        last = merged[-1] if merged else None
+        if op[0] == "copy" and last is not None and last[0] == "copy" and last[1] + last[2] == op[1]:
+            merged[-1] = ("copy", last[1], last[2] + op[2])
+        else:
+            merged.append(op)
+    return merged
+
+
+def encode_delta(base: bytes, target: bytes) -> bytes:
+    """Serialized delta that apply_delta() turns back into target."""
+    parts = [DELTA_MAGIC]
+    for op in _line_ops(base, target):
+        if op[0] == "copy":
+            parts.append(b"C %d %d\n" % (op[1], op[2]))
+        else:
+            parts.append(b"I %d\n" % len(op[1]))
+            parts.append(op[1])
+    return b"".join(parts)
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """
+    Rebuild the target of encode_delta() from its base.
+
+    Raises:
+        ValueError: If delta is not a line delta
+    """
+    if not delta.startswith(DELTA_MAGIC):
+        raise ValueError("Not a line delta")
+    lines = base.splitlines(keepends=True)
+    out: List[bytes] = []
+    pos = len(DELTA_MAGIC)
+    while pos < len(delta):
+        eol = delta.index(b"\n", pos)
+        fields = delta[pos:eol].split()
+        pos = eol + 1
+        if fields[0] == b"C":
+            start, count = int(fields[1]), int(fields[2])
+            out.extend(lines[start:start + count])
+        elif fields[0] == b"I":
+            size = int(fields[1])
+            out.append(delta[pos:pos + size])
+            pos += size
+        else:
+            raise ValueError(f"Bad delta op {fields[0]!r}")
+    return b"".join(out)
+
+
+if __name__ == "__main__":
+    # Benchmark: 30 successive ~300-byte tool injections into a ~2 MB
+    # generated server, full copies versus deltas against the predecessor
+    import random
+
+    random.seed(7)
+    body = "".join(
+        f"@mcp.tool()\ndef tool_{i}(x: int) -> int:\n    \"\"\"Generated tool {i}.\"\"\"\n    return x * {random.randint(1, 999)}\n\n\n"
+        for i in range(22000)
+    ).encode()
+    versions = [body]
+    for n in range(30):
+        at = random.randint(0, len(versions[-1]) // 2)
+        at = versions[-1].index(b"\n\n\n", at) + 3
+        tool = (f"@mcp.tool()\ndef injected_{n}(path: str) -> dict:\n    \"\"\"Injected tool {n}.\"\"\"\n"
+                f"    return {{'path': path, 'size': len(path), 'n': {n}}}\n\n\n" * 2).encode()
+        versions.append(versions[-1][:at] + tool + versions[-1][at:])
+
+    full = sum(len(v) for v in versions[1:])
+    encode_s = apply_s = 0.0
+    delta_bytes = 0
+    for prev, cur in zip(versions, versions[1:]):
+        t = time.perf_counter()
+        delta = encode_delta(prev, cur)
+        encode_s += time.perf_counter() - t
+        t = time.perf_counter()
+        assert apply_delta(prev, delta) == cur
+        apply_s += time.perf_counter() - t
+        delta_bytes += len(delta)
+    print(f"{len(versions) - 1} versions of {len(body) / 1e6:.1f} MB: full copies {full / 1e6:.1f} MB, "
+          f"deltas {delta_bytes / 1e3:.1f} KB ({full / max(delta_bytes, 1):.0f}x smaller)")
+    print(f"encode {encode_s / 30 * 1000:.1f} ms/version, apply {apply_s / 30 * 1000:.1f} ms/version")
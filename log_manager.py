@@ -8,6 +8,8 @@ import re
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from regex_sandbox import get_regex_sandbox
+
 
 def _get_claude_log_dir() -> Optional[Path]:
     """Get the Claude Desktop log directory based on OS."""
@@ -111,6 +113,9 @@ ERROR_PATTERNS = [
     (r'(?i)ECONNREFUSED|ECONNRESET|EPIPE', "connection_error"),
 ]
 
+# Built-in patterns are trusted and compiled once; user patterns go through the regex sandbox
+_COMPILED_ERROR_PATTERNS = [(re.compile(ep), category) for ep, category in ERROR_PATTERNS]
+
 
 def analyze_logs(
     server_name: Optional[str] = None,
@@ -126,10 +131,11 @@ def analyze_logs(
 
     errors: List[Dict[str, Any]] = []
     pattern_matches: List[str] = []
+    pattern_run: Dict[str, Any] = {}
 
     for line in lines:
-        for ep, category in ERROR_PATTERNS:
-            m = re.search(ep, line)
+        for regex, category in _COMPILED_ERROR_PATTERNS:
+            m = regex.search(line)
             if m:
                 errors.append({
                     "category": category,
@@ -138,9 +144,12 @@ def analyze_logs(
                 })
                 break
 
-        if pattern:
-            if re.search(pattern, line, re.IGNORECASE):
-                pattern_matches.append(line.strip()[:200])
+    if pattern:
+        try:
+            pattern_run = get_regex_sandbox().search_lines(pattern, lines, re.IGNORECASE)
+        except (re.error, ValueError) as e:
+            return {"success": False, "message": f"Invalid regex pattern: {e}"}
+        pattern_matches = [lines[index].strip()[:200] for index, _ in pattern_run["matches"]]
 
     # Summarize errors
     categories: Dict[str, int] = {}
@@ -155,6 +164,8 @@ def analyze_logs(
         "error_categories": categories,
         "recent_errors": errors[-20:],
         "pattern_matches": pattern_matches[-20:] if pattern else [],
+        "pattern_timed_out": pattern_run.get("timed_out", False),
+        "pattern_warnings": pattern_run.get("warnings", []),
     }
 
 
@@ -168,15 +179,25 @@ def search_logs(
     if not logs_result.get("success"):
         return logs_result
 
-    content = logs_result.get("content", "")
-    matching = []
-    for line in content.splitlines():
-        if re.search(pattern, line, re.IGNORECASE):
-            matching.append(line.strip()[:300])
+    log_lines = logs_result.get("content", "").splitlines()
+    try:
+        run = get_regex_sandbox().search_lines(pattern, log_lines, re.IGNORECASE)
+    except (re.error, ValueError) as e:
+        return {"success": False, "message": f"Invalid regex pattern: {e}"}
+    matching = [log_lines[index].strip()[:300] for index, _ in run["matches"]]
 
-    return {
+    result = {
         "success": True,
         "pattern": pattern,
         "match_count": len(matching),
         "matches": matching[-50:],
+        "timed_out": run["timed_out"],
+        "lines_scanned": run["lines_scanned"],
+        "warnings": run["warnings"],
     }
+    if run["timed_out"]:
+        result["message"] = (
+            f"Search stopped after {run['lines_scanned']} of {len(log_lines)} lines: "
+            f"the pattern exceeded the regex time budget; matches are partial"
+        )
+    return result
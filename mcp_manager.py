@@ -3,16 +3,32 @@ mcp_manager.py - Logic for parsing and modifying other MCP servers
 """
 
 import ast
+import base64
+import bisect
+import hashlib
 import json
+import mmap
 import os
 import re
-import shutil
 import subprocess
 import tempfile
+import threading
+from array import array
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional, Tuple
-
-from config_manager import get_server_config
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from atomic_io import atomic_append_text, atomic_write_text
+from backup_manager import get_backup_manager
+from config_manager import get_server_config, read_config
+from delimiter_lexer import delimiter_gate
+from file_locks import check_unchanged, file_version, get_lock_manager, read_versioned
+from piece_table import Piece, PieceTable
+from regex_sandbox import get_regex_sandbox
+from splice_validator import get_validation_watermarks, validate_splice
+from symbol_scanner import SYMBOL_SCANNERS, extract_symbols, file_symbols
+from tool_spans import cache_tool_spans, get_tool_spans
+from validation_cache import cached_validation
+from validator_pool import get_validator_pool
 
 
 def get_allowed_root_dir() -> Optional[Path]:
@@ -51,6 +67,62 @@ def check_path_allowed(file_path: Path) -> None:
         )
 
 
+# Extended file extensions for all supported languages
+SOURCE_EXTENSIONS: Tuple[str, ...] = (
+    '.py', '.js', '.rs', '.c', '.cpp', '.cc', '.cxx', '.go', '.ts', '.zig', '.java', '.rb',
+    '.kt', '.kts', '.swift', '.cs', '.php', '.lua', '.scala', '.ex', '.exs', '.dart',
+    '.hs', '.ml', '.mli', '.nim', '.d', '.cr', '.raku', '.rakumod', '.pm6', '.jl',
+)
+
+# Launcher commands grouped by the source extensions they run
+_COMMAND_EXTENSION_GROUPS = [
+    (("python", "python3"), ('.py',)),
+    (("node",), ('.js',)),
+    (("cargo", "rustc"), ('.rs',)),
+    (("gcc", "clang"), ('.c',)),
+    (("g++", "clang++"), ('.cpp', '.cc', '.cxx')),
+    (("go",), ('.go',)),
+    (("tsc", "ts-node"), ('.ts',)),
+    (("zig",), ('.zig',)),
+    (("java", "javac", "mvn", "gradle"), ('.java',)),
+    (("ruby",), ('.rb',)),
+    (("kotlin", "kotlinc"), ('.kt', '.kts')),
+    (("swift", "swiftc"), ('.swift',)),
+    (("dotnet", "csc", "mcs"), ('.cs',)),
+    (("php",), ('.php',)),
+    (("lua", "luajit"), ('.lua',)),
+    (("scala", "scalac"), ('.scala',)),
+    (("elixir", "elixirc", "mix"), ('.ex', '.exs')),
+    (("dart",), ('.dart',)),
+    (("ghc", "runhaskell", "cabal", "stack"), ('.hs',)),
+    (("ocamlc", "ocamlopt", "dune"), ('.ml', '.mli')),
+    (("nim", "nimble"), ('.nim',)),
+    (("dmd", "ldc2", "gdc", "dub"), ('.d',)),
+    (("crystal",), ('.cr',)),
+    (("raku", "perl6"), ('.raku', '.rakumod', '.pm6')),
+    (("julia",), ('.jl',)),
+]
+
+# command -> accepted source extensions; unknown commands (uvx, npx, ...) accept any
+COMMAND_EXTENSIONS: Dict[str, Tuple[str, ...]] = {
+    command: extensions
+    for commands, extensions in _COMMAND_EXTENSION_GROUPS
+    for command in commands
+}
+
+
+class NoLocalSourceError(ValueError):
+    """Raised when a server's args name no local source file (e.g. ``npx -y <package>``)."""
+    pass
+
+
+# Resolution cache: config-entry hash -> (path, (st_dev, st_ino), resolution info)
+_SOURCE_CACHE_MAX = 1024
+_source_cache: Dict[str, Tuple[Path, Tuple[int, int], Dict[str, Any]]] = {}
+_source_cache_lock = threading.Lock()
+_source_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
 def find_server_source_file(server_name: str) -> Path:
     """
     Locate the source code file for an MCP server.
@@ -66,198 +138,153 @@ def find_server_source_file(server_name: str) -> Path:
         FileNotFoundError: If source file doesn't exist
     """
     server_config = get_server_config(server_name)
+    return resolve_server_source_file(server_name, server_config)
+
+
+def resolve_server_source_file(server_name: str, server_config: Dict[str, Any]) -> Path:
+    """
+    Locate the source code file for an already-loaded server config entry.
+    
+    Args:
+        server_name: Name of the server (used in error messages)
+        server_config: The server's entry from mcpServers
+        
+    Returns:
+        Path to the server's main source file
+        
+    Raises:
+        ValueError: If the source file cannot be determined
+        FileNotFoundError: If source file doesn't exist
+    """
+    return resolve_server_source_info(server_name, server_config)["path"]
+
+
+def _source_cache_key(server_config: Dict[str, Any]) -> str:
+    """Hash everything that can change where a config entry's source file resolves."""
+    material = json.dumps(
+        {
+            "config": server_config,
+            "base": "" if server_config.get("cwd") else os.getcwd(),
+            "allowed_root": os.getenv("ALLOWED_ROOT_DIR", ""),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def resolve_server_source_info(server_name: str, server_config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resolve a server's source file and report how it was found.
+    
+    Results are cached by a hash of the config entry and revalidated with one
+    stat: the entry is dropped when the resolved file disappears or its inode
+    changes (e.g. the file was replaced).
+    
+    Args:
+        server_name: Name of the server (used in error messages)
+        server_config: The server's entry from mcpServers
+        
+    Returns:
+        Dictionary with path (Path), method, command, arg_index, arg and cached
+        
+    Raises:
+        NoLocalSourceError: If no argument names a source file
+        ValueError: If the source file cannot be determined
+        FileNotFoundError: If source file doesn't exist
+    """
+    key = _source_cache_key(server_config)
+    with _source_cache_lock:
+        cached = _source_cache.get(key)
+    if cached is not None:
+        path, identity, info = cached
+        try:
+            st = os.stat(path)
+            if (st.st_dev, st.st_ino) == identity:
+                with _source_cache_lock:
+                    _source_cache_stats["hits"] += 1
+                return dict(info, path=path, cached=True)
+        except OSError:
+            pass
+        with _source_cache_lock:
+            _source_cache.pop(key, None)
+            _source_cache_stats["invalidations"] += 1
+    
+    with _source_cache_lock:
+        _source_cache_stats["misses"] += 1
     
-    # Get the command and working directory
     command = server_config.get("command", "")
     args = server_config.get("args", [])
     cwd = server_config.get("cwd", "")
     
-    # Determine the source file
-    source_file = None
+    extensions = COMMAND_EXTENSIONS.get(command)
+    method = "command_table" if extensions else "extension_scan"
+    extensions = extensions or SOURCE_EXTENSIONS
     
-    # Extended file extensions for all supported languages
-    source_extensions = (
-        '.py', '.js', '.rs', '.c', '.cpp', '.cc', '.cxx', '.go', '.ts', '.zig', '.java', '.rb',
-        '.kt', '.kts', '.swift', '.cs', '.php', '.lua', '.scala', '.ex', '.exs', '.dart',
-        '.hs', '.ml', '.mli', '.nim', '.d', '.cr', '.raku', '.rakumod', '.pm6', '.jl',
-    )
-    
-    if command == "python" or command == "python3":
-        # Look for .py file in args
-        for arg in args:
-            if arg.endswith(".py"):
-                source_file = arg
-                break
-    elif command == "node":
-        # Look for .js file in args
-        for arg in args:
-            if arg.endswith(".js"):
-                source_file = arg
-                break
-    elif command in ("cargo", "rustc"):
-        # Look for .rs file in args
-        for arg in args:
-            if arg.endswith(".rs"):
-                source_file = arg
-                break
-    elif command in ("gcc", "clang"):
-        # Look for .c file in args
-        for arg in args:
-            if arg.endswith(".c"):
-                source_file = arg
-                break
-    elif command in ("g++", "clang++"):
-        # Look for .cpp, .cc, .cxx files in args
-        for arg in args:
-            if arg.endswith((".cpp", ".cc", ".cxx")):
-                source_file = arg
-                break
-    elif command == "go":
-        # Look for .go file in args
-        for arg in args:
-            if arg.endswith(".go"):
-                source_file = arg
-                break
-    elif command in ("tsc", "ts-node"):
-        # Look for .ts file in args
-        for arg in args:
-            if arg.endswith(".ts"):
-                source_file = arg
-                break
-    elif command == "zig":
-        # Look for .zig file in args
-        for arg in args:
-            if arg.endswith(".zig"):
-                source_file = arg
-                break
-    elif command in ("java", "javac", "mvn", "gradle"):
-        # Look for .java file in args
-        for arg in args:
-            if arg.endswith(".java"):
-                source_file = arg
-                break
-    elif command == "ruby":
-        # Look for .rb file in args
-        for arg in args:
-            if arg.endswith(".rb"):
-                source_file = arg
-                break
-    elif command in ("kotlin", "kotlinc"):
-        for arg in args:
-            if arg.endswith((".kt", ".kts")):
-                source_file = arg
-                break
-    elif command in ("swift", "swiftc"):
-        for arg in args:
-            if arg.endswith(".swift"):
-                source_file = arg
-                break
-    elif command in ("dotnet", "csc", "mcs"):
-        for arg in args:
-            if arg.endswith(".cs"):
-                source_file = arg
-                break
-    elif command == "php":
-        for arg in args:
-            if arg.endswith(".php"):
-                source_file = arg
-                break
-    elif command in ("lua", "luajit"):
-        for arg in args:
-            if arg.endswith(".lua"):
-                source_file = arg
-                break
-    elif command in ("scala", "scalac"):
-        for arg in args:
-            if arg.endswith(".scala"):
-                source_file = arg
-                break
-    elif command in ("elixir", "elixirc", "mix"):
-        for arg in args:
-            if arg.endswith((".ex", ".exs")):
-                source_file = arg
-                break
-    elif command == "dart":
-        for arg in args:
-            if arg.endswith(".dart"):
-                source_file = arg
-                break
-    elif command in ("ghc", "runhaskell", "cabal", "stack"):
-        for arg in args:
-            if arg.endswith(".hs"):
-                source_file = arg
-                break
-    elif command in ("ocamlc", "ocamlopt", "dune"):
-        for arg in args:
-            if arg.endswith((".ml", ".mli")):
-                source_file = arg
-                break
-    elif command in ("nim", "nimble"):
-        for arg in args:
-            if arg.endswith(".nim"):
-                source_file = arg
-                break
-    elif command in ("dmd", "ldc2", "gdc", "dub"):
-        for arg in args:
-            if arg.endswith(".d"):
-                source_file = arg
-                break
-    elif command == "crystal":
-        for arg in args:
-            if arg.endswith(".cr"):
-                source_file = arg
-                break
-    elif command in ("raku", "perl6"):
-        for arg in args:
-            if arg.endswith((".raku", ".rakumod", ".pm6")):
-                source_file = arg
-                break
-    elif command == "julia":
-        for arg in args:
-            if arg.endswith(".jl"):
-                source_file = arg
-                break
-    elif command == "uvx" or command == "npx":
-        # For package managers, check if there's a direct file reference
-        for arg in args:
-            if arg.endswith(source_extensions):
-                source_file = arg
-                break
-    else:
-        # Try to find any supported source file in args
-        for arg in args:
-            if arg.endswith(source_extensions):
-                source_file = arg
-                break
-    
-    if not source_file:
-        raise ValueError(
+    arg_index = next((i for i, arg in enumerate(args) if arg.endswith(extensions)), None)
+    if arg_index is None:
+        raise NoLocalSourceError(
             f"Cannot determine source file for server '{server_name}'. "
             f"Command: {command}, Args: {args}"
         )
     
     # Resolve the full path
-    if cwd:
-        base_path = Path(cwd)
-    else:
-        base_path = Path.cwd()
-    
-    full_path = (base_path / source_file).resolve()
+    base_path = Path(cwd) if cwd else Path.cwd()
+    full_path = (base_path / args[arg_index]).resolve()
     
-    if not full_path.exists():
+    try:
+        st = os.stat(full_path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"Source file not found: {full_path}")
     
     check_path_allowed(full_path)
-    return full_path
+    
+    info = {"method": method, "command": command, "arg_index": arg_index, "arg": args[arg_index]}
+    with _source_cache_lock:
+        if len(_source_cache) >= _SOURCE_CACHE_MAX:
+            _source_cache.pop(next(iter(_source_cache)))
+        _source_cache[key] = (full_path, (st.st_dev, st.st_ino), info)
+    return dict(info, path=full_path, cached=False)
 
 
-def read_source_file(server_name: str, max_chars: int = 50000) -> Tuple[str, Path]:
+def resolve_all_source_files() -> Dict[str, Dict[str, Any]]:
+    """
+    Resolve the source file of every configured server in one pass.
+    
+    The config is read once; each server's result holds either path/method
+    details or an error message.
+    
+    Returns:
+        Dictionary mapping server name to its resolution result
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for server_name, server_config in read_config().get("mcpServers", {}).items():
+        try:
+            info = resolve_server_source_info(server_name, server_config)
+            info["path"] = str(info["path"])
+            results[server_name] = info
+        except Exception as e:
+            results[server_name] = {"error": str(e)}
+    return results
+
+
+def get_source_cache_stats() -> Dict[str, Any]:
+    """Get hit/miss counters for the source-file resolution cache."""
+    with _source_cache_lock:
+        stats: Dict[str, Any] = dict(_source_cache_stats)
+        stats["entries"] = len(_source_cache)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def read_source_file(server_name: str, max_chars: Optional[int] = 50000) -> Tuple[str, Path]:
     """
     Read the source code of an MCP server.
     
     Args:
         server_name: Name of the server from config
-        max_chars: Maximum characters to return (truncate if larger)
+        max_chars: Maximum characters to return (truncate if larger; None reads the whole file)
         
     Returns:
         Tuple of (source_code, file_path)
@@ -268,18 +295,189 @@ def read_source_file(server_name: str, max_chars: int = 50000) -> Tuple[str, Pat
         content = f.read()
     
     original_length = len(content)
-    if original_length > max_chars:
+    if max_chars is not None and original_length > max_chars:
         content = content[:max_chars] + f"\n\n... (truncated, total size: {original_length} chars)"
     
     return content, source_path
 
 
-def validate_python_code(code: str) -> Tuple[bool, str]:
+# Line-start offsets per file version: path -> ((st_mtime_ns, st_size), offsets)
+_LINE_INDEX_MAX = 32
+_line_index_cache: Dict[str, Tuple[Tuple[int, int], array]] = {}
+_line_index_lock = threading.Lock()
+
+# Stride of the sparse file-wide line index returned with each window
+LINE_INDEX_STRIDE = 1000
+
+
+def _line_starts(path: Path, version: Tuple[int, int], mm: Any) -> array:
+    """Return byte offsets of every line start, cached per file version."""
+    key = str(path)
+    with _line_index_lock:
+        cached = _line_index_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    
+    starts = array('Q', [0])
+    find = mm.find
+    pos = find(b"\n")
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = find(b"\n", pos + 1)
+    if starts[-1] == version[1] and len(starts) > 1:
+        starts.pop()  # Trailing newline does not start a new line
+    
+    with _line_index_lock:
+        if len(_line_index_cache) >= _LINE_INDEX_MAX:
+            _line_index_cache.pop(next(iter(_line_index_cache)))
+        _line_index_cache[key] = (version, starts)
+    return starts
+
+
+def _encode_cursor(position: int, unit: str, version: Tuple[int, int]) -> str:
+    raw = json.dumps({"p": position, "u": unit, "m": version[0], "s": version[1]})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def read_source_window(
+    server_name: str,
+    offset: int = 0,
+    limit: int = 50000,
+    unit: str = "bytes",
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Read one window of a server's source file without loading the whole file.
+    
+    The file is memory-mapped and only the requested window is decoded.
+    Byte windows are snapped to UTF-8 character boundaries.
+    
+    Args:
+        server_name: Name of the server from config
+        offset: Start of the window (byte offset, or 0-indexed line number)
+        limit: Window size (bytes or lines)
+        unit: "bytes" or "lines"
+        cursor: Continuation token from a previous call; overrides offset/unit
+        
+    Returns:
+        Dictionary with content, byte and line ranges, file totals, a sparse
+        line index ([line, byte_offset] every LINE_INDEX_STRIDE lines) and
+        next_cursor (None at end of file)
+        
+    Raises:
+        ValueError: On bad arguments or a cursor issued for an older file version
+    """
+    if unit not in ("bytes", "lines"):
+        raise ValueError("unit must be 'bytes' or 'lines'")
+    if limit <= 0 or offset < 0:
+        raise ValueError("offset must be >= 0 and limit must be > 0")
+    
+    source_path = find_server_source_file(server_name)
+    st = os.stat(source_path)
+    version = (st.st_mtime_ns, st.st_size)
+    
+    if cursor:
+        token = _decode_cursor(cursor)
+        if (token.get("m"), token.get("s")) != version:
+            raise ValueError("Source file changed since the cursor was issued; restart from offset 0")
+        offset, unit = token["p"], token["u"]
+    
+    size = st.st_size
+    result: Dict[str, Any] = {
+        "file_path": str(source_path),
+        "total_bytes": size,
+        "unit": unit,
+    }
+    if size == 0:
+        result.update({
+            "content": "", "start_byte": 0, "end_byte": 0, "start_line": 0, "end_line": 0,
+            "total_lines": 0, "line_index": [], "next_cursor": None,
+        })
+        return result
+    
+    with open(source_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        starts = _line_starts(source_path, version, mm)
+        total_lines = len(starts)
+        
+        if unit == "lines":
+            start_line = min(offset, total_lines)
+            end_line = min(start_line + limit, total_lines)
+            start_byte = starts[start_line] if start_line < total_lines else size
+            end_byte = starts[end_line] if end_line < total_lines else size
+        else:
+            start_byte = min(offset, size)
+            end_byte = min(start_byte + limit, size)
+            # Snap both ends to UTF-8 character boundaries
+            while start_byte < size and (mm[start_byte] & 0xC0) == 0x80:
+                start_byte += 1
+            while start_byte < end_byte < size and (mm[end_byte] & 0xC0) == 0x80:
+                end_byte -= 1
+            if end_byte == start_byte < size:
+                # limit is smaller than the character at start_byte: return
+                # that whole character so the cursor still advances
+                end_byte += 1
+                while end_byte < size and (mm[end_byte] & 0xC0) == 0x80:
+                    end_byte += 1
+            start_line = bisect.bisect_right(starts, start_byte) - 1
+            end_line = bisect.bisect_right(starts, max(end_byte - 1, start_byte)) if end_byte > start_byte else start_line
+        
+        content = mm[start_byte:end_byte].decode("utf-8", errors="replace")
+    
+    at_end = end_byte >= size
+    next_position = end_line if unit == "lines" else end_byte
+    result.update({
+        "content": content,
+        "start_byte": start_byte,
+        "end_byte": end_byte,
+        "start_line": start_line,
+        "end_line": end_line,
+        "total_lines": total_lines,
+        "line_index": [[i, starts[i]] for i in range(0, total_lines, LINE_INDEX_STRIDE)],
+        "next_cursor": None if at_end else _encode_cursor(next_position, unit, version),
+    })
+    return result
+
+
+def tool_exists_in_file(
+    source_path: Path,
+    tool_name: str,
+    checker: Callable[[str, str], bool],
+) -> bool:
+    """
+    Check the whole source file for an existing tool definition.
+    
+    For languages with a symbol scanner the file's defined names are
+    extracted once per file version (mtime, size) and every lookup after
+    that is a set membership test. Other files are read whole and passed
+    to ``checker``.
+    
+    Args:
+        source_path: Path to the source file
+        tool_name: Name of the tool to look for
+        checker: Language-specific ``check_tool_exists_*`` function
+        
+    Returns:
+        True if the tool is defined anywhere in the file
+    """
+    if source_path.suffix in SYMBOL_SCANNERS:
+        return tool_name in file_symbols(source_path)
+    return checker(source_path.read_text(encoding='utf-8', errors='replace'), tool_name)
+
+
+def validate_python_code(code: str, tier: str = "full") -> Tuple[bool, str]:
     """
     Validate Python code using AST parsing.
     
     Args:
         code: Python code to validate
+        tier: Either tier parses with ast; accepted for a uniform validator signature
         
     Returns:
         Tuple of (is_valid, error_message)
@@ -297,15 +495,41 @@ def create_backup(file_path: Path) -> Path:
     """
     Create a backup of a file before modifying it.
     
+    The content is stored in the backup blob store under its sha256, so
+    successive backups never overwrite each other and unchanged content is
+    stored once. Pass the result to _register_backup before writing the
+    file so the blob is kept past the next cleanup.
+    
     Args:
         file_path: Path to the file to backup
         
     Returns:
-        Path to the backup file
-    """
-    backup_path = file_path.with_suffix(file_path.suffix + ".bak")
-    shutil.copy2(file_path, backup_path)
-    return backup_path
+        Path to the stored backup blob
+    """
+    return get_backup_manager().store_backup(file_path)
+
+
+def _register_backup(
+    source_path: Path,
+    backup_path: Path,
+    operation: str,
+    server_name: Optional[str] = None,
+    tool_name: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Record a backup with BackupManager. Call it before writing the file: an
+    unregistered blob is collected by the next cleanup, so a registry error
+    raises and aborts the edit rather than leaving an edit without a backup.
+    """
+    get_backup_manager().register_backup(
+        file_path=str(source_path),
+        backup_path=str(backup_path),
+        operation=operation,
+        server_name=server_name,
+        tool_name=tool_name,
+        metadata=metadata,
+    )
 
 
 def check_tool_exists(source_code: str, tool_name: str) -> bool:
@@ -319,24 +543,14 @@ def check_tool_exists(source_code: str, tool_name: str) -> bool:
     Returns:
         True if tool exists, False otherwise
     """
-    # Look for common patterns of tool definition
-    patterns = [
-        rf'@\w+\.tool\(\s*["\']?{re.escape(tool_name)}["\']?',  # @mcp.tool("tool_name")
-        rf'@\w+\.tool\(\)\s*\n\s*def\s+{re.escape(tool_name)}\s*\(',  # @mcp.tool()\ndef tool_name(
-        rf'def\s+{re.escape(tool_name)}\s*\([^)]*\)\s*->',  # def tool_name(...) ->
-    ]
-    
-    for pattern in patterns:
-        if re.search(pattern, source_code):
-            return True
-    
-    return False
+    return tool_name in extract_symbols(source_code, '.py')
 
 
 def inject_tool_into_python_file(
     server_name: str, 
     tool_name: str, 
-    tool_code: str
+    tool_code: str,
+    validation_tier: str = "full"
 ) -> Tuple[bool, str]:
     """
     Inject a new tool capability into a Python MCP server.
@@ -352,38 +566,36 @@ def inject_tool_into_python_file(
         server_name: Name of the server to modify
         tool_name: Name of the tool to inject
         tool_code: Python code for the tool (should include @mcp.tool decorator)
+        validation_tier: "fast" (parse-only) or "full" validation
         
     Returns:
         Tuple of (success, message)
     """
     try:
-        # Read the source file (limit to reasonable size for duplicate check)
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
         
         # Check if tool already exists
-        if check_tool_exists(source_code, tool_name):
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
         
         # Validate the tool code syntax
-        is_valid, error_msg = validate_python_code(tool_code)
+        is_valid, error_msg = validate_python_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Python code: {error_msg}"
         
         # Also validate that adding it won't break the file
-        combined_code = source_code + "\n\n" + tool_code
-        is_valid, error_msg = validate_python_code(combined_code)
+        is_valid, error_msg = validate_splice(source_path, tool_code, validate_python_code, validation_tier)
         if not is_valid:
             return False, f"Adding tool would break file syntax: {error_msg}"
         
-        # Create backup
-        backup_path = create_backup(source_path)
-        
-        # Append the tool code
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"# Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        # Back up and append, unless the file changed since it was checked
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n# Tool injected by universal-mcp-admin\n" + tool_code + "\n")
+            get_validation_watermarks().record(source_path, validation_tier)
         
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}"
         
@@ -415,35 +627,39 @@ def patch_file_with_regex(
             return False, f"File not found: {file_path}"
         
         # Read the file
+        expected = file_version(path)
         with open(path, "r", encoding="utf-8") as f:
             content = f.read()
         
-        # Try to compile the regex pattern
+        # Replace and count in one scan, in the sandbox under its time budget
+        sandbox = get_regex_sandbox()
         try:
-            pattern = re.compile(search_pattern)
+            result = sandbox.substitute(search_pattern, replacement_text, content)
         except re.error as e:
             return False, f"Invalid regex pattern: {str(e)}"
-        
-        # Check if pattern matches anything
-        if not pattern.search(content):
+        except ValueError as e:
+            return False, f"Invalid replacement: {str(e)}"
+        if result["timed_out"]:
+            risks = f" Risky pattern: {'; '.join(result['warnings'])}." if result["warnings"] else ""
+            return False, f"Pattern exceeded the {sandbox.budget:g} s regex budget; file left unchanged.{risks}"
+        new_content, count = result["text"], result["count"]
+        if not count:
             return False, f"Pattern '{search_pattern}' not found in file"
         
-        # Create backup
-        backup_path = create_backup(path)
-        
-        # Perform replacement
-        new_content = pattern.sub(replacement_text, content)
-        
-        # Write the modified content
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(new_content)
+        # Back up and write, unless the file changed since it was read
+        with get_lock_manager().lock(path):
+            check_unchanged(path, expected)
+            backup_path = create_backup(path)
+            _register_backup(path, backup_path, "patch_file")
+            atomic_write_text(path, new_content)
         
-        return True, f"File patched successfully. Backup created at {backup_path}"
+        return True, f"File patched successfully ({count} replacements). Backup created at {backup_path}"
         
     except Exception as e:
         return False, f"Failed to patch file: {str(e)}"
 
 
+@cached_validation("javascript", "node")
 def validate_javascript_code(code: str) -> Tuple[bool, str]:
     """
     Validate JavaScript code using Node.js syntax checking.
@@ -454,6 +670,11 @@ def validate_javascript_code(code: str) -> Tuple[bool, str]:
     Returns:
         Tuple of (is_valid, error_message)
     """
+    pooled = get_validator_pool().validate("javascript", code)
+    if pooled is not None:
+        is_valid, error_msg = pooled
+        return is_valid, "" if is_valid else f"JavaScript syntax error: {error_msg}"
+    
     try:
         # Use Node.js --check flag with a temporary file
         import tempfile
@@ -498,26 +719,14 @@ def check_tool_exists_javascript(source_code: str, tool_name: str) -> bool:
     Returns:
         True if tool exists, False otherwise
     """
-    # Look for common patterns of tool definition in JavaScript
-    patterns = [
-        rf'\.tool\(["\']?{re.escape(tool_name)}["\']?',  # .tool("tool_name")
-        rf'name:\s*["\']{re.escape(tool_name)}["\']',  # name: "tool_name"
-        rf'function\s+{re.escape(tool_name)}\s*\(',  # function tool_name(
-        rf'const\s+{re.escape(tool_name)}\s*=',  # const tool_name =
-        rf'async\s+function\s+{re.escape(tool_name)}\s*\(',  # async function tool_name(
-    ]
-    
-    for pattern in patterns:
-        if re.search(pattern, source_code):
-            return True
-    
-    return False
+    return tool_name in extract_symbols(source_code, '.js')
 
 
 def inject_tool_into_javascript_file(
     server_name: str, 
     tool_name: str, 
-    tool_code: str
+    tool_code: str,
+    validation_tier: str = "full"
 ) -> Tuple[bool, str]:
     """
     Inject a new tool capability into a JavaScript MCP server.
@@ -533,38 +742,36 @@ def inject_tool_into_javascript_file(
         server_name: Name of the server to modify
         tool_name: Name of the tool to inject
         tool_code: JavaScript code for the tool
+        validation_tier: "fast" (parse-only) or "full" validation
         
     Returns:
         Tuple of (success, message)
     """
     try:
-        # Read the source file (limit to reasonable size for duplicate check)
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
         
         # Check if tool already exists
-        if check_tool_exists_javascript(source_code, tool_name):
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_javascript):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
         
         # Validate the tool code syntax
-        is_valid, error_msg = validate_javascript_code(tool_code)
+        is_valid, error_msg = validate_javascript_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid JavaScript code: {error_msg}"
         
         # Also validate that adding it won't break the file
-        combined_code = source_code + "\n\n" + tool_code
-        is_valid, error_msg = validate_javascript_code(combined_code)
+        is_valid, error_msg = validate_splice(source_path, tool_code, validate_javascript_code, validation_tier)
         if not is_valid:
             return False, f"Adding tool would break file syntax: {error_msg}"
         
-        # Create backup
-        backup_path = create_backup(source_path)
-        
-        # Append the tool code
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        # Back up and append, unless the file changed since it was checked
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
+            get_validation_watermarks().record(source_path, validation_tier)
         
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}"
         
@@ -576,6 +783,8 @@ def inject_tool_into_javascript_file(
 # Rust Language Handlers
 # ============================================================================
 
+@delimiter_gate(".rs", "Rust")
+@cached_validation("rust", "rustc")
 def validate_rust_code(code: str) -> Tuple[bool, str]:
     """
     Validate Rust code using rustc --check.
@@ -628,24 +837,14 @@ def check_tool_exists_rust(source_code: str, tool_name: str) -> bool:
     Returns:
         True if tool exists, False otherwise
     """
-    patterns = [
-        rf'#\[mcp::tool\(name\s*=\s*["\']{re.escape(tool_name)}["\']',  # #[mcp::tool(name = "tool_name")]
-        rf'pub\s+fn\s+{re.escape(tool_name)}\s*\(',  # pub fn tool_name(
-        rf'async\s+fn\s+{re.escape(tool_name)}\s*\(',  # async fn tool_name(
-        rf'fn\s+{re.escape(tool_name)}\s*\(',  # fn tool_name(
-    ]
-    
-    for pattern in patterns:
-        if re.search(pattern, source_code):
-            return True
-    
-    return False
+    return tool_name in extract_symbols(source_code, '.rs')
 
 
 def inject_tool_into_rust_file(
     server_name: str,
     tool_name: str,
-    tool_code: str
+    tool_code: str,
+    validation_tier: str = "full"
 ) -> Tuple[bool, str]:
     """
     Inject a new tool capability into a Rust MCP server.
@@ -654,32 +853,32 @@ def inject_tool_into_rust_file(
         server_name: Name of the server to modify
         tool_name: Name of the tool to inject
         tool_code: Rust code for the tool
+        validation_tier: "fast" (parse-only) or "full" validation
         
     Returns:
         Tuple of (success, message)
     """
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
         
-        if check_tool_exists_rust(source_code, tool_name):
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_rust):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
         
-        is_valid, error_msg = validate_rust_code(tool_code)
+        is_valid, error_msg = validate_rust_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Rust code: {error_msg}"
         
-        combined_code = source_code + "\n\n" + tool_code
-        is_valid, error_msg = validate_rust_code(combined_code)
+        is_valid, error_msg = validate_splice(source_path, tool_code, validate_rust_code, validation_tier)
         if not is_valid:
             return False, f"Adding tool would break file syntax: {error_msg}"
         
-        backup_path = create_backup(source_path)
-        
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
+            get_validation_watermarks().record(source_path, validation_tier)
         
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
         
@@ -691,6 +890,8 @@ def inject_tool_into_rust_file(
 # C Language Handlers
 # ============================================================================
 
+@delimiter_gate(".c", "C")
+@cached_validation("c", "gcc", "clang")
 def validate_c_code(code: str) -> Tuple[bool, str]:
     """
     Validate C code using gcc or clang syntax checking.
@@ -748,24 +949,14 @@ def check_tool_exists_c(source_code: str, tool_name: str) -> bool:
     Returns:
         True if tool exists, False otherwise
     """
-    patterns = [
-        rf'void\s+{re.escape(tool_name)}\s*\(',  # void tool_name(
-        rf'int\s+{re.escape(tool_name)}\s*\(',  # int tool_name(
-        rf'static\s+.*\s+{re.escape(tool_name)}\s*\(',  # static ... tool_name(
-        rf'{re.escape(tool_name)}\s*\(',  # tool_name(
-    ]
-    
-    for pattern in patterns:
-        if re.search(pattern, source_code):
-            return True
-    
-    return False
+    return tool_name in extract_symbols(source_code, '.c')
 
 
 def inject_tool_into_c_file(
     server_name: str,
     tool_name: str,
-    tool_code: str
+    tool_code: str,
+    validation_tier: str = "full"
 ) -> Tuple[bool, str]:
     """
     Inject a new tool capability into a C MCP server.
@@ -774,32 +965,32 @@ def inject_tool_into_c_file(
         server_name: Name of the server to modify
         tool_name: Name of the tool to inject
         tool_code: C code for the tool
+        validation_tier: "fast" (parse-only) or "full" validation
         
     Returns:
         Tuple of (success, message)
     """
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
         
-        if check_tool_exists_c(source_code, tool_name):
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_c):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
         
-        is_valid, error_msg = validate_c_code(tool_code)
+        is_valid, error_msg = validate_c_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid C code: {error_msg}"
         
-        combined_code = source_code + "\n\n" + tool_code
-        is_valid, error_msg = validate_c_code(combined_code)
+        is_valid, error_msg = validate_splice(source_path, tool_code, validate_c_code, validation_tier)
         if not is_valid:
             return False, f"Adding tool would break file syntax: {error_msg}"
         
-        backup_path = create_backup(source_path)
-        
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"/* Tool injected by universal-mcp-admin */\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n/* Tool injected by universal-mcp-admin */\n" + tool_code + "\n")
+            get_validation_watermarks().record(source_path, validation_tier)
         
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
         
@@ -811,6 +1002,8 @@ def inject_tool_into_c_file(
 # C++ Language Handlers
 # ============================================================================
 
+@delimiter_gate(".cpp", "C++")
+@cached_validation("cpp", "g++", "clang++")
 def validate_cpp_code(code: str) -> Tuple[bool, str]:
     """
     Validate C++ code using g++ or clang++ syntax checking.
@@ -868,25 +1061,14 @@ def check_tool_exists_cpp(source_code: str, tool_name: str) -> bool:
     Returns:
         True if tool exists, False otherwise
     """
-    patterns = [
-        rf'void\s+{re.escape(tool_name)}\s*\(',  # void tool_name(
-        rf'int\s+{re.escape(tool_name)}\s*\(',  # int tool_name(
-        rf'auto\s+{re.escape(tool_name)}\s*\(',  # auto tool_name(
-        rf'std::.*\s+{re.escape(tool_name)}\s*\(',  # std::... tool_name(
-        rf'class\s+{re.escape(tool_name)}',  # class tool_name
-    ]
-    
-    for pattern in patterns:
-        if re.search(pattern, source_code):
-            return True
-    
-    return False
+    return tool_name in extract_symbols(source_code, '.cpp')
 
 
 def inject_tool_into_cpp_file(
     server_name: str,
     tool_name: str,
-    tool_code: str
+    tool_code: str,
+    validation_tier: str = "full"
 ) -> Tuple[bool, str]:
     """
     Inject a new tool capability into a C++ MCP server.
@@ -895,32 +1077,32 @@ def inject_tool_into_cpp_file(
         server_name: Name of the server to modify
         tool_name: Name of the tool to inject
         tool_code: C++ code for the tool
+        validation_tier: "fast" (parse-only) or "full" validation
         
     Returns:
         Tuple of (success, message)
     """
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
         
-        if check_tool_exists_cpp(source_code, tool_name):
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_cpp):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
         
-        is_valid, error_msg = validate_cpp_code(tool_code)
+        is_valid, error_msg = validate_cpp_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid C++ code: {error_msg}"
         
-        combined_code = source_code + "\n\n" + tool_code
-        is_valid, error_msg = validate_cpp_code(combined_code)
+        is_valid, error_msg = validate_splice(source_path, tool_code, validate_cpp_code, validation_tier)
         if not is_valid:
             return False, f"Adding tool would break file syntax: {error_msg}"
         
-        backup_path = create_backup(source_path)
-        
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
+            get_validation_watermarks().record(source_path, validation_tier)
         
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
         
@@ -932,12 +1114,15 @@ def inject_tool_into_cpp_file(
 # Go Language Handlers
 # ============================================================================
 
-def validate_go_code(code: str) -> Tuple[bool, str]:
+@delimiter_gate(".go", "Go")
+@cached_validation("go", "go", fast_binaries=("gofmt",))
+def validate_go_code(code: str, tier: str = "full") -> Tuple[bool, str]:
     """
     Validate Go code using go build syntax checking.
     
     Args:
         code: Go code to validate
+        tier: "full" runs go build; "fast" only parses with gofmt -e
         
     Returns:
         Tuple of (is_valid, error_message)
@@ -948,8 +1133,12 @@ def validate_go_code(code: str) -> Tuple[bool, str]:
             test_file = tmp_path / "test.go"
             test_file.write_text(code, encoding='utf-8')
             
+            if tier == "fast":
+                command = ["gofmt", "-e", "-l", str(test_file)]
+            else:
+                command = ["go", "build", "-o", str(tmp_path / "test"), str(test_file)]
             process = subprocess.run(
-                ["go", "build", "-o", str(tmp_path / "test"), str(test_file)],
+                command,
                 capture_output=True,
                 text=True,
                 timeout=10,
@@ -980,24 +1169,14 @@ def check_tool_exists_go(source_code: str, tool_name: str) -> bool:
     Returns:
         True if tool exists, False otherwise
     """
-    patterns = [
-        rf'func\s+{re.escape(tool_name)}\s*\(',  # func tool_name(
-        rf'func\s+\(.*\)\s+{re.escape(tool_name)}\s*\(',  # func (receiver) tool_name(
-        rf'var\s+{re.escape(tool_name)}\s*=',  # var tool_name =
-        rf'const\s+{re.escape(tool_name)}\s*=',  # const tool_name =
-    ]
-    
-    for pattern in patterns:
-        if re.search(pattern, source_code):
-            return True
-    
-    return False
+    return tool_name in extract_symbols(source_code, '.go')
 
 
 def inject_tool_into_go_file(
     server_name: str,
     tool_name: str,
-    tool_code: str
+    tool_code: str,
+    validation_tier: str = "full"
 ) -> Tuple[bool, str]:
     """
     Inject a new tool capability into a Go MCP server.
@@ -1006,32 +1185,32 @@ def inject_tool_into_go_file(
         server_name: Name of the server to modify
         tool_name: Name of the tool to inject
         tool_code: Go code for the tool
+        validation_tier: "fast" (parse-only) or "full" validation
         
     Returns:
         Tuple of (success, message)
     """
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
         
-        if check_tool_exists_go(source_code, tool_name):
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_go):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
         
-        is_valid, error_msg = validate_go_code(tool_code)
+        is_valid, error_msg = validate_go_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Go code: {error_msg}"
         
-        combined_code = source_code + "\n\n" + tool_code
-        is_valid, error_msg = validate_go_code(combined_code)
+        is_valid, error_msg = validate_splice(source_path, tool_code, validate_go_code, validation_tier)
         if not is_valid:
             return False, f"Adding tool would break file syntax: {error_msg}"
         
-        backup_path = create_backup(source_path)
-        
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
+            get_validation_watermarks().record(source_path, validation_tier)
         
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
         
@@ -1043,6 +1222,7 @@ def inject_tool_into_go_file(
 # TypeScript Language Handlers
 # ============================================================================
 
+@cached_validation("typescript", "tsc")
 def validate_typescript_code(code: str) -> Tuple[bool, str]:
     """
     Validate TypeScript code using tsc syntax checking.
@@ -1095,26 +1275,14 @@ def check_tool_exists_typescript(source_code: str, tool_name: str) -> bool:
     Returns:
         True if tool exists, False otherwise
     """
-    patterns = [
-        rf'\.tool\(["\']?{re.escape(tool_name)}["\']?',  # .tool("tool_name")
-        rf'name:\s*["\']{re.escape(tool_name)}["\']',  # name: "tool_name"
-        rf'function\s+{re.escape(tool_name)}\s*\(',  # function tool_name(
-        rf'const\s+{re.escape(tool_name)}\s*[:=]',  # const tool_name: or =
-        rf'async\s+function\s+{re.escape(tool_name)}\s*\(',  # async function tool_name(
-        rf'export\s+function\s+{re.escape(tool_name)}\s*\(',  # export function tool_name(
-    ]
-    
-    for pattern in patterns:
-        if re.search(pattern, source_code):
-            return True
-    
-    return False
+    return tool_name in extract_symbols(source_code, '.ts')
 
 
 def inject_tool_into_typescript_file(
     server_name: str,
     tool_name: str,
-    tool_code: str
+    tool_code: str,
+    validation_tier: str = "full"
 ) -> Tuple[bool, str]:
     """
     Inject a new tool capability into a TypeScript MCP server.
@@ -1123,32 +1291,32 @@ def inject_tool_into_typescript_file(
         server_name: Name of the server to modify
         tool_name: Name of the tool to inject
         tool_code: TypeScript code for the tool
+        validation_tier: "fast" (parse-only) or "full" validation
         
     Returns:
         Tuple of (success, message)
     """
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
         
-        if check_tool_exists_typescript(source_code, tool_name):
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_typescript):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
         
-        is_valid, error_msg = validate_typescript_code(tool_code)
+        is_valid, error_msg = validate_typescript_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid TypeScript code: {error_msg}"
         
-        combined_code = source_code + "\n\n" + tool_code
-        is_valid, error_msg = validate_typescript_code(combined_code)
+        is_valid, error_msg = validate_splice(source_path, tool_code, validate_typescript_code, validation_tier)
         if not is_valid:
             return False, f"Adding tool would break file syntax: {error_msg}"
         
-        backup_path = create_backup(source_path)
-        
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
+            get_validation_watermarks().record(source_path, validation_tier)
         
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
         
@@ -1160,6 +1328,8 @@ def inject_tool_into_typescript_file(
 # Zig Language Handlers
 # ============================================================================
 
+@delimiter_gate(".zig", "Zig")
+@cached_validation("zig", "zig")
 def validate_zig_code(code: str) -> Tuple[bool, str]:
     """
     Validate Zig code using zig ast-check.
@@ -1212,24 +1382,14 @@ def check_tool_exists_zig(source_code: str, tool_name: str) -> bool:
     Returns:
         True if tool exists, False otherwise
     """
-    patterns = [
-        rf'pub\s+fn\s+{re.escape(tool_name)}\s*\(',  # pub fn tool_name(
-        rf'fn\s+{re.escape(tool_name)}\s*\(',  # fn tool_name(
-        rf'const\s+{re.escape(tool_name)}\s*=',  # const tool_name =
-        rf'var\s+{re.escape(tool_name)}\s*=',  # var tool_name =
-    ]
-    
-    for pattern in patterns:
-        if re.search(pattern, source_code):
-            return True
-    
-    return False
+    return tool_name in extract_symbols(source_code, '.zig')
 
 
 def inject_tool_into_zig_file(
     server_name: str,
     tool_name: str,
-    tool_code: str
+    tool_code: str,
+    validation_tier: str = "full"
 ) -> Tuple[bool, str]:
     """
     Inject a new tool capability into a Zig MCP server.
@@ -1238,32 +1398,32 @@ def inject_tool_into_zig_file(
         server_name: Name of the server to modify
         tool_name: Name of the tool to inject
         tool_code: Zig code for the tool
+        validation_tier: "fast" (parse-only) or "full" validation
         
     Returns:
         Tuple of (success, message)
     """
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
         
-        if check_tool_exists_zig(source_code, tool_name):
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_zig):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
         
-        is_valid, error_msg = validate_zig_code(tool_code)
+        is_valid, error_msg = validate_zig_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Zig code: {error_msg}"
         
-        combined_code = source_code + "\n\n" + tool_code
-        is_valid, error_msg = validate_zig_code(combined_code)
+        is_valid, error_msg = validate_splice(source_path, tool_code, validate_zig_code, validation_tier)
         if not is_valid:
             return False, f"Adding tool would break file syntax: {error_msg}"
         
-        backup_path = create_backup(source_path)
-        
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
+            get_validation_watermarks().record(source_path, validation_tier)
         
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
         
@@ -1275,12 +1435,15 @@ def inject_tool_into_zig_file(
 # Java Language Handlers
 # ============================================================================
 
-def validate_java_code(code: str) -> Tuple[bool, str]:
+@delimiter_gate(".java", "Java")
+@cached_validation("java", "javac", fast_binaries=("javac",))
+def validate_java_code(code: str, tier: str = "full") -> Tuple[bool, str]:
     """
     Validate Java code using javac syntax checking.
     
     Args:
         code: Java code to validate
+        tier: "full" compiles; "fast" stops after parsing (javac -proc:only)
         
     Returns:
         Tuple of (is_valid, error_message)
@@ -1294,8 +1457,11 @@ def validate_java_code(code: str) -> Tuple[bool, str]:
             test_file = tmp_path / filename
             test_file.write_text(code, encoding='utf-8')
             
+            command = ["javac", "-d", str(tmp_path), str(test_file)]
+            if tier == "fast":
+                command[1:1] = ["-proc:only", "-implicit:none"]
             process = subprocess.run(
-                ["javac", "-d", str(tmp_path), str(test_file)],
+                command,
                 capture_output=True,
                 text=True,
                 timeout=15,
@@ -1326,24 +1492,14 @@ def check_tool_exists_java(source_code: str, tool_name: str) -> bool:
     Returns:
         True if tool exists, False otherwise
     """
-    patterns = [
-        rf'(?:public|private|protected)\s+.*\s+{re.escape(tool_name)}\s*\(',  # public Type tool_name(
-        rf'static\s+.*\s+{re.escape(tool_name)}\s*\(',  # static Type tool_name(
-        rf'class\s+{re.escape(tool_name)}\s',  # class tool_name
-        rf'interface\s+{re.escape(tool_name)}\s',  # interface tool_name
-    ]
-    
-    for pattern in patterns:
-        if re.search(pattern, source_code):
-            return True
-    
-    return False
+    return tool_name in extract_symbols(source_code, '.java')
 
 
 def inject_tool_into_java_file(
     server_name: str,
     tool_name: str,
-    tool_code: str
+    tool_code: str,
+    validation_tier: str = "full"
 ) -> Tuple[bool, str]:
     """
     Inject a new tool capability into a Java MCP server.
@@ -1352,32 +1508,32 @@ def inject_tool_into_java_file(
         server_name: Name of the server to modify
         tool_name: Name of the tool to inject
         tool_code: Java code for the tool
+        validation_tier: "fast" (parse-only) or "full" validation
         
     Returns:
         Tuple of (success, message)
     """
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
         
-        if check_tool_exists_java(source_code, tool_name):
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_java):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
         
-        is_valid, error_msg = validate_java_code(tool_code)
+        is_valid, error_msg = validate_java_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Java code: {error_msg}"
         
-        combined_code = source_code + "\n\n" + tool_code
-        is_valid, error_msg = validate_java_code(combined_code)
+        is_valid, error_msg = validate_splice(source_path, tool_code, validate_java_code, validation_tier)
         if not is_valid:
             return False, f"Adding tool would break file syntax: {error_msg}"
         
-        backup_path = create_backup(source_path)
-        
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
+            get_validation_watermarks().record(source_path, validation_tier)
         
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
         
@@ -1389,6 +1545,7 @@ def inject_tool_into_java_file(
 # Ruby Language Handlers
 # ============================================================================
 
+@cached_validation("ruby", "ruby")
 def validate_ruby_code(code: str) -> Tuple[bool, str]:
     """
     Validate Ruby code using ruby -c syntax checking.
@@ -1399,6 +1556,11 @@ def validate_ruby_code(code: str) -> Tuple[bool, str]:
     Returns:
         Tuple of (is_valid, error_message)
     """
+    pooled = get_validator_pool().validate("ruby", code)
+    if pooled is not None:
+        is_valid, error_msg = pooled
+        return is_valid, "" if is_valid else f"Ruby syntax error: {error_msg}"
+    
     try:
         with tempfile.NamedTemporaryFile(mode='w', suffix='.rb', delete=False, encoding='utf-8') as f:
             f.write(code)
@@ -1441,24 +1603,14 @@ def check_tool_exists_ruby(source_code: str, tool_name: str) -> bool:
     Returns:
         True if tool exists, False otherwise
     """
-    patterns = [
-        rf'def\s+{re.escape(tool_name)}\s*[\((\n]',  # def tool_name( or def tool_name\n
-        rf'def\s+self\.{re.escape(tool_name)}\s*[\((\n]',  # def self.tool_name(
-        rf'class\s+{re.escape(tool_name)}\s',  # class tool_name
-        rf'module\s+{re.escape(tool_name)}\s',  # module tool_name
-    ]
-    
-    for pattern in patterns:
-        if re.search(pattern, source_code):
-            return True
-    
-    return False
+    return tool_name in extract_symbols(source_code, '.rb')
 
 
 def inject_tool_into_ruby_file(
     server_name: str,
     tool_name: str,
-    tool_code: str
+    tool_code: str,
+    validation_tier: str = "full"
 ) -> Tuple[bool, str]:
     """
     Inject a new tool capability into a Ruby MCP server.
@@ -1467,32 +1619,32 @@ def inject_tool_into_ruby_file(
         server_name: Name of the server to modify
         tool_name: Name of the tool to inject
         tool_code: Ruby code for the tool
+        validation_tier: "fast" (parse-only) or "full" validation
         
     Returns:
         Tuple of (success, message)
     """
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
         
-        if check_tool_exists_ruby(source_code, tool_name):
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_ruby):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
         
-        is_valid, error_msg = validate_ruby_code(tool_code)
+        is_valid, error_msg = validate_ruby_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Ruby code: {error_msg}"
         
-        combined_code = source_code + "\n\n" + tool_code
-        is_valid, error_msg = validate_ruby_code(combined_code)
+        is_valid, error_msg = validate_splice(source_path, tool_code, validate_ruby_code, validation_tier)
         if not is_valid:
             return False, f"Adding tool would break file syntax: {error_msg}"
         
-        backup_path = create_backup(source_path)
-        
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"# Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n# Tool injected by universal-mcp-admin\n" + tool_code + "\n")
+            get_validation_watermarks().record(source_path, validation_tier)
         
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}"
         
@@ -1504,6 +1656,8 @@ def inject_tool_into_ruby_file(
 # Kotlin Language Handlers
 # ============================================================================
 
+@delimiter_gate(".kt", "Kotlin")
+@cached_validation("kotlin", "kotlinc")
 def validate_kotlin_code(code: str) -> Tuple[bool, str]:
     """Validate Kotlin code using kotlinc."""
     try:
@@ -1534,30 +1688,24 @@ def validate_kotlin_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_kotlin(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in Kotlin source code."""
-    patterns = [
-        rf'fun\s+{re.escape(tool_name)}\s*\(',
-        rf'class\s+{re.escape(tool_name)}\s',
-        rf'val\s+{re.escape(tool_name)}\s*[=:]',
-        rf'var\s+{re.escape(tool_name)}\s*[=:]',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.kt')
 
 
-def inject_tool_into_kotlin_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_kotlin_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a Kotlin MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_kotlin(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_kotlin):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_kotlin_code(tool_code)
+        is_valid, error_msg = validate_kotlin_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Kotlin code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -1567,6 +1715,8 @@ def inject_tool_into_kotlin_file(server_name: str, tool_name: str, tool_code: st
 # Swift Language Handlers
 # ============================================================================
 
+@delimiter_gate(".swift", "Swift")
+@cached_validation("swift", "swiftc")
 def validate_swift_code(code: str) -> Tuple[bool, str]:
     """Validate Swift code using swiftc -parse."""
     try:
@@ -1597,31 +1747,24 @@ def validate_swift_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_swift(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in Swift source code."""
-    patterns = [
-        rf'func\s+{re.escape(tool_name)}\s*\(',
-        rf'class\s+{re.escape(tool_name)}\s',
-        rf'struct\s+{re.escape(tool_name)}\s',
-        rf'let\s+{re.escape(tool_name)}\s*[=:]',
-        rf'var\s+{re.escape(tool_name)}\s*[=:]',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.swift')
 
 
-def inject_tool_into_swift_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_swift_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a Swift MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_swift(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_swift):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_swift_code(tool_code)
+        is_valid, error_msg = validate_swift_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Swift code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -1631,6 +1774,8 @@ def inject_tool_into_swift_file(server_name: str, tool_name: str, tool_code: str
 # C# Language Handlers
 # ============================================================================
 
+@delimiter_gate(".cs", "C#")
+@cached_validation("csharp", "dotnet", "csc")
 def validate_csharp_code(code: str) -> Tuple[bool, str]:
     """Validate C# code using dotnet build or csc."""
     try:
@@ -1659,30 +1804,24 @@ def validate_csharp_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_csharp(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in C# source code."""
-    patterns = [
-        rf'(?:public|private|protected|internal)\s+.*\s+{re.escape(tool_name)}\s*\(',
-        rf'static\s+.*\s+{re.escape(tool_name)}\s*\(',
-        rf'class\s+{re.escape(tool_name)}\s',
-        rf'interface\s+{re.escape(tool_name)}\s',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.cs')
 
 
-def inject_tool_into_csharp_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_csharp_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a C# MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_csharp(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_csharp):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_csharp_code(tool_code)
+        is_valid, error_msg = validate_csharp_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid C# code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -1692,6 +1831,8 @@ def inject_tool_into_csharp_file(server_name: str, tool_name: str, tool_code: st
 # PHP Language Handlers
 # ============================================================================
 
+@delimiter_gate(".php", "PHP")
+@cached_validation("php", "php")
 def validate_php_code(code: str) -> Tuple[bool, str]:
     """Validate PHP code using php -l."""
     try:
@@ -1722,28 +1863,24 @@ def validate_php_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_php(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in PHP source code."""
-    patterns = [
-        rf'function\s+{re.escape(tool_name)}\s*\(',
-        rf'class\s+{re.escape(tool_name)}\s',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.php')
 
 
-def inject_tool_into_php_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_php_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a PHP MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_php(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_php):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_php_code(tool_code)
+        is_valid, error_msg = validate_php_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid PHP code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}"
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -1753,6 +1890,7 @@ def inject_tool_into_php_file(server_name: str, tool_name: str, tool_code: str)
 # Lua Language Handlers
 # ============================================================================
 
+@cached_validation("lua", "luac")
 def validate_lua_code(code: str) -> Tuple[bool, str]:
     """Validate Lua code using luac -p."""
     try:
@@ -1783,29 +1921,24 @@ def validate_lua_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_lua(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in Lua source code."""
-    patterns = [
-        rf'function\s+{re.escape(tool_name)}\s*\(',
-        rf'local\s+function\s+{re.escape(tool_name)}\s*\(',
-        rf'{re.escape(tool_name)}\s*=\s*function\s*\(',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.lua')
 
 
-def inject_tool_into_lua_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_lua_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a Lua MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_lua(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_lua):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_lua_code(tool_code)
+        is_valid, error_msg = validate_lua_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Lua code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"-- Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n-- Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}"
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -1815,15 +1948,17 @@ def inject_tool_into_lua_file(server_name: str, tool_name: str, tool_code: str)
 # Scala Language Handlers
 # ============================================================================
 
-def validate_scala_code(code: str) -> Tuple[bool, str]:
-    """Validate Scala code using scalac."""
+@cached_validation("scala", "scalac", fast_binaries=("scalac",))
+def validate_scala_code(code: str, tier: str = "full") -> Tuple[bool, str]:
+    """Validate Scala code using scalac (fast tier: -Ystop-after:parser)."""
     try:
         with tempfile.NamedTemporaryFile(mode='w', suffix='.scala', delete=False, encoding='utf-8') as f:
             f.write(code)
             temp_path = f.name
         try:
+            command = ["scalac", "-Ystop-after:parser", temp_path] if tier == "fast" else ["scalac", temp_path]
             process = subprocess.run(
-                ["scalac", temp_path],
+                command,
                 capture_output=True, text=True, timeout=30
             )
             os.unlink(temp_path)
@@ -1845,30 +1980,24 @@ def validate_scala_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_scala(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in Scala source code."""
-    patterns = [
-        rf'def\s+{re.escape(tool_name)}\s*[\(\[]',
-        rf'class\s+{re.escape(tool_name)}\s',
-        rf'object\s+{re.escape(tool_name)}\s',
-        rf'val\s+{re.escape(tool_name)}\s*[=:]',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.scala')
 
 
-def inject_tool_into_scala_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_scala_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a Scala MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_scala(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_scala):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_scala_code(tool_code)
+        is_valid, error_msg = validate_scala_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Scala code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -1878,15 +2007,25 @@ def inject_tool_into_scala_file(server_name: str, tool_name: str, tool_code: str
 # Elixir Language Handlers
 # ============================================================================
 
-def validate_elixir_code(code: str) -> Tuple[bool, str]:
-    """Validate Elixir code using elixir compiler."""
+@cached_validation("elixir", "elixir", fast_binaries=("elixir",))
+def validate_elixir_code(code: str, tier: str = "full") -> Tuple[bool, str]:
+    """
+    Validate Elixir code using elixir compiler.
+    
+    The full tier compiles (and so runs top-level code); the fast tier only
+    parses with Code.string_to_quoted! and never executes the snippet.
+    """
     try:
         with tempfile.NamedTemporaryFile(mode='w', suffix='.exs', delete=False, encoding='utf-8') as f:
             f.write(code)
             temp_path = f.name
         try:
+            if tier == "fast":
+                expression = f"Code.string_to_quoted!(File.read!(\"{temp_path}\"))"
+            else:
+                expression = f"Code.compile_file(\"{temp_path}\")"
             process = subprocess.run(
-                ["elixir", "-e", f"Code.compile_file(\"{temp_path}\")"],
+                ["elixir", "-e", expression],
                 capture_output=True, text=True, timeout=15
             )
             os.unlink(temp_path)
@@ -1908,30 +2047,24 @@ def validate_elixir_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_elixir(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in Elixir source code."""
-    patterns = [
-        rf'def\s+{re.escape(tool_name)}\s*[\(,]',
-        rf'def\s+{re.escape(tool_name)}\s+do',
-        rf'defp\s+{re.escape(tool_name)}\s*[\(,]',
-        rf'defmodule\s+{re.escape(tool_name)}\s',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.ex')
 
 
-def inject_tool_into_elixir_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_elixir_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into an Elixir MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_elixir(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_elixir):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_elixir_code(tool_code)
+        is_valid, error_msg = validate_elixir_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Elixir code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"# Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n# Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -1941,15 +2074,21 @@ def inject_tool_into_elixir_file(server_name: str, tool_name: str, tool_code: st
 # Dart Language Handlers
 # ============================================================================
 
-def validate_dart_code(code: str) -> Tuple[bool, str]:
-    """Validate Dart code using dart analyze."""
+@delimiter_gate(".dart", "Dart")
+@cached_validation("dart", "dart", fast_binaries=("dart",))
+def validate_dart_code(code: str, tier: str = "full") -> Tuple[bool, str]:
+    """Validate Dart code using dart analyze (fast tier: parse via dart format)."""
     try:
         with tempfile.TemporaryDirectory() as tmpdir:
             tmp_path = Path(tmpdir)
             test_file = tmp_path / "tool.dart"
             test_file.write_text(code, encoding='utf-8')
+            if tier == "fast":
+                command = ["dart", "format", "--output=none", str(test_file)]
+            else:
+                command = ["dart", "analyze", "--no-fatal-infos", str(test_file)]
             process = subprocess.run(
-                ["dart", "analyze", "--no-fatal-infos", str(test_file)],
+                command,
                 capture_output=True, text=True, timeout=15, cwd=tmpdir
             )
             if process.returncode == 0:
@@ -1966,30 +2105,24 @@ def validate_dart_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_dart(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in Dart source code."""
-    patterns = [
-        rf'\w+\s+{re.escape(tool_name)}\s*\(',
-        rf'class\s+{re.escape(tool_name)}\s',
-        rf'var\s+{re.escape(tool_name)}\s*=',
-        rf'final\s+{re.escape(tool_name)}\s*=',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.dart')
 
 
-def inject_tool_into_dart_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_dart_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a Dart MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_dart(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_dart):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_dart_code(tool_code)
+        is_valid, error_msg = validate_dart_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Dart code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -1999,6 +2132,7 @@ def inject_tool_into_dart_file(server_name: str, tool_name: str, tool_code: str)
 # Haskell Language Handlers
 # ============================================================================
 
+@cached_validation("haskell", "ghc")
 def validate_haskell_code(code: str) -> Tuple[bool, str]:
     """Validate Haskell code using ghc -fno-code."""
     try:
@@ -2029,28 +2163,24 @@ def validate_haskell_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_haskell(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in Haskell source code."""
-    patterns = [
-        rf'^{re.escape(tool_name)}\s+::\s+',  # type signature
-        rf'^{re.escape(tool_name)}\s+',  # definition
-    ]
-    return any(re.search(p, source_code, re.MULTILINE) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.hs')
 
 
-def inject_tool_into_haskell_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_haskell_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a Haskell MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_haskell(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_haskell):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_haskell_code(tool_code)
+        is_valid, error_msg = validate_haskell_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Haskell code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"-- Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n-- Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -2060,6 +2190,7 @@ def inject_tool_into_haskell_file(server_name: str, tool_name: str, tool_code: s
 # OCaml Language Handlers
 # ============================================================================
 
+@cached_validation("ocaml", "ocamlc")
 def validate_ocaml_code(code: str) -> Tuple[bool, str]:
     """Validate OCaml code using ocamlfind or ocamlc."""
     try:
@@ -2095,29 +2226,24 @@ def validate_ocaml_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_ocaml(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in OCaml source code."""
-    patterns = [
-        rf'let\s+{re.escape(tool_name)}\s',
-        rf'module\s+{re.escape(tool_name)}\s',
-        rf'val\s+{re.escape(tool_name)}\s*:',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.ml')
 
 
-def inject_tool_into_ocaml_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_ocaml_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into an OCaml MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_ocaml(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_ocaml):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_ocaml_code(tool_code)
+        is_valid, error_msg = validate_ocaml_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid OCaml code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"(* Tool injected by universal-mcp-admin *)\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n(* Tool injected by universal-mcp-admin *)\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -2127,6 +2253,7 @@ def inject_tool_into_ocaml_file(server_name: str, tool_name: str, tool_code: str
 # Nim Language Handlers
 # ============================================================================
 
+@cached_validation("nim", "nim")
 def validate_nim_code(code: str) -> Tuple[bool, str]:
     """Validate Nim code using nim check."""
     try:
@@ -2157,29 +2284,24 @@ def validate_nim_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_nim(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in Nim source code."""
-    patterns = [
-        rf'proc\s+{re.escape(tool_name)}\s*[\(\*]',
-        rf'func\s+{re.escape(tool_name)}\s*[\(\*]',
-        rf'type\s+{re.escape(tool_name)}\s',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.nim')
 
 
-def inject_tool_into_nim_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_nim_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a Nim MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_nim(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_nim):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_nim_code(tool_code)
+        is_valid, error_msg = validate_nim_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Nim code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"# Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n# Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -2189,6 +2311,8 @@ def inject_tool_into_nim_file(server_name: str, tool_name: str, tool_code: str)
 # D Language Handlers
 # ============================================================================
 
+@delimiter_gate(".d", "D")
+@cached_validation("d", "dmd")
 def validate_d_code(code: str) -> Tuple[bool, str]:
     """Validate D code using dmd."""
     try:
@@ -2219,29 +2343,24 @@ def validate_d_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_d(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in D source code."""
-    patterns = [
-        rf'\w+\s+{re.escape(tool_name)}\s*\(',
-        rf'class\s+{re.escape(tool_name)}\s',
-        rf'struct\s+{re.escape(tool_name)}\s',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.d')
 
 
-def inject_tool_into_d_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_d_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a D MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_d(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_d):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_d_code(tool_code)
+        is_valid, error_msg = validate_d_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid D code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"// Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n// Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -2251,6 +2370,7 @@ def inject_tool_into_d_file(server_name: str, tool_name: str, tool_code: str) ->
 # Crystal Language Handlers
 # ============================================================================
 
+@cached_validation("crystal", "crystal")
 def validate_crystal_code(code: str) -> Tuple[bool, str]:
     """Validate Crystal code using crystal tool format --check."""
     try:
@@ -2281,29 +2401,24 @@ def validate_crystal_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_crystal(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in Crystal source code."""
-    patterns = [
-        rf'def\s+{re.escape(tool_name)}\s*[\((\n]',
-        rf'class\s+{re.escape(tool_name)}\s',
-        rf'module\s+{re.escape(tool_name)}\s',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.cr')
 
 
-def inject_tool_into_crystal_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_crystal_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a Crystal MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_crystal(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_crystal):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_crystal_code(tool_code)
+        is_valid, error_msg = validate_crystal_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Crystal code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"# Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n# Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}. Note: Compilation required."
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -2313,6 +2428,7 @@ def inject_tool_into_crystal_file(server_name: str, tool_name: str, tool_code: s
 # Raku Language Handlers
 # ============================================================================
 
+@cached_validation("raku", "raku")
 def validate_raku_code(code: str) -> Tuple[bool, str]:
     """Validate Raku code using raku -c."""
     try:
@@ -2343,30 +2459,24 @@ def validate_raku_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_raku(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in Raku source code."""
-    patterns = [
-        rf'sub\s+{re.escape(tool_name)}\s*[\((\s]',
-        rf'method\s+{re.escape(tool_name)}\s*[\((\s]',
-        rf'class\s+{re.escape(tool_name)}\s',
-        rf'module\s+{re.escape(tool_name)}\s',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.raku')
 
 
-def inject_tool_into_raku_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_raku_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a Raku MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_raku(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_raku):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_raku_code(tool_code)
+        is_valid, error_msg = validate_raku_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Raku code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"# Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n# Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}"
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -2376,15 +2486,29 @@ def inject_tool_into_raku_file(server_name: str, tool_name: str, tool_code: str)
 # Julia Language Handlers
 # ============================================================================
 
-def validate_julia_code(code: str) -> Tuple[bool, str]:
-    """Validate Julia code using julia --startup-file=no."""
+@cached_validation("julia", "julia", fast_binaries=("julia",))
+def validate_julia_code(code: str, tier: str = "full") -> Tuple[bool, str]:
+    """
+    Validate Julia code using julia --startup-file=no.
+    
+    The full tier include()s (and so runs) the file; the fast tier only
+    parses it with Meta.parseall and never executes the snippet.
+    """
     try:
         with tempfile.NamedTemporaryFile(mode='w', suffix='.jl', delete=False, encoding='utf-8') as f:
             f.write(code)
             temp_path = f.name
         try:
+            if tier == "fast":
+                expression = (
+                    f'ex = Meta.parseall(read("{temp_path}", String)); '
+                    'for a in ex.args; if a isa Expr && a.head in (:error, :incomplete); '
+                    'println(stderr, a.args[1]); exit(1); end; end'
+                )
+            else:
+                expression = f'include("{temp_path}")'
             process = subprocess.run(
-                ["julia", "--startup-file=no", "-e", f'include("{temp_path}")'],
+                ["julia", "--startup-file=no", "-e", expression],
                 capture_output=True, text=True, timeout=30
             )
             os.unlink(temp_path)
@@ -2406,30 +2530,24 @@ def validate_julia_code(code: str) -> Tuple[bool, str]:
 
 def check_tool_exists_julia(source_code: str, tool_name: str) -> bool:
     """Check if a tool exists in Julia source code."""
-    patterns = [
-        rf'function\s+{re.escape(tool_name)}\s*[\((\n]',
-        rf'{re.escape(tool_name)}\s*\([^)]*\)\s*=',  # short-form
-        rf'struct\s+{re.escape(tool_name)}\s',
-        rf'module\s+{re.escape(tool_name)}\s',
-    ]
-    return any(re.search(p, source_code) for p in patterns)
+    return tool_name in extract_symbols(source_code, '.jl')
 
 
-def inject_tool_into_julia_file(server_name: str, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+def inject_tool_into_julia_file(server_name: str, tool_name: str, tool_code: str, validation_tier: str = "full") -> Tuple[bool, str]:
     """Inject a new tool into a Julia MCP server."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=100000)
-        if check_tool_exists_julia(source_code, tool_name):
+        source_path = find_server_source_file(server_name)
+        expected = file_version(source_path)
+        if tool_exists_in_file(source_path, tool_name, check_tool_exists_julia):
             return False, f"Tool '{tool_name}' already exists in {source_path}"
-        is_valid, error_msg = validate_julia_code(tool_code)
+        is_valid, error_msg = validate_julia_code(tool_code, tier=validation_tier)
         if not is_valid:
             return False, f"Invalid Julia code: {error_msg}"
-        backup_path = create_backup(source_path)
-        with open(source_path, "a", encoding="utf-8") as f:
-            f.write("\n\n")
-            f.write(f"# Tool injected by universal-mcp-admin\n")
-            f.write(tool_code)
-            f.write("\n")
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "inject_tool", server_name, tool_name)
+            atomic_append_text(source_path, "\n\n# Tool injected by universal-mcp-admin\n" + tool_code + "\n")
         return True, f"Tool '{tool_name}' injected successfully. Backup created at {backup_path}"
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
@@ -2673,6 +2791,7 @@ def inject_tool_generic(
     tool_name: str,
     tool_code: str,
     auto_import: bool = False,
+    validation_tier: str = "full",
 ) -> Tuple[bool, str]:
     """
     Generic tool injection that routes to language-specific handlers.
@@ -2683,6 +2802,8 @@ def inject_tool_generic(
         tool_name: Name of the tool to inject
         tool_code: Code for the tool
         auto_import: If True, automatically inject missing imports
+        validation_tier: "fast" uses parse-only front ends where available
+            (never executes Elixir/Julia code); "full" keeps the full checks
         
     Returns:
         Tuple of (success, message)
@@ -2699,41 +2820,160 @@ def inject_tool_generic(
         if auto_import:
             try:
                 from import_manager import check_missing_imports, inject_imports
-                source_code, _ = read_source_file(server_name, max_chars=200000)
-                missing = check_missing_imports(source_code, tool_code, extension)
+                with get_lock_manager().lock(source_path):
+                    source_code = source_path.read_text(encoding='utf-8')
+                    missing = check_missing_imports(source_code, tool_code, extension)
+                    if missing:
+                        new_source = inject_imports(source_code, missing, extension)
+                        backup_path = create_backup(source_path)
+                        _register_backup(source_path, backup_path, "add_imports", server_name, tool_name)
+                        atomic_write_text(source_path, new_source)
                 if missing:
-                    new_source = inject_imports(source_code, missing, extension)
-                    with open(source_path, 'w', encoding='utf-8') as f:
-                        f.write(new_source)
                     import_message = f" Auto-injected imports: {', '.join(missing)}."
             except Exception as e:
                 import_message = f" Import auto-injection failed: {e}."
         
         handler = LANGUAGE_HANDLERS[extension]
-        success, message = handler['inject'](server_name, tool_name, tool_code)
-        
-        # Register backup with BackupManager
-        if success:
-            try:
-                from backup_manager import get_backup_manager
-                bm = get_backup_manager()
-                backup_path = source_path.with_suffix(source_path.suffix + ".bak")
-                if backup_path.exists():
-                    bm.register_backup(
-                        file_path=str(source_path),
-                        backup_path=str(backup_path),
-                        operation="inject_tool",
-                        server_name=server_name,
-                        tool_name=tool_name,
-                    )
-            except Exception:
-                pass
+        success, message = handler['inject'](server_name, tool_name, tool_code, validation_tier=validation_tier)
         
         return success, message + import_message
     except Exception as e:
         return False, f"Failed to inject tool: {str(e)}"
 
 
+# Validators whose injectors check the combined file (via validate_splice),
+# not just the snippet
+_SPLICE_VALIDATED = {
+    validate_python_code, validate_javascript_code, validate_rust_code,
+    validate_c_code, validate_cpp_code, validate_go_code, validate_typescript_code,
+    validate_zig_code, validate_java_code, validate_ruby_code,
+}
+
+
+def _injection_marker(comment_prefix: str) -> str:
+    """Comment line the injectors write above each injected tool."""
+    closers = {'/*': ' */', '(*': ' *)'}
+    return f"{comment_prefix} Tool injected by universal-mcp-admin{closers.get(comment_prefix, '')}"
+
+
+def inject_tools_batch(
+    server_name: str,
+    tools: List[Any],
+    auto_import: bool = False,
+    validation_tier: str = "full",
+) -> Tuple[bool, str]:
+    """
+    Inject several tools into one server with a single read, validation,
+    backup and write.
+    
+    Either every tool is injected or none is: duplicates (against the file
+    and within the batch) and invalid snippets reject the whole batch before
+    the file is touched. The combined file is validated once, the new content
+    is written atomically, and one backup entry covers the batch.
+    
+    Args:
+        server_name: Name of the server to modify
+        tools: List of {"tool_name": ..., "tool_code": ...} dicts or
+            (tool_name, tool_code) pairs, injected in order
+        auto_import: If True, add imports missing for any of the tools
+        validation_tier: "fast" (parse-only) or "full" validation
+        
+    Returns:
+        Tuple of (success, message)
+    """
+    try:
+        if not tools:
+            return False, "No tools given"
+        
+        batch: List[Tuple[str, str]] = []
+        for item in tools:
+            if isinstance(item, dict):
+                tool_name, tool_code = item.get("tool_name"), item.get("tool_code", item.get("code"))
+            else:
+                tool_name, tool_code = item
+            if not tool_name or not tool_code:
+                return False, f"Each tool needs a tool_name and tool_code: {item!r}"
+            batch.append((str(tool_name), str(tool_code)))
+        
+        source_path = find_server_source_file(server_name)
+        extension = source_path.suffix
+        if extension not in LANGUAGE_HANDLERS:
+            return False, f"Unsupported language: {extension}. Supported: {', '.join(LANGUAGE_HANDLERS.keys())}"
+        data, expected = read_versioned(source_path)
+        source_code = data.decode('utf-8')
+        handler = LANGUAGE_HANDLERS[extension]
+        check_exists = handler['check_tool_exists']
+        validate = handler['validate']
+        
+        # Duplicates: against the file, repeated names, and earlier snippets
+        errors = []
+        seen = set()
+        for index, (tool_name, _) in enumerate(batch):
+            if tool_name in seen:
+                errors.append(f"'{tool_name}' appears more than once in the batch")
+            elif tool_exists_in_file(source_path, tool_name, check_exists):
+                errors.append(f"'{tool_name}' already exists in {source_path}")
+            elif any(check_exists(code, tool_name) for _, code in batch[:index]):
+                errors.append(f"'{tool_name}' is already defined by an earlier tool in the batch")
+            seen.add(tool_name)
+        if errors:
+            return False, "Batch rejected, no tools injected. " + "; ".join(errors)
+        
+        for tool_name, tool_code in batch:
+            is_valid, error_msg = validate(tool_code, tier=validation_tier)
+            if not is_valid:
+                errors.append(f"'{tool_name}': {error_msg}")
+        if errors:
+            return False, "Batch rejected, no tools injected. Invalid code: " + "; ".join(errors)
+        
+        marker = _injection_marker(handler['comment_prefix'])
+        appended = "".join(f"\n\n{marker}\n{tool_code}\n" for _, tool_code in batch)
+        
+        import_message = ""
+        new_prefix = source_code
+        imports_added = False
+        if auto_import:
+            try:
+                from import_manager import check_missing_imports, inject_imports
+                combined_code = "\n\n".join(tool_code for _, tool_code in batch)
+                missing = check_missing_imports(source_code, combined_code, extension)
+                if missing:
+                    new_prefix = inject_imports(source_code, missing, extension)
+                    imports_added = True
+                    import_message = f" Auto-injected imports: {', '.join(missing)}."
+            except Exception as e:
+                import_message = f" Import auto-injection failed: {e}."
+        
+        if validate in _SPLICE_VALIDATED:
+            if not imports_added:
+                # appended[2:] drops the blank line validate_splice adds back
+                is_valid, error_msg = validate_splice(
+                    source_path, appended[2:], validate, validation_tier, source_code=source_code
+                )
+            else:
+                is_valid, error_msg = validate(new_prefix + appended, tier=validation_tier)
+            if not is_valid:
+                return False, f"Batch rejected, no tools injected. Adding the tools would break file syntax: {error_msg}"
+        
+        names = [tool_name for tool_name, _ in batch]
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(
+                source_path, backup_path, "inject_tools_batch", server_name,
+                ", ".join(names), metadata={"tools": names},
+            )
+            atomic_write_text(source_path, new_prefix + appended)
+            get_validation_watermarks().record(source_path, validation_tier)
+        
+        message = f"Injected {len(names)} tools ({', '.join(names)}). Backup created at {backup_path}."
+        if handler['needs_compilation']:
+            message += " Note: Compilation required."
+        return True, message + import_message
+    except Exception as e:
+        return False, f"Failed to inject tools: {str(e)}"
+
+
 # ============================================================================
 # Tool Removal and Modification
 # ============================================================================
@@ -2745,308 +2985,39 @@ def find_tool_in_source(
     Locate a tool definition in source code.
     Returns (start_line, end_line, full_definition) or None if not found.
     Lines are 0-indexed.
-    """
-    lines = source_code.splitlines()
-
-    if language == '.py':
-        return _find_python_tool(lines, tool_name)
-    elif language in ('.js', '.ts'):
-        return _find_js_tool(lines, tool_name)
-    elif language == '.rs':
-        return _find_brace_tool(lines, tool_name, r'(?:pub\s+)?(?:async\s+)?fn\s+' + re.escape(tool_name) + r'\s*\(')
-    elif language in ('.c', '.cpp', '.cc', '.cxx'):
-        return _find_brace_tool(lines, tool_name, r'(?:\w+\s+)+' + re.escape(tool_name) + r'\s*\(')
-    elif language == '.go':
-        return _find_brace_tool(lines, tool_name, r'func\s+(?:\([^)]*\)\s+)?' + re.escape(tool_name) + r'\s*\(')
-    elif language == '.zig':
-        return _find_brace_tool(lines, tool_name, r'(?:pub\s+)?fn\s+' + re.escape(tool_name) + r'\s*\(')
-    elif language == '.java':
-        return _find_brace_tool(lines, tool_name, r'(?:(?:public|private|protected)\s+)?(?:static\s+)?(?:\w+\s+)' + re.escape(tool_name) + r'\s*\(')
-    elif language == '.rb':
-        return _find_ruby_tool(lines, tool_name)
-    elif language in ('.kt', '.kts'):
-        return _find_brace_tool(lines, tool_name, r'fun\s+' + re.escape(tool_name) + r'\s*\(')
-    elif language == '.swift':
-        return _find_brace_tool(lines, tool_name, r'func\s+' + re.escape(tool_name) + r'\s*\(')
-    elif language == '.cs':
-        return _find_brace_tool(lines, tool_name, r'(?:(?:public|private|protected|internal)\s+)?(?:static\s+)?(?:\w+\s+)' + re.escape(tool_name) + r'\s*\(')
-    elif language == '.php':
-        return _find_brace_tool(lines, tool_name, r'function\s+' + re.escape(tool_name) + r'\s*\(')
-    elif language == '.lua':
-        return _find_lua_tool(lines, tool_name)
-    elif language == '.scala':
-        return _find_brace_tool(lines, tool_name, r'def\s+' + re.escape(tool_name) + r'\s*[\(\[]')
-    elif language in ('.ex', '.exs'):
-        return _find_elixir_tool(lines, tool_name)
-    elif language == '.dart':
-        return _find_brace_tool(lines, tool_name, r'\w+\s+' + re.escape(tool_name) + r'\s*\(')
-    elif language == '.hs':
-        return _find_haskell_tool(lines, tool_name)
-    elif language in ('.ml', '.mli'):
-        return _find_ocaml_tool(lines, tool_name)
-    elif language == '.nim':
-        return _find_nim_tool(lines, tool_name)
-    elif language == '.d':
-        return _find_brace_tool(lines, tool_name, r'\w+\s+' + re.escape(tool_name) + r'\s*\(')
-    elif language == '.cr':
-        return _find_ruby_tool(lines, tool_name)  # Crystal uses same def/end syntax
-    elif language in ('.raku', '.rakumod', '.pm6'):
-        return _find_brace_tool(lines, tool_name, r'(?:sub|method)\s+' + re.escape(tool_name) + r'\s*[\(\s]')
-    elif language == '.jl':
-        return _find_julia_tool(lines, tool_name)
-    return None
 
-
-def _find_python_tool(lines: list, tool_name: str) -> Optional[Tuple[int, int, str]]:
-    """Find a Python function definition, including decorators."""
-    func_pattern = re.compile(rf'def\s+{re.escape(tool_name)}\s*\(')
-    for i, line in enumerate(lines):
-        if func_pattern.search(line):
-            # Walk backwards for decorators
-            start = i
-            while start > 0 and lines[start - 1].strip().startswith('@'):
-                start -= 1
-            # Also capture preceding comment block
-            while start > 0 and lines[start - 1].strip().startswith('#'):
-                start -= 1
-
-            # Walk forward to find the end of the function
-            indent = len(line) - len(line.lstrip())
-            end = i + 1
-            while end < len(lines):
-                l = lines[end]
-                if l.strip() == '':
-                    end += 1
-                    continue
-                current_indent = len(l) - len(l.lstrip())
-                if current_indent <= indent and l.strip():
-                    break
-                end += 1
-            # Trim trailing blank lines
-            while end > i + 1 and not lines[end - 1].strip():
-                end -= 1
-            return start, end, '\n'.join(lines[start:end])
-    return None
-
-
-def _find_js_tool(lines: list, tool_name: str) -> Optional[Tuple[int, int, str]]:
-    """Find a JavaScript/TypeScript function or tool definition."""
-    patterns = [
-        re.compile(rf'(?:export\s+)?(?:async\s+)?function\s+{re.escape(tool_name)}\s*\('),
-        re.compile(rf'(?:const|let|var)\s+{re.escape(tool_name)}\s*='),
-    ]
-    for pat in patterns:
-        for i, line in enumerate(lines):
-            if pat.search(line):
-                start = i
-                # Check for preceding comments
-                while start > 0 and (lines[start - 1].strip().startswith('//') or lines[start - 1].strip().startswith('/*')):
-                    start -= 1
-                # Find matching brace end
-                end = _find_brace_end(lines, i)
-                return start, end, '\n'.join(lines[start:end])
-    return None
-
-
-def _find_brace_tool(lines: list, tool_name: str, pattern_str: str) -> Optional[Tuple[int, int, str]]:
-    """Find a brace-delimited function definition (Rust, C, C++, Go)."""
-    pat = re.compile(pattern_str)
-    for i, line in enumerate(lines):
-        if pat.search(line):
-            start = i
-            # Check for preceding comments/attributes
-            while start > 0:
-                prev = lines[start - 1].strip()
-                if prev.startswith('//') or prev.startswith('#[') or prev.startswith('/*') or prev.startswith('///'):
-                    start -= 1
-                else:
-                    break
-            end = _find_brace_end(lines, i)
-            return start, end, '\n'.join(lines[start:end])
-    return None
-
-
-def _find_ruby_tool(lines: list, tool_name: str) -> Optional[Tuple[int, int, str]]:
-    """Find a Ruby method definition (uses def/end blocks)."""
-    func_pattern = re.compile(rf'def\s+(?:self\.)?{re.escape(tool_name)}\s*[\((\n]')
-    for i, line in enumerate(lines):
-        if func_pattern.search(line):
-            start = i
-            # Walk backwards for preceding comments
-            while start > 0 and lines[start - 1].strip().startswith('#'):
-                start -= 1
-
-            # Walk forward to find matching 'end'
-            indent = len(line) - len(line.lstrip())
-            end = i + 1
-            while end < len(lines):
-                l = lines[end]
-                stripped = l.strip()
-                if stripped == 'end':
-                    current_indent = len(l) - len(l.lstrip())
-                    if current_indent <= indent:
-                        end += 1  # Include the 'end' line
-                        break
-                end += 1
-            return start, end, '\n'.join(lines[start:end])
-    return None
-
-
-def _find_lua_tool(lines: list, tool_name: str) -> Optional[Tuple[int, int, str]]:
-    """Find a Lua function definition (uses function/end blocks)."""
-    patterns = [
-        re.compile(rf'function\s+{re.escape(tool_name)}\s*\('),
-        re.compile(rf'local\s+function\s+{re.escape(tool_name)}\s*\('),
-    ]
-    for pat in patterns:
-        for i, line in enumerate(lines):
-            if pat.search(line):
-                start = i
-                while start > 0 and lines[start - 1].strip().startswith('--'):
-                    start -= 1
-                end = i + 1
-                depth = 1
-                while end < len(lines) and depth > 0:
-                    stripped = lines[end].strip()
-                    # Count block openers/closers
-                    for keyword in ['function', 'if', 'for', 'while', 'repeat']:
-                        if re.match(rf'\b{keyword}\b', stripped):
-                            depth += 1
-                    if stripped == 'end' or stripped.startswith('end ') or stripped.startswith('end)'):
-                        depth -= 1
-                    end += 1
-                return start, end, '\n'.join(lines[start:end])
-    return None
-
-
-def _find_elixir_tool(lines: list, tool_name: str) -> Optional[Tuple[int, int, str]]:
-    """Find an Elixir function definition (uses def/end blocks)."""
-    func_pattern = re.compile(rf'def[p]?\s+{re.escape(tool_name)}\s*[\(,\s]')
-    for i, line in enumerate(lines):
-        if func_pattern.search(line):
-            start = i
-            while start > 0 and lines[start - 1].strip().startswith('#'):
-                start -= 1
-            while start > 0 and lines[start - 1].strip().startswith('@'):
-                start -= 1
-            end = i + 1
-            depth = 1
-            while end < len(lines) and depth > 0:
-                stripped = lines[end].strip()
-                for keyword in ['def ', 'defp ', 'defmodule ', 'if ', 'case ', 'cond ', 'fn ']:
-                    if stripped.startswith(keyword):
-                        depth += 1
-                        break
-                if stripped == 'end' or stripped.startswith('end)'):
-                    depth -= 1
-                end += 1
-            return start, end, '\n'.join(lines[start:end])
-    return None
-
-
-def _find_haskell_tool(lines: list, tool_name: str) -> Optional[Tuple[int, int, str]]:
-    """Find a Haskell function definition."""
-    sig_pattern = re.compile(rf'^{re.escape(tool_name)}\s+::')
-    def_pattern = re.compile(rf'^{re.escape(tool_name)}\s+')
-    for i, line in enumerate(lines):
-        if sig_pattern.match(line) or def_pattern.match(line):
-            start = i
-            while start > 0 and lines[start - 1].strip().startswith('--'):
-                start -= 1
-            end = i + 1
-            while end < len(lines):
-                l = lines[end]
-                if l.strip() == '' or (l[0:1] != ' ' and l[0:1] != '\t' and not l.startswith(tool_name)):
-                    break
-                end += 1
-            while end > i + 1 and not lines[end - 1].strip():
-                end -= 1
-            return start, end, '\n'.join(lines[start:end])
-    return None
-
-
-def _find_ocaml_tool(lines: list, tool_name: str) -> Optional[Tuple[int, int, str]]:
-    """Find an OCaml let binding."""
-    let_pattern = re.compile(rf'let\s+{re.escape(tool_name)}\s')
-    for i, line in enumerate(lines):
-        if let_pattern.search(line):
-            start = i
-            while start > 0 and lines[start - 1].strip().startswith('(*'):
-                start -= 1
-            end = i + 1
-            while end < len(lines):
-                l = lines[end].strip()
-                if l == '' or (l.startswith('let ') and not l.startswith('let ' + tool_name)):
-                    break
-                end += 1
-            while end > i + 1 and not lines[end - 1].strip():
-                end -= 1
-            return start, end, '\n'.join(lines[start:end])
-    return None
-
-
-def _find_nim_tool(lines: list, tool_name: str) -> Optional[Tuple[int, int, str]]:
-    """Find a Nim proc/func definition (indentation-based)."""
-    proc_pattern = re.compile(rf'(?:proc|func)\s+{re.escape(tool_name)}\s*[\(\*]')
-    for i, line in enumerate(lines):
-        if proc_pattern.search(line):
-            start = i
-            while start > 0 and lines[start - 1].strip().startswith('#'):
-                start -= 1
-            indent = len(line) - len(line.lstrip())
-            end = i + 1
-            while end < len(lines):
-                l = lines[end]
-                if l.strip() == '':
-                    end += 1
-                    continue
-                current_indent = len(l) - len(l.lstrip())
-                if current_indent <= indent and l.strip():
-                    break
-                end += 1
-            while end > i + 1 and not lines[end - 1].strip():
-                end -= 1
-            return start, end, '\n'.join(lines[start:end])
-    return None
+    Looks the name up in the source's cached span index (tool_spans.py), so
+    repeated lookups in the same text do not re-scan it.
+    """
+    return get_tool_spans(source_code, language).find(tool_name)
 
 
-def _find_julia_tool(lines: list, tool_name: str) -> Optional[Tuple[int, int, str]]:
-    """Find a Julia function definition (uses function/end blocks)."""
-    func_pattern = re.compile(rf'function\s+{re.escape(tool_name)}\s*[\((\n]')
-    for i, line in enumerate(lines):
-        if func_pattern.search(line):
-            start = i
-            while start > 0 and lines[start - 1].strip().startswith('#'):
-                start -= 1
-            end = i + 1
-            depth = 1
-            while end < len(lines) and depth > 0:
-                stripped = lines[end].strip()
-                for keyword in ['function ', 'if ', 'for ', 'while ', 'begin', 'let ', 'try']:
-                    if stripped.startswith(keyword):
-                        depth += 1
-                        break
-                if stripped == 'end' or stripped.startswith('end ') or stripped.startswith('end#'):
-                    depth -= 1
-                end += 1
-            return start, end, '\n'.join(lines[start:end])
-    return None
+def _join_lines(lines: List[str], like: str) -> str:
+    """Join lines with newlines, keeping a final newline if the original text had one."""
+    text = '\n'.join(lines)
+    if lines and like.endswith(('\n', '\r')):
+        text += '\n'
+    return text
 
 
-def _find_brace_end(lines: list, start_line: int) -> int:
-    """Find the end of a brace-delimited block starting from start_line."""
-    depth = 0
-    found_open = False
-    for i in range(start_line, len(lines)):
-        for ch in lines[i]:
-            if ch == '{':
-                depth += 1
-                found_open = True
-            elif ch == '}':
-                depth -= 1
-                if found_open and depth == 0:
-                    return i + 1
-    return len(lines)
+def _removal_cut(lines: List[str], start: int, end: int) -> Tuple[int, int]:
+    """
+    Lines to delete when removing lines[start:end]: the span widened so that
+    at most two blank lines remain where the cut closes up.
+    """
+    cut_start, cut_end = start, end
+    blank_before = 0
+    while cut_start - blank_before > 0 and lines[cut_start - blank_before - 1] == '':
+        blank_before += 1
+    blank_after = 0
+    while cut_end + blank_after < len(lines) and lines[cut_end + blank_after] == '':
+        blank_after += 1
+    excess = blank_before + blank_after - 2
+    if excess > 0:
+        trimmed_after = min(excess, blank_after)
+        cut_end += trimmed_after
+        cut_start -= excess - trimmed_after
+    return cut_start, cut_end
 
 
 def remove_tool_from_source(
@@ -3056,18 +3027,15 @@ def remove_tool_from_source(
     Remove a tool definition from source code.
     Returns (success, message, modified_source).
     """
-    result = find_tool_in_source(source_code, tool_name, language)
-    if result is None:
+    index = get_tool_spans(source_code, language)
+    found = index.find(tool_name)
+    if found is None:
         return False, f"Tool '{tool_name}' not found in source", source_code
 
-    start, end, _ = result
-    lines = source_code.splitlines()
-    new_lines = lines[:start] + lines[end:]
-
-    # Clean up extra blank lines
-    modified = '\n'.join(new_lines)
-    while '\n\n\n\n' in modified:
-        modified = modified.replace('\n\n\n\n', '\n\n\n')
+    start, end, _ = found
+    lines = index.lines
+    cut_start, cut_end = _removal_cut(lines, start, end)
+    modified = _join_lines(lines[:cut_start] + lines[cut_end:], source_code)
 
     # Validate
     if language == '.py':
@@ -3075,6 +3043,7 @@ def remove_tool_from_source(
         if not is_valid:
             return False, f"Removing tool would break syntax: {err}", source_code
 
+    cache_tool_spans(index.edited(cut_start, cut_end, [], modified))
     return True, f"Tool '{tool_name}' removed (lines {start+1}-{end})", modified
 
 
@@ -3085,14 +3054,15 @@ def replace_tool_in_source(
     Replace a tool definition with new code.
     Returns (success, message, modified_source).
     """
-    result = find_tool_in_source(source_code, tool_name, language)
-    if result is None:
+    index = get_tool_spans(source_code, language)
+    found = index.find(tool_name)
+    if found is None:
         return False, f"Tool '{tool_name}' not found in source", source_code
 
-    start, end, _ = result
-    lines = source_code.splitlines()
-    new_lines = lines[:start] + new_code.splitlines() + lines[end:]
-    modified = '\n'.join(new_lines)
+    start, end, _ = found
+    lines = index.lines
+    new_code_lines = new_code.splitlines()
+    modified = _join_lines(lines[:start] + new_code_lines + lines[end:], source_code)
 
     # Validate
     if language == '.py':
@@ -3100,15 +3070,17 @@ def replace_tool_in_source(
         if not is_valid:
             return False, f"Replacement would break syntax: {err}", source_code
 
+    cache_tool_spans(index.edited(start, end, new_code_lines, modified))
     return True, f"Tool '{tool_name}' replaced (lines {start+1}-{end})", modified
 
 
 def remove_tool(server_name: str, tool_name: str) -> Tuple[bool, str]:
     """Remove a tool from a server's source file."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=200000)
+        source_path = find_server_source_file(server_name)
+        data, expected = read_versioned(source_path)
+        source_code = data.decode('utf-8')
         extension = source_path.suffix
-        backup_path = create_backup(source_path)
 
         success, message, modified = remove_tool_from_source(
             source_code, tool_name, extension
@@ -3116,18 +3088,11 @@ def remove_tool(server_name: str, tool_name: str) -> Tuple[bool, str]:
         if not success:
             return False, message
 
-        with open(source_path, 'w', encoding='utf-8') as f:
-            f.write(modified)
-
-        # Register backup
-        try:
-            from backup_manager import get_backup_manager
-            get_backup_manager().register_backup(
-                str(source_path), str(backup_path),
-                "remove_tool", server_name, tool_name,
-            )
-        except Exception:
-            pass
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "remove_tool", server_name, tool_name)
+            atomic_write_text(source_path, modified)
 
         return True, f"{message}. Backup at {backup_path}"
     except Exception as e:
@@ -3137,9 +3102,10 @@ def remove_tool(server_name: str, tool_name: str) -> Tuple[bool, str]:
 def replace_tool(server_name: str, tool_name: str, new_code: str) -> Tuple[bool, str]:
     """Replace a tool in a server's source file."""
     try:
-        source_code, source_path = read_source_file(server_name, max_chars=200000)
+        source_path = find_server_source_file(server_name)
+        data, expected = read_versioned(source_path)
+        source_code = data.decode('utf-8')
         extension = source_path.suffix
-        backup_path = create_backup(source_path)
 
         success, message, modified = replace_tool_in_source(
             source_code, tool_name, new_code, extension
@@ -3147,18 +3113,239 @@ def replace_tool(server_name: str, tool_name: str, new_code: str) -> Tuple[bool,
         if not success:
             return False, message
 
-        with open(source_path, 'w', encoding='utf-8') as f:
-            f.write(modified)
+        with get_lock_manager().lock(source_path):
+            check_unchanged(source_path, expected)
+            backup_path = create_backup(source_path)
+            _register_backup(source_path, backup_path, "replace_tool", server_name, tool_name)
+            atomic_write_text(source_path, modified)
+
+        return True, f"{message}. Backup at {backup_path}"
+    except Exception as e:
+        return False, f"Failed to replace tool: {e}"
+
 
+# ============================================================================
+# Edit Sessions
+# ============================================================================
+
+class EditSession:
+    """
+    Queue inject/remove/replace/import operations against one server's
+    source and apply them with one validation, one backup and one write.
+
+    The file is read once when the session opens. Operations edit a line
+    piece table over that text, so each costs the size of the code it adds
+    rather than the size of the file; tools are located through the original
+    text's span index. ``commit`` renders the final text once, validates it
+    and writes it atomically if the file has not changed since it was read.
+    """
+
+    def __init__(self, server_name: str, auto_import: bool = False, validation_tier: str = "full"):
+        self.server_name = server_name
+        self.auto_import = auto_import
+        self.validation_tier = validation_tier
+        self.source_path = find_server_source_file(server_name)
+        self.language = self.source_path.suffix
+        if self.language not in LANGUAGE_HANDLERS:
+            raise ValueError(
+                f"Unsupported language: {self.language}. Supported: {', '.join(LANGUAGE_HANDLERS.keys())}"
+            )
+        self._handler = LANGUAGE_HANDLERS[self.language]
+        data, self._expected = read_versioned(self.source_path)
+        self.source_code = data.decode('utf-8')
+        self._index = get_tool_spans(self.source_code, self.language)
+        self._table = PieceTable(self._index.lines)
+        # Tools whose current code was added in this session:
+        # name -> (piece, lines above the code, original span it replaced or None)
+        self._session_tools: Dict[str, Tuple[Piece, List[str], Optional[Tuple[int, int]]]] = {}
+        self._snippets: Dict[str, str] = {}
+        # Original definitions that were removed or replaced
+        self._gone: set = set()
+        self._imports: List[str] = []
+        self._appended = False
+        self.operations: List[str] = []
+        self.committed = False
+
+    def inject(self, tool_name: str, tool_code: str) -> Tuple[bool, str]:
+        """Queue a new tool, appended after the existing code like inject_tool."""
+        if tool_name in self._session_tools:
+            return False, f"Tool '{tool_name}' is already defined in this session"
+        if tool_name not in self._gone and self._handler['check_tool_exists'](self.source_code, tool_name):
+            return False, f"Tool '{tool_name}' already exists in {self.source_path}"
+        prefix = ['', _injection_marker(self._handler['comment_prefix'])]
+        piece = self._table.append(prefix + tool_code.splitlines())
+        self._session_tools[tool_name] = (piece, prefix, None)
+        self._snippets[tool_name] = tool_code
+        self._appended = True
+        self.operations.append(f"inject {tool_name}")
+        return True, f"Queued injection of '{tool_name}'"
+
+    def remove(self, tool_name: str) -> Tuple[bool, str]:
+        """Queue the removal of a tool (from the file or added in this session)."""
+        if tool_name in self._session_tools:
+            piece, _, span = self._session_tools.pop(tool_name)
+            self._snippets.pop(tool_name, None)
+            if span is None:
+                self._table.replace_piece(piece, [])
+            else:
+                # Replaced earlier in this session: drop the replacement and
+                # close up the blank lines around the original span
+                self._table.remove_piece(piece)
+                start, end = span
+                cut_start, cut_end = _removal_cut(self._index.lines, start, end)
+                for first, last in ((cut_start, start), (end, cut_end)):
+                    if first < last:
+                        try:
+                            self._table.replace_original(first, last, [])
+                        except ValueError:
+                            pass  # Already cut by an earlier removal
+            self.operations.append(f"remove {tool_name}")
+            return True, f"Queued removal of '{tool_name}'"
+        found = None if tool_name in self._gone else self._index.find(tool_name)
+        if found is None:
+            return False, f"Tool '{tool_name}' not found in source"
+        start, end, _ = found
+        cut_start, cut_end = _removal_cut(self._index.lines, start, end)
         try:
-            from backup_manager import get_backup_manager
-            get_backup_manager().register_backup(
-                str(source_path), str(backup_path),
-                "replace_tool", server_name, tool_name,
+            self._table.replace_original(cut_start, cut_end, [])
+        except ValueError as e:
+            return False, f"Cannot remove '{tool_name}': {e}"
+        self._gone.add(tool_name)
+        self.operations.append(f"remove {tool_name}")
+        return True, f"Queued removal of '{tool_name}' (lines {start+1}-{end})"
+
+    def replace(self, tool_name: str, new_code: str) -> Tuple[bool, str]:
+        """Queue replacing a tool's definition with new_code."""
+        new_lines = new_code.splitlines()
+        if tool_name in self._session_tools:
+            piece, prefix, _ = self._session_tools[tool_name]
+            self._table.replace_piece(piece, prefix + new_lines)
+            self._snippets[tool_name] = new_code
+            self.operations.append(f"replace {tool_name}")
+            return True, f"Queued replacement of '{tool_name}'"
+        found = None if tool_name in self._gone else self._index.find(tool_name)
+        if found is None:
+            return False, f"Tool '{tool_name}' not found in source"
+        start, end, _ = found
+        try:
+            piece = self._table.replace_original(start, end, new_lines)
+        except ValueError as e:
+            return False, f"Cannot replace '{tool_name}': {e}"
+        self._gone.add(tool_name)
+        self._session_tools[tool_name] = (piece, [], (start, end))
+        self._snippets[tool_name] = new_code
+        self.operations.append(f"replace {tool_name}")
+        return True, f"Queued replacement of '{tool_name}' (lines {start+1}-{end})"
+
+    def add_imports(self, imports: List[str]) -> Tuple[bool, str]:
+        """Queue import statements; ones the file already has are skipped at commit."""
+        self._imports.extend(imports)
+        self.operations.append(f"imports {', '.join(imports)}")
+        return True, f"Queued {len(imports)} imports"
+
+    def render(self) -> Tuple[str, List[str]]:
+        """The final text and the imports it gained, without writing anything."""
+        like = '\n' if self._appended else self.source_code
+        text = _join_lines(self._table.lines(), like)
+        if not self._imports and not self.auto_import:
+            return text, []
+        from import_manager import extract_imports, inject_imports
+        wanted = list(self._imports)
+        if self.auto_import:
+            for code in self._snippets.values():
+                wanted.extend(extract_imports(code, self.language))
+        present = set(extract_imports(text, self.language))
+        missing = [imp for imp in dict.fromkeys(wanted) if imp not in present]
+        if missing:
+            text = inject_imports(text, missing, self.language)
+        return text, missing
+
+    def commit(self) -> Tuple[bool, str]:
+        """Validate the final text once and write it with a single backup."""
+        if self.committed:
+            return False, "Edit session already committed"
+        if not self.operations:
+            return False, "No operations queued"
+        text, imports_added = self.render()
+
+        validate = self._handler['validate']
+        if validate in _SPLICE_VALIDATED:
+            is_valid, error_msg = validate(text, tier=self.validation_tier)
+            if not is_valid:
+                return False, f"Edit session rejected, file left unchanged. The edited file would break syntax: {error_msg}"
+        else:
+            # The whole file is not checked for these languages; check the new code
+            errors = []
+            for tool_name, code in self._snippets.items():
+                is_valid, error_msg = validate(code, tier=self.validation_tier)
+                if not is_valid:
+                    errors.append(f"'{tool_name}': {error_msg}")
+            if errors:
+                return False, "Edit session rejected, file left unchanged. Invalid code: " + "; ".join(errors)
+
+        touched = list(dict.fromkeys(op.split(' ', 1)[1] for op in self.operations if not op.startswith('imports ')))
+        with get_lock_manager().lock(self.source_path):
+            check_unchanged(self.source_path, self._expected)
+            backup_path = create_backup(self.source_path)
+            _register_backup(
+                self.source_path, backup_path, "edit_session", self.server_name,
+                ", ".join(touched), metadata={"operations": list(self.operations)},
             )
-        except Exception:
-            pass
+            atomic_write_text(self.source_path, text)
+            if validate in _SPLICE_VALIDATED:
+                get_validation_watermarks().record(self.source_path, self.validation_tier)
+        self.committed = True
 
-        return True, f"{message}. Backup at {backup_path}"
+        message = f"Applied {len(self.operations)} operations in one write. Backup created at {backup_path}."
+        if imports_added:
+            message += f" Added imports: {', '.join(imports_added)}."
+        if self._handler['needs_compilation']:
+            message += " Note: Compilation required."
+        return True, message
+
+
+def apply_edit_session(
+    server_name: str,
+    operations: List[Dict[str, Any]],
+    auto_import: bool = False,
+    validation_tier: str = "full",
+) -> Tuple[bool, str]:
+    """
+    Run a list of operations as one EditSession: all of them are applied, or
+    none are.
+
+    Args:
+        server_name: Name of the server to modify
+        operations: Dicts with "op" ("inject", "remove", "replace" or
+            "imports") plus "tool_name" and "code", or "imports" (a list)
+        auto_import: If True, add imports used by injected/replacement code
+        validation_tier: "fast" (parse-only) or "full" validation
+
+    Returns:
+        Tuple of (success, message)
+    """
+    try:
+        if not operations:
+            return False, "No operations given"
+        session = EditSession(server_name, auto_import=auto_import, validation_tier=validation_tier)
+        for number, operation in enumerate(operations, 1):
+            kind = operation.get("op")
+            tool_name = operation.get("tool_name")
+            code = operation.get("code", operation.get("tool_code"))
+            if kind == "imports":
+                success, message = session.add_imports(list(operation.get("imports") or []))
+            elif kind not in ("inject", "remove", "replace"):
+                success, message = False, f"Unknown operation {kind!r}"
+            elif not tool_name or (kind != "remove" and not code):
+                success, message = False, f"'{kind}' needs a tool_name" + ("" if kind == "remove" else " and code")
+            elif kind == "inject":
+                success, message = session.inject(tool_name, code)
+            elif kind == "remove":
+                success, message = session.remove(tool_name)
+            else:
+                success, message = session.replace(tool_name, code)
+            if not success:
+                return False, f"Edit session rejected at operation {number}, file left unchanged. {message}"
+        return session.commit()
     except Exception as e:
-        return False, f"Failed to replace tool: {e}"
+        return False, f"Failed to apply edit session: {e}"
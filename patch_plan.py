@@ -0,0 +1,365 @@
+"""
+patch_plan.py - Multi-rule, multi-file regex patching with one scan per file
+"""
+
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from atomic_io import atomic_write_text
+from file_locks import ConcurrentModificationError, check_unchanged, get_lock_manager, read_versioned
+from mcp_manager import check_path_allowed
+from project_scanner import SKIP_DIRS
+from regex_sandbox import get_regex_sandbox
+
+# Previews kept per file in the summary
+_MAX_SAMPLES = 5
+_PREVIEW_CHARS = 80
+
+# Backreferences tie a pattern to its own group numbers, which shift once it
+# is one alternative of a combined pattern
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+class PatchRule(NamedTuple):
+    """One (glob, pattern, replacement) rule of a patch plan."""
+    glob: str
+    pattern: str
+    replacement: str
+
+
+class _CompiledRule(NamedTuple):
+    rule: PatchRule
+    path_regex: "re.Pattern[str]"
+    literal: bool   # Replacement has no group references or escapes
+
+
+def _glob_regex(glob: str) -> "re.Pattern[str]":
+    """
+    Compile a project-relative glob: "*" and "?" stay within one directory,
+    "**" spans directories, and a glob without "/" matches file names at any
+    depth.
+    """
+    glob = glob.replace('\\', '/').lstrip('/')
+    if glob.startswith('./'):
+        glob = glob[2:]
+    if '/' not in glob:
+        glob = '**/' + glob
+    out = []
+    i = 0
+    while i < len(glob):
+        if glob.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+        elif glob.startswith('**', i):
+            out.append('.*')
+            i += 2
+        elif glob[i] == '*':
+            out.append('[^/]*')
+            i += 1
+        elif glob[i] == '?':
+            out.append('[^/]')
+            i += 1
+        elif glob[i] == '[':
+            close = glob.find(']', i + 1)
+            if close == -1:
+                out.append(re.escape('['))
+                i += 1
+            else:
+                body = glob[i + 1:close]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = close + 1
+        else:
+            out.append(re.escape(glob[i]))
+            i += 1
+    return re.compile(''.join(out) + r'\Z')
+
+
+def parse_rules(rules: Sequence[Any]) -> List[PatchRule]:
+    """
+    Normalise rules given as {"glob", "pattern", "replacement"} dicts or
+    (glob, pattern, replacement) sequences.
+
+    Raises:
+        ValueError: If a rule is incomplete or its pattern does not compile
+    """
+    parsed = []
+    for number, item in enumerate(rules, 1):
+        if isinstance(item, dict):
+            values = (item.get("glob"), item.get("pattern"), item.get("replacement"))
+        else:
+            values = tuple(item) if len(item) == 3 else (None, None, None)
+        glob, pattern, replacement = values
+        if not glob or not pattern or replacement is None:
+            raise ValueError(f"Rule {number} needs a glob, pattern and replacement: {item!r}")
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Rule {number}: invalid regex pattern: {e}")
+        parsed.append(PatchRule(str(glob), str(pattern), str(replacement)))
+    return parsed
+
+
+def _compile_rules(rules: List[PatchRule]) -> List[_CompiledRule]:
+    return [
+        _CompiledRule(rule, _glob_regex(rule.glob), '\\' not in rule.replacement)
+        for rule in rules
+    ]
+
+
+class _Matcher:
+    """
+    Combined pattern for one set of rules: each rule is a named alternative,
+    so a file is scanned once whatever the number of rules. Rules that use
+    backreferences (or group names that clash) cannot be combined; then each
+    rule gets its own pass, in rule order.
+    """
+
+    def __init__(self, compiled: List[_CompiledRule], indices: Tuple[int, ...]):
+        self.compiled = compiled
+        self.indices = indices
+        self.combined: Optional["re.Pattern[str]"] = None
+        if len(indices) > 1 and not any(_BACKREFERENCE.search(compiled[k].rule.pattern) for k in indices):
+            try:
+                self.combined = re.compile("|".join(f"(?P<_rule{k}>{compiled[k].rule.pattern})" for k in indices))
+            except re.error:
+                self.combined = None
+            else:
+                self._rule_of_group = {self.combined.groupindex[f"_rule{k}"]: k for k in indices}
+
+    def passes(self) -> List[Tuple[str, Optional[int], Dict[int, int]]]:
+        """
+        (pattern, rule index, group -> rule index) per pass; the rule index
+        is None for the combined pattern, whose groups name the rule.
+        """
+        if self.combined is not None:
+            return [(self.combined.pattern, None, self._rule_of_group)]
+        return [(self.compiled[k].rule.pattern, k, {}) for k in self.indices]
+
+    def rules(self) -> List[Tuple[str, str, bool]]:
+        """(pattern, replacement, literal) for every rule index."""
+        return [(c.rule.pattern, c.rule.replacement, c.literal) for c in self.compiled]
+
+
+def _scan_file(
+    path: Path, relative: str, matcher: _Matcher, build: bool, budget: Optional[float]
+) -> Dict[str, Any]:
+    """
+    Read one file once and run its rules in the regex sandbox, under a
+    per-file time budget; the new text is kept only when building.
+    """
+    try:
+        data, version = read_versioned(path)
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return {"file": relative, "skipped": "not UTF-8 text"}
+    except OSError as e:
+        return {"file": relative, "skipped": str(e)}
+
+    passes = matcher.passes()
+    try:
+        # Separate passes see earlier rules' output, also in a dry run
+        outcome = get_regex_sandbox().replace_passes(
+            text, passes, matcher.rules(), build=build or len(passes) > 1,
+            max_samples=_MAX_SAMPLES, preview=_PREVIEW_CHARS, budget=budget,
+        )
+    except ValueError as e:
+        return {"file": relative, "skipped": str(e)}
+    if outcome["timed_out"]:
+        return {"file": relative, "skipped": "regex time budget exceeded", "timed_out": True}
+
+    counts = outcome["counts"]
+    new_text = outcome["text"]
+    report: Dict[str, Any] = {
+        "file": relative,
+        "matches": sum(counts.values()),
+        "by_rule": {str(k): n for k, n in sorted(counts.items())},
+        "samples": outcome["samples"],
+    }
+    if build and counts and new_text != text:
+        report["_path"] = path
+        report["_version"] = version
+        report["_new_text"] = new_text
+    return report
+
+
+def _collect_files(root: Path, compiled: List[_CompiledRule], max_files: int) -> Tuple[Dict[Tuple[int, ...], List[Tuple[Path, str]]], bool]:
+    """Walk the project once: rule-index tuple -> [(path, relative path)]."""
+    groups: Dict[Tuple[int, ...], List[Tuple[Path, str]]] = {}
+    seen = 0
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+        base = Path(dirpath)
+        for name in sorted(files):
+            path = base / name
+            relative = path.relative_to(root).as_posix()
+            indices = tuple(k for k, c in enumerate(compiled) if c.path_regex.match(relative))
+            if not indices:
+                continue
+            if seen >= max_files:
+                return groups, True
+            seen += 1
+            groups.setdefault(indices, []).append((path, relative))
+    return groups, False
+
+
+def run_patch_plan(
+    project_path: str,
+    rules: Sequence[Any],
+    dry_run: bool = True,
+    server_name: Optional[str] = None,
+    description: str = "",
+    max_workers: int = 8,
+    max_files: int = 5000,
+    allow_risky: bool = False,
+    budget: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Apply (glob, pattern, replacement) rules across a project.
+
+    Files are found in one walk (skipping node_modules, .git, build output,
+    ...). Each matching file is read once and scanned once with a combined
+    pattern of the rules whose glob it matches, in a thread pool; the scans
+    run in the regex sandbox, so no file can take longer than the budget.
+    Rules apply simultaneously: at each position the first rule (in list
+    order) that matches wins, and replacement text is not re-scanned by
+    other rules. Rules with backreferences cannot be combined and run as
+    separate passes, in rule order, over the previous passes' output.
+
+    With dry_run (the default) nothing is written and the result lists the
+    matches per file and rule with line previews. Otherwise every changed file
+    is locked, checked against the version that was scanned, saved in one
+    checkpoint, and written atomically; if a write fails the checkpoint is
+    restored. Nothing is written if any file's scan ran over budget.
+
+    Args:
+        project_path: Project root; globs are relative to it
+        rules: {"glob", "pattern", "replacement"} dicts or triples
+        dry_run: Only report what would change
+        server_name: Server the checkpoint is filed under (defaults to the
+            project directory name)
+        description: Checkpoint description
+        max_workers: Threads reading and scanning files
+        max_files: Stop collecting files after this many
+        allow_risky: Run rules whose patterns have backtracking-prone shapes
+            (files they exceed the budget on are reported under timed_out)
+        budget: Seconds each file's scan may take (defaults to the regex
+            sandbox budget, REGEX_BUDGET_SECONDS)
+
+    Returns:
+        Dictionary with success, message, per-file summaries and totals
+    """
+    started = time.perf_counter()
+    try:
+        root = Path(project_path).resolve()
+        check_path_allowed(root)
+        if not root.is_dir():
+            return {"success": False, "message": f"Project directory not found: {project_path}"}
+        parsed = parse_rules(rules)
+        if not parsed:
+            return {"success": False, "message": "No rules given"}
+    except (PermissionError, ValueError) as e:
+        return {"success": False, "message": str(e)}
+
+    sandbox = get_regex_sandbox()
+    risky = {str(k): sandbox.compile(rule.pattern)[1] for k, rule in enumerate(parsed)}
+    risky = {k: warnings for k, warnings in risky.items() if warnings}
+    if risky and not allow_risky:
+        return {
+            "success": False,
+            "message": "Rules with backtracking-prone patterns were not run (pass allow_risky to run them anyway)",
+            "risky_rules": risky,
+        }
+
+    compiled = _compile_rules(parsed)
+    groups, truncated = _collect_files(root, compiled, max_files)
+    jobs = [
+        (path, relative, _Matcher(compiled, indices))
+        for indices, files in groups.items()
+        for path, relative in files
+    ]
+    workers = max(1, min(max_workers, len(jobs)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        reports = list(pool.map(lambda job: _scan_file(*job, build=not dry_run, budget=budget), jobs))
+    reports.sort(key=lambda report: report["file"])
+
+    skipped = [{"file": r["file"], "reason": r["skipped"]} for r in reports if "skipped" in r]
+    timed_out = [r["file"] for r in reports if r.get("timed_out")]
+    matched = [r for r in reports if r.get("matches")]
+    by_rule = [0] * len(parsed)
+    for report in matched:
+        for k, n in report["by_rule"].items():
+            by_rule[int(k)] += n
+    result: Dict[str, Any] = {
+        "success": True,
+        "dry_run": dry_run,
+        "files_scanned": len(reports) - len(skipped),
+        "files_matched": len(matched),
+        "total_matches": sum(by_rule),
+        "matches_by_rule": by_rule,
+        "files": [{k: v for k, v in r.items() if not k.startswith('_')} for r in matched],
+        "skipped": skipped,
+        "truncated": truncated,
+        "risky_rules": risky,
+        "timed_out": timed_out,
+    }
+
+    changes = [r for r in matched if "_new_text" in r]
+    if dry_run:
+        result["message"] = f"{result['total_matches']} matches in {len(matched)} files (dry run, nothing written)"
+        if timed_out:
+            result["message"] += f"; {len(timed_out)} files ran over the regex time budget"
+    elif timed_out:
+        result.update({
+            "success": False,
+            "message": f"Patch plan aborted, no files written: {len(timed_out)} files ran over the regex time budget",
+        })
+    elif not changes:
+        result["message"] = "No matches, nothing written"
+    else:
+        try:
+            result.update(_apply_changes(root, changes, server_name, description, len(parsed)))
+        except ConcurrentModificationError as e:
+            result.update({"success": False, "message": f"Patch plan aborted, no files written: {e}"})
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+def _apply_changes(
+    root: Path, changes: List[Dict[str, Any]], server_name: Optional[str], description: str, rule_count: int
+) -> Dict[str, Any]:
+    """Write scanned changes under one checkpoint, all files locked throughout."""
+    from backup_manager import get_backup_manager
+    manager = get_backup_manager()
+    paths = [change["_path"] for change in changes]
+    with get_lock_manager().lock_many(paths):
+        for change in changes:
+            check_unchanged(change["_path"], change["_version"])
+        checkpoint_id = manager.create_checkpoint(
+            server_name or root.name,
+            description or f"patch plan: {rule_count} rules over {len(changes)} files",
+            [str(path) for path in paths],
+        )
+        written = []
+        try:
+            for change in changes:
+                atomic_write_text(change["_path"], change["_new_text"])
+                written.append(change["file"])
+        except Exception as e:
+            restored, restore_message = manager.restore_checkpoint(checkpoint_id)
+            return {
+                "success": False,
+                "message": f"Write failed after {len(written)} files ({e}); {restore_message}",
+                "checkpoint_id": checkpoint_id,
+                "rolled_back": restored,
+            }
+    return {
+        "message": f"Patched {len(written)} files under checkpoint '{checkpoint_id}'",
+        "checkpoint_id": checkpoint_id,
+        "files_written": written,
+    }
@@ -0,0 +1,107 @@
+"""
+piece_table.py - Line-based piece table for batched source edits
+"""
+
+from typing import List
+
+
+class Piece:
+    """A run of lines taken from the original text or the add buffer."""
+
+    __slots__ = ("added", "start", "end")
+
+    def __init__(self, added: bool, start: int, end: int):
+        self.added = added
+        self.start = start
+        self.end = end
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        return f"Piece({'add' if self.added else 'orig'}, {self.start}, {self.end})"
+
+
+class PieceTable:
+    """
+    The lines of an edited text as pieces of two buffers.
+
+    The original lines are never modified; inserted lines are appended to an
+    add buffer and the text is the concatenation of the pieces. Editing costs
+    the size of the inserted lines plus the number of pieces, not the size of
+    the file, and the text is materialised once by ``lines()``.
+
+    Original lines are addressed by their line numbers in the unedited text,
+    so positions found in the original (e.g. a tool span) stay valid however
+    many edits came before. Pieces returned by ``replace_original`` and
+    ``append`` are handles that ``replace_piece`` can re-point later.
+    """
+
+    def __init__(self, lines: List[str]):
+        self._original = lines
+        self._added: List[str] = []
+        self._pieces: List[Piece] = [Piece(False, 0, len(lines))] if lines else []
+
+    def _add(self, new_lines: List[str]) -> Piece:
+        start = len(self._added)
+        self._added.extend(new_lines)
+        return Piece(True, start, len(self._added))
+
+    def replace_original(self, start: int, end: int, new_lines: List[str]) -> Piece:
+        """
+        Replace original lines [start, end) with new_lines.
+
+        Raises:
+            ValueError: If part of the range was already replaced or removed
+        """
+        for k, piece in enumerate(self._pieces):
+            if piece.added or not piece.start <= start <= end <= piece.end:
+                continue
+            # An empty range at a piece boundary belongs to the piece it starts
+            if start == end == piece.end and start != len(self._original):
+                continue
+            new_piece = self._add(new_lines)
+            split = [new_piece]
+            if piece.start < start:
+                split.insert(0, Piece(False, piece.start, start))
+            if end < piece.end:
+                split.append(Piece(False, end, piece.end))
+            self._pieces[k:k + 1] = split
+            return new_piece
+        raise ValueError(f"Original lines {start + 1}-{end} overlap an earlier edit")
+
+    def replace_piece(self, piece: Piece, new_lines: List[str]) -> None:
+        """Point an added piece at new_lines (an empty list removes its lines)."""
+        if not piece.added:
+            raise ValueError("Only added pieces can be replaced")
+        added = self._add(new_lines)
+        piece.start, piece.end = added.start, added.end
+
+    def remove_piece(self, piece: Piece) -> None:
+        """Drop an added piece from the text; the original lines around it stay put."""
+        for k, candidate in enumerate(self._pieces):
+            if candidate is piece:
+                del self._pieces[k]
+                return
+        raise ValueError("Piece is not part of the text")
+
+    def append(self, new_lines: List[str]) -> Piece:
+        """Add new_lines at the end of the text."""
+        piece = self._add(new_lines)
+        self._pieces.append(piece)
+        return piece
+
+    def lines(self) -> List[str]:
+        """The edited text's lines."""
+        result: List[str] = []
+        for piece in self._pieces:
+            buffer = self._added if piece.added else self._original
+            result.extend(buffer[piece.start:piece.end])
+        return result
+
+    def __len__(self) -> int:
+        return sum(len(piece) for piece in self._pieces)
+
+    @property
+    def piece_count(self) -> int:
+        return len(self._pieces)
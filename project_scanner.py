@@ -7,7 +7,9 @@ import re
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from atomic_io import atomic_write_text
 from config_manager import get_server_config
+from file_locks import check_unchanged, get_lock_manager, read_versioned
 
 # Common source extensions grouped by language
 SOURCE_EXTENSIONS = {
@@ -279,7 +281,8 @@ def inject_into_module(
     if not p.exists():
         return False, f"Module file not found: {module_path}"
 
-    source = p.read_text(encoding='utf-8')
+    data, expected = read_versioned(p)
+    source = data.decode('utf-8')
 
     # Check if tool already exists
     if tool_name in source:
@@ -287,5 +290,7 @@ def inject_into_module(
 
     # Append tool code
     new_source = source.rstrip() + "\n\n\n" + tool_code.rstrip() + "\n"
-    p.write_text(new_source, encoding='utf-8')
+    with get_lock_manager().lock(p):
+        check_unchanged(p, expected)
+        atomic_write_text(p, new_source)
     return True, f"Injected '{tool_name}' into {module_path}"
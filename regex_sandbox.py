@@ -0,0 +1,635 @@
+"""
+regex_sandbox.py - Time-budgeted execution of user-supplied regular expressions
+"""
+
+import atexit
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from validator_pool import ValidatorWorker, WorkerError
+
+try:
+    from re import _parser as _sre  # Python 3.11+
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse as _sre  # type: ignore[no-redef]
+
+# Worker program. Requests are "<byte length>\n<json>" frames on stdin;
+# answers are "<KIND> <byte length>\n<json>" frames on stdout:
+#   P  partial results, sent about every 20 ms while scanning (after
+#      every line for risky patterns, so a timeout loses nothing)
+#   D  done (the final result)
+#   E  error (bad replacement template, ...)
+# replace_passes runs patch_plan's passes over one file (see _replace_passes,
+# its in-process twin).
+# Partial frames are what survives when the worker is killed at the budget.
+_REGEX_WORKER = r"""
+import json, re, sys, time
+from functools import lru_cache
+compile_pattern = lru_cache(maxsize=256)(re.compile)
+stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+def send(kind, payload):
+    data = json.dumps(payload).encode('utf-8')
+    stdout.write(kind.encode('ascii') + b' ' + str(len(data)).encode('ascii') + b'\n' + data)
+    stdout.flush()
+while True:
+    header = stdin.readline()
+    if not header:
+        break
+    request = json.loads(stdin.read(int(header)).decode('utf-8'))
+    try:
+        op = request.get('op')
+        if op == 'ping':
+            send('D', {})
+            continue
+        if op == 'replace_passes':
+            # Keep in sync with _replace_passes in regex_sandbox.py
+            text, counts, samples = request['text'], {}, []
+            rules, build = request['rules'], request['build']
+            max_samples, preview = request['max_samples'], request['preview']
+            for pattern, rule, groups in request['passes']:
+                pieces, last, line = [], 0, 1
+                for match in compile_pattern(pattern, 0).finditer(text):
+                    k = groups[str(match.lastindex)] if rule is None else rule
+                    counts[k] = counts.get(k, 0) + 1
+                    start, end = match.span()
+                    if len(samples) < max_samples:
+                        line += text.count('\n', last, start)
+                        samples.append({'line': line, 'rule': k, 'match': match.group()[:preview]})
+                        line += text.count('\n', start, end)
+                    if build:
+                        rule_pattern, replacement, literal = rules[k]
+                        pieces.append(text[last:start])
+                        if literal:
+                            pieces.append(replacement)
+                        else:
+                            own = match if rule is not None else compile_pattern(rule_pattern, 0).match(text, start) or match
+                            pieces.append(own.expand(replacement))
+                    last = end
+                if build:
+                    pieces.append(text[last:])
+                    text = ''.join(pieces)
+            send('D', {'text': text if build else None, 'counts': counts, 'samples': samples})
+            continue
+        regex = compile_pattern(request['pattern'], request.get('flags', 0))
+        if op == 'search_lines':
+            limit, width = request.get('limit'), request.get('width', 300)
+            flush_after = request.get('flush_after', 0.02)
+            batch, found, scanned = [], 0, 0
+            flushed = time.monotonic()
+            for index, line in enumerate(request['lines']):
+                match = regex.search(line)
+                scanned = index + 1
+                if match:
+                    batch.append([index, match.group(0)[:width]])
+                    found += 1
+                    if limit and found >= limit:
+                        break
+                if time.monotonic() - flushed >= flush_after:
+                    send('P', {'matches': batch, 'scanned': scanned})
+                    batch, flushed = [], time.monotonic()
+            send('D', {'matches': batch, 'scanned': scanned})
+        elif op == 'subn':
+            text, count = regex.subn(request['replacement'], request['text'])
+            send('D', {'text': text, 'count': count})
+        else:
+            send('E', {'error': 'unknown operation %r' % op})
+    except Exception as e:
+        send('E', {'error': '%s: %s' % (type(e).__name__, e)})
+"""
+
+DEFAULT_BUDGET = 2.0
+
+_COMPILE_CACHE_MAX = 256
+
+# Characters a category matches, for overlap tests between quantified atoms
+_CATEGORY_PROBES = {
+    _sre.CATEGORY_DIGIT: re.compile(r'\d'),
+    _sre.CATEGORY_NOT_DIGIT: re.compile(r'\D'),
+    _sre.CATEGORY_SPACE: re.compile(r'\s'),
+    _sre.CATEGORY_NOT_SPACE: re.compile(r'\S'),
+    _sre.CATEGORY_WORD: re.compile(r'\w'),
+    _sre.CATEGORY_NOT_WORD: re.compile(r'\W'),
+}
+_CATEGORY_SAMPLES = "aZ_09 \t\n.-,/"
+_REPEATS = (_sre.MAX_REPEAT, _sre.MIN_REPEAT)
+_ANY = "any"
+
+
+# ---------------------------------------------------------------------------
+# Static risk analysis
+# ---------------------------------------------------------------------------
+
+def _first_chars(items: Sequence[Tuple[Any, Any]]) -> FrozenSet[Any]:
+    """
+    Approximate set of what the first character of a match can be: chars,
+    category codes, or _ANY when it could be nearly anything.
+    """
+    for op, av in items:
+        if op == _sre.LITERAL:
+            return frozenset([chr(av)])
+        if op == _sre.IN:
+            tokens = set()
+            for item_op, item_av in av:
+                if item_op == _sre.LITERAL:
+                    tokens.add(chr(item_av))
+                elif item_op == _sre.RANGE and item_av[1] - item_av[0] < 64:
+                    tokens.update(chr(c) for c in range(item_av[0], item_av[1] + 1))
+                elif item_op == _sre.CATEGORY and item_av in _CATEGORY_PROBES:
+                    tokens.add(item_av)
+                else:
+                    return frozenset([_ANY])
+            return frozenset(tokens)
+        if op == _sre.CATEGORY or op == _sre.AT:
+            continue    # Zero-width
+        if op == _sre.SUBPATTERN:
+            return _first_chars(av[-1])
+        if op in _REPEATS:
+            return _first_chars(av[2])
+        if op == _sre.BRANCH:
+            return frozenset().union(*(_first_chars(branch) for branch in av[1]))
+        return frozenset([_ANY])
+    return frozenset([_ANY])
+
+
+def _overlap(a: FrozenSet[Any], b: FrozenSet[Any]) -> bool:
+    if _ANY in a or _ANY in b or a & b:
+        return True
+    for x in a:
+        for y in b:
+            if isinstance(x, str) and not isinstance(y, str):
+                if _CATEGORY_PROBES[y].match(x):
+                    return True
+            elif isinstance(y, str) and not isinstance(x, str):
+                if _CATEGORY_PROBES[x].match(y):
+                    return True
+            elif not isinstance(x, str) and not isinstance(y, str):
+                if any(_CATEGORY_PROBES[x].match(c) and _CATEGORY_PROBES[y].match(c) for c in _CATEGORY_SAMPLES):
+                    return True
+    return False
+
+
+def _overlapping_branches(items: Sequence[Tuple[Any, Any]]) -> bool:
+    """Whether an alternation in items (outside nested repeats) has branches that can start alike."""
+    for op, av in items:
+        if op == _sre.SUBPATTERN and _overlapping_branches(av[-1]):
+            return True
+        if op == _sre.BRANCH:
+            # The parser factors common prefixes out: (a|ab) becomes a(?:|b)
+            firsts = [_first_chars(branch) for branch in av[1]]
+            if any(_overlap(a, b) for i, a in enumerate(firsts) for b in firsts[i + 1:]):
+                return True
+    return False
+
+
+def _walk(
+    items: Sequence[Tuple[Any, Any]], inside_unbounded: bool, risks: Dict[str, None], inside_repeat: bool = False
+) -> None:
+    previous: Optional[FrozenSet[Any]] = None
+    for op, av in items:
+        current: Optional[FrozenSet[Any]] = None
+        if op in _REPEATS:
+            low, high, body = av
+            unbounded = high == _sre.MAXREPEAT
+            if unbounded:
+                if inside_unbounded:
+                    risks["nested quantifiers, e.g. (a+)+: exponential backtracking"] = None
+                elif inside_repeat:
+                    # (.*a){12} tries every split of the text into 12 parts
+                    risks["bounded repeat of an unbounded quantifier, e.g. (.*a){12}: exponential backtracking"] = None
+                if _overlapping_branches(body):
+                    risks["quantified alternation with overlapping branches, e.g. (a|ab)*"] = None
+                current = _first_chars(body)
+                if previous is not None and _overlap(previous, current):
+                    risks["adjacent quantifiers over overlapping characters, e.g. \\w+\\w+: polynomial backtracking"] = None
+            _walk(body, inside_unbounded or unbounded, risks, inside_repeat or high > 1)
+        elif op == _sre.SUBPATTERN:
+            _walk(av[-1], inside_unbounded, risks, inside_repeat)
+        elif op == _sre.BRANCH:
+            for branch in av[1]:
+                _walk(branch, inside_unbounded, risks, inside_repeat)
+        elif op in (_sre.ASSERT, _sre.ASSERT_NOT):
+            _walk(av[1], inside_unbounded, risks, inside_repeat)
+        elif op == _sre.GROUPREF_EXISTS:
+            for branch in av[1:]:
+                if branch:
+                    _walk(branch, inside_unbounded, risks, inside_repeat)
+        elif op == _sre.GROUPREF:
+            risks["backreference: matching can be exponential"] = None
+        # Possessive repeats and atomic groups never backtrack into themselves
+        previous = current
+
+
+def analyze_pattern(pattern: str, flags: int = 0) -> List[str]:
+    """
+    Shapes in a pattern that are known to cause catastrophic backtracking.
+
+    A static heuristic over the parsed pattern: nested unbounded quantifiers
+    (also inside a bounded repeat such as {12}), quantified alternations
+    whose branches can start with the same character, adjacent unbounded
+    quantifiers over overlapping characters and backreferences. An empty
+    list does not prove a pattern safe; the time budget still applies.
+
+    Raises:
+        re.error: If the pattern does not compile
+    """
+    parsed = _sre.parse(pattern, flags)
+    risks: Dict[str, None] = {}
+    _walk(list(parsed), False, risks)
+    return list(risks)
+
+
+def _replace_passes(
+    text: str,
+    passes: Sequence[Tuple[str, Optional[int], Dict[int, int]]],
+    rules: Sequence[Tuple[str, str, bool]],
+    build: bool,
+    max_samples: int,
+    preview: int,
+) -> Tuple[Optional[str], Dict[int, int], List[Dict[str, Any]]]:
+    """
+    In-process version of the worker's replace_passes operation. Keep in
+    sync with the replace_passes branch of _REGEX_WORKER above.
+    """
+    counts: Dict[int, int] = {}
+    samples: List[Dict[str, Any]] = []
+    for pattern, rule, groups in passes:
+        pieces: List[str] = []
+        last = 0
+        line = 1
+        for match in re.compile(pattern).finditer(text):
+            k = groups[match.lastindex] if rule is None else rule
+            counts[k] = counts.get(k, 0) + 1
+            start, end = match.span()
+            if len(samples) < max_samples:
+                line += text.count('\n', last, start)
+                samples.append({"line": line, "rule": k, "match": match.group()[:preview]})
+                line += text.count('\n', start, end)
+            if build:
+                rule_pattern, replacement, literal = rules[k]
+                pieces.append(text[last:start])
+                if literal:
+                    pieces.append(replacement)
+                else:
+                    # Re-match the rule alone so group references mean its own groups
+                    own = match if rule is not None else re.compile(rule_pattern).match(text, start) or match
+                    pieces.append(own.expand(replacement))
+            last = end
+        if build:
+            pieces.append(text[last:])
+            text = ''.join(pieces)
+    return (text if build else None), counts, samples
+
+
+# ---------------------------------------------------------------------------
+# Sandbox
+# ---------------------------------------------------------------------------
+
+class _RegexWorker(ValidatorWorker):
+    """A Python worker process running regex requests."""
+
+    def __init__(self) -> None:
+        super().__init__("regex", sys.executable, ["-I", "-c", _REGEX_WORKER])
+
+    def run(self, request: Dict[str, Any], deadline: float, partial: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        """Send a request; partial frames are appended to ``partial`` as they arrive."""
+        data = json.dumps(request).encode("utf-8")
+        try:
+            self.process.stdin.write(f"{len(data)}\n".encode("ascii") + data)
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerError(f"regex worker is not accepting input: {e}")
+        while True:
+            header = self._read_until_newline(deadline)
+            try:
+                kind, length = header.split(" ", 1)
+                payload = json.loads(self._read_exact(int(length), deadline).decode("utf-8"))
+            except ValueError:
+                raise WorkerError(f"regex worker sent a malformed frame: {header!r}")
+            if kind == "P":
+                partial.append(payload)
+                continue
+            self.requests += 1
+            self.last_used = time.monotonic()
+            return kind, payload
+
+
+class RegexSandbox:
+    """
+    Runs user-supplied patterns in worker processes with a wall-clock budget.
+
+    Patterns are compiled once in the server (LRU) to reject syntax errors
+    and analysed for risky shapes before anything runs. Matching happens in
+    a long-lived Python worker; when a request exceeds its budget the worker
+    is killed, the partial results it had streamed are returned with
+    ``timed_out`` set, and a fresh worker is started on the next request.
+    On platforms without worker support (Windows) patterns run in-process
+    without a budget.
+    """
+
+    def __init__(self, max_workers: int = 2, budget: float = DEFAULT_BUDGET):
+        self.max_workers = max_workers
+        self.budget = budget
+        self._cond = threading.Condition()
+        self._idle: List[_RegexWorker] = []
+        self._count = 0
+        self._compiled: "OrderedDict[Tuple[str, int], Tuple[re.Pattern[str], List[str]]]" = OrderedDict()
+        self.stats = {
+            "runs": 0,
+            "timeouts": 0,
+            "worker_errors": 0,
+            "spawned": 0,
+            "in_process": 0,
+            "risky_patterns": 0,
+            "compile_hits": 0,
+            "compile_misses": 0,
+        }
+        self.enabled = max_workers > 0 and os.name != "nt"
+
+    def compile(self, pattern: str, flags: int = 0) -> Tuple["re.Pattern[str]", List[str]]:
+        """
+        Compiled pattern and its risk warnings, cached per (pattern, flags).
+
+        Raises:
+            re.error: If the pattern does not compile
+        """
+        key = (pattern, flags)
+        with self._cond:
+            cached = self._compiled.get(key)
+            if cached is not None:
+                self._compiled.move_to_end(key)
+                self.stats["compile_hits"] += 1
+                return cached
+        compiled = re.compile(pattern, flags)
+        warnings = analyze_pattern(pattern, flags)
+        with self._cond:
+            self._compiled[key] = (compiled, warnings)
+            while len(self._compiled) > _COMPILE_CACHE_MAX:
+                self._compiled.popitem(last=False)
+            self.stats["compile_misses"] += 1
+            if warnings:
+                self.stats["risky_patterns"] += 1
+        return compiled, warnings
+
+    def search_lines(
+        self,
+        pattern: str,
+        lines: Sequence[str],
+        flags: int = 0,
+        limit: Optional[int] = None,
+        budget: Optional[float] = None,
+        width: int = 300,
+    ) -> Dict[str, Any]:
+        """
+        ``re.search`` over each line.
+
+        Returns:
+            Dictionary with matches ([line index, matched text] pairs in line
+            order), lines_scanned, timed_out, warnings and elapsed_ms
+
+        Raises:
+            re.error: If the pattern does not compile
+        """
+        compiled, warnings = self.compile(pattern, flags)
+        started = time.perf_counter()
+        request = {"op": "search_lines", "pattern": pattern, "flags": flags,
+                   "lines": list(lines), "limit": limit, "width": width,
+                   "flush_after": 0 if warnings else 0.02}
+        outcome = self._run(request, budget)
+        if outcome is None:
+            matches: List[List[Any]] = []
+            scanned = 0
+            for index, line in enumerate(lines):
+                match = compiled.search(line)
+                scanned = index + 1
+                if match:
+                    matches.append([index, match.group(0)[:width]])
+                    if limit and len(matches) >= limit:
+                        break
+            kind, payload, partial, timed_out = "D", {"matches": matches, "scanned": scanned}, [], False
+        else:
+            kind, payload, partial, timed_out = outcome
+        if kind == "E":
+            raise ValueError(payload.get("error", "regex worker error"))
+        frames = partial + ([payload] if kind == "D" else [])
+        matches = [m for frame in frames for m in frame.get("matches", [])]
+        scanned = max((frame.get("scanned", 0) for frame in frames), default=0)
+        return {
+            "matches": matches,
+            "lines_scanned": scanned,
+            "timed_out": timed_out,
+            "warnings": warnings,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def substitute(
+        self,
+        pattern: str,
+        replacement: str,
+        text: str,
+        flags: int = 0,
+        budget: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        ``re.subn`` on text. A substitution has no useful partial result: on
+        timeout ``text`` is None.
+
+        Returns:
+            Dictionary with text, count, timed_out, warnings and elapsed_ms
+
+        Raises:
+            re.error: If the pattern does not compile
+            ValueError: If the replacement template is invalid
+        """
+        compiled, warnings = self.compile(pattern, flags)
+        started = time.perf_counter()
+        request = {"op": "subn", "pattern": pattern, "flags": flags, "replacement": replacement, "text": text}
+        outcome = self._run(request, budget)
+        if outcome is None:
+            try:
+                new_text, count = compiled.subn(replacement, text)
+            except (re.error, IndexError) as e:
+                raise ValueError(f"{type(e).__name__}: {e}")
+            kind, payload, timed_out = "D", {"text": new_text, "count": count}, False
+        else:
+            kind, payload, _, timed_out = outcome
+        if kind == "E":
+            raise ValueError(payload.get("error", "regex worker error"))
+        return {
+            "text": payload.get("text") if kind == "D" else None,
+            "count": payload.get("count", 0),
+            "timed_out": timed_out,
+            "warnings": warnings,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def replace_passes(
+        self,
+        text: str,
+        passes: Sequence[Tuple[str, Optional[int], Dict[int, int]]],
+        rules: Sequence[Tuple[str, str, bool]],
+        build: bool = True,
+        max_samples: int = 5,
+        preview: int = 80,
+        budget: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run replacement passes over text, each pass over the previous pass's
+        output (patch_plan's scan of one file).
+
+        Args:
+            text: Text to scan
+            passes: (pattern, rule index, or None plus a {group: rule index}
+                map for a combined pattern of several rules)
+            rules: (pattern, replacement, literal) per rule index
+            build: Return the replaced text as well as the counts
+            max_samples: Match previews to keep
+            preview: Characters kept per preview
+
+        Returns:
+            Dictionary with text (None unless build, or on timeout), counts
+            (rule index -> matches), samples, timed_out and elapsed_ms
+
+        Raises:
+            ValueError: If a replacement template is invalid
+        """
+        started = time.perf_counter()
+        request = {"op": "replace_passes", "text": text, "build": build,
+                   "passes": [[pattern, rule, groups] for pattern, rule, groups in passes],
+                   "rules": [list(rule) for rule in rules], "max_samples": max_samples, "preview": preview}
+        outcome = self._run(request, budget)
+        if outcome is None:
+            try:
+                new_text, counts, samples = _replace_passes(text, passes, rules, build, max_samples, preview)
+            except (re.error, IndexError) as e:
+                raise ValueError(f"{type(e).__name__}: {e}")
+            kind, payload, timed_out = "D", {"text": new_text, "counts": counts, "samples": samples}, False
+        else:
+            kind, payload, _, timed_out = outcome
+        if kind == "E":
+            raise ValueError(payload.get("error", "regex worker error"))
+        return {
+            "text": payload.get("text") if kind == "D" else None,
+            # JSON turned the rule indices into strings
+            "counts": {int(k): n for k, n in payload.get("counts", {}).items()},
+            "samples": payload.get("samples", []),
+            "timed_out": timed_out,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def _run(
+        self, request: Dict[str, Any], budget: Optional[float]
+    ) -> Optional[Tuple[str, Dict[str, Any], List[Dict[str, Any]], bool]]:
+        """
+        Run a request in a worker: (kind, payload, partial frames, timed out),
+        or None if the caller should run it in-process.
+        """
+        if not self.enabled:
+            with self._cond:
+                self.stats["in_process"] += 1
+            return None
+        worker = self._acquire()
+        if worker is None:
+            with self._cond:
+                self.stats["in_process"] += 1
+            return None
+        deadline = time.monotonic() + (self.budget if budget is None else budget)
+        partial: List[Dict[str, Any]] = []
+        healthy = False
+        try:
+            kind, payload = worker.run(request, deadline, partial)
+            healthy = True
+            return kind, payload, partial, False
+        except WorkerError:
+            timed_out = time.monotonic() >= deadline
+            with self._cond:
+                self.stats["timeouts" if timed_out else "worker_errors"] += 1
+            if timed_out:
+                return "T", {}, partial, True
+            # Never retry in-process: the pattern may be what killed the worker
+            return "E", {"error": "regex worker failed"}, partial, False
+        finally:
+            with self._cond:
+                self.stats["runs"] += 1
+            self._release(worker, healthy)
+
+    def _acquire(self) -> Optional[_RegexWorker]:
+        with self._cond:
+            while True:
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.is_alive():
+                        return worker
+                    self._count -= 1
+                if self._count < self.max_workers:
+                    self._count += 1
+                    break
+                # Busy workers finish or are killed within their budget
+                self._cond.wait(timeout=self.budget)
+        try:
+            worker = _RegexWorker()
+        except OSError:
+            with self._cond:
+                self._count -= 1
+                self.enabled = False
+                self._cond.notify()
+            return None
+        with self._cond:
+            self.stats["spawned"] += 1
+        return worker
+
+    def _release(self, worker: _RegexWorker, healthy: bool) -> None:
+        if not healthy:
+            # A timed-out worker may still be backtracking: kill, do not wait
+            try:
+                worker.process.kill()
+                worker.process.wait(timeout=2)
+            except Exception:
+                pass
+        with self._cond:
+            if healthy and worker.is_alive():
+                self._idle.append(worker)
+            else:
+                self._count -= 1
+            self._cond.notify()
+
+    def shutdown(self) -> None:
+        """Terminate all idle workers."""
+        with self._cond:
+            for worker in self._idle:
+                worker.terminate()
+                self._count -= 1
+            self._idle.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["enabled"] = self.enabled
+            stats["workers"] = self._count
+            stats["budget_seconds"] = self.budget
+            stats["cached_patterns"] = len(self._compiled)
+        return stats
+
+
+# Global sandbox instance
+_regex_sandbox: Optional[RegexSandbox] = None
+_regex_sandbox_lock = threading.Lock()
+
+
+def get_regex_sandbox() -> RegexSandbox:
+    """Get or create the global RegexSandbox instance."""
+    global _regex_sandbox
+    with _regex_sandbox_lock:
+        if _regex_sandbox is None:
+            try:
+                budget = float(os.getenv("REGEX_BUDGET_SECONDS", str(DEFAULT_BUDGET)))
+            except ValueError:
+                budget = DEFAULT_BUDGET
+            _regex_sandbox = RegexSandbox(budget=budget)
+            atexit.register(_regex_sandbox.shutdown)
+    return _regex_sandbox
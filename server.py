@@ -15,17 +15,28 @@ from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 
+import atomic_io
 import backup_manager
 import build_cache
 import build_detector
 import config_manager
+import delimiter_lexer
+import file_locks
 import git_manager
 import import_manager
 import log_manager
 import mcp_manager
+import patch_plan
 import project_scanner
+import regex_sandbox
 import resource_discovery
 import server_monitor
+import source_index
+import splice_validator
+import symbol_scanner
+import tool_spans
+import validation_cache
+import validator_pool
 import tool_analyzer
 import tool_tester
 import export_manager
@@ -69,34 +80,50 @@ def list_active_servers() -> List[Dict[str, Any]]:
 
 
 @mcp.tool()
-def inspect_mcp_source(server_name: str) -> Dict[str, str]:
+def inspect_mcp_source(
+    server_name: str,
+    offset: int = 0,
+    limit: int = 50000,
+    unit: str = "bytes",
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Locate the source code file for an MCP server and return its content.
     This essentially "reads the mind" of another agent.
     
+    Large files are returned one window at a time; pass next_cursor back
+    to read the following window, or jump with offset/unit="lines".
+    
     Args:
         server_name: Name of the server from the config list
+        offset: Start of the window (byte offset, or 0-indexed line if unit="lines")
+        limit: Window size in bytes or lines (default: 50000)
+        unit: "bytes" or "lines" (default: "bytes")
+        cursor: Continuation token from a previous call (overrides offset/unit)
         
     Returns:
         Dictionary containing:
         - server_name: Name of the server
         - file_path: Path to the source file
-        - content: Source code content (truncated if huge)
+        - content: Source code in the requested window
+        - start_byte/end_byte, start_line/end_line: Window bounds
+        - total_bytes/total_lines: File totals
+        - line_index: [line, byte_offset] pairs every 1000 lines
+        - next_cursor: Token for the next window (None at end of file)
         
     Example:
         {
             "server_name": "luthier-physics",
             "file_path": "/path/to/luthier/server.py",
-            "content": "import fastmcp\\n..."
+            "content": "import fastmcp\\n...",
+            "next_cursor": null
         }
     """
     try:
-        source_code, file_path = mcp_manager.read_source_file(server_name)
-        return {
-            "server_name": server_name,
-            "file_path": str(file_path),
-            "content": source_code
-        }
+        window = mcp_manager.read_source_window(
+            server_name, offset=offset, limit=limit, unit=unit, cursor=cursor
+        )
+        return {"server_name": server_name, **window}
     except Exception as e:
         raise RuntimeError(f"Failed to inspect MCP source: {str(e)}")
 
@@ -106,7 +133,8 @@ def inject_tool_capability(
     server_name: str, 
     tool_name: str, 
     code: str,
-    auto_compile: bool = False
+    auto_compile: bool = False,
+    validation_tier: str = "full"
 ) -> Dict[str, Any]:
     """
     HOT-PATCHING: Inject a new tool capability into an MCP server (supports multiple languages).
@@ -119,7 +147,7 @@ def inject_tool_capability(
     2. Reads the target server's source file
     3. Checks if tool_name already exists
     4. Validates the code syntax
-    5. Creates a .bak backup copy
+    5. Stores a backup copy (restorable with restore_backup)
     6. Appends the new tool code to the end of the file
     7. Optionally compiles if auto_compile=True and language requires compilation
     
@@ -131,6 +159,9 @@ def inject_tool_capability(
         tool_name: Name of the tool to inject
         code: Code for the tool (language-specific format)
         auto_compile: If True and language requires compilation, automatically compile after injection
+        validation_tier: "fast" uses parse-only front ends (gofmt -e, javac -proc:only,
+            scalac -Ystop-after:parser, Elixir/Julia parsers, dart format) and never
+            executes code; "full" (default) runs the complete compiler checks
         
     Returns:
         Dictionary containing:
@@ -176,7 +207,7 @@ def inject_tool_capability(
         
         # Use generic injection dispatcher
         success, message = mcp_manager.inject_tool_generic(
-            server_name, tool_name, code
+            server_name, tool_name, code, validation_tier=validation_tier
         )
         
         if not success:
@@ -216,6 +247,90 @@ def inject_tool_capability(
         }
 
 
+@mcp.tool()
+def inject_tools_batch(
+    server_name: str,
+    tools: List[Dict[str, str]],
+    auto_import: bool = False,
+    auto_compile: bool = False,
+    validation_tier: str = "full"
+) -> Dict[str, Any]:
+    """
+    HOT-PATCHING: Inject several tools into an MCP server in one step.
+    
+    Unlike calling inject_tool_capability once per tool, the batch resolves and
+    reads the source file once, validates the combined result once, creates one
+    backup, writes the file once (atomically) and registers one backup entry.
+    The batch is all-or-nothing: if any tool is a duplicate or fails
+    validation, the file is left untouched.
+    
+    Args:
+        server_name: Name of the server to modify (from config list)
+        tools: List of {"tool_name": "...", "tool_code": "..."} objects, injected in order
+        auto_import: If True, add imports missing for any of the tools
+        auto_compile: If True and language requires compilation, compile after injection
+        validation_tier: "fast" (parse-only) or "full" (default) validation
+        
+    Returns:
+        Dictionary containing:
+        - success: Whether the operation succeeded
+        - message: Success or error message
+        - tools: Names of the tools in the batch
+        - needs_compilation: Whether compilation is needed (if not auto-compiled)
+        - is_self_modification: Whether this is modifying universal-mcp-admin itself
+        
+    Example (Python):
+        inject_tools_batch(
+            "luthier-physics",
+            [
+                {"tool_name": "area", "tool_code": "@mcp.tool()\\ndef area(w: float, h: float) -> float:\\n    return w * h"},
+                {"tool_name": "volume", "tool_code": "@mcp.tool()\\ndef volume(w: float, h: float, d: float) -> float:\\n    return w * h * d"}
+            ]
+        )
+    """
+    is_self_modification = server_name == "universal-mcp-admin"
+    try:
+        success, message = mcp_manager.inject_tools_batch(
+            server_name, tools, auto_import=auto_import, validation_tier=validation_tier
+        )
+        names = [t.get("tool_name") if isinstance(t, dict) else t[0] for t in tools]
+        
+        if not success:
+            return {
+                "success": False,
+                "message": message,
+                "tools": names,
+                "is_self_modification": is_self_modification
+            }
+        
+        source_path = mcp_manager.find_server_source_file(server_name)
+        handler = mcp_manager.LANGUAGE_HANDLERS.get(source_path.suffix, {})
+        needs_compilation = handler.get('needs_compilation', False)
+        
+        result = {
+            "success": True,
+            "message": message,
+            "tools": names,
+            "needs_compilation": needs_compilation and not auto_compile,
+            "is_self_modification": is_self_modification
+        }
+        
+        if auto_compile and needs_compilation:
+            compile_result = compile_server(server_name, force=False)
+            result["compilation"] = compile_result
+            if not compile_result.get("success", False):
+                result["message"] += f" Warning: Compilation failed: {compile_result.get('message', 'Unknown error')}"
+        
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to inject tools: {str(e)}",
+            "is_self_modification": is_self_modification
+        }
+
+
 @mcp.tool()
 def patch_knowledge_file(
     file_path: str,
@@ -238,7 +353,7 @@ def patch_knowledge_file(
         - backup_path: Path to backup file (if created)
         
     Safety:
-        - Creates .bak backup before modification
+        - Stores a backup before modification (restorable with restore_backup)
         - Validates regex pattern before applying
         - Respects ALLOWED_ROOT_DIR restriction
         
@@ -272,6 +387,70 @@ def patch_knowledge_file(
         }
 
 
+@mcp.tool()
+def patch_project(
+    project_path: str,
+    rules: List[Dict[str, str]],
+    dry_run: bool = True,
+    server_name: Optional[str] = None,
+    description: str = "",
+    max_workers: int = 8,
+    allow_risky: bool = False
+) -> Dict[str, Any]:
+    """
+    Apply several regex rules across many files of a project in one call.
+    
+    Each rule is {"glob": ..., "pattern": ..., "replacement": ...}; globs are
+    relative to project_path ("**" spans directories, a glob without "/"
+    matches file names at any depth). Every matching file is read and scanned
+    once with a combined pattern of its rules, in a thread pool; scans run
+    in the regex sandbox with a per-file time budget.
+    
+    Run with dry_run=True (default) first to see the matches per file and
+    rule; with dry_run=False all changed files are saved in one checkpoint
+    and then written atomically. Files edited since the scan abort the
+    whole plan before anything is written.
+    
+    Args:
+        project_path: Project root directory
+        rules: List of {"glob", "pattern", "replacement"} objects; at each
+            position the first matching rule wins
+        dry_run: Only report what would change
+        server_name: Server to file the checkpoint under (defaults to the directory name)
+        description: Checkpoint description
+        max_workers: Threads reading and scanning files
+        allow_risky: Run rules whose patterns look prone to catastrophic
+            backtracking (rejected by default, listed under risky_rules)
+        
+    Returns:
+        Dictionary containing:
+        - success / message
+        - files_scanned, files_matched, total_matches, matches_by_rule
+        - files: Per-file match counts (by rule index) and line previews
+        - timed_out: Files whose scan ran over the budget (nothing is written
+          when this is not empty)
+        - checkpoint_id and files_written (when applied)
+        
+    Example:
+        Rename a helper across a project:
+        patch_project(
+            "/path/to/project",
+            [{"glob": "**/*.py", "pattern": "\\bold_helper\\b", "replacement": "new_helper"}],
+            dry_run=False
+        )
+    """
+    try:
+        return patch_plan.run_patch_plan(
+            project_path, rules, dry_run=dry_run, server_name=server_name,
+            description=description, max_workers=max_workers, allow_risky=allow_risky
+        )
+    except Exception as e:
+        return {
+            "success": False,
+            "message": f"Failed to run patch plan: {str(e)}"
+        }
+
+
 @mcp.tool()
 def compile_server(
     server_name: str,
@@ -556,8 +735,11 @@ def add_server_config(
         Dictionary with success status and message
     """
     try:
-        config_manager.add_server_config(server_name, command, args, cwd, env)
-        return {"success": True, "message": f"Server '{server_name}' added to config"}
+        warning = config_manager.add_server_config(server_name, command, args, cwd, env)
+        result: Dict[str, Any] = {"success": True, "message": f"Server '{server_name}' added to config"}
+        if warning:
+            result["warning"] = warning
+        return result
     except Exception as e:
         return {"success": False, "message": str(e)}
 
@@ -574,8 +756,11 @@ def remove_server_config(server_name: str) -> Dict[str, Any]:
         Dictionary with success status and the removed config
     """
     try:
-        removed = config_manager.remove_server_config(server_name)
-        return {"success": True, "message": f"Server '{server_name}' removed", "config": removed}
+        removed, warning = config_manager.remove_server_config(server_name)
+        result: Dict[str, Any] = {"success": True, "message": f"Server '{server_name}' removed", "config": removed}
+        if warning:
+            result["warning"] = warning
+        return result
     except Exception as e:
         return {"success": False, "message": str(e)}
 
@@ -596,8 +781,39 @@ def update_server(
         Dictionary with success status
     """
     try:
-        config_manager.update_server_config(server_name, updates)
-        return {"success": True, "message": f"Server '{server_name}' config updated"}
+        warning = config_manager.update_server_config(server_name, updates)
+        result: Dict[str, Any] = {"success": True, "message": f"Server '{server_name}' config updated"}
+        if warning:
+            result["warning"] = warning
+        return result
+    except Exception as e:
+        return {"success": False, "message": str(e)}
+
+
+@mcp.tool()
+def batch_update_config(operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply many config edits at once with a single validated, atomic write.
+
+    Operations are applied in order to an in-memory copy of the config.
+    If any operation fails or the resulting config is invalid, nothing is written.
+
+    Args:
+        operations: List of operation dictionaries, each with "op" and "server_name":
+            - {"op": "add", "server_name", "command", "args"?, "cwd"?, "env"?}
+            - {"op": "remove", "server_name"}
+            - {"op": "update", "server_name", "updates"}
+            - {"op": "enable", "server_name", "config"?}
+            - {"op": "disable", "server_name"}
+
+    Returns:
+        Dictionary with success status, per-operation results and whether the config was written
+    """
+    try:
+        result = config_manager.apply_config_operations(operations)
+        result["success"] = True
+        result["message"] = f"Applied {result['applied']} config operations"
+        return result
     except Exception as e:
         return {"success": False, "message": str(e)}
 
@@ -650,6 +866,48 @@ def modify_tool(
         return {"success": False, "message": str(e)}
 
 
+@mcp.tool()
+def edit_tools(
+    server_name: str,
+    operations: List[Dict[str, Any]],
+    auto_import: bool = False,
+    validation_tier: str = "full",
+) -> Dict[str, Any]:
+    """
+    Apply several inject/remove/replace/import operations to an MCP server's
+    source as one transaction.
+
+    The source is read once and the operations are queued in order against
+    it; the final text is validated once, written with one atomic write and
+    covered by one backup. If any operation fails (unknown tool, duplicate,
+    overlapping edits, invalid result) the file is left untouched.
+
+    Args:
+        server_name: Name of the server to modify
+        operations: List of {"op": "inject" | "remove" | "replace", "tool_name": "...",
+            "code": "..."} or {"op": "imports", "imports": ["import os", ...]}
+        auto_import: If True, add imports used by injected/replacement code
+        validation_tier: "fast" (parse-only) or "full" (default) validation
+
+    Returns:
+        Dictionary with success status, message and the number of operations
+
+    Example:
+        edit_tools("my-server", [
+            {"op": "remove", "tool_name": "old_tool"},
+            {"op": "replace", "tool_name": "area", "code": "@mcp.tool()\\ndef area(w: float) -> float:\\n    return w * w"},
+            {"op": "inject", "tool_name": "volume", "code": "@mcp.tool()\\ndef volume(w: float) -> float:\\n    return w ** 3"}
+        ])
+    """
+    try:
+        success, message = mcp_manager.apply_edit_session(
+            server_name, operations, auto_import=auto_import, validation_tier=validation_tier
+        )
+        return {"success": success, "message": message, "operations": len(operations)}
+    except Exception as e:
+        return {"success": False, "message": str(e)}
+
+
 # ============================================================================
 # Feature 3: Rollback / Backup Management
 # ============================================================================
@@ -691,7 +949,8 @@ def restore_backup(
         target_path: Optional override path to restore to
 
     Returns:
-        Dictionary with success status
+        Dictionary with success status; the message reports how long reading
+        the backup took and how many deltas were applied to rebuild it
     """
     try:
         bm = backup_manager.get_backup_manager()
@@ -706,16 +965,77 @@ def cleanup_backups(older_than_days: int = 30) -> Dict[str, Any]:
     """
     Clean up old backup files.
 
+    Backup contents are shared between identical backups, and successive
+    backups of a file are stored as deltas; stored data is deleted once no
+    remaining backup or checkpoint needs it.
+
     Args:
         older_than_days: Remove backups older than this many days
 
     Returns:
-        Dictionary with cleanup results
+        Dictionary with cleanup results, storage savings and restore latency
     """
     try:
         bm = backup_manager.get_backup_manager()
         removed, kept = bm.cleanup_backups(older_than_days=older_than_days)
-        return {"success": True, "removed": removed, "kept": kept}
+        return {"success": True, "removed": removed, "kept": kept, "storage": bm.get_storage_stats()}
+    except Exception as e:
+        return {"success": False, "message": str(e)}
+
+
+@mcp.tool()
+def list_config_history(
+    server_name: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """
+    List journaled changes to claude_desktop_config.json, newest first.
+
+    Args:
+        server_name: Only changes touching this server
+        since: ISO timestamp lower bound (e.g. "2024-05-01T00:00:00+00:00")
+        until: ISO timestamp upper bound
+        limit: Maximum number of entries to return
+
+    Returns:
+        Dictionary with change entries (seq, timestamp, servers, operation)
+    """
+    try:
+        bm = backup_manager.get_backup_manager()
+        changes = bm.list_config_changes(server_name, since, until, limit)
+        return {"success": True, "changes": changes, "count": len(changes)}
+    except Exception as e:
+        return {"success": False, "message": str(e)}
+
+
+@mcp.tool()
+def get_config_version(
+    seq: Optional[int] = None,
+    timestamp: Optional[str] = None,
+    restore: bool = False,
+) -> Dict[str, Any]:
+    """
+    Reconstruct (and optionally restore) a previous version of the config.
+
+    Args:
+        seq: Journal sequence number from list_config_history
+        timestamp: Alternatively, the version current at this ISO timestamp
+        restore: If True, write the reconstructed version back as the live config
+
+    Returns:
+        Dictionary with the reconstructed config and replay information
+    """
+    try:
+        bm = backup_manager.get_backup_manager()
+        config, info = bm.get_config_version(seq, timestamp)
+        result = {"success": True, "config": config, "info": info, "restored": restore}
+        if restore:
+            restored = config_manager.restore_config_version(info["seq"])
+            if restored.get("warning"):
+                result["warning"] = restored["warning"]
+        return result
     except Exception as e:
         return {"success": False, "message": str(e)}
 
@@ -762,7 +1082,9 @@ def add_imports(
         Dictionary with success status
     """
     try:
-        source_code, source_path = mcp_manager.read_source_file(server_name, max_chars=200000)
+        source_path = mcp_manager.find_server_source_file(server_name)
+        data, expected = file_locks.read_versioned(source_path)
+        source_code = data.decode('utf-8')
         extension = source_path.suffix
         missing = []
         existing = import_manager.extract_imports(source_code, extension)
@@ -774,10 +1096,12 @@ def add_imports(
         if not missing:
             return {"success": True, "message": "All imports already present", "added": []}
 
-        backup_path = mcp_manager.create_backup(source_path)
         new_source = import_manager.inject_imports(source_code, missing, extension)
-        with open(source_path, 'w', encoding='utf-8') as f:
-            f.write(new_source)
+        with file_locks.get_lock_manager().lock(source_path):
+            file_locks.check_unchanged(source_path, expected)
+            backup_path = mcp_manager.create_backup(source_path)
+            mcp_manager._register_backup(source_path, backup_path, "add_imports", server_name)
+            atomic_io.atomic_write_text(source_path, new_source)
         return {"success": True, "message": f"Added {len(missing)} imports", "added": missing, "backup": str(backup_path)}
     except Exception as e:
         return {"success": False, "message": str(e)}
@@ -800,15 +1124,14 @@ def list_server_tools(server_name: str) -> Dict[str, Any]:
         Dictionary with list of tools and their metadata
     """
     try:
-        source_code, source_path = mcp_manager.read_source_file(server_name, max_chars=200000)
-        extension = source_path.suffix
-        tools = tool_analyzer.list_tools_in_source(source_code, extension)
+        entry = source_index.get_source_index().get_entry(server_name)
+        tools = entry["tools"]
         return {
             "success": True,
             "server_name": server_name,
             "tools": tools,
             "count": len(tools),
-            "language": extension,
+            "language": entry["language"],
         }
     except Exception as e:
         return {"success": False, "message": str(e)}
@@ -827,9 +1150,8 @@ def inspect_tool(server_name: str, tool_name: str) -> Dict[str, Any]:
         Dictionary with tool signature, parameters, docstring, etc.
     """
     try:
-        source_code, source_path = mcp_manager.read_source_file(server_name, max_chars=200000)
-        extension = source_path.suffix
-        sig = tool_analyzer.get_tool_signature(tool_name, source_code, extension)
+        entry = source_index.get_source_index().get_entry(server_name)
+        sig = next((t for t in entry["tools"] if t["name"] == tool_name), None)
         if sig is None:
             return {"success": False, "message": f"Tool '{tool_name}' not found in {server_name}"}
         return {"success": True, "tool": sig}
@@ -850,19 +1172,36 @@ def compare_servers(server_name1: str, server_name2: str) -> Dict[str, Any]:
         Dictionary with comparison results
     """
     try:
-        src1, path1 = mcp_manager.read_source_file(server_name1, max_chars=200000)
-        src2, path2 = mcp_manager.read_source_file(server_name2, max_chars=200000)
-        ext1 = path1.suffix
-        ext2 = path2.suffix
+        index = source_index.get_source_index()
+        entry1 = index.get_entry(server_name1)
+        entry2 = index.get_entry(server_name2)
+        ext1 = entry1["language"]
+        ext2 = entry2["language"]
         if ext1 != ext2:
             return {"success": False, "message": f"Language mismatch: {ext1} vs {ext2}"}
-        result = tool_analyzer.compare_tools(src1, src2, ext1)
+        result = tool_analyzer.compare_tool_lists(entry1["tools"], entry2["tools"])
         result["success"] = True
         return result
     except Exception as e:
         return {"success": False, "message": str(e)}
 
 
+@mcp.tool()
+def resolve_source_files() -> Dict[str, Any]:
+    """
+    Resolve the source file of every configured server in one pass.
+
+    Returns:
+        Dictionary mapping each server to its source path and how it was found
+        (method, command, arg_index), or to an error message
+    """
+    try:
+        results = mcp_manager.resolve_all_source_files()
+        return {"success": True, "servers": results, "count": len(results)}
+    except Exception as e:
+        return {"success": False, "message": str(e)}
+
+
 # ============================================================================
 # Feature 6: Multi-file Support
 # ============================================================================
@@ -949,6 +1288,7 @@ def inject_into_module(
 def validate_tool_code(
     server_name: str,
     tool_code: str,
+    validation_tier: str = "full",
 ) -> Dict[str, Any]:
     """
     Validate tool code before injection (signature, syntax, compatibility).
@@ -956,6 +1296,7 @@ def validate_tool_code(
     Args:
         server_name: Target server name (used to determine language)
         tool_code: The tool code to validate
+        validation_tier: "fast" (parse-only, never executes code) or "full"
 
     Returns:
         Dictionary with validation results
@@ -965,12 +1306,19 @@ def validate_tool_code(
         extension = source_path.suffix
         sig_result = tool_tester.validate_tool_signature(tool_code, extension)
 
+        syntax: Dict[str, Any] = {"tier": validation_tier}
+        handler = mcp_manager.LANGUAGE_HANDLERS.get(extension)
+        if handler is not None:
+            is_valid, error_msg = handler['validate'](tool_code, tier=validation_tier)
+            syntax.update({"valid": is_valid, "error": error_msg})
+
         source_code, _ = mcp_manager.read_source_file(server_name, max_chars=200000)
         compat = tool_tester.check_tool_compatibility(source_code, tool_code, extension)
 
         return {
             "success": True,
             "signature": sig_result,
+            "syntax": syntax,
             "compatibility": compat,
         }
     except Exception as e:
@@ -1115,10 +1463,9 @@ def list_server_resources(server_name: str) -> Dict[str, Any]:
         Dictionary with list of resources
     """
     try:
-        source_code, source_path = mcp_manager.read_source_file(server_name, max_chars=200000)
-        extension = source_path.suffix
-        resources = resource_discovery.list_mcp_resources(source_code, extension)
-        prompts = resource_discovery.list_mcp_prompts(source_code, extension)
+        entry = source_index.get_source_index().get_entry(server_name)
+        resources = entry["resources"]
+        prompts = entry["prompts"]
         return {
             "success": True,
             "resources": resources,
@@ -1205,7 +1552,9 @@ def search_logs(
 
     Args:
         server_name: Optional filter by server name
-        pattern: Regex pattern to search for
+        pattern: Regex pattern to search for (runs in the regex sandbox under
+            a time budget; a pattern that exceeds it returns the matches found
+            so far with timed_out set)
 
     Returns:
         Dictionary with matching log lines
@@ -1285,6 +1634,20 @@ def get_server_info(server_name: str) -> Dict[str, Any]:
     return server_monitor.get_server_info(server_name)
 
 
+@mcp.tool()
+def validate_fleet() -> Dict[str, Any]:
+    """
+    Health-check every configured MCP server in parallel.
+
+    For each server verifies the config shape, that the command is on PATH,
+    that cwd exists, and that the source file resolves.
+
+    Returns:
+        Dictionary with an overall summary and a per-server report with timings
+    """
+    return server_monitor.validate_fleet()
+
+
 # ============================================================================
 # Feature 12: Version Control Integration
 # ============================================================================
@@ -1472,6 +1835,40 @@ def export_rag_data(
     )
 
 
+# ============================================================================
+# Feature 14: Performance & Caching
+# ============================================================================
+
+
+@mcp.tool()
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Report hit/miss counters for the admin server's internal caches.
+
+    Returns:
+        Dictionary with per-cache statistics (hits, misses, hit_rate, entries)
+    """
+    try:
+        return {
+            "success": True,
+            "config": config_manager.get_config_cache_stats(),
+            "source_resolution": mcp_manager.get_source_cache_stats(),
+            "source_index": source_index.get_source_index().get_stats(),
+            "validator_pool": validator_pool.get_validator_pool().get_stats(),
+            "regex_sandbox": regex_sandbox.get_regex_sandbox().get_stats(),
+            "validation": validation_cache.get_validation_cache().get_stats(),
+            "delimiter_precheck": delimiter_lexer.get_gate_stats(),
+            "splice_validation": splice_validator.get_validation_watermarks().get_stats(),
+            "backup_blobs": backup_manager.get_backup_manager().blobs.get_stats(),
+            "atomic_writes": atomic_io.get_write_stats(),
+            "file_locks": file_locks.get_lock_manager().get_stats(),
+            "symbol_scanner": symbol_scanner.get_scanner_stats(),
+            "tool_spans": tool_spans.get_span_stats(),
+        }
+    except Exception as e:
+        return {"success": False, "message": str(e)}
+
+
 if __name__ == "__main__":
     # Run the MCP server
     mcp.run()
@@ -4,12 +4,17 @@ server_monitor.py - Server lifecycle management: status checking, enable/disable
 
 import os
 import re
+import shutil
 import signal
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import config_manager
+import mcp_manager
 
 
 def check_server_status(server_name: str) -> Dict[str, Any]:
@@ -75,11 +80,14 @@ def list_server_statuses() -> List[Dict[str, Any]]:
 def enable_server(server_name: str) -> Dict[str, Any]:
     """Enable a server in the configuration."""
     try:
-        config_manager.enable_server(server_name)
-        return {
+        warning = config_manager.enable_server(server_name)
+        result: Dict[str, Any] = {
             "success": True,
             "message": f"Server '{server_name}' enabled",
         }
+        if warning:
+            result["warning"] = warning
+        return result
     except Exception as e:
         return {
             "success": False,
@@ -90,12 +98,15 @@ def enable_server(server_name: str) -> Dict[str, Any]:
 def disable_server(server_name: str) -> Dict[str, Any]:
     """Disable a server in the configuration."""
     try:
-        removed = config_manager.disable_server(server_name)
-        return {
+        removed, warning = config_manager.disable_server(server_name)
+        result: Dict[str, Any] = {
             "success": True,
             "message": f"Server '{server_name}' disabled (config preserved)",
             "config": removed,
         }
+        if warning:
+            result["warning"] = warning
+        return result
     except Exception as e:
         return {
             "success": False,
@@ -130,3 +141,134 @@ def get_server_info(server_name: str) -> Dict[str, Any]:
         info["env_vars"] = list(env.keys())
 
     return info
+
+
+# ============================================================================
+# Fleet Health Check
+# ============================================================================
+
+
+class _FleetProbe:
+    """
+    Per-run memo of filesystem lookups shared by all fleet workers.
+
+    shutil.which results are cached per (command, PATH value) and directory
+    stats per path, so servers sharing an interpreter or project directory
+    cost one lookup between them. Lookups are idempotent, so concurrent
+    misses on the same key only duplicate work; the counters are locked.
+    """
+
+    def __init__(self) -> None:
+        self._which: Dict[Tuple[str, str], Optional[str]] = {}
+        self._dirs: Dict[str, bool] = {}
+        self._stats_lock = threading.Lock()
+        self.stats = {"which_hits": 0, "which_misses": 0, "stat_hits": 0, "stat_misses": 0}
+
+    def _count(self, counter: str) -> None:
+        with self._stats_lock:
+            self.stats[counter] += 1
+
+    def which(self, command: str, path_value: str) -> Optional[str]:
+        key = (command, path_value)
+        if key in self._which:
+            self._count("which_hits")
+            return self._which[key]
+        self._count("which_misses")
+        found = shutil.which(command, path=path_value)
+        self._which[key] = found
+        return found
+
+    def is_dir(self, path: str) -> bool:
+        if path in self._dirs:
+            self._count("stat_hits")
+            return self._dirs[path]
+        self._count("stat_misses")
+        result = os.path.isdir(path)
+        self._dirs[path] = result
+        return result
+
+
+def _check_fleet_server(
+    probe: _FleetProbe, server_name: str, config: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Run all health checks for one server config entry."""
+    started = time.perf_counter()
+    errors: List[str] = []
+    checks: Dict[str, Any] = {}
+
+    is_valid, error = config_manager.validate_server_config(config)
+    checks["config"] = {"ok": is_valid, "message": error}
+    if not is_valid:
+        errors.append(f"config: {error}")
+
+    cwd = config.get("cwd", "") if isinstance(config, dict) else ""
+    if cwd:
+        cwd_ok = probe.is_dir(cwd)
+        checks["cwd"] = {"ok": cwd_ok, "path": cwd}
+        if not cwd_ok:
+            errors.append(f"cwd: directory not found: {cwd}")
+
+    command = config.get("command", "") if isinstance(config, dict) else ""
+    if command:
+        env = config.get("env") or {}
+        path_value = env.get("PATH") if isinstance(env, dict) and env.get("PATH") else os.environ.get("PATH", "")
+        if os.sep in command or (os.altsep and os.altsep in command):
+            candidate = Path(cwd or ".") / command
+            resolved = str(candidate) if os.access(candidate, os.X_OK) and candidate.is_file() else None
+        else:
+            resolved = probe.which(command, path_value)
+        checks["command"] = {"ok": resolved is not None, "command": command, "resolved": resolved}
+        if resolved is None:
+            errors.append(f"command: '{command}' not found on PATH")
+
+        try:
+            source_path = mcp_manager.resolve_server_source_file(server_name, config)
+            checks["source"] = {"ok": True, "path": str(source_path)}
+        except mcp_manager.NoLocalSourceError:
+            # Package runners (npx -y <pkg>, uvx <pkg>, ...) have no local source to check
+            checks["source"] = {"ok": True, "applicable": False, "message": "No local source file (package or binary)"}
+        except Exception as e:
+            checks["source"] = {"ok": False, "message": str(e)}
+            errors.append(f"source: {e}")
+
+    return {
+        "server_name": server_name,
+        "healthy": not errors,
+        "checks": checks,
+        "errors": errors,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def validate_fleet(max_workers: int = 16) -> Dict[str, Any]:
+    """
+    Health-check every configured server in parallel.
+
+    Checks config shape, that the command resolves on PATH (honouring a
+    per-server env PATH), that cwd exists, and that the source file resolves.
+    The config is read once and shared by all workers.
+    """
+    started = time.perf_counter()
+    try:
+        config = config_manager.read_config()
+    except Exception as e:
+        return {"success": False, "message": f"Failed to read config: {e}"}
+
+    servers = list(config.get("mcpServers", {}).items())
+    probe = _FleetProbe()
+    if servers:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(servers)))) as pool:
+            reports = list(pool.map(lambda item: _check_fleet_server(probe, item[0], item[1]), servers))
+    else:
+        reports = []
+
+    unhealthy = [r["server_name"] for r in reports if not r["healthy"]]
+    return {
+        "success": True,
+        "server_count": len(reports),
+        "healthy": len(reports) - len(unhealthy),
+        "unhealthy": unhealthy,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        "lookup_stats": probe.stats,
+        "servers": reports,
+    }
@@ -0,0 +1,193 @@
+"""
+source_index.py - Persistent per-server source index for analysis tools
+"""
+
+import copy
+import hashlib
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import mcp_manager
+from atomic_io import atomic_write_text
+import resource_discovery
+import tool_analyzer
+
+# Bump when the shape of extracted spans changes so stale entries are rebuilt
+INDEX_VERSION = 1
+
+
+class SourceIndex:
+    """
+    On-disk index of each server's resolved source file and extracted spans.
+
+    Each entry records the source path, size, mtime, sha256, language and
+    the tools/resources/prompts extracted from it. A lookup costs one stat
+    when the file is unchanged; the file is re-read only when size or mtime
+    differ, and spans are re-extracted only when the content hash differs.
+    """
+
+    def __init__(self, index_file: Optional[Path] = None):
+        if index_file is None:
+            cache_dir = Path.home() / ".cache" / "universal-mcp-admin"
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            index_file = cache_dir / "source_index.json"
+        self.index_file = Path(index_file)
+        self._lock = threading.Lock()
+        self._index: Dict[str, Any] = self._load_index()
+        self.stats = {"hits": 0, "rehashed": 0, "rebuilt": 0, "saves": 0, "save_failures": 0}
+        self.last_save_error: Optional[str] = None
+
+    def _load_index(self) -> Dict[str, Any]:
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    return data
+            except (OSError, ValueError):
+                pass
+        return {"version": INDEX_VERSION, "servers": {}}
+
+    def _save_index(self) -> None:
+        """
+        Persist the index. Called with the lock held and only after a change.
+        A failed write keeps the in-memory index, counts the failure and
+        reports it on stderr and in get_stats().
+        """
+        try:
+            atomic_write_text(self.index_file, json.dumps(self._index), fsync=False)
+            self.stats["saves"] += 1
+            self.last_save_error = None
+        except Exception as e:
+            self.stats["save_failures"] += 1
+            self.last_save_error = f"{type(e).__name__}: {e}"
+            print(f"universal-mcp-admin: cannot write {self.index_file}: {self.last_save_error}", file=sys.stderr)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get_entry(self, server_name: str) -> Dict[str, Any]:
+        """
+        Return the index entry for a server, rebuilding it if the file changed.
+        The entry is a copy; changing it does not affect the index.
+
+        Raises:
+            ValueError / FileNotFoundError: If the source file cannot be resolved
+        """
+        source_path = mcp_manager.find_server_source_file(server_name)
+        st = os.stat(source_path)
+
+        with self._lock:
+            entry = self._index["servers"].get(server_name)
+            if self._is_current(entry, source_path, st):
+                self.stats["hits"] += 1
+                return copy.deepcopy(entry)
+
+        return self._update(server_name, source_path, st, *_read_with_hash(source_path))
+
+    def read_source(self, server_name: str) -> Tuple[Dict[str, Any], str, Path]:
+        """
+        Return (entry, source text, source path) from a single read of the
+        file; the entry is refreshed from the same bytes if the file changed.
+        The entry is a copy, as in get_entry.
+
+        Raises:
+            ValueError / FileNotFoundError: If the source file cannot be resolved
+        """
+        source_path = mcp_manager.find_server_source_file(server_name)
+        st = os.stat(source_path)
+        source_code, digest = _read_with_hash(source_path)
+
+        with self._lock:
+            entry = self._index["servers"].get(server_name)
+            if self._is_current(entry, source_path, st) and entry["sha256"] == digest:
+                self.stats["hits"] += 1
+                return copy.deepcopy(entry), source_code, source_path
+
+        return self._update(server_name, source_path, st, source_code, digest), source_code, source_path
+
+    @staticmethod
+    def _is_current(entry: Optional[Dict[str, Any]], source_path: Path, st: os.stat_result) -> bool:
+        return (
+            entry is not None
+            and entry["source_path"] == str(source_path)
+            and entry["size"] == st.st_size
+            and entry["mtime_ns"] == st.st_mtime_ns
+        )
+
+    def _update(
+        self, server_name: str, source_path: Path, st: os.stat_result, source_code: str, digest: str
+    ) -> Dict[str, Any]:
+        """Refresh or rebuild a server's entry from freshly read source; returns a copy."""
+        language = source_path.suffix
+
+        with self._lock:
+            entry = self._index["servers"].get(server_name)
+            if entry is not None and entry["sha256"] == digest and entry["language"] == language:
+                # Touched but unchanged: refresh the stat fields only
+                entry.update({"source_path": str(source_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns})
+                self.stats["rehashed"] += 1
+            else:
+                entry = {
+                    "source_path": str(source_path),
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                    "sha256": digest,
+                    "language": language,
+                    "line_count": source_code.count('\n') + 1,
+                    "tools": tool_analyzer.list_tools_in_source(source_code, language),
+                    "resources": resource_discovery.list_mcp_resources(source_code, language),
+                    "prompts": resource_discovery.list_mcp_prompts(source_code, language),
+                    "indexed_at": datetime.now(timezone.utc).isoformat(),
+                }
+                self.stats["rebuilt"] += 1
+            self._index["servers"][server_name] = entry
+            self._save_index()
+            return copy.deepcopy(entry)
+
+    def invalidate(self, server_name: Optional[str] = None) -> None:
+        """Drop one server's entry, or the whole index."""
+        with self._lock:
+            servers = self._index["servers"]
+            if not servers or (server_name is not None and server_name not in servers):
+                return
+            if server_name is None:
+                servers.clear()
+            else:
+                del servers[server_name]
+            self._save_index()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return lookup counters and the number of indexed servers."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["entries"] = len(self._index["servers"])
+            stats["last_save_error"] = self.last_save_error
+        lookups = stats["hits"] + stats["rehashed"] + stats["rebuilt"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def _read_with_hash(path: Path) -> Tuple[str, str]:
+    """Read a source file and return (text, sha256 of its bytes)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return data.decode('utf-8', errors='replace'), hashlib.sha256(data).hexdigest()
+
+
+# Global index instance
+_source_index: Optional[SourceIndex] = None
+
+
+def get_source_index() -> SourceIndex:
+    """Get or create the global SourceIndex instance."""
+    global _source_index
+    if _source_index is None:
+        _source_index = SourceIndex()
+    return _source_index
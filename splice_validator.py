@@ -0,0 +1,241 @@
+"""
+splice_validator.py - Incremental validation of code appended to validated files
+"""
+
+import hashlib
+import json
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from atomic_io import atomic_write_text
+from delimiter_lexer import LEXER_PROFILES, LexError, iter_delimiters
+
+# Snippet constructs that are valid alone but not once appended after
+# existing declarations (file headers, imports that must come first, ...)
+_SPLICE_BLOCKERS: Dict[str, List[Tuple["re.Pattern[str]", str]]] = {}
+for _exts, _rules in (
+    (('.py',), [(r'^\s*from\s+__future__\s+import\b', "from __future__ imports must be first")]),
+    (('.go',), [(r'^\s*package\s', "package clause"), (r'^\s*import\b', "imports must precede declarations")]),
+    (('.java',), [(r'^\s*package\s', "package declaration"), (r'^\s*import\s', "imports must precede declarations")]),
+    (('.kt', '.kts'), [(r'^\s*package\s', "package declaration"), (r'^\s*import\s', "imports must precede declarations")]),
+    (('.scala',), [(r'^\s*package\s', "package clause")]),
+    (('.dart',), [(r'^\s*(?:library|part\s+of)\b', "library directive"), (r'^\s*(?:import|export|part)\s', "directives must precede declarations")]),
+    (('.hs',), [(r'^\s*module\s', "module header"), (r'^\s*import\s', "imports must precede declarations")]),
+    (('.d',), [(r'^\s*module\s', "module declaration")]),
+    (('.php',), [(r'<\?php|\?>', "PHP open/close tags"), (r'^\s*namespace\s', "namespace declaration")]),
+    (('.rs',), [(r'^\s*#!\[', "inner attributes must be first")]),
+):
+    for _ext in _exts:
+        _SPLICE_BLOCKERS[_ext] = [(re.compile(pattern, re.MULTILINE), reason) for pattern, reason in _rules]
+
+# File endings after which appended code would not be parsed as code
+_END_MARKERS: Dict[str, "re.Pattern[str]"] = {
+    '.rb': re.compile(r'^__END__\s*$', re.MULTILINE),
+    '.cr': re.compile(r'^__END__\s*$', re.MULTILINE),
+    '.raku': re.compile(r'^=finish\b', re.MULTILINE),
+    '.rakumod': re.compile(r'^=finish\b', re.MULTILINE),
+    '.pm6': re.compile(r'^=finish\b', re.MULTILINE),
+}
+
+
+def splice_blockers(tool_code: str, language: str) -> List[str]:
+    """Reasons the snippet cannot be validated on its own as an append."""
+    return [reason for pattern, reason in _SPLICE_BLOCKERS.get(language, ()) if pattern.search(tool_code)]
+
+
+def file_end_state(source_code: str, language: str) -> Tuple[bool, str]:
+    """
+    Check that the file ends in top-level context: no open bracket, string
+    or comment, and no end-of-code marker (Ruby __END__, PHP ?> HTML mode).
+
+    Returns:
+        Tuple of (at_top_level, reason)
+    """
+    marker = _END_MARKERS.get(language)
+    if marker is not None and marker.search(source_code):
+        return False, "file has an end-of-code marker"
+    if language == '.php' and source_code.rfind('?>') > source_code.rfind('<?php'):
+        return False, "file ends in HTML mode"
+    if language in LEXER_PROFILES:
+        try:
+            for _ in iter_delimiters(source_code, language):
+                pass
+        except LexError as e:
+            return False, f"file does not end at top level ({e.message})"
+    return True, ""
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ValidationWatermarks:
+    """
+    Per-file record of the last content (by sha256) known to validate.
+
+    An entry stores the validation tier that produced it; a "full" request
+    only trusts "full" watermarks, a "fast" request trusts either.
+    """
+
+    def __init__(self, watermark_file: Optional[Path] = None, max_files: int = 500):
+        if watermark_file is None:
+            cache_dir = Path.home() / ".cache" / "universal-mcp-admin"
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            watermark_file = cache_dir / "validation_watermarks.json"
+        self.watermark_file = Path(watermark_file)
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._marks: Dict[str, Dict[str, Any]] = self._load_marks()
+        self.stats = {"incremental": 0, "full": 0, "recorded": 0, "saves": 0, "save_failures": 0}
+
+    def _load_marks(self) -> Dict[str, Dict[str, Any]]:
+        if self.watermark_file.exists():
+            try:
+                with open(self.watermark_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, Exception):
+                pass
+        return {}
+
+    def _save_marks(self) -> None:
+        """
+        Persist the watermarks. Called with the lock held. A failed write
+        keeps the in-memory marks, counts the failure and reports it on stderr.
+        """
+        try:
+            atomic_write_text(self.watermark_file, json.dumps(self._marks), fsync=False)
+            self.stats["saves"] += 1
+        except Exception as e:
+            self.stats["save_failures"] += 1
+            print(f"universal-mcp-admin: cannot write {self.watermark_file}: {e}", file=sys.stderr)
+
+    def accepts_append(self, path: Path, tier: str) -> bool:
+        """
+        True if the file's current content carries a usable watermark whose
+        recorded lexical end state is top level.
+        """
+        with self._lock:
+            mark = self._marks.get(str(path))
+        if mark is None or not mark.get("top_level"):
+            return False
+        if tier == "full" and mark.get("tier") != "full":
+            return False
+        try:
+            return mark["sha256"] == _file_sha256(path)
+        except OSError:
+            return False
+
+    def record(self, path: Path, tier: str) -> None:
+        """
+        Mark the file's current content as validated at the given tier.
+
+        Called after a validated snippet was appended. If the previous
+        watermark covers an unchanged prefix that ended at top level, the
+        end state carries over without re-lexing the file.
+        """
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return
+        with self._lock:
+            previous = self._marks.get(str(path))
+        if (
+            previous is not None
+            and previous.get("top_level")
+            and previous.get("size", -1) <= len(data)
+            and hashlib.sha256(data[:previous["size"]]).hexdigest() == previous["sha256"]
+        ):
+            top_level = True
+        else:
+            top_level, _ = file_end_state(data.decode('utf-8', errors='replace'), path.suffix)
+        with self._lock:
+            self._marks.pop(str(path), None)
+            self._marks[str(path)] = {
+                "sha256": hashlib.sha256(data).hexdigest(),
+                "size": len(data),
+                "tier": tier,
+                "top_level": top_level,
+                "validated_at": datetime.now(timezone.utc).isoformat(),
+            }
+            while len(self._marks) > self.max_files:
+                self._marks.pop(next(iter(self._marks)))
+            self.stats["recorded"] += 1
+            self._save_marks()
+
+    def note_check(self, incremental: bool) -> None:
+        with self._lock:
+            self.stats["incremental" if incremental else "full"] += 1
+
+    def forget(self, path: Path) -> None:
+        with self._lock:
+            if self._marks.pop(str(path), None) is not None:
+                self._save_marks()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["files"] = len(self._marks)
+        checks = stats["incremental"] + stats["full"]
+        stats["incremental_rate"] = round(stats["incremental"] / checks, 4) if checks else 0.0
+        return stats
+
+
+def validate_splice(
+    source_path: Path,
+    tool_code: str,
+    validate: Callable[..., Tuple[bool, str]],
+    tier: str = "full",
+    source_code: Optional[str] = None,
+) -> Tuple[bool, str]:
+    """
+    Check that appending tool_code (after a blank line) keeps the file valid.
+
+    If the file's current content (by sha256) carries a watermark recorded at
+    top level and the snippet has no constructs that are only legal at the
+    top of a file, the already-validated snippet is enough and the combined
+    file is not re-parsed. Otherwise the combined file goes through
+    ``validate``; callers record a new watermark after writing.
+
+    Args:
+        source_path: File the snippet will be appended to
+        tool_code: Snippet, already validated on its own
+        validate: The language's ``validate_*_code`` function
+        tier: Validation tier
+        source_code: Current file content, if the caller already read it
+
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    watermarks = get_validation_watermarks()
+    language = source_path.suffix
+
+    if not splice_blockers(tool_code, language) and watermarks.accepts_append(source_path, tier):
+        watermarks.note_check(incremental=True)
+        return True, ""
+
+    watermarks.note_check(incremental=False)
+    if source_code is None:
+        source_code = source_path.read_text(encoding='utf-8')
+    return validate(source_code + "\n\n" + tool_code, tier=tier)
+
+
+# Global watermark store
+_validation_watermarks: Optional[ValidationWatermarks] = None
+_validation_watermarks_lock = threading.Lock()
+
+
+def get_validation_watermarks() -> ValidationWatermarks:
+    """Get or create the global ValidationWatermarks instance."""
+    global _validation_watermarks
+    with _validation_watermarks_lock:
+        if _validation_watermarks is None:
+            _validation_watermarks = ValidationWatermarks()
+    return _validation_watermarks
@@ -0,0 +1,222 @@
+"""
+symbol_scanner.py - One-pass extraction of defined tool/function names per language
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
+
+# Definition forms per language. Alternatives capture defined names and end
+# right after the last one (trailing context is a lookahead), so consecutive
+# definitions are never swallowed by one match. Every group that took part in
+# a match is a name.
+_JS_FORMS = [
+    r'\.tool\(\s*["\']?([^"\'\s,)]+)',           # .tool("name" / .tool(name
+    r'\bname:\s*["\']([^"\'\n]+)["\']',          # name: "name"
+    r'\bfunction\s+(\w+)(?=\s*\()',              # [async|export] function name(
+]
+_JAVA_LIKE_METHOD = r'\b(?:{mods})\s+(?:[\w<>\[\],.?]+\s+)*?(\w+)(?=\s*\()'
+_TYPE_DECL = r'\b(?:{kinds})\s+(\w+)(?=\s)'
+
+_SYMBOL_FORMS: Dict[Tuple[str, ...], List[str]] = {
+    ('.py',): [
+        # @mcp.tool(["name"])\n[async ]def name
+        r'@\w+\.tool\(\s*(?:(?:name\s*=\s*)?["\']([^"\'\n]+)["\'])?[^)\n]*\)\s*\n\s*(?:async\s+)?def\s+(\w+)',
+        r'@\w+\.tool\(\s*(?:name\s*=\s*)?["\']([^"\'\n]+)["\']',   # @mcp.tool("name")
+        r'\bdef\s+(\w+)(?=\s*\([^)]*\)\s*->)',                      # def name(...) ->
+    ],
+    ('.js',): _JS_FORMS + [r'\bconst\s+(\w+)(?=\s*=)'],
+    ('.ts',): _JS_FORMS + [r'\bconst\s+(\w+)(?=\s*[:=])'],
+    ('.rs',): [
+        r'#\[mcp::tool\(name\s*=\s*["\']([^"\'\n]+)["\']',
+        r'\bfn\s+(\w+)(?=\s*\()',
+    ],
+    ('.c',): [r'\b(\w+)(?=\s*\()'],
+    ('.cpp', '.cc', '.cxx'): [
+        r'\b(?:void|int|auto)\s+(\w+)(?=\s*\()',
+        r'\bstd::[\w:<>, *&]*?[ \t*&](\w+)(?=\s*\()',
+        r'\bclass\s+(\w+)',
+    ],
+    ('.go',): [
+        r'\bfunc\s+(?:\([^)]*\)\s*)?(\w+)(?=\s*\()',
+        r'\b(?:var|const)\s+(\w+)(?=\s*=)',
+    ],
+    ('.zig',): [
+        r'\bfn\s+(\w+)(?=\s*\()',
+        r'\b(?:const|var)\s+(\w+)(?=\s*=)',
+    ],
+    ('.java',): [
+        _JAVA_LIKE_METHOD.format(mods='public|private|protected|static'),
+        _TYPE_DECL.format(kinds='class|interface'),
+    ],
+    ('.cs',): [
+        _JAVA_LIKE_METHOD.format(mods='public|private|protected|internal|static'),
+        _TYPE_DECL.format(kinds='class|interface'),
+    ],
+    ('.rb',): [
+        r'\bdef\s+((?:self\.)?\w+)(?=\s*[(\n])',
+        _TYPE_DECL.format(kinds='class|module'),
+    ],
+    ('.kt', '.kts'): [
+        r'\bfun\s+(\w+)(?=\s*\()',
+        _TYPE_DECL.format(kinds='class'),
+        r'\b(?:val|var)\s+(\w+)(?=\s*[=:])',
+    ],
+    ('.swift',): [
+        r'\bfunc\s+(\w+)(?=\s*\()',
+        _TYPE_DECL.format(kinds='class|struct'),
+        r'\b(?:let|var)\s+(\w+)(?=\s*[=:])',
+    ],
+    ('.php',): [
+        r'\bfunction\s+(\w+)(?=\s*\()',
+        _TYPE_DECL.format(kinds='class'),
+    ],
+    ('.lua',): [
+        r'\bfunction\s+([\w.:]+)(?=\s*\()',
+        r'\b([\w.:]+)(?=\s*=\s*function\s*\()',
+    ],
+    ('.scala',): [
+        r'\bdef\s+(\w+)(?=\s*[(\[])',
+        _TYPE_DECL.format(kinds='class|object'),
+        r'\bval\s+(\w+)(?=\s*[=:])',
+    ],
+    ('.ex', '.exs'): [
+        r'\bdefp?\s+(\w+[?!]?)(?=\s*[(,]|\s+do\b)',
+        r'\bdefmodule\s+([\w.]+)(?=\s)',
+    ],
+    ('.dart',): [
+        r'\b\w+\s+(\w+)(?=\s*\()',
+        _TYPE_DECL.format(kinds='class'),
+        r'\b(?:var|final)\s+(\w+)(?=\s*=)',
+    ],
+    ('.hs',): [r'^(\S+)(?=\s)'],
+    ('.ml', '.mli'): [
+        r'\blet\s+(\w+)(?=\s)',
+        _TYPE_DECL.format(kinds='module'),
+        r'\bval\s+(\w+)(?=\s*:)',
+    ],
+    ('.nim',): [
+        r'\b(?:proc|func)\s+(\w+)(?=\s*[(*])',
+        _TYPE_DECL.format(kinds='type'),
+    ],
+    ('.d',): [
+        r'\b\w+\s+(\w+)(?=\s*\()',
+        _TYPE_DECL.format(kinds='class|struct'),
+    ],
+    ('.cr',): [
+        r'\bdef\s+(\w+)(?=\s*[(\n])',
+        _TYPE_DECL.format(kinds='class|module'),
+    ],
+    ('.raku', '.rakumod', '.pm6'): [
+        r'\b(?:sub|method)\s+([\w-]+)(?=[\s(])',
+        r'\b(?:class|module)\s+([\w:]+)(?=\s)',
+    ],
+    ('.jl',): [
+        r'\bfunction\s+([\w.!]+)(?=\s*[(\n])',
+        r'\b([\w.!]+)(?=\s*\([^)]*\)\s*=)',                         # short-form f(x) = ...
+        _TYPE_DECL.format(kinds='struct|module'),
+    ],
+}
+
+# Languages whose dotted names (M.f, M:f, self.f) also define the last component
+_DOTTED_NAMES = {'.lua', '.rb'}
+
+
+def _compile_scanner(forms: List[str]) -> "re.Pattern[str]":
+    return re.compile("|".join(f"(?:{form})" for form in forms), re.MULTILINE)
+
+
+# Built once at import: extension -> combined pattern
+SYMBOL_SCANNERS: Dict[str, "re.Pattern[str]"] = {
+    ext: _compile_scanner(forms) for exts, forms in _SYMBOL_FORMS.items() for ext in exts
+}
+
+_TEXT_CACHE_MAX = 8
+_FILE_CACHE_MAX = 256
+_text_cache: "OrderedDict[Tuple[str, str], FrozenSet[str]]" = OrderedDict()
+_file_cache: "OrderedDict[str, Tuple[Tuple[int, int], FrozenSet[str]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"scans": 0, "text_hits": 0, "file_hits": 0, "file_scans": 0}
+
+
+def _scan(code: str, language: str) -> FrozenSet[str]:
+    names = set()
+    for match in SYMBOL_SCANNERS[language].finditer(code):
+        names.update(name for name in match.groups() if name)
+    if language in _DOTTED_NAMES:
+        names.update(re.split(r'[.:]', name)[-1] for name in list(names))
+    with _cache_lock:
+        _stats["scans"] += 1
+    return frozenset(names)
+
+
+def extract_symbols(code: str, language: str) -> FrozenSet[str]:
+    """
+    All tool/function/type names defined in ``code``, found in one regex pass.
+
+    Results for the most recent texts are memoised, so checking many names
+    against the same source string scans it once.
+
+    Raises:
+        KeyError: If the language has no scanner
+    """
+    if language not in SYMBOL_SCANNERS:
+        raise KeyError(f"No symbol scanner for {language}")
+    key = (language, code)
+    with _cache_lock:
+        cached = _text_cache.get(key)
+        if cached is not None:
+            _text_cache.move_to_end(key)
+            _stats["text_hits"] += 1
+            return cached
+
+    names = _scan(code, language)
+    with _cache_lock:
+        _text_cache[key] = names
+        while len(_text_cache) > _TEXT_CACHE_MAX:
+            _text_cache.popitem(last=False)
+    return names
+
+
+def file_symbols(path: Union[str, Path], language: Optional[str] = None) -> FrozenSet[str]:
+    """
+    Defined names for a source file, cached per file version (mtime, size).
+
+    Args:
+        path: Source file
+        language: Extension selecting the scanner (defaults to the file's)
+    """
+    path = Path(path)
+    language = language or path.suffix
+    st = os.stat(path)
+    version = (st.st_mtime_ns, st.st_size)
+    key = f"{os.path.realpath(path)}:{language}"
+    with _cache_lock:
+        cached = _file_cache.get(key)
+        if cached is not None and cached[0] == version:
+            _file_cache.move_to_end(key)
+            _stats["file_hits"] += 1
+            return cached[1]
+
+    with open(path, 'rb') as f:
+        code = f.read().decode('utf-8', errors='replace')
+    names = _scan(code, language)
+    with _cache_lock:
+        _file_cache[key] = (version, names)
+        _file_cache.move_to_end(key)
+        while len(_file_cache) > _FILE_CACHE_MAX:
+            _file_cache.popitem(last=False)
+        _stats["file_scans"] += 1
+    return names
+
+
+def get_scanner_stats() -> Dict[str, Any]:
+    """Scan and cache-hit counters for symbol extraction."""
+    with _cache_lock:
+        stats: Dict[str, Any] = dict(_stats)
+        stats["cached_files"] = len(_file_cache)
+    stats["languages"] = len(SYMBOL_SCANNERS)
+    return stats
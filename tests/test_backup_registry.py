@@ -0,0 +1,66 @@
+"""Tests for backup_manager.py's SQLite registry: the one-time JSON import and id collisions."""
+
+import json
+import uuid
+from pathlib import Path
+
+import pytest
+
+import backup_manager
+from backup_manager import BackupManager
+
+LEGACY = {
+    "backups": [
+        {"id": "aaaa1111", "timestamp": "2024-01-01T00:00:00+00:00", "file_path": "/srv/a.py",
+         "backup_path": "/srv/a.py.bak", "operation": "inject", "server_name": "demo", "metadata": {}},
+        {"id": "bbbb2222", "timestamp": "2024-01-02T00:00:00+00:00", "file_path": "/srv/b.py",
+         "backup_path": "/srv/b.py.bak", "operation": "remove", "server_name": "demo"},
+    ],
+    "checkpoints": [
+        {"id": "cccc3333", "timestamp": "2024-01-03T00:00:00+00:00", "server_name": "demo",
+         "description": "before refactor", "files": []},
+    ],
+}
+
+
+def test_json_registry_is_imported_once(tmp_path: Path) -> None:
+    registry = tmp_path / "backups.db"
+    legacy = tmp_path / "backups.json"
+    legacy.write_text(json.dumps(LEGACY), encoding="utf-8")
+
+    manager = BackupManager(registry)
+    assert not legacy.exists()
+    assert (tmp_path / "backups.json.migrated").exists()
+    assert [b["id"] for b in manager.list_backups()] == ["bbbb2222", "aaaa1111"]
+    assert [c["id"] for c in manager.list_checkpoints()] == ["cccc3333"]
+
+    # A stale backups.json (e.g. written by an old process) is not imported again
+    stale = {"backups": [{**LEGACY["backups"][0], "id": "dddd4444"}], "checkpoints": []}
+    legacy.write_text(json.dumps(stale), encoding="utf-8")
+    manager = BackupManager(registry)
+    assert [b["id"] for b in manager.list_backups()] == ["bbbb2222", "aaaa1111"]
+    assert legacy.exists()
+
+
+def test_colliding_ids_are_redrawn(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    manager = BackupManager(tmp_path / "backups.db")
+    taken = "11111111-0000-4000-8000-000000000000"
+    fresh = "22222222-0000-4000-8000-000000000000"
+    draws = iter([uuid.UUID(value) for value in (taken, taken, taken, fresh, taken)])
+    monkeypatch.setattr(backup_manager.uuid, "uuid4", lambda: next(draws))
+
+    first = manager.register_backup("/srv/a.py", "/srv/a.py.bak", "inject")
+    second = manager.register_backup("/srv/a.py", "/srv/a.py.bak", "inject")
+    assert (first, second) == ("11111111", "22222222")
+    # Checkpoint ids only have to be unique among checkpoints
+    assert manager.create_checkpoint("demo", "snapshot", []) == "11111111"
+
+
+def test_full_uuid_after_repeated_collisions(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    manager = BackupManager(tmp_path / "backups.db")
+    taken = "33333333-0000-4000-8000-000000000000"
+    monkeypatch.setattr(backup_manager.uuid, "uuid4", lambda: uuid.UUID(taken))
+    assert manager.register_backup("/srv/a.py", "/srv/a.py.bak", "inject") == "33333333"
+    # Every short id collides, so the last attempt stores the full uuid
+    assert manager.register_backup("/srv/a.py", "/srv/a.py.bak", "inject") == taken
+    assert len(manager.list_backups()) == 2
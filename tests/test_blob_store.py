@@ -0,0 +1,86 @@
+"""Tests for blob_store.py and BackupManager's blob references: delta chains, deduplication and cleanup."""
+
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+import backup_manager
+from backup_manager import BackupManager
+from blob_store import BlobStore
+
+# Large enough that a one-line change is stored as a delta
+BASE_TEXT = "".join(f"line {i}: some source text that stays the same\n" for i in range(200))
+
+
+@pytest.fixture
+def manager(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> BackupManager:
+    monkeypatch.setattr(backup_manager, "BLOB_GRACE_SECONDS", 0)
+    return BackupManager(tmp_path / "registry" / "backups.db", snapshot_interval=10)
+
+
+def _back_up_versions(manager: BackupManager, path: Path, count: int) -> List[str]:
+    ids = []
+    for version in range(count):
+        path.write_text(BASE_TEXT + f"version {version}\n", encoding="utf-8")
+        ids.append(manager.register_backup(str(path), str(manager.store_backup(path)), "test"))
+    return ids
+
+
+def _ref_rows(manager: BackupManager) -> Dict[str, Dict[str, Any]]:
+    rows = manager._connect().execute("SELECT digest, refs, dependents, base, depth FROM blobs").fetchall()
+    return {row["digest"]: dict(row) for row in rows}
+
+
+def test_blob_store_roundtrip_and_delta(tmp_path: Path) -> None:
+    store = BlobStore(tmp_path / "blobs")
+    base_data = BASE_TEXT.encode()
+    base = store.put(base_data)
+    assert store.put(base_data) == base
+    new_data = base_data + b"one more line\n"
+    digest = store.put(new_data, base, base_data)
+    assert store.base_of(digest) == base
+    assert store.read(digest) == (new_data, 1)
+    assert store.get(base) == base_data
+    assert store.get_stats()["deduplicated"] == 1
+
+
+def test_delta_chain_refs_survive_cleanup(manager: BackupManager, tmp_path: Path) -> None:
+    path = tmp_path / "server.py"
+    ids = _back_up_versions(manager, path, 4)
+    stats = manager.get_storage_stats()
+    assert stats["backups"] == 4
+    assert stats["references"] == 4
+    assert stats["delta_blobs"] == 3
+    assert stats["max_chain_depth"] == 3
+
+    removed, kept = manager.cleanup_backups(older_than_days=0, keep_recent=1)
+    assert (removed, kept) == (3, 1)
+    # The newest backup is a delta: its whole chain stays, held by dependents
+    refs = _ref_rows(manager)
+    assert len(refs) == 4
+    assert sum(row["refs"] - row["dependents"] for row in refs.values()) == 1
+    assert all(row["refs"] == 1 for row in refs.values())
+    assert all(manager.blobs.path_for(digest) is not None for digest in refs)
+    success, message = manager.restore_backup(ids[-1], str(tmp_path / "restored.py"))
+    assert success, message
+    assert (tmp_path / "restored.py").read_text(encoding="utf-8") == BASE_TEXT + "version 3\n"
+
+    manager.cleanup_backups(older_than_days=0, keep_recent=0)
+    assert _ref_rows(manager) == {}
+    assert list(manager.blobs.iter_blobs()) == []
+
+
+def test_checkpoint_shares_blob_with_backup(manager: BackupManager, tmp_path: Path) -> None:
+    path = tmp_path / "server.py"
+    path.write_text(BASE_TEXT, encoding="utf-8")
+    backup_path = manager.store_backup(path)
+    manager.register_backup(str(path), str(backup_path), "test")
+    manager.create_checkpoint("demo", "snapshot", [str(path)])
+    [(digest, row)] = _ref_rows(manager).items()
+    assert row["refs"] == 2
+    assert manager.get_storage_stats()["saved_bytes"] == len(BASE_TEXT)
+
+    manager.cleanup_backups(older_than_days=0, keep_recent=0)
+    assert _ref_rows(manager)[digest]["refs"] == 1
+    assert manager.blobs.path_for(digest) is not None
@@ -0,0 +1,89 @@
+"""Tests for block_boundaries.py: block_end spans across block styles."""
+
+from typing import Optional
+
+import pytest
+
+from block_boundaries import BLOCK_STYLES, block_boundaries, block_end
+
+# (language, first block with delimiters hidden in strings/comments, a second block)
+CASES = [
+    ('.rs', 'fn a() {\n    let s = "}"; // }\n    let c = \'}\';\n    let r = r#"}"#;\n}\n', 'fn z() {}\n'),
+    ('.cpp', 'int a() {\n    auto s = R"x(})x";\n    int n = 1\'000; /* } */\n    return n;\n}\n', 'int z() { return 0; }\n'),
+    ('.go', 'func a() {\n\ts := `}`\n\t/* } */\n}\n', 'func z() {}\n'),
+    ('.js', 'function a() {\n  const t = `${ {} } }`;\n  const r = /[}]/;\n}\n', 'function z() {}\n'),
+    ('.kt', 'fun a() {\n    val s = "${ mapOf(1 to 2) } }"\n    /* /* } */ } */\n}\n', 'fun z() {}\n'),
+    ('.cs', 'void A() {\n    var s = @"}""";\n    var t = $"{n} }}";\n}\n', 'void Z() {}\n'),
+    ('.swift', 'func a() {\n    let s = #"}"#\n    let t = "\\(x) }"\n}\n', 'func z() {}\n'),
+    ('.php', '#[Attr] function a() {\n  # }\n  return "}";\n}\n', 'function z() {}\n'),
+    ('.py', 'def a():\n    s = """\ndef b():\n"""\n    return [\n1]\n', 'def z():\n    pass\n'),
+    ('.nim', 'proc a() =\n  let s = """\nproc b"""\n  echo s\n', 'proc z() =\n  discard\n'),
+    ('.rb', 'def a\n  s = "end #{1}"\n  x = 1 if s\n  [1].each do |y|\n  end\nend\n', 'def z\nend\n'),
+    ('.lua', 'function a()\n  local s = [[ end ]]\n  if x then return end\nend\n', 'function z()\nend\n'),
+    ('.ex', '  def a do\n    "end"\n  end\n', '  def z do\n  end\n'),
+    ('.jl', 'function a(x)\n    x[end]\nend\n', 'function z()\nend\n'),
+]
+
+
+def _first_end(first: str) -> int:
+    """Blocks end just past their closing token, before the final newline."""
+    return len(first) - 1
+
+
+@pytest.mark.parametrize("language, first, second", CASES, ids=[case[0] for case in CASES])
+def test_block_end_spans_first_block(language: str, first: str, second: str) -> None:
+    code = first + "\n" + second
+    found = block_end(code, language, 0)
+    assert found is not None
+    end, scanned = found
+    assert end == _first_end(first)
+    assert end <= scanned <= len(code)
+
+
+@pytest.mark.parametrize("language, first, second", CASES, ids=[case[0] for case in CASES])
+def test_block_end_from_later_line(language: str, first: str, second: str) -> None:
+    code = first + "\n" + second
+    start = len(first) + 1
+    found = block_end(code, language, start)
+    assert found is not None
+    assert found[0] == start + _first_end(second)
+
+
+@pytest.mark.parametrize("language, first, second", CASES, ids=[case[0] for case in CASES])
+def test_block_end_matches_full_scan(language: str, first: str, second: str) -> None:
+    code = first + "\n" + second
+    boundaries = block_boundaries(code, language)
+    assert boundaries is not None
+    found = block_end(code, language, 0)
+    assert found is not None
+    assert boundaries.end_after(0) == found[0]
+
+
+@pytest.mark.parametrize(
+    "language, code",
+    [
+        ('.rs', 'fn a() {\n    let s = "}";\n'),
+        ('.js', 'function a() {\n  const s = `x;\n}\n'),
+        ('.go', 'func a() {\n\ts := "unterminated\n}\n'),
+    ],
+)
+def test_block_end_none_when_brace_code_cannot_be_lexed(language: str, code: str) -> None:
+    assert block_end(code, language, 0) is None
+
+
+@pytest.mark.parametrize("language", ['.txt', '.md', ''])
+def test_block_end_unknown_language(language: str) -> None:
+    assert block_end("x {\n}\n", language, 0) is None
+    assert block_boundaries("x {\n}\n", language) is None
+
+
+def test_keyword_open_before() -> None:
+    code = "x = 1\ny = 2\ndef a\nend\n"
+    assert block_end(code, '.rb', 0, open_before=code.index("y")) is None
+    found: Optional[tuple] = block_end(code, '.rb', 0)
+    assert found is not None and code[:found[0]].endswith("end")
+
+
+def test_block_styles_cover_every_case() -> None:
+    styles = {BLOCK_STYLES[language] for language, _, _ in CASES}
+    assert styles == {'brace', 'keyword', 'indent'}
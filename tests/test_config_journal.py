@@ -0,0 +1,83 @@
+"""Tests for config_journal.py: recovery from damaged lines and concurrent appends."""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+from config_journal import ConfigJournal
+
+
+def _record_servers(journal: ConfigJournal, count: int) -> Dict[str, Any]:
+    config: Dict[str, Any] = {"mcpServers": {}}
+    for i in range(count):
+        new = {"mcpServers": {**config["mcpServers"], f"s{i}": {"command": "run"}}}
+        journal.record_change(config, new, f"add s{i}")
+        config = new
+    return config
+
+
+def _seqs(path: Path) -> List[int]:
+    seqs = []
+    for line in path.read_bytes().splitlines():
+        try:
+            seqs.append(json.loads(line)["seq"])
+        except ValueError:
+            continue
+    return seqs
+
+
+def test_corrupt_middle_line_is_skipped_not_truncated(tmp_path: Path) -> None:
+    path = tmp_path / "journal.jsonl"
+    config = _record_servers(ConfigJournal(path), 5)
+    lines = path.read_bytes().splitlines(keepends=True)
+    lines[2] = b'{"broken\n'
+    path.write_bytes(b"".join(lines))
+
+    journal = ConfigJournal(path)
+    new = {"mcpServers": {**config["mcpServers"], "extra": {}}}
+    journal.record_change(config, new)
+    assert path.read_bytes().count(b"\n") == len(lines) + 1
+    assert journal.get_stats()["corrupt_lines"] == 1
+    # Versions past the damaged line still replay; the lost delta shows up
+    # as a failed hash check rather than an error
+    rebuilt, info = journal.get_version(journal.head_seq())
+    assert "extra" in rebuilt["mcpServers"] and "s1" not in rebuilt["mcpServers"]
+    assert info["verified"] is False
+
+
+def test_partial_tail_is_dropped_only_on_write(tmp_path: Path) -> None:
+    path = tmp_path / "journal.jsonl"
+    config = _record_servers(ConfigJournal(path), 3)
+    with open(path, "ab") as f:
+        f.write(b'{"seq": 99, "partial')
+
+    journal = ConfigJournal(path)
+    journal.list_changes()
+    assert path.read_bytes().endswith(b"partial")
+
+    journal.record_change(config, {**config, "extra": 1})
+    assert b"partial" not in path.read_bytes()
+    assert journal.get_stats()["torn_tails_dropped"] == 1
+
+
+def test_concurrent_writers_get_unique_seqs(tmp_path: Path) -> None:
+    path = tmp_path / "journal.jsonl"
+
+    def writer(n: int) -> None:
+        journal = ConfigJournal(path)   # One instance per writer, as in separate processes
+        for k in range(15):
+            head = journal.head_seq()
+            current = journal.get_version(head)[0] if head else {}
+            journal.record_change(current, {**current, f"w{n}": k})
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    seqs = _seqs(path)
+    assert len(seqs) == len(set(seqs))
+    assert seqs == sorted(seqs)
+    assert ConfigJournal(path).get_stats()["records"] == len(seqs)
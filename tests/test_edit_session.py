@@ -0,0 +1,95 @@
+"""Tests for piece_table.py and EditSession: operations that revisit a tool touched earlier in the session."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from mcp_manager import EditSession, remove_tool_from_source
+from piece_table import PieceTable
+
+SOURCE = '''from fastmcp import FastMCP
+
+mcp = FastMCP("demo")
+
+
+@mcp.tool()
+def alpha() -> str:
+    return "a"
+
+
+@mcp.tool()
+def beta() -> str:
+    return "b"
+
+
+if __name__ == "__main__":
+    mcp.run()
+'''
+
+NEW_BETA = '@mcp.tool()\ndef beta() -> int:\n    return 2'
+
+
+@pytest.fixture
+def source_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    config_path = tmp_path / "claude_desktop_config.json"
+    monkeypatch.setenv("CLAUDE_CONFIG_PATH", str(config_path))
+    path = tmp_path / "server.py"
+    path.write_text(SOURCE, encoding="utf-8")
+    config_path.write_text(json.dumps({"mcpServers": {"demo": {"command": "python", "args": [str(path)]}}}))
+    return path
+
+
+def test_piece_table_replace_then_remove_restores_surrounding_lines() -> None:
+    table = PieceTable(["a", "b", "c", "d"])
+    piece = table.replace_original(1, 3, ["X"])
+    assert table.lines() == ["a", "X", "d"]
+    table.remove_piece(piece)
+    assert table.lines() == ["a", "d"]
+    with pytest.raises(ValueError):
+        table.remove_piece(piece)
+    with pytest.raises(ValueError):
+        table.replace_original(2, 3, [])
+
+
+def test_piece_table_append_after_removed_range() -> None:
+    table = PieceTable(["a", "b", "c"])
+    table.replace_original(1, 2, [])
+    piece = table.append(["b2"])
+    assert table.lines() == ["a", "c", "b2"]
+    table.replace_piece(piece, ["b3", "b4"])
+    assert table.lines() == ["a", "c", "b3", "b4"]
+    assert len(table) == 4
+
+
+def test_replace_then_remove_matches_plain_removal(source_file: Path) -> None:
+    session = EditSession("demo")
+    assert session.replace("alpha", '@mcp.tool()\ndef alpha() -> str:\n    return "A"')[0]
+    assert session.remove("alpha")[0]
+    text, _ = session.render()
+    assert text == remove_tool_from_source(SOURCE, "alpha", ".py")[2]
+    assert "def alpha" not in text
+    assert "def beta" in text
+    assert "\n\n\n\n" not in text
+
+
+def test_inject_after_remove_redefines_the_tool(source_file: Path) -> None:
+    session = EditSession("demo")
+    assert session.remove("beta")[0]
+    assert session.inject("beta", NEW_BETA)[0]
+    text, _ = session.render()
+    assert text.count("def beta") == 1
+    assert "return 2" in text
+    assert 'return "b"' not in text
+
+    success, message = session.commit()
+    assert success, message
+    assert source_file.read_text(encoding="utf-8") == text
+
+
+def test_inject_of_existing_tool_is_rejected(source_file: Path) -> None:
+    session = EditSession("demo")
+    success, message = session.inject("beta", NEW_BETA)
+    assert not success
+    assert "already exists" in message
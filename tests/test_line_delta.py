@@ -0,0 +1,102 @@
+"""Tests for line_delta.py: deltas must rebuild the target exactly."""
+
+import random
+
+import pytest
+
+from line_delta import DELTA_MAGIC, apply_delta, encode_delta
+
+# Lines with every line ending splitlines() knows about, blank lines and a
+# line repeated often enough to exercise the candidate limit
+_LINES = [
+    b"def f(x):\n", b"    return x\n", b"\n", b"}\n", b"{\n", b"x = 1\r\n", b"lone\r", b"tab\there\n",
+    b"caf\xc3\xa9\n", b"    pass\n", b"", b"no newline", b"\x00\x01\n",
+]
+
+
+def _random_text(rng: random.Random, lines: int) -> bytes:
+    return b"".join(rng.choice(_LINES) for _ in range(lines))
+
+
+def _mutate(rng: random.Random, base: bytes) -> bytes:
+    """Apply a few random line and byte edits."""
+    lines = base.splitlines(keepends=True)
+    for _ in range(rng.randint(1, 6)):
+        kind = rng.choice(("insert", "delete", "replace", "bytes", "duplicate"))
+        at = rng.randint(0, len(lines))
+        if kind == "insert":
+            lines[at:at] = [rng.choice(_LINES) for _ in range(rng.randint(1, 5))]
+        elif kind == "delete":
+            del lines[at:at + rng.randint(1, 5)]
+        elif kind == "replace":
+            lines[at:at + 1] = [rng.choice(_LINES)]
+        elif kind == "duplicate" and lines:
+            lines[at:at] = lines[rng.randint(0, len(lines) - 1):][:3]
+        else:
+            text = b"".join(lines)
+            pos = rng.randint(0, len(text))
+            text = text[:pos] + bytes(rng.randint(0, 255) for _ in range(rng.randint(0, 4))) + text[pos + 2:]
+            lines = text.splitlines(keepends=True)
+    return b"".join(lines)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_round_trip_fuzz(seed: int) -> None:
+    rng = random.Random(seed)
+    base = _random_text(rng, rng.randint(0, 80))
+    for _ in range(10):
+        target = _mutate(rng, base)
+        delta = encode_delta(base, target)
+        assert apply_delta(base, delta) == target
+        base = target
+
+
+@pytest.mark.parametrize(
+    "base, target",
+    [
+        (b"", b""),
+        (b"", b"a\nb\n"),
+        (b"a\nb\n", b""),
+        (b"a\nb", b"a\nb\n"),
+        (b"a\nb\n", b"a\nb"),
+        (b"a\r\nb\rc\n", b"a\r\nX\rc\n"),
+        (b"same\n" * 50, b"same\n" * 51),
+        (b"x\n", b"\n\n\n"),
+    ],
+)
+def test_round_trip_edges(base: bytes, target: bytes) -> None:
+    assert apply_delta(base, encode_delta(base, target)) == target
+
+
+def test_identical_text_is_one_copy() -> None:
+    base = b"".join(b"line %d\n" % i for i in range(1000))
+    assert encode_delta(base, base) == DELTA_MAGIC + b"C 0 1000\n"
+
+
+def test_small_edit_to_large_text_gives_small_delta() -> None:
+    base = b"".join(b"def tool_%d(x):\n    return x * %d\n\n\n" % (i, i) for i in range(5000))
+    at = base.index(b"def tool_2500")
+    insertion = b"def injected(path):\n    return path\n\n\n"
+    target = base[:at] + insertion + base[at:]
+    delta = encode_delta(base, target)
+    assert apply_delta(base, delta) == target
+    assert len(delta) < len(insertion) + 64
+
+
+def test_moved_block_is_copied_not_inserted() -> None:
+    block = b"".join(b"moved line %d\n" % i for i in range(200))
+    rest = b"".join(b"other line %d\n" % i for i in range(200))
+    base, target = block + rest, rest + block
+    delta = encode_delta(base, target)
+    assert apply_delta(base, delta) == target
+    assert len(delta) < 64
+
+
+def test_apply_rejects_non_delta() -> None:
+    with pytest.raises(ValueError):
+        apply_delta(b"base\n", b"not a delta")
+
+
+def test_apply_rejects_unknown_op() -> None:
+    with pytest.raises(ValueError):
+        apply_delta(b"base\n", DELTA_MAGIC + b"X 1\n")
@@ -0,0 +1,88 @@
+"""Tests for patch_plan.py: combined-rule group mapping and rollback of failed writes."""
+
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+import backup_manager
+import patch_plan
+from backup_manager import BackupManager
+from patch_plan import PatchRule, _compile_rules, _Matcher, run_patch_plan
+
+
+@pytest.fixture
+def project(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.delenv("ALLOWED_ROOT_DIR", raising=False)
+    monkeypatch.setattr(backup_manager, "_backup_manager", BackupManager(tmp_path / "registry" / "backups.db"))
+    root = tmp_path / "project"
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "a.py").write_text("old(1) + old(22)\nkeep = name_x\n", encoding="utf-8")
+    (root / "pkg" / "b.py").write_text("old(3)\n", encoding="utf-8")
+    (root / "notes.txt").write_text("old(4) name_y\n", encoding="utf-8")
+    return root
+
+
+def _read_all(root: Path) -> Dict[str, str]:
+    return {p.relative_to(root).as_posix(): p.read_text(encoding="utf-8") for p in sorted(root.rglob("*")) if p.is_file()}
+
+
+def test_combined_pattern_maps_groups_to_rules() -> None:
+    compiled = _compile_rules([
+        PatchRule("*.py", r"old\((\d+)\)", r"new(\1)"),
+        PatchRule("*.py", r"(name)_(\w)", r"\2_\1"),
+    ])
+    matcher = _Matcher(compiled, (0, 1))
+    assert matcher.combined is not None
+    [(pattern, rule, groups)] = matcher.passes()
+    assert rule is None
+    for match in matcher.combined.finditer("old(7) name_z"):
+        assert groups[match.lastindex] == (0 if match.group().startswith("old") else 1)
+
+
+def test_rules_with_backreferences_get_their_own_pass() -> None:
+    compiled = _compile_rules([PatchRule("*", r"(a)\1", "b"), PatchRule("*", "c", "d")])
+    matcher = _Matcher(compiled, (0, 1))
+    assert matcher.combined is None
+    assert [rule for _, rule, _ in matcher.passes()] == [0, 1]
+
+
+def test_combined_rules_expand_their_own_groups(project: Path) -> None:
+    rules = [
+        {"glob": "*.py", "pattern": r"old\((\d+)\)", "replacement": r"new(\1)"},
+        {"glob": "*.py", "pattern": r"(name)_(\w)", "replacement": r"\2_\1"},
+        {"glob": "*.txt", "pattern": r"old\((\d+)\)", "replacement": r"txt\1"},
+    ]
+    result = run_patch_plan(str(project), rules, dry_run=False)
+    assert result["success"], result["message"]
+    assert result["matches_by_rule"] == [3, 1, 1]
+    by_file = {report["file"]: report["by_rule"] for report in result["files"]}
+    assert by_file == {"notes.txt": {"2": 1}, "pkg/a.py": {"0": 2, "1": 1}, "pkg/b.py": {"0": 1}}
+    assert _read_all(project) == {
+        "notes.txt": "txt4 name_y\n",
+        "pkg/a.py": "new(1) + new(22)\nkeep = x_name\n",
+        "pkg/b.py": "new(3)\n",
+    }
+
+
+def test_failed_write_restores_checkpoint(project: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    before = _read_all(project)
+    real_write = patch_plan.atomic_write_text
+    writes = []
+
+    def failing_write(path: Path, text: str) -> None:
+        writes.append(path)
+        if len(writes) == 2:
+            raise OSError("disk full")
+        real_write(path, text)
+
+    monkeypatch.setattr(patch_plan, "atomic_write_text", failing_write)
+    rules = [{"glob": "*.py", "pattern": r"old\((\d+)\)", "replacement": r"new(\1)"}]
+    result = run_patch_plan(str(project), rules, dry_run=False)
+    assert not result["success"]
+    assert result["rolled_back"]
+    assert "disk full" in result["message"]
+    assert _read_all(project) == before
+    [checkpoint] = backup_manager.get_backup_manager().list_checkpoints()
+    assert checkpoint["id"] == result["checkpoint_id"]
+    assert len(checkpoint["files"]) == 2
@@ -0,0 +1,121 @@
+"""Tests for regex_sandbox.py: risk analysis, time budgets and partial results."""
+
+import os
+import re
+import time
+from typing import Iterator
+
+import pytest
+
+from regex_sandbox import RegexSandbox, analyze_pattern
+
+needs_workers = pytest.mark.skipif(os.name == "nt", reason="regex workers are not supported on Windows")
+
+# Backtracks exponentially on a run of "a" with no "b" after it
+CATASTROPHIC = r"(a+)+b"
+EVIL_LINE = "a" * 32 + "c"
+
+
+@pytest.fixture
+def sandbox() -> Iterator[RegexSandbox]:
+    box = RegexSandbox(max_workers=1, budget=0.5)
+    yield box
+    box.shutdown()
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [r"(a+)+b", r"(\w*)*x", r"(a|ab)*c", r"\w+\w+x", r"(.*a){12}x", r"(x+y?){2,5}z", r"(a)\1"],
+)
+def test_risky_patterns_are_flagged(pattern: str) -> None:
+    assert analyze_pattern(pattern)
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [r"\bold_helper\b", r"def (\w+)\(", r"(ab){3}", r"(a?){2}", r"[a-z]+\d+", r"^\s*#.*$", r"(?:x|y)+z"],
+)
+def test_plain_patterns_are_not_flagged(pattern: str) -> None:
+    assert analyze_pattern(pattern) == []
+
+
+def test_analyze_rejects_bad_syntax() -> None:
+    with pytest.raises(re.error):
+        analyze_pattern("(unclosed")
+
+
+@needs_workers
+def test_search_lines_within_budget(sandbox: RegexSandbox) -> None:
+    lines = ["alpha 1", "beta", "gamma 22", "delta 333"]
+    result = sandbox.search_lines(r"\d+", lines)
+    assert result["timed_out"] is False
+    assert result["matches"] == [[0, "1"], [2, "22"], [3, "333"]]
+    assert result["lines_scanned"] == len(lines)
+
+
+@needs_workers
+def test_search_lines_timeout_keeps_partial_results(sandbox: RegexSandbox) -> None:
+    lines = ["aab"] * 20 + [EVIL_LINE] + ["ab"] * 5
+    started = time.monotonic()
+    result = sandbox.search_lines(CATASTROPHIC, lines)
+    assert time.monotonic() - started < 5
+    assert result["timed_out"] is True
+    assert result["warnings"]
+    # Risky patterns stream after every line, so all matches before the
+    # catastrophic line survive the kill
+    assert result["matches"] == [[i, "aab"] for i in range(20)]
+    assert result["lines_scanned"] == 20
+    assert sandbox.get_stats()["timeouts"] == 1
+
+
+@needs_workers
+def test_worker_recovers_after_timeout(sandbox: RegexSandbox) -> None:
+    assert sandbox.search_lines(CATASTROPHIC, [EVIL_LINE])["timed_out"] is True
+    result = sandbox.search_lines(r"b+", ["abbb"])
+    assert result["timed_out"] is False
+    assert result["matches"] == [[0, "bbb"]]
+
+
+@needs_workers
+def test_substitute_timeout_returns_no_text(sandbox: RegexSandbox) -> None:
+    result = sandbox.substitute(CATASTROPHIC, "x", EVIL_LINE)
+    assert result["timed_out"] is True
+    assert result["text"] is None
+
+    result = sandbox.substitute(r"(\w+)@", r"<\1>", "me@ you@")
+    assert result == {**result, "text": "<me> <you>", "count": 2, "timed_out": False}
+
+
+@needs_workers
+def test_substitute_bad_template(sandbox: RegexSandbox) -> None:
+    with pytest.raises(ValueError):
+        sandbox.substitute(r"(a)", r"\2", "a")
+
+
+@needs_workers
+def test_replace_passes_timeout(sandbox: RegexSandbox) -> None:
+    text = "a" * 30
+    result = sandbox.replace_passes(text, [(r"(.*a){12}x", 0, {})], [(r"(.*a){12}x", "y", True)], budget=0.3)
+    assert result["timed_out"] is True
+    assert result["text"] is None
+
+
+@needs_workers
+def test_replace_passes_combined_pattern(sandbox: RegexSandbox) -> None:
+    rules = [(r"old_(\w+)", r"new_\1", False), (r"foo", "bar", True)]
+    combined = re.compile(r"(?P<_rule0>old_(\w+))|(?P<_rule1>foo)")
+    groups = {combined.groupindex["_rule0"]: 0, combined.groupindex["_rule1"]: 1}
+    result = sandbox.replace_passes("old_x foo\nold_y\n", [(combined.pattern, None, groups)], rules)
+    assert result["text"] == "new_x bar\nnew_y\n"
+    assert result["counts"] == {0: 2, 1: 1}
+    assert [sample["line"] for sample in result["samples"]] == [1, 1, 2]
+
+
+def test_in_process_fallback_matches_worker() -> None:
+    box = RegexSandbox(max_workers=0)
+    rules = [(r"(\d+)", r"<\1>", False)]
+    result = box.replace_passes("a1 b22\n", [(r"(\d+)", 0, {})], rules)
+    assert result["text"] == "a<1> b<22>\n"
+    assert result["counts"] == {0: 2}
+    assert box.search_lines(r"\d", ["x", "y1"])["matches"] == [[1, "1"]]
+    assert box.get_stats()["in_process"] == 2
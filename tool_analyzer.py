@@ -489,8 +489,18 @@ def compare_tools(
     source1: str, source2: str, language: str
 ) -> Dict[str, Any]:
     """Compare tool sets between two source files."""
-    tools1 = {t["name"]: t for t in list_tools_in_source(source1, language)}
-    tools2 = {t["name"]: t for t in list_tools_in_source(source2, language)}
+    return compare_tool_lists(
+        list_tools_in_source(source1, language),
+        list_tools_in_source(source2, language),
+    )
+
+
+def compare_tool_lists(
+    tools_a: List[Dict[str, Any]], tools_b: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Compare two already-extracted tool lists."""
+    tools1 = {t["name"]: t for t in tools_a}
+    tools2 = {t["name"]: t for t in tools_b}
 
     names1 = set(tools1.keys())
     names2 = set(tools2.keys())
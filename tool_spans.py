@@ -0,0 +1,452 @@
+"""
+tool_spans.py - Cached index of tool definition spans for remove/replace
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from block_boundaries import block_end
+
+
+class ToolSpan(NamedTuple):
+    """Where a tool definition sits in its source text."""
+    start_line: int   # 0-based, includes leading comments/decorators
+    end_line: int     # exclusive
+    start_byte: int   # UTF-8 offset of the first line
+    end_byte: int     # UTF-8 offset just past the last line's content
+
+
+# A span function gets (index, header line, tool name) and returns
+# (start, end, reach): the definition's line range plus one past the last
+# line it looked at below the header. Edits beyond reach cannot move the span.
+SpanFunction = Callable[["ToolSpanIndex", int, str], Tuple[int, int, int]]
+
+
+def _comment_start(lines: List[str], i: int, prefixes: Tuple[str, ...]) -> int:
+    start = i
+    while start > 0 and lines[start - 1].strip().startswith(prefixes):
+        start -= 1
+    return start
+
+
+def _line_after(index: "ToolSpanIndex", start_line: int, offset: int) -> int:
+    """Line number just past the line containing ``offset - 1`` of ``joined()``."""
+    return start_line + index.joined().count('\n', index.line_offset(start_line), offset) + 1
+
+
+def _indent_end(index: "ToolSpanIndex", i: int) -> Tuple[int, int]:
+    """End of the indentation block under header i, trailing blanks trimmed; and its reach."""
+    found = block_end(index.joined(), index.language, index.line_offset(i))
+    if found is None:
+        return i + 1, min(i + 2, len(index.lines))
+    end_offset, scanned = found
+    return _line_after(index, i, end_offset), min(_line_after(index, i, scanned), len(index.lines))
+
+
+def _python_span(index: "ToolSpanIndex", i: int, tool_name: str) -> Tuple[int, int, int]:
+    lines = index.lines
+    # Decorators, then the comment block above them
+    start = i
+    while start > 0 and lines[start - 1].strip().startswith('@'):
+        start -= 1
+    start = _comment_start(lines, start, ('#',))
+    end, reach = _indent_end(index, i)
+    return start, end, reach
+
+
+def _nim_span(index: "ToolSpanIndex", i: int, tool_name: str) -> Tuple[int, int, int]:
+    lines = index.lines
+    start = _comment_start(lines, i, ('#',))
+    end, reach = _indent_end(index, i)
+    return start, end, reach
+
+
+def _brace_end(index: "ToolSpanIndex", start_line: int, lexed: bool = True) -> Tuple[int, int]:
+    """
+    End of the brace-delimited block starting at start_line, and its reach.
+
+    When lexed and the language has a lexer profile, braces inside strings,
+    char literals, comments and regex literals are ignored; otherwise (or if the block cannot
+    be lexed) braces are counted character by character.
+    """
+    lines = index.lines
+    reach_floor = 0
+    if lexed:
+        # Lex in place from the header line instead of copying the rest of the file
+        found = block_end(index.joined(), index.language, index.line_offset(start_line))
+        if found is not None:
+            end = _line_after(index, start_line, found[0])
+            return end, end
+        reach_floor = len(lines)  # The lexer looked at the whole rest of the file
+
+    depth = 0
+    found_open = False
+    for i in range(start_line, len(lines)):
+        for ch in lines[i]:
+            if ch == '{':
+                depth += 1
+                found_open = True
+            elif ch == '}':
+                depth -= 1
+                if found_open and depth == 0:
+                    return i + 1, max(i + 1, reach_floor)
+    return len(lines), len(lines)
+
+
+def _js_span(index: "ToolSpanIndex", i: int, tool_name: str) -> Tuple[int, int, int]:
+    lines = index.lines
+    start = _comment_start(lines, i, ('//', '/*'))
+    end, reach = _brace_end(index, i)
+    return start, end, reach
+
+
+def _lexed_brace_span(index: "ToolSpanIndex", i: int, tool_name: str) -> Tuple[int, int, int]:
+    lines = index.lines
+    # Comments and attributes (Rust #[...]) above the header
+    start = _comment_start(lines, i, ('//', '#[', '/*'))
+    end, reach = _brace_end(index, i)
+    return start, end, reach
+
+
+def _keyword_end(index: "ToolSpanIndex", i: int) -> int:
+    """Line after the keyword that closes the block opened on header line i."""
+    line_start = index.line_offset(i)
+    found = block_end(index.joined(), index.language, line_start, open_before=line_start + len(index.lines[i]))
+    if found is None:
+        return i + 1   # One-line or abstract definition
+    return _line_after(index, i, found[0])
+
+
+def _ruby_span(index: "ToolSpanIndex", i: int, tool_name: str) -> Tuple[int, int, int]:
+    start = _comment_start(index.lines, i, ('#',))
+    end = _keyword_end(index, i)
+    return start, end, end
+
+
+def _lua_span(index: "ToolSpanIndex", i: int, tool_name: str) -> Tuple[int, int, int]:
+    start = _comment_start(index.lines, i, ('--',))
+    end = _keyword_end(index, i)
+    return start, end, end
+
+
+def _elixir_span(index: "ToolSpanIndex", i: int, tool_name: str) -> Tuple[int, int, int]:
+    lines = index.lines
+    start = _comment_start(lines, i, ('#',))
+    start = _comment_start(lines, start, ('@',))
+    end = _keyword_end(index, i)
+    return start, end, end
+
+
+def _julia_span(index: "ToolSpanIndex", i: int, tool_name: str) -> Tuple[int, int, int]:
+    start = _comment_start(index.lines, i, ('#',))
+    end = _keyword_end(index, i)
+    return start, end, end
+
+
+def _haskell_span(index: "ToolSpanIndex", i: int, tool_name: str) -> Tuple[int, int, int]:
+    lines = index.lines
+    # Signature plus every equation and indented continuation line
+    start = _comment_start(lines, i, ('--',))
+    end = i + 1
+    while end < len(lines):
+        l = lines[end]
+        if l.strip() == '' or (l[0:1] != ' ' and l[0:1] != '\t' and not l.startswith(tool_name)):
+            break
+        end += 1
+    reach = min(end + 1, len(lines))
+    while end > i + 1 and not lines[end - 1].strip():
+        end -= 1
+    return start, end, reach
+
+
+def _ocaml_span(index: "ToolSpanIndex", i: int, tool_name: str) -> Tuple[int, int, int]:
+    lines = index.lines
+    start = _comment_start(lines, i, ('(*',))
+    end = i + 1
+    while end < len(lines):
+        l = lines[end].strip()
+        if l == '' or (l.startswith('let ') and not l.startswith('let ' + tool_name)):
+            break
+        end += 1
+    reach = min(end + 1, len(lines))
+    while end > i + 1 and not lines[end - 1].strip():
+        end -= 1
+    return start, end, reach
+
+
+# Definition headers per language: (span function, name pattern, header forms).
+# Forms are searched line by line and tried in order; "{name}" is the escaped
+# tool name for a single lookup, or a capture of the name pattern when the
+# whole file is indexed.
+_C_FUNCTION = r'(?:\w+\s+)+{name}\s*\('
+_TYPED_FUNCTION = r'\w+\s+{name}\s*\('
+_HEADER_FORMS: Dict[Tuple[str, ...], Tuple[SpanFunction, str, List[str]]] = {
+    ('.py',): (_python_span, r'\w+', [r'def\s+{name}\s*\(']),
+    ('.js', '.ts'): (_js_span, r'\w+', [
+        r'(?:export\s+)?(?:async\s+)?function\s+{name}\s*\(',
+        r'(?:const|let|var)\s+{name}\s*=',
+    ]),
+    ('.rs',): (_lexed_brace_span, r'\w+', [r'(?:pub\s+)?(?:async\s+)?fn\s+{name}\s*\(']),
+    ('.c', '.cpp', '.cc', '.cxx'): (_lexed_brace_span, r'\w+', [_C_FUNCTION]),
+    ('.go',): (_lexed_brace_span, r'\w+', [r'func\s+(?:\([^)]*\)\s+)?{name}\s*\(']),
+    ('.zig',): (_lexed_brace_span, r'\w+', [r'(?:pub\s+)?fn\s+{name}\s*\(']),
+    ('.java',): (_lexed_brace_span, r'\w+', [
+        r'(?:(?:public|private|protected)\s+)?(?:static\s+)?(?:\w+\s+){name}\s*\(',
+    ]),
+    ('.rb', '.cr'): (_ruby_span, r'\w+', [r'def\s+(?:self\.)?{name}\s*[\((\n]']),
+    ('.kt', '.kts'): (_lexed_brace_span, r'\w+', [r'fun\s+{name}\s*\(']),
+    ('.swift',): (_lexed_brace_span, r'\w+', [r'func\s+{name}\s*\(']),
+    ('.cs',): (_lexed_brace_span, r'\w+', [
+        r'(?:(?:public|private|protected|internal)\s+)?(?:static\s+)?(?:\w+\s+){name}\s*\(',
+    ]),
+    ('.php',): (_lexed_brace_span, r'\w+', [r'function\s+{name}\s*\(']),
+    ('.lua',): (_lua_span, r'[\w.:]+', [r'function\s+{name}\s*\(', r'local\s+function\s+{name}\s*\(']),
+    ('.scala',): (_lexed_brace_span, r'\w+', [r'def\s+{name}\s*[\(\[]']),
+    ('.ex', '.exs'): (_elixir_span, r'\w+[?!]?', [r'def[p]?\s+{name}\s*[\(,\s]']),
+    ('.dart', '.d'): (_lexed_brace_span, r'\w+', [_TYPED_FUNCTION]),
+    ('.hs',): (_haskell_span, r'\S+', [r'^{name}\s+']),
+    ('.ml', '.mli'): (_ocaml_span, r'\w+', [r'let\s+{name}\s']),
+    ('.nim',): (_nim_span, r'\w+', [r'(?:proc|func)\s+{name}\s*[\(\*]']),
+    ('.raku', '.rakumod', '.pm6'): (_lexed_brace_span, r'[\w-]+', [r'(?:sub|method)\s+{name}\s*[\(\s]']),
+    ('.jl',): (_julia_span, r'[\w.!]+', [r'function\s+{name}\s*[\((\n]']),
+}
+
+# Built once at import: extension -> (span function, full name pattern, indexing forms, form templates)
+_HEADERS: Dict[str, Tuple[SpanFunction, "re.Pattern[str]", List["re.Pattern[str]"], List[str]]] = {
+    ext: (
+        span,
+        re.compile(name_pattern),
+        [re.compile(form.replace('{name}', f'(?P<name>{name_pattern})')) for form in forms],
+        forms,
+    )
+    for exts, (span, name_pattern, forms) in _HEADER_FORMS.items()
+    for ext in exts
+}
+
+SPAN_LANGUAGES = frozenset(_HEADERS)
+
+# Line boundaries str.splitlines() knows besides '\n'
+_OTHER_LINE_BREAKS = re.compile(r'[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+_stats_lock = threading.Lock()
+_stats = {"builds": 0, "hits": 0, "edits": 0, "spans_computed": 0, "spans_reused": 0, "direct_scans": 0, "spans_carried": 0}
+
+
+def _count(key: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def _scan_headers(
+    lines: List[str], forms: List["re.Pattern[str]"], first_line: int = 0
+) -> Dict[str, List[Tuple[int, int]]]:
+    """name -> [(form rank, header line)] for every header in lines."""
+    found: Dict[str, List[Tuple[int, int]]] = {}
+    for rank, form in enumerate(forms):
+        search = form.finditer
+        for offset, line in enumerate(lines):
+            for match in search(line):
+                found.setdefault(match.group('name'), []).append((rank, first_line + offset))
+    return found
+
+
+class ToolSpanIndex:
+    """
+    Every tool definition header in one source text, by name.
+
+    Headers are found in one pass when the index is built; a definition's
+    extent is computed the first time it is looked up and memoised. After an
+    edit, ``edited`` derives the index of the new text from this one: headers
+    outside the edited lines are shifted instead of re-scanned, and memoised
+    spans survive unless the edit touched lines they depended on.
+    """
+
+    def __init__(self, source_code: str, language: str, _lines: Optional[List[str]] = None):
+        self.source_code = source_code
+        self.language = language
+        self.lines = source_code.splitlines() if _lines is None else _lines
+        self._line_bytes: Optional[List[int]] = None
+        self._line_ends: Optional[List[int]] = None
+        self._joined: Optional[str] = None
+        # name -> [(rank, header line)], sorted: the first entry is what a lookup finds
+        self._headers: Dict[str, List[Tuple[int, int]]] = {}
+        # (name, header line) -> (start, end, reach)
+        self._spans: Dict[Tuple[str, int], Tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+        if _lines is None and language in _HEADERS:
+            self._headers = _scan_headers(self.lines, _HEADERS[language][2])
+            for occurrences in self._headers.values():
+                occurrences.sort()
+            _count("builds")
+
+    def names(self) -> List[str]:
+        """Names with at least one definition header, in file order."""
+        return sorted(self._headers, key=lambda name: min(line for _, line in self._headers[name]))
+
+    def _line_range(self, tool_name: str) -> Optional[Tuple[int, int]]:
+        if self.language not in _HEADERS:
+            return None
+        span_function, name_pattern, _, templates = _HEADERS[self.language]
+        occurrences = self._headers.get(tool_name)
+        if not occurrences:
+            if name_pattern.fullmatch(tool_name):
+                return None
+            # Names the index cannot capture (operators, qualified names) are
+            # looked up with the literal name, as before indexing existed
+            _count("direct_scans")
+            for template in templates:
+                pattern = re.compile(template.replace('{name}', re.escape(tool_name)))
+                for i, line in enumerate(self.lines):
+                    if pattern.search(line):
+                        return span_function(self, i, tool_name)[:2]
+            return None
+
+        header = occurrences[0][1]
+        key = (tool_name, header)
+        with self._lock:
+            cached = self._spans.get(key)
+        if cached is not None:
+            _count("spans_reused")
+            return cached[:2]
+        computed = span_function(self, header, tool_name)
+        with self._lock:
+            self._spans[key] = computed
+        _count("spans_computed")
+        return computed[:2]
+
+    def joined(self) -> str:
+        """The lines joined with newlines (the source itself when it only uses '\\n')."""
+        if self._joined is None:
+            if _OTHER_LINE_BREAKS.search(self.source_code):
+                self._joined = '\n'.join(self.lines)
+            else:
+                self._joined = self.source_code
+        return self._joined
+
+    def line_offset(self, line: int) -> int:
+        """Offset of a line's start in ``joined()``."""
+        if self._line_ends is None:
+            self._line_ends = list(accumulate(map(len, self.lines)))
+        return self._line_ends[line - 1] + line if line else 0
+
+    def _byte_offsets(self) -> List[int]:
+        if self._line_bytes is None:
+            # Offsets of each line start in the original text (terminators included)
+            self._line_bytes = [0] + list(accumulate(
+                map(len, map(str.encode, self.source_code.splitlines(keepends=True)))
+            ))
+        return self._line_bytes
+
+    def span(self, tool_name: str) -> Optional[ToolSpan]:
+        """Line and byte range of a tool's definition, or None if not found."""
+        line_range = self._line_range(tool_name)
+        if line_range is None:
+            return None
+        start, end = line_range
+        offsets = self._byte_offsets()
+        end_byte = offsets[end - 1] + len(self.lines[end - 1].encode('utf-8'))
+        return ToolSpan(start, end, offsets[start], end_byte)
+
+    def find(self, tool_name: str) -> Optional[Tuple[int, int, str]]:
+        """(start_line, end_line, full_definition) as returned by find_tool_in_source."""
+        line_range = self._line_range(tool_name)
+        if line_range is None:
+            return None
+        start, end = line_range
+        return start, end, '\n'.join(self.lines[start:end])
+
+    def edited(self, start: int, end: int, new_lines: List[str], new_source: str) -> "ToolSpanIndex":
+        """
+        Index for the text in which lines[start:end] were replaced by new_lines.
+
+        Args:
+            start: First replaced line
+            end: One past the last replaced line
+            new_lines: Replacement lines (already split)
+            new_source: The full edited text, whose splitlines() must equal the
+                spliced line list
+        """
+        lines = self.lines[:start] + new_lines + self.lines[end:]
+        index = ToolSpanIndex(new_source, self.language, _lines=lines)
+        if self.language not in _HEADERS:
+            return index
+        delta = len(new_lines) - (end - start)
+
+        def moved(line: int) -> int:
+            return line + delta if line >= end else line
+
+        headers: Dict[str, List[Tuple[int, int]]] = {}
+        for name, occurrences in self._headers.items():
+            kept = [(rank, moved(line)) for rank, line in occurrences if not start <= line < end]
+            if kept:
+                headers[name] = kept
+        touched = set()
+        for name, occurrences in _scan_headers(new_lines, _HEADERS[self.language][2], start).items():
+            headers.setdefault(name, []).extend(occurrences)
+            touched.add(name)
+        for name in touched:
+            headers[name].sort()
+        index._headers = headers
+
+        with self._lock:
+            spans = list(self._spans.items())
+        reused = 0
+        for (name, header), (span_start, span_end, reach) in spans:
+            if start <= header < end:
+                continue
+            # Lines looked at were [span_start - 1, reach); overlap means recompute
+            if reach > start and span_start - 1 < end:
+                continue
+            index._spans[(name, moved(header))] = (moved(span_start), moved(span_end), moved(reach))
+            reused += 1
+        _count("edits")
+        _count("spans_carried", reused)
+        return index
+
+
+_INDEX_CACHE_MAX = 8
+_index_cache: "OrderedDict[Tuple[str, str], ToolSpanIndex]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_tool_spans(source_code: str, language: str) -> ToolSpanIndex:
+    """
+    Span index for a source text, cached per (language, content).
+
+    The cache holds the most recent texts, including ones produced by
+    remove/replace through ``cache_tool_spans``, so re-reading a file this
+    process just wrote finds its index already built.
+    """
+    key = (language, source_code)
+    with _cache_lock:
+        cached = _index_cache.get(key)
+        if cached is not None:
+            _index_cache.move_to_end(key)
+            _stats["hits"] += 1
+            return cached
+    index = ToolSpanIndex(source_code, language)
+    cache_tool_spans(index)
+    return index
+
+
+def cache_tool_spans(index: ToolSpanIndex) -> None:
+    """Make an index (typically one derived by ``edited``) available to lookups."""
+    key = (index.language, index.source_code)
+    with _cache_lock:
+        _index_cache[key] = index
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > _INDEX_CACHE_MAX:
+            _index_cache.popitem(last=False)
+
+
+def get_span_stats() -> Dict[str, Any]:
+    """Index builds, cache hits and span memo counters."""
+    with _stats_lock:
+        stats: Dict[str, Any] = dict(_stats)
+    with _cache_lock:
+        stats["cached_texts"] = len(_index_cache)
+    stats["languages"] = len(SPAN_LANGUAGES)
+    return stats
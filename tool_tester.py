@@ -3,6 +3,7 @@ tool_tester.py - Tool validation, dry-run injection testing, and compatibility c
 """
 
 import ast
+import json
 import os
 import re
 import subprocess
@@ -10,12 +11,51 @@ import tempfile
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from validation_cache import cached_result
+
+
+# Executables each language's signature check may invoke (validation cache key)
+_SIGNATURE_TOOLCHAINS: Dict[str, Tuple[str, ...]] = {
+    '.js': ('node',), '.ts': ('node',),
+    '.zig': ('zig',),
+    '.java': ('javac',),
+    '.rb': ('ruby',),
+    '.kt': ('kotlinc',), '.kts': ('kotlinc',),
+    '.swift': ('swiftc',),
+    '.php': ('php',),
+    '.lua': ('luac',),
+    '.dart': ('dart',),
+    '.hs': ('ghc',),
+    '.nim': ('nim',),
+    '.d': ('dmd',),
+    '.cr': ('crystal',),
+    '.raku': ('raku',), '.rakumod': ('raku',), '.pm6': ('raku',),
+    '.jl': ('julia',),
+}
+
+
+def _is_cacheable_result(result: Dict[str, Any]) -> bool:
+    """Results that only reflect a missing or hung toolchain are not cached."""
+    warnings = result.get("warnings", []) + result.get("signature_warnings", [])
+    return not any("not available" in w or "timed out" in w for w in warnings)
+
 
 def validate_tool_signature(tool_code: str, language: str) -> Dict[str, Any]:
     """
     Validate tool structure for the given language.
     Checks decorator/annotation presence, function signature, return type, etc.
+    Results are cached per (language, code, toolchain version).
     """
+    return cached_result(
+        f"signature{language}",
+        tool_code,
+        _SIGNATURE_TOOLCHAINS.get(language, ()),
+        lambda: _validate_tool_signature(tool_code, language),
+        _is_cacheable_result,
+    )
+
+
+def _validate_tool_signature(tool_code: str, language: str) -> Dict[str, Any]:
     result: Dict[str, Any] = {
         "valid": True,
         "warnings": [],
@@ -504,7 +544,24 @@ def dry_run_injection(
     """
     Simulate injection without applying it.
     Returns validation result and preview of the combined code.
+    Results are cached per (language, source, tool, toolchain version).
     """
+    binaries = ('node',) if language in ('.js', '.ts') else _SIGNATURE_TOOLCHAINS.get(language, ())
+    return cached_result(
+        f"dry_run{language}",
+        json.dumps([source_code, tool_name, tool_code]),
+        binaries,
+        lambda: _dry_run_injection(source_code, tool_name, tool_code, language),
+        _is_cacheable_result,
+    )
+
+
+def _dry_run_injection(
+    source_code: str,
+    tool_name: str,
+    tool_code: str,
+    language: str,
+) -> Dict[str, Any]:
     result: Dict[str, Any] = {
         "valid": True,
         "errors": [],
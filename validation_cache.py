@@ -0,0 +1,358 @@
+"""
+validation_cache.py - Persistent cache of code validation verdicts
+"""
+
+import atexit
+import copy
+import functools
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from atomic_io import atomic_write_text
+
+# Longest error message kept per entry; compiler output beyond this is cut
+MAX_MESSAGE_CHARS = 4000
+
+# "fast" uses parse-only front ends where a language has one; "full" is the
+# original (type-checking / compiling) validator
+VALIDATION_TIERS = ("fast", "full")
+
+# New verdicts are written out once this many are pending, once the oldest
+# pending one is this many seconds old, and at interpreter exit
+FLUSH_EVERY = 50
+FLUSH_INTERVAL = 30.0
+
+
+class ValidationCache:
+    """
+    Bounded LRU cache of validation verdicts, persisted between runs.
+
+    Entries are keyed on (language, sha256(code), toolchain), where the
+    toolchain identifies every validator binary by resolved path and version
+    string. Upgrading a compiler or changing PATH therefore misses the cache
+    instead of returning a verdict from a different toolchain.
+
+    Stores only mark the cache dirty; the file is rewritten in batches (see
+    FLUSH_EVERY / FLUSH_INTERVAL), by flush(), and at exit.
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None, max_entries: int = 2000):
+        if cache_file is None:
+            cache_dir = Path.home() / ".cache" / "universal-mcp-admin"
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = cache_dir / "validation_cache.json"
+        self.cache_file = Path(cache_file)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._versions: Dict[str, Optional[str]] = {}
+        self._latency: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._dirty = 0
+        self._dirty_since = 0.0
+        self._save_lock = threading.Lock()
+        self._load_cache()
+        self.stats = {
+            "hits": 0, "misses": 0, "stored": 0, "not_cacheable": 0, "evictions": 0,
+            "saves": 0, "save_failures": 0,
+        }
+
+    def _load_cache(self) -> None:
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self._entries = OrderedDict(data.get("entries", []))
+                self._latency = data.get("latency", {})
+            except (json.JSONDecodeError, Exception):
+                self._entries = OrderedDict()
+                self._latency = {}
+
+    def _mark_dirty(self) -> bool:
+        """Note a change (lock held); True when a batch is due to be written."""
+        if not self._dirty:
+            self._dirty_since = time.monotonic()
+        self._dirty += 1
+        return self._dirty >= FLUSH_EVERY or time.monotonic() - self._dirty_since >= FLUSH_INTERVAL
+
+    def flush(self) -> None:
+        """Write pending changes to the cache file, if there are any."""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                pending = self._dirty
+                self._dirty = 0
+                data = json.dumps({"entries": list(self._entries.items()), "latency": self._latency})
+            try:
+                atomic_write_text(self.cache_file, data, fsync=False)
+            except Exception as e:
+                with self._lock:
+                    self._dirty += pending
+                    self.stats["save_failures"] += 1
+                print(f"universal-mcp-admin: cannot write {self.cache_file}: {e}", file=sys.stderr)
+                return
+            with self._lock:
+                self.stats["saves"] += 1
+
+    # ------------------------------------------------------------------
+    # Toolchain identity
+    # ------------------------------------------------------------------
+
+    def toolchain_id(self, binaries: Sequence[str]) -> Optional[str]:
+        """
+        Describe the validator binaries as "path@version" entries.
+
+        Returns:
+            Identifier string, or None if none of the binaries is installed and
+            reports a version (verdicts from a broken toolchain are never cached)
+        """
+        parts = []
+        for name in binaries:
+            path = shutil.which(name)
+            version = self._binary_version(path) if path else None
+            if version is None:
+                parts.append(f"{name}:missing")
+                continue
+            parts.append(f"{path}@{version}")
+        if binaries and all(part.endswith(":missing") for part in parts):
+            return None
+        return "|".join(parts) or "builtin"
+
+    def _binary_version(self, path: str) -> Optional[str]:
+        """
+        Version string for a binary, probed once per process per (path, mtime).
+
+        Not persisted: toolchain shims (rustup, asdf, ...) can switch versions
+        without the shim itself changing.
+        """
+        try:
+            st = os.stat(path)
+            probe_key = f"{path}:{st.st_mtime_ns}:{st.st_size}"
+        except OSError:
+            return None
+
+        with self._lock:
+            if probe_key in self._versions:
+                return self._versions[probe_key]
+
+        version = None
+        for flag in ("--version", "-version", "version"):
+            try:
+                process = subprocess.run([path, flag], capture_output=True, text=True, timeout=10)
+            except Exception:
+                continue
+            output = (process.stdout.strip() or process.stderr.strip()).splitlines()
+            if process.returncode == 0 and output:
+                version = output[0].strip()[:200]
+                break
+
+        with self._lock:
+            self._versions[probe_key] = version
+        return version
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(language: str, code: str, toolchain: str) -> str:
+        digest = hashlib.sha256(code.encode('utf-8')).hexdigest()
+        return f"{language}:{digest}:{toolchain}"
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._entries[key]
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, verdict: Any) -> None:
+        with self._lock:
+            self._entries[key] = verdict
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+            self.stats["stored"] += 1
+            due = self._mark_dirty()
+        if due:
+            self.flush()
+
+    def record_latency(self, language: str, tier: str, seconds: float) -> None:
+        """Record the wall time of one uncached validator run."""
+        ms = seconds * 1000.0
+        with self._lock:
+            entry = self._latency.setdefault(language, {}).setdefault(
+                tier, {"runs": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+            )
+            entry["runs"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["last_ms"] = ms
+            due = self._mark_dirty()
+        if due:
+            self.flush()
+
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """Per-language, per-tier validator latency (uncached runs only)."""
+        with self._lock:
+            return {
+                language: {
+                    tier: {
+                        "runs": int(entry["runs"]),
+                        "avg_ms": round(entry["total_ms"] / entry["runs"], 1) if entry["runs"] else 0.0,
+                        "max_ms": round(entry["max_ms"], 1),
+                        "last_ms": round(entry["last_ms"], 1),
+                    }
+                    for tier, entry in tiers.items()
+                }
+                for language, tiers in self._latency.items()
+            }
+
+    def note_not_cacheable(self) -> None:
+        with self._lock:
+            self.stats["not_cacheable"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._mark_dirty()
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["entries"] = len(self._entries)
+            stats["max_entries"] = self.max_entries
+            stats["pending_writes"] = self._dirty
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["latency"] = self.get_latency_stats()
+        return stats
+
+
+def _truncated(verdict: Tuple[bool, str]) -> list:
+    is_valid, message = verdict
+    return [is_valid, message[:MAX_MESSAGE_CHARS]]
+
+
+def _is_cacheable_verdict(verdict: Sequence[Any]) -> bool:
+    """Environment failures (timeouts, crashes) are not verdicts about the code."""
+    is_valid, message = verdict
+    if is_valid:
+        return True
+    return "timed out" not in message and not message.startswith("Failed to validate")
+
+
+def cached_result(
+    namespace: str,
+    code: str,
+    binaries: Sequence[str],
+    compute: Callable[[], Any],
+    cacheable: Callable[[Any], bool],
+) -> Any:
+    """
+    Return a cached JSON-serialisable result for ``code``, computing it on a miss.
+
+    Args:
+        namespace: Cache namespace (language or check name)
+        code: Input the result depends on
+        binaries: Executables ``compute`` may invoke; empty for pure-Python checks
+        compute: Produces the result on a cache miss
+        cacheable: Decides whether a fresh result is a verdict worth keeping
+    """
+    cache = get_validation_cache()
+    toolchain = cache.toolchain_id(binaries)
+    if toolchain is None:
+        cache.note_not_cacheable()
+        return compute()
+
+    key = cache.make_key(namespace, code, toolchain)
+    cached = cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    result = compute()
+    if cacheable(result):
+        cache.put(key, copy.deepcopy(result))
+    else:
+        cache.note_not_cacheable()
+    return result
+
+
+def cached_validation(
+    language: str,
+    *binaries: str,
+    fast_binaries: Optional[Sequence[str]] = None,
+) -> Callable:
+    """
+    Decorator for ``validate_*_code(code) -> (is_valid, error_message)``
+    functions that caches their verdicts in the global ValidationCache and
+    records per-tier latency of the runs that miss.
+
+    The wrapped function accepts ``tier`` ("fast" or "full"). Validators that
+    declare ``fast_binaries`` take a ``tier`` keyword themselves; for the rest
+    both tiers run the full validator.
+
+    Args:
+        language: Cache namespace for the validator
+        binaries: Executables the full tier may invoke, in preference order
+        fast_binaries: Executables the parse-only fast tier may invoke
+    """
+    def decorator(validate: Callable[..., Tuple[bool, str]]) -> Callable[..., Tuple[bool, str]]:
+        @functools.wraps(validate)
+        def wrapper(code: str, tier: str = "full") -> Tuple[bool, str]:
+            if tier not in VALIDATION_TIERS:
+                raise ValueError(f"Unknown validation tier '{tier}'. Use one of: {', '.join(VALIDATION_TIERS)}")
+            if fast_binaries is None:
+                tier = "full"
+
+            tier_binaries = binaries if tier == "full" else fast_binaries
+
+            def compute() -> list:
+                start = time.perf_counter()
+                if fast_binaries is None:
+                    verdict = validate(code)
+                else:
+                    verdict = validate(code, tier=tier)
+                cache = get_validation_cache()
+                if cache.toolchain_id(tier_binaries) is not None:
+                    cache.record_latency(language, tier, time.perf_counter() - start)
+                return _truncated(verdict)
+
+            verdict = cached_result(
+                language if tier == "full" else f"{language}:{tier}",
+                code,
+                tier_binaries,
+                compute,
+                _is_cacheable_verdict,
+            )
+            return bool(verdict[0]), verdict[1]
+        return wrapper
+    return decorator
+
+
+# Global cache instance
+_validation_cache: Optional[ValidationCache] = None
+_validation_cache_lock = threading.Lock()
+
+
+def get_validation_cache() -> ValidationCache:
+    """Get or create the global ValidationCache instance."""
+    global _validation_cache
+    with _validation_cache_lock:
+        if _validation_cache is None:
+            _validation_cache = ValidationCache()
+            atexit.register(_validation_cache.flush)
+    return _validation_cache
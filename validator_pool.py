@@ -0,0 +1,360 @@
+"""
+validator_pool.py - Long-lived syntax-checker processes for interpreted languages
+"""
+
+import atexit
+import os
+import select
+import shutil
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Worker programs. Each reads frames of "<byte length>\n<utf-8 code>" on stdin
+# and answers "<STATUS> <byte length>\n<message>" on stdout, where STATUS is
+# OK, ERR, or FALLBACK (the snippet needs the one-shot checker, e.g. ESM).
+# A zero-length frame is a health-check ping.
+
+_NODE_WORKER = r"""
+const vm = require('vm');
+let buf = Buffer.alloc(0);
+function reply(status, msg) {
+  const out = Buffer.from(msg, 'utf8');
+  process.stdout.write(status + ' ' + out.length + '\n');
+  process.stdout.write(out);
+}
+process.stdin.on('data', (chunk) => {
+  buf = Buffer.concat([buf, chunk]);
+  for (;;) {
+    const nl = buf.indexOf(10);
+    if (nl < 0) return;
+    const n = parseInt(buf.slice(0, nl).toString(), 10);
+    if (buf.length < nl + 1 + n) return;
+    const code = buf.slice(nl + 1, nl + 1 + n).toString('utf8');
+    buf = buf.slice(nl + 1 + n);
+    try {
+      // Same CommonJS wrapper `node --check` applies; lineOffset keeps line numbers
+      new vm.Script('(function (exports, require, module, __filename, __dirname) {\n' + code + '\n})',
+                    { filename: 'snippet.js', lineOffset: -1 });
+      reply('OK', '');
+    } catch (e) {
+      const text = String((e && e.stack) || e).split('\n    at ')[0];
+      const esm = /Cannot use import statement|Unexpected token 'export'|import\.meta/.test(text);
+      reply(esm ? 'FALLBACK' : 'ERR', text);
+    }
+  }
+});
+"""
+
+_RUBY_WORKER = r"""
+STDOUT.sync = true
+STDIN.binmode
+while (header = STDIN.gets)
+  code = STDIN.read(header.to_i) || ""
+  code.force_encoding(Encoding::UTF_8)
+  begin
+    RubyVM::InstructionSequence.compile(code, "snippet.rb")
+    status, msg = "OK", ""
+  rescue SyntaxError => e
+    status, msg = "ERR", e.message
+  rescue StandardError, ScriptError => e
+    status, msg = "FALLBACK", e.message
+  end
+  msg = msg.b
+  STDOUT.write("#{status} #{msg.bytesize}\n")
+  STDOUT.write(msg)
+end
+"""
+
+# language -> (binary, arguments)
+WORKER_SPECS: Dict[str, Tuple[str, List[str]]] = {
+    "javascript": ("node", ["-e", _NODE_WORKER]),
+    "ruby": ("ruby", ["-e", _RUBY_WORKER]),
+}
+
+
+class WorkerError(Exception):
+    """Raised when a worker process dies, times out or breaks protocol."""
+    pass
+
+
+class ValidatorWorker:
+    """One long-lived checker process speaking the length-prefixed protocol."""
+
+    def __init__(self, language: str, binary: str, args: List[str]):
+        self.language = language
+        self.process = subprocess.Popen(
+            [binary, *args],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+        )
+        self.requests = 0
+        self.last_used = time.monotonic()
+        self._buffer = b""
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def check(self, code: str, timeout: float) -> Tuple[str, str]:
+        """Send one snippet and return (status, message)."""
+        data = code.encode("utf-8")
+        try:
+            self.process.stdin.write(f"{len(data)}\n".encode("ascii") + data)
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerError(f"{self.language} worker is not accepting input: {e}")
+
+        deadline = time.monotonic() + timeout
+        header = self._read_until_newline(deadline)
+        try:
+            status, length = header.split(" ", 1)
+            message = self._read_exact(int(length), deadline)
+        except ValueError:
+            raise WorkerError(f"{self.language} worker sent a malformed header: {header!r}")
+
+        self.requests += 1
+        self.last_used = time.monotonic()
+        return status, message.decode("utf-8", errors="replace")
+
+    def ping(self, timeout: float = 2.0) -> bool:
+        """Health check: an empty frame must come back OK."""
+        try:
+            return self.check("", timeout)[0] == "OK"
+        except WorkerError:
+            return False
+
+    def terminate(self) -> None:
+        try:
+            self.process.stdin.close()
+        except Exception:
+            pass
+        try:
+            self.process.terminate()
+            self.process.wait(timeout=2)
+        except Exception:
+            try:
+                self.process.kill()
+            except Exception:
+                pass
+
+    def _fill(self, deadline: float) -> None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise WorkerError(f"{self.language} worker timed out")
+        fd = self.process.stdout.fileno()
+        ready, _, _ = select.select([fd], [], [], remaining)
+        if not ready:
+            raise WorkerError(f"{self.language} worker timed out")
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            raise WorkerError(f"{self.language} worker exited")
+        self._buffer += chunk
+
+    def _read_until_newline(self, deadline: float) -> str:
+        while b"\n" not in self._buffer:
+            self._fill(deadline)
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return line.decode("ascii", errors="replace")
+
+    def _read_exact(self, n: int, deadline: float) -> bytes:
+        while len(self._buffer) < n:
+            self._fill(deadline)
+        data, self._buffer = self._buffer[:n], self._buffer[n:]
+        return data
+
+
+class ValidatorPool:
+    """
+    Pool of persistent syntax-checker processes, one small pool per language.
+
+    Workers are spawned lazily, pinged before reuse after sitting idle,
+    recycled after ``max_requests`` checks, and discarded on any error.
+    ``validate`` returns None whenever the pool cannot give a verdict so the
+    caller can fall back to its one-shot subprocess path.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_requests: int = 500,
+        idle_ping_after: float = 30.0,
+        timeout: float = 10.0,
+    ):
+        self.max_workers = max_workers
+        self.max_requests = max_requests
+        self.idle_ping_after = idle_ping_after
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._idle: Dict[str, List[ValidatorWorker]] = {}
+        self._count: Dict[str, int] = {}
+        self._unavailable: Dict[str, str] = {}
+        self.stats = {
+            "requests": 0,
+            "spawned": 0,
+            "recycled": 0,
+            "failed_health_checks": 0,
+            "worker_errors": 0,
+            "fallbacks": 0,
+        }
+        self.enabled = max_workers > 0 and os.name != "nt"
+
+    def supports(self, language: str) -> bool:
+        return self.enabled and language in WORKER_SPECS and language not in self._unavailable
+
+    def validate(self, language: str, code: str) -> Optional[Tuple[bool, str]]:
+        """
+        Check code with a pooled worker.
+
+        Returns:
+            (is_valid, error_message), or None if the caller should use the
+            one-shot path (unsupported language, missing binary, worker failure
+            or a snippet the in-process parser cannot judge)
+        """
+        if not self.supports(language):
+            return None
+
+        worker = self._acquire(language)
+        if worker is None:
+            return None
+
+        healthy = True
+        try:
+            status, message = worker.check(code, self.timeout)
+        except WorkerError:
+            healthy = False
+            with self._cond:
+                self.stats["worker_errors"] += 1
+            return None
+        finally:
+            self._release(worker, healthy)
+
+        with self._cond:
+            self.stats["requests"] += 1
+            if status == "FALLBACK":
+                self.stats["fallbacks"] += 1
+        if status == "OK":
+            return True, ""
+        if status == "ERR":
+            return False, message.strip()
+        return None
+
+    def _acquire(self, language: str) -> Optional[ValidatorWorker]:
+        while True:
+            worker = None
+            with self._cond:
+                while True:
+                    idle = self._idle.setdefault(language, [])
+                    if idle:
+                        worker = idle.pop()
+                        break
+                    if self._count.get(language, 0) < self.max_workers:
+                        self._count[language] = self._count.get(language, 0) + 1
+                        break
+                    if not self._cond.wait(timeout=self.timeout):
+                        return None
+            if worker is None:
+                break
+
+            # Checked out, so the liveness probe runs without holding the lock
+            alive = worker.is_alive()
+            if alive and (time.monotonic() - worker.last_used <= self.idle_ping_after or worker.ping()):
+                return worker
+            self._discard(worker, failed_check=alive)
+
+        binary_name, args = WORKER_SPECS[language]
+        binary = shutil.which(binary_name)
+        try:
+            if binary is None:
+                raise FileNotFoundError(binary_name)
+            worker = ValidatorWorker(language, binary, args)
+        except OSError as e:
+            with self._cond:
+                self._count[language] -= 1
+                self._unavailable[language] = f"{binary_name} not available: {e}"
+                self._cond.notify()
+            return None
+
+        with self._cond:
+            self.stats["spawned"] += 1
+        return worker
+
+    def _release(self, worker: ValidatorWorker, healthy: bool) -> None:
+        with self._cond:
+            language = worker.language
+            if healthy and worker.is_alive() and worker.requests < self.max_requests:
+                self._idle.setdefault(language, []).append(worker)
+            else:
+                if healthy:
+                    self.stats["recycled"] += 1
+                worker.terminate()
+                self._count[language] -= 1
+            self._cond.notify()
+
+    def _discard(self, worker: ValidatorWorker, failed_check: bool) -> None:
+        """Terminate a checked-out worker and free its slot."""
+        worker.terminate()
+        with self._cond:
+            if failed_check:
+                self.stats["failed_health_checks"] += 1
+            self._count[worker.language] -= 1
+            self._cond.notify()
+
+    def health_check(self) -> Dict[str, Any]:
+        """Ping every idle worker, dropping the ones that do not answer."""
+        with self._cond:
+            checked_out = {language: list(idle) for language, idle in self._idle.items()}
+            for idle in self._idle.values():
+                idle.clear()
+
+        # Pings block on worker I/O, so they run with the workers checked out
+        for workers in checked_out.values():
+            for worker in workers:
+                if worker.is_alive() and worker.ping():
+                    self._release(worker, healthy=True)
+                else:
+                    self._discard(worker, failed_check=True)
+
+        with self._cond:
+            return {
+                language: {"idle": len(self._idle.get(language, [])), "total": self._count.get(language, 0)}
+                for language in checked_out
+            }
+
+    def shutdown(self) -> None:
+        """Terminate all idle workers."""
+        with self._cond:
+            for language, idle in self._idle.items():
+                for worker in idle:
+                    worker.terminate()
+                    self._count[language] -= 1
+                idle.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats: Dict[str, Any] = dict(self.stats)
+            stats["enabled"] = self.enabled
+            stats["workers"] = {lang: count for lang, count in self._count.items()}
+            stats["unavailable"] = dict(self._unavailable)
+        return stats
+
+
+# Global pool instance
+_validator_pool: Optional[ValidatorPool] = None
+_validator_pool_lock = threading.Lock()
+
+
+def get_validator_pool() -> ValidatorPool:
+    """Get or create the global ValidatorPool instance."""
+    global _validator_pool
+    with _validator_pool_lock:
+        if _validator_pool is None:
+            try:
+                size = int(os.getenv("VALIDATOR_POOL_SIZE", "2"))
+            except ValueError:
+                size = 2
+            _validator_pool = ValidatorPool(max_workers=size)
+            atexit.register(_validator_pool.shutdown)
+    return _validator_pool